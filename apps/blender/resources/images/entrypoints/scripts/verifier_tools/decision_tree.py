@@ -19,6 +19,13 @@ class DecisionTree:
         tree = DecisionTree(data[0])
 
         return tree, data[1]
+
+    ## ======================= ##
+    ##
+    def get_used_labels(self, labels):
+        # Leaves are marked with negative feature indices
+        used_features = set(self.classifier.tree_.feature)
+        return [label for i, label in enumerate(labels) if i in used_features]
     
     ## ======================= ##
     ##   
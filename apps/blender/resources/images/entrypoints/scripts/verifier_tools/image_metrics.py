@@ -55,13 +55,10 @@ class ImgageMetrics:
         self.crop_resolution = None
         self.variance_difference = None
 
-        # ensure that the keys are correct
-        keys = ImgageMetrics.get_metric_names()
-        keys.append('Label')
-
-        for key in keys:
-            if key not in dictionary:
-                raise KeyError("missing metric:" + key)
+        # ensure that the keys are correct, metrics which the classifier
+        # doesn't use are not computed and are left as None
+        if 'Label' not in dictionary:
+            raise KeyError("missing metric: Label")
 
         # read into ImgMetrics object
         for key in dictionary:
@@ -1,14 +1,15 @@
 import os
 import sys
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
-from typing import Dict
+from typing import List, Optional, Tuple
 
 import OpenEXR
 from PIL import Image
 
-from . import decision_tree
-from .image_format_converter import convert_tga_to_png, convert_exr_to_png
+from .image_format_converter import load_exr_as_rgb
 from .image_metrics import ImgageMetrics
+from .metric_engine import get_engine
 
 
 PROVIDER_RESULT_CROP_NAME_PREFIX = "fragment_corresponding_to_"
@@ -35,6 +36,61 @@ def calculate_metrics(
     :param metrics_output_filename:
     :return:
     """
+    (compare_metrics, providers_result_crop) = compute_crop_metrics(
+        reference_crop_path,
+        providers_result_image_path,
+        top_left_corner_x,
+        top_left_corner_y
+    )
+    return _save_crop_metrics(
+        reference_crop_path,
+        compare_metrics,
+        providers_result_crop,
+        metrics_output_filename
+    )
+
+
+def calculate_metrics_in_parallel(
+        crops: List[Tuple[str, str, int, int, str]],
+        processes: Optional[int] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Calculate metrics for many crops at once, in worker processes when there
+    is more than one crop. Results are saved in the order of crops, so a
+    metrics file shared by crops holds the metrics of the last one.
+    :param crops: calculate_metrics() arguments for every crop
+    :param processes: number of worker processes, CPU count by default
+    :return: path to the metrics file and the label of every crop
+    """
+    compute_args = [crop[:4] for crop in crops]
+    if len(crops) > 1:
+        processes = min(processes or cpu_count(), len(crops))
+        with Pool(processes, initializer=get_engine,
+                  initargs=(TREE_PATH,)) as pool:
+            results = pool.starmap(compute_crop_metrics, compute_args)
+    else:
+        results = [compute_crop_metrics(*args) for args in compute_args]
+
+    return [
+        (_save_crop_metrics(crop[0], compare_metrics, providers_result_crop,
+                            crop[4]),
+         compare_metrics['Label'])
+        for crop, (compare_metrics, providers_result_crop)
+        in zip(crops, results)
+    ]
+
+
+def compute_crop_metrics(
+        reference_crop_path,
+        providers_result_image_path,
+        top_left_corner_x,
+        top_left_corner_y
+):
+    """
+    Compare the crop with the corresponding part of provider's result and
+    classify it. Images are processed in memory.
+    :return: metrics and the crop of provider's result
+    """
     (cropped_image, providers_result_crop) = \
         _load_and_prepare_images_for_comparison(
             reference_crop_path,
@@ -42,23 +98,27 @@ def calculate_metrics(
             top_left_corner_x,
             top_left_corner_y
         )
-    image_metrics = dict()
-    image_metrics['Label'] = VERIFICATION_FAIL
-
-    (classifier, labels, available_metrics) = get_metrics()
+    engine = get_engine(TREE_PATH)
 
     print(f"providers_result_crop: {providers_result_crop.getbbox()}")
-    compare_metrics = compare_images(
+    compare_metrics = engine.compare_images(
         cropped_image,
-        providers_result_crop,
-        available_metrics
+        providers_result_crop
     )
     try:
-        label = classify_with_tree(compare_metrics, classifier, labels)
-        compare_metrics['Label'] = label
+        compare_metrics['Label'] = engine.classify(compare_metrics)
     except Exception as e:
         print("There were errors %r" % e, file=sys.stderr)
         compare_metrics['Label'] = VERIFICATION_FAIL
+    return compare_metrics, providers_result_crop
+
+
+def _save_crop_metrics(
+        reference_crop_path,
+        compare_metrics,
+        providers_result_crop,
+        metrics_output_filename
+):
     providers_result_crop.save(
         _generate_path_for_providers_result_crop(reference_crop_path)
     )
@@ -74,19 +134,6 @@ def _generate_path_for_providers_result_crop(reference_crop_path):
     )
 
 
-def load_classifier():
-    classifier, feature_labels = decision_tree.DecisionTree.load(TREE_PATH)
-    return classifier, feature_labels
-
-
-def classify_with_tree(metrics, classifier, feature_labels):
-    features = dict()
-    for label in feature_labels:
-        features[label] = metrics[label]
-    results = classifier.classify_with_feature_vector(features, feature_labels)
-    return results[0].decode('utf-8')
-
-
 def _load_and_prepare_images_for_comparison(
         reference_crop_path,
         result_image_path,
@@ -105,8 +152,8 @@ def _load_and_prepare_images_for_comparison(
     """
     print(f"result_image_path = {result_image_path}")
     print(f"reference_crop_path = {reference_crop_path}")
-    providers_result_image = convert_to_png_if_needed(result_image_path)
-    reference_crop = convert_to_png_if_needed(reference_crop_path)
+    providers_result_image = load_image(result_image_path)
+    reference_crop = load_image(reference_crop_path)
     (crop_width, crop_height) = reference_crop.size
     print(
         f"top_left_corner_x={top_left_corner_x}, "
@@ -127,63 +174,26 @@ def get_file_extension_lowercase(file_path):
     return os.path.splitext(file_path)[1][1:].lower()
 
 
-def convert_to_png_if_needed(image_path):
+def load_image(image_path):
+    """
+    Open the image, converting EXR to 8-bit RGB in memory
+    :raises ValueError if the image is a multilayer OpenEXR
+    """
     extension = get_file_extension_lowercase(image_path)
-    name = os.path.basename(image_path)
-    file_name = os.path.join("/tmp/", name)
     if extension == "exr":
         channels = OpenEXR.InputFile(image_path).header()['channels']
         if 'RenderLayer.Combined.R' in channels:
-            sys.exit("There is no support for OpenEXR multilayer")
-        convert_exr_to_png(image_path, file_name)
-    elif extension == "tga":
-        convert_tga_to_png(image_path, file_name)
-    else:
-        file_name = image_path
-    return Image.open(file_name)
+            raise ValueError("There is no support for OpenEXR multilayer")
+        return load_exr_as_rgb(image_path)
+    return Image.open(image_path)
 
 
 def get_providers_result_crop(providers_result_image, x, y, width, height):
     return providers_result_image.crop((x, y, x + width, y + height))
 
 
-def get_metrics():
-    classifier, feature_labels = load_classifier()
-    available_metrics = ImgageMetrics.get_metric_classes()
-    # todo review: DONE IN DOCS
-    #  effective_metrics isn't used after filling it with values
-    #  in the loops below
-    effective_metrics = []
-    for metric in available_metrics:
-        for label in feature_labels:
-            for label_part in metric.get_labels():
-                if label_part == label and metric not in effective_metrics:
-                    effective_metrics.append(metric)
-    return (classifier, feature_labels, available_metrics)
-
-
 def get_labels_from_metrics(metrics):
     labels = []
     for metric in metrics:
         labels.extend(metric.get_labels())
     return labels
-
-
-def compare_images(image_a, image_b, metrics) -> Dict:
-    """
-    This the entry point for calculating metrics between image_a, image_b
-    once they are cropped to the same size.
-    """
-
-    # imageA/B are images read by: PIL.Image.open(image.png)
-    (crop_height, crop_width) = image_a.size
-    crop_resolution = str(crop_height) + "x" + str(crop_width)
-
-    data = {"crop_resolution": crop_resolution}
-
-    for metric_class in metrics:
-        result = metric_class.compute_metrics(image_a, image_b)
-        for key, value in result.items():
-            data[key] = value
-
-    return data
@@ -1,3 +1,4 @@
+import numpy
 from PIL import Image
 import sys
 
@@ -31,34 +32,32 @@ class MetricMassCenterDistance:
     @staticmethod
     def compute_mass_centers(image):
         image = image.convert('RGB')
-        pixels = image.load()
+        # int64 keeps the sums exact, like the former per pixel loop did
+        pixels = numpy.array(image, dtype=numpy.int64)
         width, height = image.size
+        x_weights = numpy.arange(width, dtype=numpy.int64)
+        y_weights = numpy.arange(height, dtype=numpy.int64)
         results = dict()
-        for channel_index in range(len(pixels[0, 0])):
-            mass_center_x = 0
-            mass_center_y = 0
-            total_mass = 0
-            for x in range(width):
-                for y in range(height):
-                    mass = pixels[x, y][channel_index]
-                    mass_center_x += mass * x
-                    mass_center_y += mass * y
-                    total_mass += mass
-                    
+        for channel_index in range(pixels.shape[2]):
+            channel = pixels[..., channel_index]
+            total_mass = int(channel.sum())
+            mass_center_x = int((channel.sum(axis=0) * x_weights).sum())
+            mass_center_y = int((channel.sum(axis=1) * y_weights).sum())
+
             divisor_x = (float(total_mass) * width)
             divisor_y = (float(total_mass) * height)
-               
+
             if divisor_x == 0:
                 mass_center_x = 0.5
             else:
                 mass_center_x = mass_center_x / divisor_x
-                
+
             if divisor_y == 0:
                 mass_center_y = 0.5
             else:
                 mass_center_y = mass_center_y / divisor_y
-            
-            results[channel_index] = mass_center_x, mass_center_y        
+
+            results[channel_index] = mass_center_x, mass_center_y
         return results
 
 
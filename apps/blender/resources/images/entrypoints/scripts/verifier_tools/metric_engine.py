@@ -0,0 +1,57 @@
+from typing import Dict, Optional
+
+from . import decision_tree
+from .image_metrics import ImgageMetrics
+
+# Engine of the current process, see get_engine()
+_engine: Optional['MetricEngine'] = None
+
+
+class MetricEngine:
+    """
+    Compares crops with the decision tree classifier. The classifier is loaded
+    once and only the metrics which the tree splits on are computed.
+    """
+
+    def __init__(self, tree_path) -> None:
+        self.classifier, self.feature_labels = \
+            decision_tree.DecisionTree.load(tree_path)
+        self.required_labels = \
+            self.classifier.get_used_labels(self.feature_labels)
+        self.metric_classes = [
+            metric_class
+            for metric_class in ImgageMetrics.get_metric_classes()
+            if set(metric_class.get_labels()) & set(self.required_labels)
+        ]
+
+    def compare_images(self, image_a, image_b) -> Dict:
+        """
+        Calculate required metrics between image_a and image_b, read by
+        PIL.Image.open() and cropped to the same size.
+        """
+        (crop_height, crop_width) = image_a.size
+        data = {"crop_resolution": str(crop_height) + "x" + str(crop_width)}
+
+        for metric_class in self.metric_classes:
+            data.update(metric_class.compute_metrics(image_a, image_b))
+        return data
+
+    def classify(self, metrics: Dict) -> str:
+        # The tree doesn't split on features other than the required ones,
+        # so their values don't change the result
+        features = {
+            label: metrics.get(label, 0.0) for label in self.feature_labels
+        }
+        results = self.classifier.classify_with_feature_vector(
+            features,
+            self.feature_labels
+        )
+        return results[0].decode('utf-8')
+
+
+def get_engine(tree_path) -> MetricEngine:
+    """ The engine of the current process, created on first use """
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        _engine = MetricEngine(tree_path)
+    return _engine
@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from pathlib import Path
 from pprint import pprint
 from typing import List, Optional, Tuple, Any, Dict
@@ -8,7 +9,7 @@ from ..render_tools import blender_render as blender
 from .crop_generator import WORK_DIR, OUTPUT_DIR, FloatingPointBox, Crop, \
     Resolution
 from .file_extension.matcher import get_expected_extension
-from .image_metrics_calculator import calculate_metrics
+from .image_metrics_calculator import calculate_metrics_in_parallel
 
 
 def get_crop_with_id(id: int, crops: [List[Crop]]) -> Optional[Crop]:
@@ -110,7 +111,7 @@ def make_verdict(
         crops: List[Crop],
         reference_results: List[Dict[str, Any]],
 ) -> None:
-    verdict = True
+    crops_to_compare = []
 
     for crop_data in reference_results:
         crop = get_crop_with_id(crop_data['crop']['id'], crops)
@@ -124,19 +125,28 @@ def make_verdict(
         for crop, providers_result_image_path in zip(
                 crop_data['results'], providers_result_images_paths):
             crop_path = get_crop_path(OUTPUT_DIR, crop)
-            results_path = calculate_metrics(
+            crops_to_compare.append((
                 crop_path,
                 providers_result_image_path,
                 left, top,
-                metrics_output_filename=os.path.join(
+                os.path.join(
                     OUTPUT_DIR,
                     crop_data['crop']['outfilebasename'] + "metrics.txt")
-            )
-            print("results_path: ", results_path)
-            with open(results_path, 'r') as f:
-                data = json.load(f)
-            if data['Label'] != "TRUE":
-                verdict = False
+            ))
+
+    verdict = True
+    try:
+        results = calculate_metrics_in_parallel(crops_to_compare)
+    except ValueError as e:
+        # Provider's result can't be compared, e.g. a multilayer OpenEXR
+        print("Metrics calculation failed: %r" % e, file=sys.stderr)
+        results = []
+        verdict = False
+
+    for results_path, label in results:
+        print("results_path: ", results_path)
+        if label != "TRUE":
+            verdict = False
 
     with open(os.path.join(OUTPUT_DIR, 'verdict.json'), 'w') as f:
         json.dump({'verdict': verdict}, f)
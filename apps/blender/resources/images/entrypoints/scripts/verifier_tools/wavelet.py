@@ -6,7 +6,9 @@ import sys
 
 
 def calculate_sum(coefficient):
-    return sum(sum(coefficient ** 2))
+    # Same order of additions as sum(sum(coefficient)): rows are added one
+    # after another, then the elements of the result, so values don't change
+    return numpy.cumsum(numpy.sum(coefficient ** 2, axis=0))[-1]
 
 
 def calculate_size(coefficient):
@@ -37,6 +39,12 @@ def calculate_mse(coefficient1, coefficient2, low, high):
         return sum_ / count
 
 
+def _sum_absolute(coefficients):
+    # Same order of additions as sum(sum(sum(numpy.absolute(coefficients))))
+    abs_coefficients = numpy.absolute(coefficients)
+    return numpy.cumsum(abs_coefficients.sum(axis=0).sum(axis=0))[-1]
+
+
 ## ======================= ##
 ##
 def calculate_frequencies(coefficient1, coefficient2):
@@ -46,11 +54,8 @@ def calculate_frequencies(coefficient1, coefficient2):
     frequencies = list()
 
     for i in range(start_level, num_of_levels):
-        abs_coeff1 = numpy.absolute(coefficient1[i])
-        abs_coeff2 = numpy.absolute(coefficient2[i])
-
-        sum_coeffs1 = sum(sum(sum(abs_coeff1)))
-        sum_coeffs2 = sum(sum(sum(abs_coeff2)))
+        sum_coeffs1 = _sum_absolute(coefficient1[i])
+        sum_coeffs2 = _sum_absolute(coefficient2[i])
 
         diff = numpy.absolute(sum_coeffs2 - sum_coeffs1) / (
                     3 * coefficient1[i][0].size)
@@ -60,10 +65,30 @@ def calculate_frequencies(coefficient1, coefficient2):
     return frequencies
 
 
+def calculate_band_mses(coefficient1, coefficient2):
+    """
+    MSE of base, low, mid and high frequency bands of decompositions
+    """
+    total_length = len(coefficient1) - 1
+    one_third_of_length = int(total_length / 3)
+    two_thirds_of_length = int(total_length * 2 / 3)
+    bands = [
+        (0, 1),
+        (1, 1 + one_third_of_length),
+        (1 + one_third_of_length, 1 + two_thirds_of_length),
+        (1 + two_thirds_of_length, 1 + total_length),
+    ]
+    return [calculate_mse(coefficient1, coefficient2, low, high)
+            for low, high in bands]
+
+
 ## ======================= ##
 ##
 class MetricWavelet:
 
+    WAVELETS = ["db4", "sym2", "haar"]
+    BANDS = ["base", "low", "mid", "high"]
+
     ## ======================= ##
     ##
     @staticmethod
@@ -76,132 +101,29 @@ class MetricWavelet:
         np_image2 = numpy.array(image2)
 
         result = dict()
-        result["wavelet_db4_base"] = 0
-        result["wavelet_db4_low"] = 0
-        result["wavelet_db4_mid"] = 0
-        result["wavelet_db4_high"] = 0
-
-        for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "db4")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "db4")
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_db4_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_db4_low"] = result[
-                "wavelet_db4_low"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1, 1 + one_third_of_length
-            )
-            result["wavelet_db4_mid"] = result[
-                "wavelet_db4_mid"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_db4_high"] = result[
-                "wavelet_db4_high"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + two_thirds_of_length,
-                1 + total_length
-            )
-
-        #
-        result["wavelet_sym2_base"] = 0
-        result["wavelet_sym2_low"] = 0
-        result["wavelet_sym2_mid"] = 0
-        result["wavelet_sym2_high"] = 0
-
-        for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "sym2")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "sym2")
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_sym2_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_sym2_low"] = result[
-                "wavelet_sym2_low"
-             ] + calculate_mse(
-                coefficient1, coefficient2, 1, 1 + one_third_of_length
-            )
-            result["wavelet_sym2_mid"] = result[
-                "wavelet_sym2_mid"
-             ] + calculate_mse(
-                coefficient1, coefficient2, 1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_sym2_high"] = result[
-                "wavelet_sym2_high"
-            ] + calculate_mse(
-                coefficient1, coefficient2, 1 + two_thirds_of_length,
-                1 + total_length
-            )
-
-        # Frequency metrics based on haar wavlets
-        result["wavelet_haar_freq_x1"] = 0
-        result["wavelet_haar_freq_x2"] = 0
-        result["wavelet_haar_freq_x3"] = 0
-
-        result["wavelet_haar_base"] = 0
-        result["wavelet_haar_low"] = 0
-        result["wavelet_haar_mid"] = 0
-        result["wavelet_haar_high"] = 0
+        for wavelet in MetricWavelet.WAVELETS:
+            for band in MetricWavelet.BANDS:
+                result["wavelet_{}_{}".format(wavelet, band)] = 0
+        for i in range(1, 4):
+            result["wavelet_haar_freq_x{}".format(i)] = 0
 
         for i in range(0, 3):
-            coefficient1 = pywt.wavedec2(np_image1[..., i], "haar")
-            coefficient2 = pywt.wavedec2(np_image2[..., i], "haar")
-
-            frequencies = calculate_frequencies(coefficient1, coefficient2)
-
-            result["wavelet_haar_freq_x1"] = result["wavelet_haar_freq_x1"] + \
-                                             frequencies[0]
-            result["wavelet_haar_freq_x2"] = result["wavelet_haar_freq_x2"] + \
-                                             frequencies[1]
-            result["wavelet_haar_freq_x3"] = result["wavelet_haar_freq_x3"] + \
-                                             frequencies[2]
-
-            total_length = len(coefficient1) - 1
-            one_third_of_length = int(total_length / 3)
-            two_thirds_of_length = int(total_length * 2 / 3)
-
-            result["wavelet_haar_base"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                0,
-                1
-            )
-            result["wavelet_haar_low"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1,
-                1 + one_third_of_length
-            )
-            result["wavelet_haar_mid"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1 + one_third_of_length,
-                1 + two_thirds_of_length
-            )
-            result["wavelet_haar_high"] += calculate_mse(
-                coefficient1,
-                coefficient2,
-                1 + two_thirds_of_length,
-                1 + total_length
-            )
+            for wavelet in MetricWavelet.WAVELETS:
+                # Each decomposition is computed once and reused by all of
+                # the metrics based on it
+                coefficient1 = pywt.wavedec2(np_image1[..., i], wavelet)
+                coefficient2 = pywt.wavedec2(np_image2[..., i], wavelet)
+
+                mses = calculate_band_mses(coefficient1, coefficient2)
+                for band, mse in zip(MetricWavelet.BANDS, mses):
+                    result["wavelet_{}_{}".format(wavelet, band)] += mse
+
+                if wavelet == "haar":
+                    frequencies = calculate_frequencies(coefficient1,
+                                                        coefficient2)
+                    for j, frequency in enumerate(frequencies[:3]):
+                        result["wavelet_haar_freq_x{}".format(j + 1)] += \
+                            frequency
 
         return result
 
@@ -13,8 +13,9 @@ from apps.blender.blenderenvironment import BlenderEnvironment, \
     BlenderNVGPUEnvironment
 from apps.core.task.coretask import CoreTaskTypeInfo
 from apps.rendering.resources.imgrepr import OpenCVImgRepr
+from apps.rendering.resources.previewcompositor import PreviewCompositor
 from apps.rendering.resources.renderingtaskcollector import \
-    RenderingTaskCollector
+    StreamingRenderingTaskCollector
 from apps.rendering.resources.utils import handle_opencv_image_error
 from apps.rendering.task.framerenderingtask import FrameRenderingTask, \
     FrameRenderingTaskBuilder, FrameRendererOptions
@@ -34,7 +35,8 @@ logger = logging.getLogger(__name__)
 
 class PreviewUpdater(object):
     def __init__(self, preview_file_path, preview_res_x, preview_res_y,
-                 expected_offsets):
+                 expected_offsets,
+                 compositor: Optional[PreviewCompositor] = None):
         # pairs of (subtask_number, its_image_filepath)
         # careful: chunks' numbers start from 1
         self.chunks = {}
@@ -42,6 +44,7 @@ class PreviewUpdater(object):
         self.preview_res_y = preview_res_y
         self.preview_file_path = preview_file_path
         self.expected_offsets = expected_offsets
+        self.compositor = compositor or PreviewCompositor(PREVIEW_EXT)
 
         # where the match ends - since the chunks have unexpectable sizes, we
         # don't know where to paste new chunk unless all of the above are in
@@ -71,20 +74,23 @@ class PreviewUpdater(object):
                                                      chunk_height)
 
             def open_or_create_image():
-                if not os.path.exists(self.preview_file_path) \
-                        or len(self.chunks) == 1:
+                preview_img = None
+                if len(self.chunks) > 1:
+                    preview_img = self.compositor.get(self.preview_file_path)
+                if preview_img is None:
                     chunk_channels = subtask_img.get_channels()
-                    return OpenCVImgRepr.empty(self.preview_res_x,
-                                               self.preview_res_y,
-                                               channels=chunk_channels)
-                return OpenCVImgRepr.from_image_file(self.preview_file_path)
+                    preview_img = OpenCVImgRepr.empty(self.preview_res_x,
+                                                      self.preview_res_y,
+                                                      channels=chunk_channels)
+                    self.compositor.set(self.preview_file_path, preview_img)
+                return preview_img
 
             preview_img = open_or_create_image()
 
             subtask_img_resized.try_adjust_type(OpenCVImgRepr.IMG_U8)
 
             preview_img.paste_image(subtask_img_resized, 0, offset)
-            preview_img.save_with_extension(self.preview_file_path, PREVIEW_EXT)
+            self.compositor.changed(self.preview_file_path, preview_img)
 
         if not handler_result.success:
             return
@@ -99,9 +105,16 @@ class PreviewUpdater(object):
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
         if os.path.exists(self.preview_file_path):
-            with handle_opencv_image_error(logger):
-                OpenCVImgRepr.empty(self.preview_res_x, self.preview_res_y) \
-                    .save_with_extension(self.preview_file_path, PREVIEW_EXT)
+            self.compositor.set(
+                self.preview_file_path,
+                OpenCVImgRepr.empty(self.preview_res_x, self.preview_res_y))
+            self.compositor.flush(self.preview_file_path)
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        # Pickled before previews were composed in memory
+        if 'compositor' not in state:
+            self.compositor = PreviewCompositor(PREVIEW_EXT)
 
     def _get_height(self, subtask_number):
         next_offset = \
@@ -114,6 +127,9 @@ class RenderingTaskTypeInfo(CoreTaskTypeInfo):
     @classmethod
     def get_preview(cls, task, single=False):
         result = None
+        if task:
+            task.flush_preview()
+
         if not task:
             pass
         elif task.use_frames:
@@ -325,18 +341,22 @@ class BlenderRenderTask(FrameRenderingTask):
                                                                   PREVIEW_EXT)
                 preview_path = os.path.join(self.tmp_dir, preview_name)
                 self.preview_file_path.append(preview_path)
-                self.preview_updaters.append(PreviewUpdater(preview_path,
-                                                            preview_x,
-                                                            preview_y,
-                                                            expected_offsets))
+                self.preview_updaters.append(PreviewUpdater(
+                    preview_path,
+                    preview_x,
+                    preview_y,
+                    expected_offsets,
+                    compositor=self.preview_compositor))
         else:
             preview_name = "current_preview.{}".format(PREVIEW_EXT)
             self.preview_file_path = "{}".format(os.path.join(self.tmp_dir,
                                                               preview_name))
-            self.preview_updater = PreviewUpdater(self.preview_file_path,
-                                                  preview_x,
-                                                  preview_y,
-                                                  expected_offsets)
+            self.preview_updater = PreviewUpdater(
+                self.preview_file_path,
+                preview_x,
+                preview_y,
+                expected_offsets,
+                compositor=self.preview_compositor)
 
     # pylint: disable-msg=too-many-locals
     def query_extra_data(self, perf_index: float,
@@ -521,9 +541,12 @@ class BlenderRenderTask(FrameRenderingTask):
 
                 img.try_adjust_type(OpenCVImgRepr.IMG_U8)
 
-                img.save_with_extension(preview_task_file_path, PREVIEW_EXT)
-                img.save_with_extension(self._get_preview_file_path(num),
-                                        PREVIEW_EXT)
+                # The frame is complete, its previews won't change anymore
+                preview_file_path = self._get_preview_file_path(num)
+                self.preview_compositor.set(preview_task_file_path, img)
+                self.preview_compositor.set(preview_file_path, img.copy())
+                self.preview_compositor.flush(preview_task_file_path)
+                self.preview_compositor.flush(preview_file_path)
         else:
             self.preview_updaters[num].update_preview(new_chunk_file_path, part)
             self._update_frame_task_preview()
@@ -565,24 +588,6 @@ class BlenderRenderTask(FrameRenderingTask):
             part = (subtask['start_task'] - 1) % parts + 1
             self.mark_part_on_preview(part, img_task, color, pu)
 
-    def _put_frame_together(self, frame_num, num_start):
-        directory = os.path.dirname(self.output_file)
-        output_file_name = os.path.join(directory,
-                                        self._get_output_name(frame_num))
-        frame_key = str(frame_num)
-        collected = self.frames_given[frame_key]
-        collected = OrderedDict(sorted(collected.items()))
-        collector = CustomCollector(width=self.res_x,
-                                    height=self.res_y)
-        for file in collected.values():
-            collector.add_img_file(file)
-        with handle_opencv_image_error(logger):
-            image = collector.finalize()
-            image.save_with_extension(output_file_name, self.output_format)
-        self.collected_file_names[frame_num] = output_file_name
-        self._update_frame_preview(output_file_name, frame_num, final=True)
-        self._update_frame_task_preview()
-
 
 class BlenderNVGPURenderTask(BlenderRenderTask):
     ENVIRONMENT_CLASS: Type[BlenderEnvironment] = BlenderNVGPUEnvironment
@@ -625,9 +630,9 @@ class BlenderNVGPURenderTaskBuilder(BlenderRenderTaskBuilder):
     TASK_CLASS: Type[BlenderRenderTask] = BlenderNVGPURenderTask
 
 
-class CustomCollector(RenderingTaskCollector):
+class CustomCollector(StreamingRenderingTaskCollector):
     def __init__(self, width=1, height=1):
-        RenderingTaskCollector.__init__(self, width, height)
+        StreamingRenderingTaskCollector.__init__(self, width, height)
         self.current_offset = 0
 
     def _paste_image(self, final_img, new_part, num):
@@ -94,6 +94,8 @@ class CoreTaskTypeInfo(TaskTypeInfo):
 class CoreTask(Task):
     VERIFIER_CLASS: Type[CoreVerifier] = CoreVerifier
     VERIFICATION_QUEUE = VerificationQueue()
+    PER_SUBTASK_ATTRS = ('subtasks_given', 'stdout', 'stderr', 'results')
+    STATIC_ATTRS = ('task_definition', 'task_resources', 'environment')
 
     ENVIRONMENT_CLASS: 'Type[Environment]'
 
@@ -225,6 +227,7 @@ class CoreTask(Task):
             subtask_id,
             self._deadline,
             verification_finished_,
+            task_id=self.header.task_id,
             subtask_info={**self.subtasks_given[subtask_id],
                           **{'owner': self.header.task_owner.key}},
             results=result_files,
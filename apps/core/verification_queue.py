@@ -1,9 +1,12 @@
 import logging
-import queue
+import time
+from collections import deque
 from functools import partial
 from types import FunctionType
-from typing import Optional, Type, Dict, Tuple
+from typing import Deque, Optional, Type, Dict, Tuple
 
+from golem.task.verification.concurrency import AdaptiveConcurrency, \
+    TASK_FAIRNESS_PENALTY
 from golem.verifier.core_verifier import CoreVerifier
 from twisted.internet.defer import Deferred, gatherResults
 
@@ -11,8 +14,14 @@ from apps.core.verification_task import VerificationTask
 
 logger = logging.getLogger(__name__)
 
+QueuedEntry = Tuple[float, VerificationTask, Type[CoreVerifier]]
+
 
 class VerificationQueue:
+    """ Runs up to `concurrency` verifications at once, fewer when there is
+        not enough free CPU or memory. Entries are started in order of
+        submission, but each running verification of a task delays its other
+        entries by TASK_FAIRNESS_PENALTY seconds. """
 
     #  We assume that after 30 minutes verification tasks is stalled (possibly
     #  to bugs in third party docker api). After this period we finish
@@ -21,10 +30,13 @@ class VerificationQueue:
     #  results.
     VERIFICATION_TIMEOUT = 1800
 
-    def __init__(self, concurrency: int = 1) -> None:
-        self._concurrency = concurrency
-        self._queue: queue.Queue = queue.Queue()
+    def __init__(self, concurrency: Optional[int] = None) -> None:
+        self._concurrency = AdaptiveConcurrency(max_workers=concurrency)
+        # Queued entries of every task, in order of submission
+        self._queue: Dict[Optional[str], Deque[QueuedEntry]] = dict()
         self._jobs: Dict[str, Deferred] = dict()
+        # Task ids of running verifications, by subtask id
+        self._job_tasks: Dict[str, Optional[str]] = dict()
         self.callbacks: Dict[VerificationTask, FunctionType] = dict()
         self._paused = False
 
@@ -33,6 +45,7 @@ class VerificationQueue:
                subtask_id: str,
                deadline: int,
                cb: FunctionType,
+               task_id: Optional[str] = None,
                **kwargs) -> None:
 
         logger.debug(
@@ -43,7 +56,8 @@ class VerificationQueue:
 
         entry = VerificationTask(subtask_id, deadline, kwargs)
         self.callbacks[entry] = cb
-        self._queue.put((entry, verifier_class))
+        self._queue.setdefault(task_id, deque()).append(
+            (time.monotonic(), entry, verifier_class))
         self._process_queue()
 
     def pause(self) -> Deferred:
@@ -57,21 +71,37 @@ class VerificationQueue:
 
     @property
     def can_run(self) -> bool:
-        return not self._paused and len(self._jobs) < self._concurrency
+        return not self._paused \
+            and self._concurrency.can_start(len(self._jobs))
 
     def _process_queue(self) -> None:
-        if self.can_run:
+        while self.can_run:
             entry, verifier_cls = self._next()
-            if entry and verifier_cls:
-                self._run(entry, verifier_cls)
+            if not (entry and verifier_cls):
+                return
+            self._run(entry, verifier_cls)
 
     def _next(self) -> Tuple[Optional[VerificationTask],
                              Optional[Type[CoreVerifier]]]:
-        try:
-            return self._queue.get(block=False)
-        except queue.Empty:
+        if not self._queue:
             return None, None
 
+        running: Dict[Optional[str], int] = dict()
+        for subtask_id in self._jobs:
+            task_id = self._job_tasks.get(subtask_id)
+            running[task_id] = running.get(task_id, 0) + 1
+
+        task_id = min(
+            self._queue,
+            key=lambda task: self._queue[task][0][0]
+            + running.get(task, 0) * TASK_FAIRNESS_PENALTY)
+        entries = self._queue[task_id]
+        _, entry, verifier_cls = entries.popleft()
+        if not entries:
+            del self._queue[task_id]
+        self._job_tasks[entry.subtask_id] = task_id
+        return entry, verifier_cls
+
     def _run(self, entry: VerificationTask,
              verifier_cls: Type[CoreVerifier]) -> None:
         subtask_id = entry.subtask_id
@@ -85,6 +115,7 @@ class VerificationQueue:
                                       result=args[0][2])
             finally:
                 self._jobs.pop(subtask_id, None)
+                self._job_tasks.pop(subtask_id, None)
                 self._process_queue()
 
         def errback(_):
@@ -104,6 +135,8 @@ class VerificationQueue:
             result.addTimeout(VerificationQueue.VERIFICATION_TIMEOUT, reactor,
                               onTimeoutCancel=fn_timeout)
             self._jobs[subtask_id] = result
+        else:
+            self._job_tasks.pop(subtask_id, None)
 
     @staticmethod
     def _verification_timed_out(_result, _timeout, task, event,
@@ -112,6 +145,7 @@ class VerificationQueue:
         task.stop(event)
 
     def _reset(self) -> None:
-        self._queue = queue.Queue()
+        self._queue = dict()
         self._jobs = dict()
+        self._job_tasks = dict()
         self.callbacks = dict()
@@ -115,6 +115,11 @@ class OpenCVImgRepr:
     def get_size(self):
         return tuple(reversed(self.img.shape[:2]))
 
+    def copy(self):
+        img_repr = OpenCVImgRepr()
+        img_repr.img = self.img.copy()
+        return img_repr
+
     def paste_image(self, img_repr, x, y):
         try:
             self.img[y:y + img_repr.img.shape[0], x:img_repr.img.shape[1]] = \
@@ -171,7 +176,11 @@ class OpenCVImgRepr:
 
 
 class EXRImgRepr(ImgRepr):
-    def __init__(self):
+    def __init__(self, tile_rows: Optional[int] = None):
+        """
+        :param tile_rows: if set, convert the image in bands of that many
+        scanlines, not to keep all of its float channels in memory at once
+        """
         self.img = None
         self.type = "EXR"
         self.dw = None
@@ -180,25 +189,25 @@ class EXRImgRepr(ImgRepr):
         self.min = 0.0
         self.max = 1.0
         self.file_path = None
+        self.tile_rows = tile_rows
 
     def _convert_openexr_to_opencv_bgr(self):
         width, height = self.get_size()
-        bytes_r, bytes_g, bytes_b = self.img.channels("RGB")
-        r = numpy.fromstring(bytes_r, dtype=numpy.float32)
-        g = numpy.fromstring(bytes_g, dtype=numpy.float32)
-        b = numpy.fromstring(bytes_b, dtype=numpy.float32)
-
-        for channel in r, g, b:
-            for pixel_value in numpy.nditer(channel, op_flags=['readwrite']):
-                pixel_value[...] = round(pixel_value * 255)
-
-        opencv_img = numpy.zeros((height, width, 3), dtype=numpy.uint8)
-        r = numpy.reshape(r, (-1, width))
-        g = numpy.reshape(g, (-1, width))
-        b = numpy.reshape(b, (-1, width))
-        opencv_img[:, :, 0] = b
-        opencv_img[:, :, 1] = g
-        opencv_img[:, :, 2] = r
+        rows = self.tile_rows or height
+        opencv_img = numpy.empty((height, width, 3), dtype=numpy.uint8)
+
+        for top in range(0, height, rows):
+            bottom = min(top + rows, height)
+            channels = self.img.channels(
+                "BGR", self.pixel_type,
+                self.dw.min.y + top, self.dw.min.y + bottom - 1)
+
+            for i, channel_bytes in enumerate(channels):
+                channel = numpy.frombuffer(channel_bytes, dtype=numpy.float32)
+                channel = channel.reshape(bottom - top, width)
+                # Rounds half to even, as round() does
+                opencv_img[top:bottom, :, i] = numpy.rint(channel * 255)
+
         return opencv_img
 
     def load_from_file(self, file_):
@@ -221,7 +230,7 @@ class EXRImgRepr(ImgRepr):
         self.bgr[y, x] = color[::-1]
 
     def copy(self):
-        e = EXRImgRepr()
+        e = EXRImgRepr(self.tile_rows)
         e.load_from_file(self.file_path)
         e.dw = deepcopy(self.dw)
         e.bgr = deepcopy(self.bgr)
@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from apps.rendering.resources.imgrepr import OpenCVImgRepr, OpenCVError
+
+logger = logging.getLogger("apps.rendering")
+
+
+class PreviewCompositor:
+    """
+    Keeps preview images in memory, so that new chunks can be pasted onto them
+    without reading and writing the whole image for every chunk. Changed
+    images are saved to disk after `flush_delay` seconds from the first
+    unsaved change, or on `flush`. Delayed saves run on the reactor thread,
+    where the images are changed, so that no half-pasted image is saved.
+
+    Least recently used images are saved and dropped from memory when all of
+    them take more than `memory_limit` bytes.
+    """
+
+    FLUSH_DELAY = 2.0  # s
+    MEMORY_LIMIT = 256 * 2 ** 20  # B
+
+    def __init__(self, extension: str,
+                 flush_delay: Optional[float] = None,
+                 memory_limit: Optional[int] = None) -> None:
+        self.extension = extension
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None \
+            else flush_delay
+        self.memory_limit = self.MEMORY_LIMIT if memory_limit is None \
+            else memory_limit
+
+        self._images = OrderedDict()  # type: OrderedDict
+        self._dirty = set()  # type: set
+        self._lock = threading.RLock()
+        self._flush_scheduled = False
+
+    def __getstate__(self):
+        # Images are kept on disk only; unsaved changes are not persisted
+        return {
+            'extension': self.extension,
+            'flush_delay': self.flush_delay,
+            'memory_limit': self.memory_limit,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get(self, path: str) -> Optional[OpenCVImgRepr]:
+        """
+        Get the preview image to paste on. Call `changed` after modifying it.
+        :return: the image, loaded from disk if not in memory, or None if
+        it doesn't exist
+        """
+        with self._lock:
+            img = self._images.get(path)
+            if img is not None:
+                self._images.move_to_end(path)
+                return img
+
+            if not os.path.exists(path):
+                return None
+
+            img = OpenCVImgRepr.from_image_file(path)
+            self._images[path] = img
+            self._enforce_memory_limit(path)
+            return img
+
+    def set(self, path: str, img: OpenCVImgRepr, saved: bool = False) -> None:
+        """
+        Replace the preview image.
+        :param saved: the image has just been saved to disk
+        """
+        with self._lock:
+            self._images[path] = img
+            self._images.move_to_end(path)
+            if saved:
+                self._dirty.discard(path)
+                self._enforce_memory_limit(path)
+            else:
+                self.changed(path)
+
+    def changed(self, path: str,
+                img: Optional[OpenCVImgRepr] = None) -> None:
+        """
+        Mark the preview image as modified.
+        :param img: the modified image, put back in memory if it has been
+        dropped since it was taken with `get`
+        """
+        with self._lock:
+            if path not in self._images:
+                if img is None:
+                    logger.warning("Preview change dropped, %s is no longer "
+                                   "in memory", path)
+                    return
+                self._images[path] = img
+
+            self._dirty.add(path)
+            self._enforce_memory_limit(path)
+
+            if self.flush_delay <= 0:
+                self.flush(path)
+            elif not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._schedule_flush()
+
+    def flush(self, path: Optional[str] = None) -> None:
+        """ Save changed images, or the given one only, to disk """
+        with self._lock:
+            paths = [path] if path else list(self._dirty)
+            for dirty_path in paths:
+                if dirty_path in self._dirty:
+                    self._save(dirty_path)
+
+    def _schedule_flush(self) -> None:
+        from twisted.internet import reactor
+        reactor.callFromThread(
+            reactor.callLater, self.flush_delay, self._flush_delayed)
+
+    def _flush_delayed(self):
+        with self._lock:
+            self._flush_scheduled = False
+            self.flush()
+
+    def _save(self, path: str) -> None:
+        self._dirty.discard(path)
+        try:
+            self._images[path].save_with_extension(path, self.extension)
+        except (OSError, OpenCVError) as exc:
+            logger.warning("Cannot save preview %s: %r", path, exc)
+
+    def _enforce_memory_limit(self, current_path: str) -> None:
+        size = sum(img.img.nbytes for img in self._images.values())
+
+        for path in list(self._images):
+            if size <= self.memory_limit:
+                break
+            if path == current_path:
+                continue
+
+            if path in self._dirty:
+                self._save(path)
+            size -= self._images.pop(path).img.nbytes
@@ -1,11 +1,45 @@
 import logging
 import math
-from typing import Optional
+import struct
+from typing import List, Optional, Tuple
+
+import OpenEXR
 
 from apps.rendering.resources.imgrepr import OpenCVImgRepr
 
 logger = logging.getLogger("apps.rendering")
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+EXR_MAGIC = b'\x76\x2f\x31\x01'
+
+
+def read_image_size(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Read the size of a PNG or EXR image from its header, without decoding it
+    :param str path: path to the image
+    :return: (width, height) or None if the size can't be read this way
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(24)
+    except OSError:
+        return None
+
+    if header[:8] == PNG_SIGNATURE and header[12:16] == b'IHDR':
+        return struct.unpack('>II', header[16:24])
+
+    if header[:4] == EXR_MAGIC:
+        try:
+            exr = OpenEXR.InputFile(path)
+            data_window = exr.header()['dataWindow']
+            exr.close()
+        except (OSError, KeyError, ValueError):
+            return None
+        return (data_window.max.x - data_window.min.x + 1,
+                data_window.max.y - data_window.min.y + 1)
+
+    return None
+
 
 class RenderingTaskCollector(object):
     def __init__(self, width=None, height=None):
@@ -63,3 +97,52 @@ class RenderingTaskCollector(object):
         img_offset.paste_image(new_part, 0, offset)
         img_offset.add(final_img)
         return img_offset
+
+
+class StreamingRenderingTaskCollector(RenderingTaskCollector):
+    """
+    Reads every chunk once. Chunk sizes are read from image headers, so the
+    final image is allocated up front and chunks are pasted into it one at a
+    time, instead of being all kept in memory. Chunks in formats other than
+    PNG and EXR are decoded to find out their size.
+    """
+
+    def finalize_img(self):
+        sizes = [self._get_size(img_path)
+                 for img_path in self.accepted_img_files]
+        self.width = sizes[-1][0]
+        self.height = sum(height for _, height in sizes)
+
+        final_img = None
+        offset = 0
+        for img_path in self.accepted_img_files:
+            image = OpenCVImgRepr.from_image_file(img_path)
+            if final_img is None:
+                self.dtype = image.img.dtype
+                if len(image.img.shape) == 3:
+                    self.channels = image.img.shape[2]
+                final_img = OpenCVImgRepr.empty(self.width, self.height,
+                                                self.channels, self.dtype)
+            final_img.paste_image(image, 0, offset)
+            offset += image.get_height()
+        return final_img
+
+    @staticmethod
+    def _get_size(img_path):
+        size = read_image_size(img_path)
+        if size is None:
+            size = OpenCVImgRepr.from_image_file(img_path).get_size()
+        return size
+
+
+def merge_frame(img_files: List[str], output_path: str,
+                output_format: str) -> None:
+    """
+    Put the chunks of a frame together and save it
+    :param img_files: paths to the chunks, from the top of the frame
+    """
+    collector = StreamingRenderingTaskCollector()
+    for img_file in img_files:
+        collector.add_img_file(img_file)
+    image = collector.finalize()
+    image.save_with_extension(output_path, output_format)
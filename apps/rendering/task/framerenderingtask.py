@@ -16,9 +16,9 @@ from copy import deepcopy
 
 from apps.core.task.coretask import CoreTask
 from apps.core.task.coretaskstate import Options
-from apps.rendering.resources.imgrepr import OpenCVImgRepr
+from apps.rendering.resources.imgrepr import OpenCVImgRepr, OpenCVError
 from apps.rendering.resources.renderingtaskcollector import \
-    RenderingTaskCollector
+    StreamingRenderingTaskCollector, merge_frame
 from apps.rendering.resources.utils import handle_opencv_image_error
 from apps.rendering.task.renderingtask import (
     RenderingTask,
@@ -263,8 +263,8 @@ class FrameRenderingTask(RenderingTask):
                 img.resize(int(round(self.scale_factor * img.get_width())),
                            int(round(self.scale_factor * img.get_height())))
 
-                img.save_with_extension(self._get_preview_file_path(num),
-                                        PREVIEW_EXT)
+                self.preview_compositor.set(self._get_preview_file_path(num),
+                                            img)
 
             if not final:
                 img_pasted = self._paste_new_chunk(
@@ -274,6 +274,8 @@ class FrameRenderingTask(RenderingTask):
                 resize_and_save(img_pasted)
             else:
                 resize_and_save(img)
+                # The frame is complete, its preview won't change anymore
+                self.preview_compositor.flush(self._get_preview_file_path(num))
 
         self.last_preview_path = preview_task_file_path
 
@@ -329,8 +331,11 @@ class FrameRenderingTask(RenderingTask):
             img_offset = None
 
         with handle_opencv_image_error(logger):
-            existing_frame_preview = OpenCVImgRepr.from_image_file(
+            existing_frame_preview = self.preview_compositor.get(
                 preview_file_path)
+            if existing_frame_preview is None:
+                raise OpenCVError('Preview {} does not exist'.format(
+                    preview_file_path))
             if img_offset:
                 existing_frame_preview.add(img_offset)
             return existing_frame_preview
@@ -353,13 +358,15 @@ class FrameRenderingTask(RenderingTask):
     def _open_frame_preview(self, preview_file_path):
 
         if not os.path.exists(preview_file_path):
+            img = OpenCVImgRepr.empty(
+                int(round(self.res_x * self.scale_factor)),
+                int(round(self.res_y * self.scale_factor)))
             with handle_opencv_image_error(logger):
-                img = OpenCVImgRepr.empty(
-                    int(round(self.res_x * self.scale_factor)),
-                    int(round(self.res_y * self.scale_factor)))
                 img.save_with_extension(preview_file_path, PREVIEW_EXT)
+            self.preview_compositor.set(preview_file_path, img, saved=True)
+            return img
 
-        return OpenCVImgRepr.from_image_file(preview_file_path)
+        return self.preview_compositor.get(preview_file_path)
 
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
@@ -394,8 +401,8 @@ class FrameRenderingTask(RenderingTask):
     def _put_image_together(self):
         output_file_name = self.output_file
         self.collected_file_names = OrderedDict(sorted(self.collected_file_names.items()))
-        collector = RenderingTaskCollector(width=self.res_x,
-                                           height=self.res_y)
+        collector = StreamingRenderingTaskCollector(width=self.res_x,
+                                                    height=self.res_y)
         for file in self.collected_file_names.values():
             collector.add_img_file(file)
         with handle_opencv_image_error(logger):
@@ -408,13 +415,9 @@ class FrameRenderingTask(RenderingTask):
         frame_key = str(frame_num)
         collected = self.frames_given[frame_key]
         collected = OrderedDict(sorted(collected.items()))
-        collector = RenderingTaskCollector(width=self.res_x,
-                                           height=self.res_y)
-        for file in collected.values():
-            collector.add_img_file(file)
         with handle_opencv_image_error(logger):
-            image = collector.finalize()
-            image.save_with_extension(output_file_name, self.output_format)
+            merge_frame(list(collected.values()), output_file_name,
+                        self.output_format)
 
         self.collected_file_names[frame_num] = output_file_name
         self._update_frame_preview(output_file_name, frame_num, final=True)
@@ -454,7 +457,7 @@ class FrameRenderingTask(RenderingTask):
         preview_task_file_path = self._get_preview_task_file_path(idx)
         img_task = self._open_frame_preview(preview_task_file_path)
         self._mark_task_area(sub, img_task, color, idx)
-        img_task.save_with_extension(preview_task_file_path, PREVIEW_EXT)
+        self.preview_compositor.changed(preview_task_file_path, img_task)
 
     def _get_subtask_file_path(self, subtask_dir_list, name_dir, num):
         if subtask_dir_list[num] is None:
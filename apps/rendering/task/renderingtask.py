@@ -7,6 +7,7 @@ from pathlib import Path
 
 from apps.core.task.coretask import CoreTask, CoreTaskBuilder
 from apps.rendering.resources.imgrepr import OpenCVImgRepr
+from apps.rendering.resources.previewcompositor import PreviewCompositor
 from apps.rendering.resources.utils import handle_opencv_image_error
 from golem.verifier.rendering_verifier import RenderingVerifier
 from golem.core.simpleexccmd import is_windows
@@ -63,6 +64,7 @@ class RenderingTask(CoreTask):
 
         self.preview_file_path = None
         self.preview_task_file_path = None
+        self.preview_compositor = PreviewCompositor(PREVIEW_EXT)
 
         self.collected_file_names = {}
 
@@ -95,6 +97,7 @@ class RenderingTask(CoreTask):
         super().restart_subtask(subtask_id)
 
     def update_task_state(self, task_state):
+        self.flush_preview()
         if not self.finished_computation() and self.preview_task_file_path:
             task_state.extra_data['result_preview'] \
                 = self.preview_task_file_path
@@ -121,7 +124,8 @@ class RenderingTask(CoreTask):
             img = OpenCVImgRepr.from_image_file(new_chunk_file_path)
             img_current = self._open_preview()
             img_current.add(img)
-            img_current.save_with_extension(self.preview_file_path, PREVIEW_EXT)
+            self.preview_compositor.changed(self.preview_file_path,
+                                            img_current)
 
     @CoreTask.handle_key_error
     def _remove_from_preview(self, subtask_id):
@@ -130,7 +134,7 @@ class RenderingTask(CoreTask):
         with handle_opencv_image_error(logger):
             img = self._open_preview()
             self._mark_task_area(subtask, img, empty_color)
-            img.save_with_extension(self.preview_file_path, PREVIEW_EXT)
+            self.preview_compositor.changed(self.preview_file_path, img)
 
     def _update_task_preview(self):
         sent_color = (0, 255, 0)
@@ -141,7 +145,7 @@ class RenderingTask(CoreTask):
                                                           preview_name))
 
         with handle_opencv_image_error(logger):
-            img_task = self._open_preview()
+            img_task = self._open_preview().copy()
             subtasks_given = dict(self.subtasks_given)
             for sub in subtasks_given.values():
                 if sub['status'].is_active():
@@ -150,7 +154,7 @@ class RenderingTask(CoreTask):
                                      SubtaskStatus.restarted]:
                     self._mark_task_area(sub, img_task, failed_color)
 
-            img_task.save_with_extension(preview_task_file_path, PREVIEW_EXT)
+            self.preview_compositor.set(preview_task_file_path, img_task)
 
         self._update_preview_task_file_path(preview_task_file_path)
 
@@ -211,26 +215,37 @@ class RenderingTask(CoreTask):
 
     def _open_preview(self, mode=OpenCVImgRepr.RGB, ext=PREVIEW_EXT):
         """ If preview file doesn't exist create a new empty one with given mode
-         and extension. Extension should be compatible with selected mode. """
+         and extension. Extension should be compatible with selected mode.
+         Returns the preview kept in memory by the preview compositor, which
+         should be notified of changes. """
         if self.preview_file_path is None or not os.path.exists(
                 self.preview_file_path):
             preview_name = "current_preview.{}".format(ext)
             self.preview_file_path = "{}".format(os.path.join(self.tmp_dir,
                                                               preview_name))
 
+            img = OpenCVImgRepr.empty(
+                int(round(self.res_x * self.scale_factor)),
+                int(round(self.res_y * self.scale_factor)), channels=mode)
             with handle_opencv_image_error(logger):
-                img = OpenCVImgRepr.empty(
-                    int(round(self.res_x * self.scale_factor)),
-                    int(round(self.res_y * self.scale_factor)), channels=mode)
                 logger.debug('Saving new preview: %r', self.preview_file_path)
                 img.save_with_extension(self.preview_file_path, ext)
-
-        logger.debug(
-            'Opening preview: %r, exists?: %s',
-            self.preview_file_path,
-            os.path.exists(self.preview_file_path)
-        )
-        return OpenCVImgRepr.from_image_file(self.preview_file_path)
+            self.preview_compositor.set(self.preview_file_path, img,
+                                        saved=True)
+            return img
+
+        logger.debug('Opening preview: %r', self.preview_file_path)
+        return self.preview_compositor.get(self.preview_file_path)
+
+    def flush_preview(self):
+        """ Save previews which have changed in memory to disk """
+        self.preview_compositor.flush()
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # Tasks pickled before previews were composed in memory
+        if 'preview_compositor' not in state:
+            self.preview_compositor = PreviewCompositor(PREVIEW_EXT)
 
     def __get_path(self, path):
         if is_windows():
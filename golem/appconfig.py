@@ -35,6 +35,11 @@ SEND_PEERS_NUM = 10
 USE_IP6 = 0
 USE_UPNP = 1
 ACCEPT_TASKS = 1
+# Number of subtasks computed at the same time, the hardware preset is split
+# evenly between them
+SUBTASK_SLOTS = 1
+# Docker containers created in advance for task-api subtasks, 0 disables
+CONTAINER_POOL_SIZE = 0
 SEND_PINGS = 1
 ENABLE_MONITOR = 1
 DEBUG_THIRD_PARTY = 0
@@ -158,6 +163,8 @@ class AppConfig:
             enable_monitor=ENABLE_MONITOR,
             # hardware
             hardware_preset_name=CUSTOM_HARDWARE_PRESET_NAME,
+            subtask_slots=SUBTASK_SLOTS,
+            container_pool_size=CONTAINER_POOL_SIZE,
             # price and trust
             min_price=MIN_PRICE,
             max_price=MAX_PRICE,
@@ -3,6 +3,7 @@
 import collections
 import enum
 import logging
+import os
 import sys
 import time
 import uuid
@@ -61,6 +62,7 @@ from golem.ranking.ranking import Ranking
 from golem.report import Component, Stage, StatusPublisher, report_calls
 from golem.resource.base.resourceserver import BaseResourceServer
 from golem.resource.dirmanager import DirManager, DirectoryType
+from golem.resource.hyperdrive.contentstore import ContentStore
 from golem.resource.hyperdrive.resourcesmanager import HyperdriveResourceManager
 from golem.rpc import utils as rpc_utils
 from golem.rpc.mapping.rpceventnames import Task, Network, Environment, UI
@@ -464,6 +466,8 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
                 'host': self.config_desc.hyperdrive_rpc_address,
                 'port': self.config_desc.hyperdrive_rpc_port,
             },
+            content_store=ContentStore(
+                os.path.join(self.datadir, 'ContentStore')),
         )
         self.resource_server = BaseResourceServer(
             resource_manager=resource_manager,
@@ -946,8 +950,14 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             'subtasks_rejected': self.get_provider_stat('provider_srr_cnt'),
             'subtasks_with_errors': self.get_comp_stat('tasks_with_errors'),
             'subtasks_with_timeout': self.get_comp_stat('tasks_with_timeout'),
+            'slots': self.get_slots_stats(),
         }
 
+    def get_slots_stats(self) -> List[Dict[str, Any]]:
+        if self.task_server and self.task_server.task_computer:
+            return self.task_server.task_computer.get_slots_stats()
+        return []
+
     def get_supported_task_count(self) -> int:
         if self.task_server:
             return len(self.task_server.task_keeper.supported_tasks)
@@ -1152,6 +1162,10 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         dir_manager.clear_dir(self.get_distributed_files_dir(),
                               older_than_seconds)
 
+        content_store = self.resource_server.resource_manager.content_store
+        if content_store:
+            content_store.clean(older_than_seconds)
+
     def remove_received_files(self, older_than_seconds: int = 0):
         dir_manager = DirManager(self.datadir)
         dir_manager.clear_dir(
@@ -1208,16 +1222,24 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
     @rpc_utils.expose('comp.environment.enable')
     def enable_environment(self, env_id):
         try:
-            return self.environments_manager.change_accept_tasks(env_id, True)
+            result = self.environments_manager.change_accept_tasks(
+                env_id, True)
         except KeyError:
             return "No such environment"
+        if self.task_server:
+            self.task_server.task_keeper.recheck_environment(env_id)
+        return result
 
     @rpc_utils.expose('comp.environment.disable')
     def disable_environment(self, env_id):
         try:
-            return self.environments_manager.change_accept_tasks(env_id, False)
+            result = self.environments_manager.change_accept_tasks(
+                env_id, False)
         except KeyError:
             return "No such environment"
+        if self.task_server:
+            self.task_server.task_keeper.recheck_environment(env_id)
+        return result
 
     def send_gossip(self, gossip, send_to):
         return self.p2pservice.send_gossip(gossip, send_to)
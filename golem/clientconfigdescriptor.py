@@ -49,6 +49,8 @@ class ClientConfigDescriptor(object):
         self.max_resource_size = 0  # KiB
         self.max_memory_size = 0  # KiB
         self.hardware_preset_name = ""
+        self.subtask_slots = 1
+        self.container_pool_size = 0
 
         self.requesting_trust = 0.0
         self.computing_trust = 0.0
@@ -106,6 +108,7 @@ class ConfigApprover(object):
     to_int_opt = {
         'seed_port', 'num_cores', 'opt_peer_num', 'p2p_session_timeout',
         'task_session_timeout', 'pings_interval', 'max_results_sending_delay',
+        'subtask_slots', 'container_pool_size',
     }
     to_big_int_opt = {
         'min_price', 'max_price',
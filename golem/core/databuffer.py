@@ -128,3 +128,190 @@ class DataBuffer:
     def clear_buffer(self):
         """ Remove all data from the buffer """
         self.buffered_data = b""
+
+
+class RingDataBuffer(DataBuffer):
+    """ Drop-in replacement for DataBuffer backed by a preallocated bytearray.
+
+    Appending and consuming data only moves read / write offsets, so the cost
+    of receiving a frame is linear in its size regardless of how fragmented
+    the stream is. Space in front of the read offset is reclaimed by
+    compaction (moving live data to the front) and the storage is reallocated
+    (never resized in place) when the live data does not fit.
+
+    Frames returned by `read_len_prefixed_view` and `get_len_prefixed_views`
+    are memoryviews into the internal storage. They are only valid until the
+    next modification of the buffer; copy them with `bytes()` to keep them.
+    """
+
+    INITIAL_CAPACITY = 64 * 1024
+    MAX_IDLE_CAPACITY = 4 * 1024 * 1024
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        """ Create new ring data buffer
+        :param int capacity: initial size of preallocated storage
+        """
+        # pylint: disable=super-init-not-called
+        self._initial_capacity = max(capacity, LONG_STANDARD_SIZE)
+        self._buf = bytearray(self._initial_capacity)
+        self._start = 0
+        self._end = 0
+
+    @property
+    def buffered_data(self):
+        """ Copy of the data held in the buffer (compatibility with
+        DataBuffer)
+        :return bytes: buffered data
+        """
+        return bytes(self._buf[self._start:self._end])
+
+    def append_ulong(self, num):
+        if num < 0:
+            raise AttributeError("num must be grater than 0")
+        bytes_num_rep = struct.pack("!L", num)
+        self.append_bytes(bytes_num_rep)
+        return bytes_num_rep
+
+    def append_bytes(self, data):
+        size = len(data)
+        if not size:
+            return
+        self._reserve(size)
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def data_size(self):
+        return self._end - self._start
+
+    def peek_ulong(self):
+        if self.data_size() < LONG_STANDARD_SIZE:
+            return None
+
+        (ret_val,) = struct.unpack_from("!L", self._buf, self._start)
+        return ret_val
+
+    def read_ulong(self):
+        val_ = self.peek_ulong()
+        if val_ is None:
+            raise ValueError(
+                "buffer_data is shorter than {}".format(LONG_STANDARD_SIZE))
+        self._consume(LONG_STANDARD_SIZE)
+
+        return val_
+
+    def peek_view(self, num_bytes):
+        """
+        Return a memoryview of first <num_bytes> bytes from buffer without
+        copying them. Doesn't change the buffer.
+        :param long num_bytes: how many bytes should be read from buffer
+        :return memoryview: first <num_bytes> bytes from buffer
+        """
+        if num_bytes > self.data_size():
+            raise AttributeError("num_bytes is grater than buffer length")
+
+        return memoryview(self._buf)[self._start:self._start + num_bytes]
+
+    def peek_bytes(self, num_bytes):
+        return bytes(self.peek_view(num_bytes))
+
+    def read_view(self, num_bytes):
+        """
+        Remove first <num_bytes> bytes from buffer and return a memoryview
+        of them (valid until the next modification of the buffer).
+        :param long num_bytes: how many bytes should be read and removed
+         from buffer
+        :return memoryview: bytes removed form buffer
+        """
+        val_ = self.peek_view(num_bytes)
+        self._consume(num_bytes)
+
+        return val_
+
+    def read_bytes(self, num_bytes):
+        val_ = self.peek_bytes(num_bytes)
+        self._consume(num_bytes)
+
+        return val_
+
+    def read_all(self):
+        ret_data = self.buffered_data
+        self.clear_buffer()
+
+        return ret_data
+
+    def has_len_prefixed_frame(self):
+        """ Check whether a whole length-prefixed frame is buffered
+        :return bool: True if a frame can be read from the buffer
+        """
+        return (self.data_size() > LONG_STANDARD_SIZE and
+                self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE))
+
+    def read_len_prefixed_view(self):
+        """
+        Read long number from the buffer and then return a memoryview of the
+        bytes with that length, removing them from the buffer
+        :return memoryview|None: first frame from the buffer (after long)
+        """
+        if not self.has_len_prefixed_frame():
+            return None
+        num_bytes = self.read_ulong()
+        return self.read_view(num_bytes)
+
+    def read_len_prefixed_bytes(self):
+        ret_bytes = self.read_len_prefixed_view()
+        if ret_bytes is not None:
+            ret_bytes = bytes(ret_bytes)
+        return ret_bytes
+
+    def get_len_prefixed_views(self):
+        """
+        Generator function that return from buffer memoryviews of datas
+        preceded with their length (long). Each view is valid until the
+        buffer is modified by anything other than this generator.
+        """
+        while self.has_len_prefixed_frame():
+            num_bytes = self.read_ulong()
+            yield self.read_view(num_bytes)
+
+    def get_len_prefixed_bytes(self):
+        for view in self.get_len_prefixed_views():
+            yield bytes(view)
+
+    def clear_buffer(self):
+        self._start = 0
+        self._end = 0
+
+    def _consume(self, num_bytes):
+        self._start += num_bytes
+        if self._start == self._end:
+            # Nothing left - rewind instead of compacting later
+            self._start = 0
+            self._end = 0
+            if len(self._buf) > self.MAX_IDLE_CAPACITY:
+                # Do not keep storage grown for a huge frame forever
+                self._buf = bytearray(self._initial_capacity)
+
+    def _reserve(self, size):
+        """ Make room for <size> bytes after the write offset """
+        capacity = len(self._buf)
+        if self._end + size <= capacity:
+            return
+
+        live = self._end - self._start
+        if live + size <= capacity and live <= capacity // 2:
+            # Compact: at least half of the storage becomes free, so the cost
+            # of moving live data is amortized over the following appends
+            view = memoryview(self._buf)
+            view[:live] = view[self._start:self._end]
+            view.release()
+        else:
+            # Reallocate with geometric growth. Storage is replaced rather
+            # than resized, so memoryviews handed out earlier never block it.
+            new_capacity = capacity * 2
+            while new_capacity < live + size:
+                new_capacity *= 2
+            new_buf = bytearray(new_capacity)
+            new_buf[:live] = memoryview(self._buf)[self._start:self._end]
+            self._buf = new_buf
+        self._start = 0
+        self._end = live
@@ -124,3 +124,126 @@ class AESFileEncryptor(FileEncryptor):
                     working = False
 
                 dst.write(chunk)
+
+    @classmethod
+    def encrypting_writer(cls, dst, secret, key_len=32):
+        return AESEncryptingWriter(dst, secret, key_len, encryptor=cls)
+
+    @classmethod
+    def decrypting_reader(cls, src, secret, key_len=32):
+        return AESDecryptingReader(src, secret, key_len, encryptor=cls)
+
+
+class AESEncryptingWriter(object):
+    """ Write-only stream encrypting data the same way as
+        AESFileEncryptor.encrypt does, without an intermediate file.
+        Padding is written on close; the destination is not closed. """
+
+    def __init__(self, dst, secret, key_len=32, encryptor=AESFileEncryptor):
+        block_size = encryptor.block_size
+        salt = encryptor.gen_salt(block_size)
+        key, iv = encryptor.get_key_and_iv(secret, salt, key_len, block_size)
+
+        self._dst = dst
+        self._block_size = block_size
+        self._cipher = AES.new(key, encryptor.aes_mode, iv)
+        self._pending = bytes()
+        self._closed = False
+
+        dst.write(encryptor.salt_prefix + salt)
+
+    def write(self, data):
+        if self._closed:
+            raise ValueError("Write to a closed stream")
+
+        written = len(data)
+        data = self._pending + bytes(data)
+        aligned = len(data) - len(data) % self._block_size
+        self._pending = data[aligned:]
+        if aligned:
+            self._dst.write(self._cipher.encrypt(data[:aligned]))
+        return written
+
+    def flush(self):
+        self._dst.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        pad_len = self._block_size - len(self._pending)
+        chunk = self._pending + chr(pad_len).encode() * pad_len
+        self._dst.write(self._cipher.encrypt(chunk))
+        self._pending = bytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AESDecryptingReader(object):
+    """ Read-only stream decrypting data encrypted by AESFileEncryptor,
+        without an intermediate file. Raises ValueError on a malformed
+        ciphertext or padding, e.g. when the secret is wrong. """
+
+    def __init__(self, src, secret, key_len=32, encryptor=AESFileEncryptor):
+        block_size = encryptor.block_size
+        block = src.read(block_size)
+        if len(block) != block_size:
+            raise ValueError("Ciphertext too short")
+
+        salt = block[encryptor.salt_prefix_len:]
+        key, iv = encryptor.get_key_and_iv(secret, salt, key_len, block_size)
+
+        self._src = src
+        self._block_size = block_size
+        self._read_size = encryptor.chunk_size * block_size
+        self._cipher = AES.new(key, encryptor.aes_mode, iv)
+        # The last decrypted block is held back until the end of the
+        # ciphertext is known, as it carries the padding
+        self._last_block = bytes()
+        self._buffer = bytearray()
+        self._eof = False
+
+    def read(self, size=-1):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            self._read_chunk()
+
+        if size < 0 or size >= len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _read_chunk(self):
+        chunk = self._src.read(self._read_size)
+
+        if not chunk:
+            self._eof = True
+            self._buffer += self._unpad(self._last_block)
+            self._last_block = bytes()
+            return
+
+        if len(chunk) % self._block_size:
+            # Reads of regular files are short only at the end
+            rest = self._src.read(
+                self._block_size - len(chunk) % self._block_size)
+            chunk += rest
+            if len(chunk) % self._block_size:
+                raise ValueError("Invalid ciphertext length")
+
+        decrypted = self._last_block + self._cipher.decrypt(chunk)
+        self._buffer += decrypted[:-self._block_size]
+        self._last_block = decrypted[-self._block_size:]
+
+    def _unpad(self, block):
+        if len(block) != self._block_size:
+            raise ValueError("Invalid ciphertext length")
+        pad_len = block[-1]
+        if not 0 < pad_len <= self._block_size \
+                or block[-pad_len:] != bytes([pad_len]) * pad_len:
+            raise ValueError("Invalid padding")
+        return block[:-pad_len]
@@ -17,6 +17,13 @@ class AsyncHTTPRequest:
 
     agent = None
     timeout = 5
+    # Maximum number of idle keep-alive connections per host
+    pool_size = 8
+    # Seconds after which an idle connection is closed
+    pool_idle_timeout = 60
+    # Requests failing to connect are retried after backoff_factor * 2^n s
+    retries = 3
+    backoff_factor = 0.5
 
     @implementer(IBodyProducer)
     class BytesBodyProducer:
@@ -39,17 +46,41 @@ class AsyncHTTPRequest:
             pass
 
     @classmethod
+    @defer.inlineCallbacks
     def run(cls, method, uri, headers, body):
+        # Imports the reactor
+        from twisted.internet import reactor, task
+        from twisted.internet.error import ConnectError
+        from twisted.web.client import RequestNotSent
+
         if not cls.agent:
             cls.agent = cls.create_agent()
-        return cls.agent.request(method, uri, headers,
-                                 cls.BytesBodyProducer(body))
+
+        attempt = 0
+        while True:
+            try:
+                response = yield cls.agent.request(
+                    method, uri, headers, cls.BytesBodyProducer(body))
+                return response
+            # The request has not reached the server, it's safe to resend it
+            except (ConnectError, RequestNotSent) as exc:
+                if attempt >= cls.retries:
+                    raise
+                delay = cls.backoff_factor * 2 ** attempt
+                attempt += 1
+                logger.debug('HTTP request to %r failed: %r. Retrying in %ss',
+                             uri, exc, delay)
+                yield task.deferLater(reactor, delay, lambda: None)
 
     @classmethod
     def create_agent(cls):
         from twisted.internet import reactor
-        from twisted.web.client import Agent  # imports reactor
-        return Agent(reactor, connectTimeout=cls.timeout)
+        # imports reactor
+        from twisted.web.client import Agent, HTTPConnectionPool
+        pool = HTTPConnectionPool(reactor, persistent=True)
+        pool.maxPersistentPerHost = cls.pool_size
+        pool.cachedConnectionTimeout = cls.pool_idle_timeout
+        return Agent(reactor, connectTimeout=cls.timeout, pool=pool)
 
 
 class AsyncRequest(object):
@@ -1,7 +1,14 @@
 # Generating, solving and checking solutions of crypto-puzzles for proof of work system
 
+from hashlib import sha256
+import multiprocessing
+import queue
 from random import sample
 import time
+from typing import Callable, Optional, Tuple
+
+from twisted.internet.defer import CancelledError, Deferred, succeed
+from twisted.internet.threads import deferToThread
 
 from golem.core.keysauth import get_random, sha2
 
@@ -9,6 +16,11 @@ __author__ = 'Magda.Stasiewicz'
 
 CHALLENGE_HISTORY_LIMIT = 100
 MAX_RANDINT = 100000000000000000000000000
+# Number of solutions tried between progress reports of the solver process
+SOLVE_BATCH = 2 ** 16
+# Challenges up to this difficulty take a few milliseconds, they are solved
+# in place rather than in a process
+INLINE_DIFFICULTY = 14
 
 
 def create_challenge(history, prev):
@@ -27,16 +39,39 @@ def create_challenge(history, prev):
     return concat
 
 
+def find_solution(challenge: str, difficulty: int, start: int = 0,
+                  count: Optional[int] = None) -> Optional[int]:
+    """
+    Returns the lowest solution of the challenge in range
+    [start, start + count), None if there is none. The challenge is hashed
+    once, each candidate only extends a copy of that hash. Digests are
+    compared as big-endian bytes, which orders them the same as their integer
+    values
+    """
+    if difficulty <= 0:
+        return start
+    # A digest may only be accepted if it is equal to 0 for difficulty above 256
+    target = pow(2, 256 - difficulty) if difficulty <= 256 else 0
+    target_digest = target.to_bytes(32, 'big')
+    prefix = sha256(challenge.encode())
+    stop = None if count is None else start + count
+    solution = start
+    while stop is None or solution < stop:
+        candidate = prefix.copy()
+        candidate.update(str(solution).encode())
+        if candidate.digest() <= target_digest:
+            return solution
+        solution += 1
+    return None
+
+
 def solve_challenge(challenge, difficulty):
     """
     Solves the puzzle given in string challenge difficulty is required number of zeros in the beginning of binary
     representation of solution's hash returns solution and computation time in seconds
     """
     start = time.time()
-    min_hash = pow(2, 256 - difficulty)     # could be done prettier
-    solution = 0
-    while sha2(challenge + str(solution)) > min_hash:
-        solution += 1
+    solution = find_solution(challenge, difficulty)
     end = time.time()
     return solution, end - start
 
@@ -51,3 +86,82 @@ def accept_challenge(challenge, solution, difficulty):
     if sha2(challenge + str(solution)) <= pow(2, 256 - difficulty):     # also could be done prettier
         return True
     return False
+
+
+def _solve_in_process(challenge, difficulty, cancelled, results):
+    """ Solver process: reports the number of tried solutions after every
+    batch, then the solution """
+    start = 0
+    while not cancelled.is_set():
+        solution = find_solution(challenge, difficulty, start, SOLVE_BATCH)
+        if solution is not None:
+            results.put((True, solution))
+            return
+        start += SOLVE_BATCH
+        results.put((False, start))
+
+
+class ChallengeSolver:
+    """
+    Solves a challenge off the reactor, in a worker process unless it is easy.
+    The Deferred returned by start fires with the solution and computation
+    time in seconds. Cancelling it, or calling cancel, stops the worker
+    process. Progress is called on the reactor with the number of solutions
+    tried so far
+    """
+
+    # How often the waiting thread checks for cancellation, in seconds
+    POLL_INTERVAL = 0.1
+    # How long a cancelled process may take to finish its batch, in seconds
+    JOIN_TIMEOUT = 5
+
+    def __init__(self, challenge: str, difficulty: int,
+                 progress: Optional[Callable[[int], None]] = None) -> None:
+        self.challenge = challenge
+        self.difficulty = difficulty
+        self._progress = progress
+        self._context = multiprocessing.get_context('spawn')
+        self._cancelled = self._context.Event()
+
+    def start(self) -> Deferred:
+        if self.difficulty <= INLINE_DIFFICULTY:
+            return succeed(solve_challenge(self.challenge, self.difficulty))
+
+        results = self._context.Queue()
+        process = self._context.Process(
+            target=_solve_in_process,
+            args=(self.challenge, self.difficulty, self._cancelled, results),
+            daemon=True,
+        )
+        process.start()
+        deferred = Deferred(lambda _: self.cancel())
+        deferToThread(self._wait, process, results, time.time()) \
+            .chainDeferred(deferred)
+        return deferred
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def _wait(self, process, results, start: float) -> Tuple[int, float]:
+        """ Runs in a thread, waiting for the solver process """
+        from twisted.internet import reactor
+        try:
+            while not self._cancelled.is_set():
+                try:
+                    done, value = results.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    if not process.is_alive():
+                        raise RuntimeError(
+                            "Challenge solver exited with code {}".format(
+                                process.exitcode))
+                    continue
+                if done:
+                    return value, time.time() - start
+                if self._progress:
+                    reactor.callFromThread(self._progress, value)
+            raise CancelledError()
+        finally:
+            self._cancelled.set()
+            process.join(self.JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
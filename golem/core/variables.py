@@ -116,6 +116,12 @@ STAGE_TIME = 36000
 # THREADING CONST #
 ###################
 REACTOR_THREAD_POOL_SIZE = 20
+# Threads serializing and encrypting / decrypting messages off the reactor,
+# 0 disables the pool
+CRYPTO_POOL_SIZE = 4
+# Messages smaller than that are processed on the reactor thread
+CRYPTO_POOL_INLINE_THRESHOLD = 64 * 1024
+CRYPTO_POOL_MAX_PENDING = 256
 
 #################
 # INCOMES CONST #
@@ -127,6 +133,13 @@ PAYMENT_DEADLINE = 24 * 60 * 60
 #################
 NUM_OF_RES_TRANSFERS_NEEDED_FOR_VER = 3
 
+######################
+# TASK JOURNAL CONST #
+######################
+# Deltas appended to a task journal before it is compacted into a snapshot.
+# A journal is compacted earlier when its deltas outgrow the snapshot.
+TASK_JOURNAL_MAX_RECORDS = 1000
+
 #################
 # TASK DEFINITION PICKLED VERSION #
 #################
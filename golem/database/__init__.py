@@ -1,6 +1,8 @@
 __all__ = [
     'Database',
+    'DatabaseExecutor',
     'GolemSqliteDatabase'
 ]
 
 from .database import Database, GolemSqliteDatabase
+from .executor import DatabaseExecutor
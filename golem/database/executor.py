@@ -0,0 +1,93 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+import peewee
+
+T = TypeVar('T')
+
+
+class DatabaseExecutor:
+    """ Runs blocking database queries in threads, off the event loop.
+
+        Reads run in a bounded pool of threads, concurrently with each other
+        and with a write, which SQLite allows in the WAL journal mode. Writes
+        run one at a time in a single thread, as SQLite takes a single writer
+        anyway; queueing them here saves busy retries in the database.
+
+        Each thread keeps its own connection, so the database has to use
+        thread local connections. A thread reconnects once the database is
+        initialized with another file. Writes run in a transaction. Called
+        functions must return materialized results, not lazy queries.
+    """
+
+    READ_WORKERS: int = 4
+
+    def __init__(
+            self,
+            db: peewee.Database,
+            read_workers: Optional[int] = None,
+    ) -> None:
+        self._db = db
+        self._readers = ThreadPoolExecutor(
+            max_workers=read_workers or self.READ_WORKERS,
+            thread_name_prefix='db-read')
+        self._writer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='db-write')
+        # Database file each thread is connected to
+        self._local = threading.local()
+
+    async def read(
+            self,
+            fn: Callable[..., T],
+            *args: Any,
+            **kwargs: Any,
+    ) -> T:
+        """ Call a function which only reads from the database """
+        return await self._run(self._readers, False, fn, *args, **kwargs)
+
+    async def write(
+            self,
+            fn: Callable[..., T],
+            *args: Any,
+            **kwargs: Any,
+    ) -> T:
+        """ Call a function which writes to the database, in a transaction """
+        return await self._run(self._writer, True, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._readers.shutdown(wait=wait)
+        self._writer.shutdown(wait=wait)
+
+    async def _run(  # pylint: disable=too-many-arguments
+            self,
+            executor: ThreadPoolExecutor,
+            with_transaction: bool,
+            fn: Callable[..., T],
+            *args: Any,
+            **kwargs: Any,
+    ) -> T:
+        loop = asyncio.get_event_loop()
+        call = functools.partial(
+            self._call, with_transaction, fn, *args, **kwargs)
+        return await loop.run_in_executor(executor, call)
+
+    def _call(
+            self,
+            with_transaction: bool,
+            fn: Callable[..., T],
+            *args: Any,
+            **kwargs: Any,
+    ) -> T:
+        if getattr(self._local, 'database', None) != self._db.database:
+            if not self._db.is_closed():
+                self._db.close()
+            self._local.database = self._db.database
+
+        if not with_transaction:
+            return fn(*args, **kwargs)
+        with self._db.transaction():
+            return fn(*args, **kwargs)
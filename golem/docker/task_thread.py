@@ -75,7 +75,8 @@ class DockerTaskThread(TaskThread):
                  extra_data: Dict,
                  dir_mapping: DockerDirMapping,
                  timeout: int,
-                 check_mem: bool = False) -> None:
+                 check_mem: bool = False,
+                 constraints: Optional[Dict[str, str]] = None) -> None:
 
         if not docker_images:
             raise AttributeError("docker images is None")
@@ -98,6 +99,9 @@ class DockerTaskThread(TaskThread):
         self.job: Optional[DockerJob] = None
         self.check_mem = check_mem
         self.dir_mapping = dir_mapping
+        # Host config entries overriding the docker manager's CPU and memory
+        # limits, e.g. for a single subtask slot
+        self.constraints = constraints or {}
 
     # pylint:disable=too-many-arguments
     @staticmethod
@@ -186,6 +190,7 @@ class DockerTaskThread(TaskThread):
         # PyLint still thinks docker_manager is of type DockerConfigManager
         # pylint: disable=no-member
         host_config = self.docker_manager.get_host_config_for_task(binds)
+        host_config.update(self.constraints)
         host_config['devices'] = devices
         host_config['runtime'] = runtime
 
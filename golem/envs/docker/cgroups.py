@@ -0,0 +1,199 @@
+"""
+Readers of resource usage of Docker containers from the cgroup filesystem.
+
+Both cgroup v1 (a hierarchy per controller) and cgroup v2 (the unified
+hierarchy) are supported, with either the cgroupfs or the systemd cgroup
+driver. Reading a sample opens a handful of small pseudo-files, so it's
+cheap enough to be done on every `usage_counters` call.
+"""
+import abc
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from golem.envs import CounterId, CounterUsage
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+# CPU time (user and system) used by the container, in seconds
+CPU_TIME: CounterId = 'cpu_time'
+# The highest memory usage of the container, in bytes
+MEMORY_PEAK: CounterId = 'memory_peak'
+# Bytes read from and written to block devices
+IO_READ_BYTES: CounterId = 'io_read_bytes'
+IO_WRITE_BYTES: CounterId = 'io_write_bytes'
+
+COUNTERS: List[CounterId] = [
+    CPU_TIME,
+    MEMORY_PEAK,
+    IO_READ_BYTES,
+    IO_WRITE_BYTES,
+]
+
+
+def _container_dirs(container_id: str) -> List[str]:
+    """ Paths of a container's cgroup relative to a hierarchy, for the
+        cgroupfs and systemd drivers respectively """
+    return [
+        f'docker/{container_id}',
+        f'system.slice/docker-{container_id}.scope',
+    ]
+
+
+def _read_int(path: Path) -> int:
+    return int(path.read_text().split()[0])
+
+
+def _read_keyed(path: Path) -> Dict[str, int]:
+    """ Parse a flat keyed file, e.g. 'usage_usec 123' per line """
+    values = {}
+    for line in path.read_text().splitlines():
+        key, _, value = line.partition(' ')
+        if value:
+            values[key] = int(value)
+    return values
+
+
+class CgroupReader(abc.ABC):
+
+    def __init__(self) -> None:
+        self._memory_peak = 0
+
+    def usage(self) -> Dict[CounterId, CounterUsage]:
+        """ Sample the usage counters. Raises OSError if the cgroup is gone,
+            e.g. because the container has been stopped. """
+        read_bytes, write_bytes = self._io_bytes()
+        # Not every kernel tracks the peak, then the highest sample is used
+        self._memory_peak = max(self._memory_peak, self._memory_usage())
+        return {
+            CPU_TIME: self._cpu_time(),
+            MEMORY_PEAK: self._memory_peak,
+            IO_READ_BYTES: read_bytes,
+            IO_WRITE_BYTES: write_bytes,
+        }
+
+    @abc.abstractmethod
+    def _cpu_time(self) -> float:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _memory_usage(self) -> int:
+        """ The peak memory usage or the current one if the peak is not
+            available """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _io_bytes(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+
+class CgroupV1Reader(CgroupReader):
+
+    CPU_CONTROLLERS = ['cpuacct', 'cpu,cpuacct']
+    BLKIO_FILES = [
+        'blkio.throttle.io_service_bytes',
+        'blkio.io_service_bytes',
+    ]
+
+    def __init__(self, cpuacct: Path, memory: Path, blkio: Path) -> None:
+        super().__init__()
+        self._cpuacct = cpuacct
+        self._memory = memory
+        self._blkio = blkio
+
+    @classmethod
+    def find(cls, root: Path, container_id: str) \
+            -> Optional['CgroupV1Reader']:
+
+        def _find(controllers: Iterable[str]) -> Optional[Path]:
+            for controller in controllers:
+                for container_dir in _container_dirs(container_id):
+                    path = root / controller / container_dir
+                    if path.is_dir():
+                        return path
+            return None
+
+        cpuacct = _find(cls.CPU_CONTROLLERS)
+        memory = _find(['memory'])
+        blkio = _find(['blkio'])
+        if cpuacct is None or memory is None or blkio is None:
+            return None
+        return cls(cpuacct, memory, blkio)
+
+    def _cpu_time(self) -> float:
+        return _read_int(self._cpuacct / 'cpuacct.usage') / 1e9
+
+    def _memory_usage(self) -> int:
+        return _read_int(self._memory / 'memory.max_usage_in_bytes')
+
+    def _io_bytes(self) -> Tuple[int, int]:
+        read_bytes = write_bytes = 0
+        for name in self.BLKIO_FILES:
+            path = self._blkio / name
+            if not path.exists():
+                continue
+            # Lines like '8:0 Read 4096', totals are skipped
+            for line in path.read_text().splitlines():
+                fields = line.split()
+                if len(fields) != 3:
+                    continue
+                if fields[1] == 'Read':
+                    read_bytes += int(fields[2])
+                elif fields[1] == 'Write':
+                    write_bytes += int(fields[2])
+            if read_bytes or write_bytes:
+                break
+        return read_bytes, write_bytes
+
+
+class CgroupV2Reader(CgroupReader):
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self._path = path
+
+    @classmethod
+    def find(cls, root: Path, container_id: str) \
+            -> Optional['CgroupV2Reader']:
+        for container_dir in _container_dirs(container_id):
+            path = root / container_dir
+            if path.is_dir():
+                return cls(path)
+        return None
+
+    def _cpu_time(self) -> float:
+        return _read_keyed(self._path / 'cpu.stat')['usage_usec'] / 1e6
+
+    def _memory_usage(self) -> int:
+        peak = self._path / 'memory.peak'
+        if peak.exists():
+            return _read_int(peak)
+        return _read_int(self._path / 'memory.current')
+
+    def _io_bytes(self) -> Tuple[int, int]:
+        read_bytes = write_bytes = 0
+        # Lines like '8:0 rbytes=4096 wbytes=0 rios=1 wios=0 ...'
+        for line in (self._path / 'io.stat').read_text().splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key == 'rbytes':
+                    read_bytes += int(value)
+                elif key == 'wbytes':
+                    write_bytes += int(value)
+        return read_bytes, write_bytes
+
+
+def cgroup_reader(container_id: str, root: Path = CGROUP_ROOT) \
+        -> Optional[CgroupReader]:
+    """ Find the cgroup of a running container. Returns None if it cannot be
+        found, e.g. because the Docker daemon runs in a virtual machine. """
+    if (root / 'cgroup.controllers').exists():
+        reader: Optional[CgroupReader] = CgroupV2Reader.find(root, container_id)
+    else:
+        reader = CgroupV1Reader.find(root, container_id)
+    if reader is None:
+        logger.debug("Cgroup of container '%s' not found in %s",
+                     container_id, root)
+    return reader
@@ -3,8 +3,7 @@ import os
 from copy import deepcopy
 from pathlib import Path
 from socket import socket, SocketIO, SHUT_WR
-from threading import Thread, Lock
-from time import sleep
+from threading import Lock
 from typing import Optional, Any, Dict, List, Type, ClassVar, \
     Tuple, Iterator, Union, Iterable
 
@@ -12,6 +11,7 @@ from dataclasses import dataclass, field, asdict
 from docker.errors import APIError
 from golem_task_api.envs import DOCKER_CPU_ENV_ID
 from twisted.internet.defer import Deferred, inlineCallbacks, succeed
+from twisted.internet.task import LoopingCall
 from twisted.internet.threads import deferToThread
 from urllib3.contrib.pyopenssl import WrappedSocket
 
@@ -40,6 +40,10 @@ from golem.envs import (
     RuntimeStatus
 )
 from golem.envs.docker import DockerRuntimePayload, DockerPrerequisites
+from golem.envs.docker.cgroups import CgroupReader, cgroup_reader, \
+    COUNTERS as USAGE_COUNTERS
+from golem.envs.docker.events import DockerEventsMonitor
+from golem.envs.docker.pool import ContainerPool
 from golem.envs.docker.whitelist import Whitelist
 
 logger = logging.getLogger(__name__)
@@ -50,7 +54,8 @@ cpu = CONSTRAINT_KEYS['cpu']
 
 DOCKER_CPU_METADATA = EnvMetadata(
     id=DOCKER_CPU_ENV_ID,
-    description='Docker environment using CPU'
+    description='Docker environment using CPU',
+    supported_counters=USAGE_COUNTERS,
 )
 
 
@@ -60,6 +65,8 @@ class DockerCPUConfig(EnvConfig):
     work_dirs: List[Path] = field(default_factory=list)
     memory_mb: int = 1024
     cpu_count: int = 1
+    # Containers created in advance for runtimes, 0 disables the pool
+    container_pool_size: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         dict_ = asdict(self)
@@ -160,20 +167,28 @@ class DockerCPURuntime(RuntimeBase):
 
     CONTAINER_RUNNING: ClassVar[List[str]] = ["running"]
     CONTAINER_STOPPED: ClassVar[List[str]] = ["exited", "dead"]
-
-    STATUS_UPDATE_INTERVAL = 1.0  # seconds
+    USAGE_SAMPLE_INTERVAL: ClassVar[float] = 1.0  # seconds
 
     def __init__(
             self,
             container_config: Dict[str, Any],
             port_mapper: ContainerPortMapper,
             runtime_logger: Optional[logging.Logger] = None,
+            events_monitor: Optional[DockerEventsMonitor] = None,
+            container_pool: Optional[ContainerPool] = None,
     ) -> None:
         super().__init__(logger=runtime_logger or logger)
 
         client = local_client()
 
-        self._status_update_thread: Optional[Thread] = None
+        self._container_pool = container_pool
+
+        # Status changes of the container are pushed by the monitor
+        self._events_monitor = events_monitor or DockerEventsMonitor.instance()
+        self._oom_killed = False
+        self._usage_reader: Optional[CgroupReader] = None
+        self._usage: Dict[CounterId, CounterUsage] = {}
+        self._usage_sampler: Optional[LoopingCall] = None
         self._container_id: Optional[str] = None
         self._stdin_socket: Optional[InputSocket] = None
         self._port_mapper = port_mapper
@@ -211,25 +226,50 @@ class DockerCPURuntime(RuntimeBase):
                 self._logger.debug("Container still running, no status update.")
 
             elif container_status in self.CONTAINER_STOPPED:
-                if exit_code == 0:
-                    self._stopped()
-                else:
-                    self._error_occurred(
-                        None, f"Container stopped with exit code {exit_code}.")
+                self._container_stopped(exit_code)
 
             else:
                 self._error_occurred(
                     None, f"Unexpected container status: '{container_status}'.")
 
-    def _update_status_loop(self) -> None:
-        """ Periodically call _update_status(). Stop when the container is no
-            longer running. """
-        while self.status() == RuntimeStatus.RUNNING:
-            self._update_status()
-            sleep(self.STATUS_UPDATE_INTERVAL)
+    def _container_stopped(self, exit_code: int) -> None:
+        """ Update the Runtime's status after the container has stopped on
+            its own. Assumes the status lock is held. """
+        # The last sample, unless the cgroup has been removed already
+        self.usage_counters()
+        self._events_monitor.unregister(self._container_id)
+        if self._oom_killed:
+            self._error_occurred(
+                None, f"Container ran out of memory (exit code {exit_code}).")
+        elif exit_code == 0:
+            self._stopped()
+        else:
+            self._error_occurred(
+                None, f"Container stopped with exit code {exit_code}.")
 
-        self._logger.info("Runtime is no longer running. "
-                          "Stopping status update thread.")
+    def _on_container_event(
+            self,
+            action: str,
+            attributes: Dict[str, str]
+    ) -> None:
+        """ Handle an event of the container pushed by the events monitor.
+            Uses lock for status read & write. """
+        self._logger.debug("Container event: '%s'.", action)
+        if action == 'oom':
+            self._oom_killed = True
+        if action != 'die':
+            return
+
+        with self._status_lock:
+            if self._status != RuntimeStatus.RUNNING:
+                return
+            try:
+                exit_code = int(attributes['exitCode'])
+            except (KeyError, ValueError):
+                # Not reported by older daemons, ask for it
+                self._update_status()
+                return
+            self._container_stopped(exit_code)
 
     def prepare(self) -> Deferred:
         self._change_status(
@@ -239,22 +279,40 @@ class DockerCPURuntime(RuntimeBase):
 
         def _prepare():
             client = local_client()
-            result = client.create_container_from_config(self._container_config)
+            container_id = None
+            if self._container_pool is not None:
+                container_id = self._container_pool.claim(
+                    self._container_config)
+
+            if container_id is None:
+                result = client.create_container_from_config(
+                    self._container_config)
+                container_id = result.get("Id")
+                for warning in result.get("Warnings") or []:
+                    self._logger.warning(
+                        "Container creation warning: %s", warning)
 
-            container_id = result.get("Id")
             assert isinstance(container_id, str), "Invalid container ID"
             self._container_id = container_id
 
-            for warning in result.get("Warnings") or []:
-                self._logger.warning("Container creation warning: %s", warning)
-
             sock = client.attach_socket(
                 container_id, params={'stdin': True, 'stream': True}
             )
             self._stdin_socket = InputSocket(sock)
 
+        def _fill_pool(res):
+            # Prepare a container for the next runtime with the same config
+            if self._container_pool is not None:
+                deferToThread(
+                    self._container_pool.fill, self._container_config
+                ).addErrback(lambda failure: self._logger.warning(
+                    "Failed to add a container to the pool: %r",
+                    failure.value))
+            return res
+
         deferred_prepare = deferToThread(_prepare)
         deferred_prepare.addCallback(self._prepared)
+        deferred_prepare.addCallback(_fill_pool)
         deferred_prepare.addErrback(self._error_callback(
             "Creating container failed."))
         return deferred_prepare
@@ -266,6 +324,7 @@ class DockerCPURuntime(RuntimeBase):
         self._logger.info("Cleaning up runtime...")
 
         def _clean_up():
+            self._events_monitor.unregister(self._container_id)
             client = local_client()
             client.remove_container(self._container_id)
 
@@ -289,18 +348,33 @@ class DockerCPURuntime(RuntimeBase):
         self._logger.info("Starting container '%s'...", self._container_id)
 
         def _start():
+            # Register before starting not to miss the container's events.
+            # They are handled only once the runtime is running.
+            self._events_monitor.register(
+                self._container_id,
+                on_event=self._on_container_event,
+                poll=self._update_status)
             client = local_client()
-            client.start(self._container_id)
+            try:
+                client.start(self._container_id)
+            except Exception:
+                self._events_monitor.unregister(self._container_id)
+                raise
 
-        def _spawn_status_update_thread(_):
-            self._logger.debug("Spawning status update thread...")
-            self._status_update_thread = Thread(target=self._update_status_loop)
-            self._status_update_thread.start()
-            self._logger.debug("Status update thread spawned.")
+        def _sample_usage(res):
+            self._usage_sampler = LoopingCall(self._sample_usage)
+            self._usage_sampler.start(self.USAGE_SAMPLE_INTERVAL)
+            return res
+
+        def _check_status(_):
+            # The container might have stopped before the runtime was marked
+            # as running, then its 'die' event would be ignored
+            return deferToThread(self._update_status)
 
         deferred_start = deferToThread(_start)
         deferred_start.addCallback(self._started)
-        deferred_start.addCallback(_spawn_status_update_thread)
+        deferred_start.addCallback(_sample_usage)
+        deferred_start.addCallback(_check_status)
         deferred_start.addErrback(self._error_callback(
             f"Starting container '{self._container_id}' failed."))
         return deferred_start
@@ -311,18 +385,13 @@ class DockerCPURuntime(RuntimeBase):
         self._logger.info("Stopping container '%s'...", self._container_id)
 
         def _stop():
+            # The container's cgroup is removed when it stops
+            self.usage_counters()
+            # The container is going to die, it's not an error
+            self._events_monitor.unregister(self._container_id)
             client = local_client()
             client.stop(self._container_id)
 
-        def _join_status_update_thread(res):
-            self._logger.debug("Joining status update thread...")
-            self._status_update_thread.join(self.STATUS_UPDATE_INTERVAL * 2)
-            if self._status_update_thread.is_alive():
-                self._logger.warning("Failed to join status update thread.")
-            else:
-                self._logger.debug("Status update thread joined.")
-            return res
-
         def _close_stdin(res):
             if self._stdin_socket is not None:
                 self._stdin_socket.close()
@@ -332,7 +401,6 @@ class DockerCPURuntime(RuntimeBase):
         deferred_stop.addCallback(self._stopped)
         deferred_stop.addErrback(self._error_callback(
             f"Stopping container '{self._container_id}' failed."))
-        deferred_stop.addBoth(_join_status_update_thread)
         deferred_stop.addBoth(_close_stdin)
         return deferred_stop
 
@@ -414,8 +482,31 @@ class DockerCPURuntime(RuntimeBase):
         assert self._container_id is not None
         return self._port_mapper.get_port_mapping(self._container_id, port)
 
+    def _sample_usage(self) -> None:
+        """ Sample usage counters while the container is running. Its cgroup
+            is removed as soon as it stops, also when it stops on its own. """
+        if self.status() != RuntimeStatus.RUNNING:
+            if self._usage_sampler is not None \
+                    and self._usage_sampler.running:
+                self._usage_sampler.stop()
+            return
+        self.usage_counters()
+
     def usage_counters(self) -> Dict[CounterId, CounterUsage]:
-        raise NotImplementedError
+        """ Sample resource usage of the container from its cgroup. Once the
+            container is gone the last sample is returned. Empty if the cgroup
+            is not accessible, e.g. when Docker runs in a virtual machine. """
+        if self._container_id is None:
+            return {}
+        if self._usage_reader is None:
+            self._usage_reader = cgroup_reader(self._container_id)
+            if self._usage_reader is None:
+                return dict(self._usage)
+        try:
+            self._usage = self._usage_reader.usage()
+        except (OSError, ValueError, KeyError) as e:
+            self._logger.debug("Cannot read usage counters: %r", e)
+        return dict(self._usage)
 
 
 class DockerCPUEnvironment(EnvironmentBase):
@@ -484,8 +575,10 @@ class DockerCPUEnvironment(EnvironmentBase):
             raise EnvironmentError("No supported hypervisor found")
         self._hypervisor = hypervisor_cls.instance(self._get_hypervisor_config)
         self._port_mapper = ContainerPortMapper(self._hypervisor)
+        self._container_pool: Optional[ContainerPool] = None
         self._update_work_dirs(config.work_dirs)
         self._constrain_hypervisor(config)
+        self._update_container_pool(config)
 
     def _get_hypervisor_config(self) -> Dict[str, int]:
         return {
@@ -518,6 +611,10 @@ class DockerCPUEnvironment(EnvironmentBase):
         self._logger.info("Cleaning up environment...")
 
         def _clean_up():
+            if self._container_pool is not None:
+                self._logger.info(
+                    "Container pool stats: %r", self._container_pool.stats())
+                self._container_pool.clear()
             try:
                 self._hypervisor.quit()
             except Exception as e:
@@ -611,6 +708,7 @@ class DockerCPUEnvironment(EnvironmentBase):
         if config.work_dirs != self._config.work_dirs:
             self._update_work_dirs(config.work_dirs)
         self._constrain_hypervisor(config)
+        self._update_container_pool(config)
         self._config = self.parse_config(asdict(config))
         self._config_updated(config)
 
@@ -646,6 +744,18 @@ class DockerCPUEnvironment(EnvironmentBase):
             raise
         self._logger.info("Working directory successfully updated.")
 
+    def _update_container_pool(self, config: DockerCPUConfig) -> None:
+        if config.container_pool_size > 0:
+            if self._container_pool is None:
+                self._container_pool = ContainerPool(
+                    config.container_pool_size)
+            else:
+                self._container_pool.max_size = config.container_pool_size
+        elif self._container_pool is not None:
+            # The environment is disabled, no runtimes are being prepared
+            self._container_pool.clear()
+            self._container_pool = None
+
     def _constrain_hypervisor(self, config: DockerCPUConfig) -> None:
         current = self._hypervisor.constraints()
         target = {
@@ -744,4 +854,5 @@ class DockerCPUEnvironment(EnvironmentBase):
         return DockerCPURuntime(
             container_config,
             self._port_mapper,
-            runtime_logger=self._logger)
+            runtime_logger=self._logger,
+            container_pool=self._container_pool)
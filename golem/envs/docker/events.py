@@ -0,0 +1,159 @@
+import logging
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
+
+from golem.docker.client import local_client
+
+logger = logging.getLogger(__name__)
+
+# Called with the event action (e.g. 'die') and the attributes of the actor
+ContainerEventCallback = Callable[[str, Dict[str, str]], None]
+# Called to check the container status directly, if events are unavailable
+PollCallback = Callable[[], None]
+
+
+class DockerEventsMonitor:
+    """ Single consumer of the Docker daemon's events stream shared by all the
+        runtimes. Container events are dispatched to the callbacks registered
+        for the container. While the stream is not available (e.g. the daemon
+        is restarting) the registered containers are polled instead. They are
+        also polled once the stream is (re)connected, because events could
+        have been missed in the meantime. """
+
+    EVENTS: ClassVar[List[str]] = ['start', 'die', 'oom']
+
+    POLL_INTERVAL: ClassVar[float] = 1.0  # seconds
+    RECONNECT_INTERVAL: ClassVar[float] = 5.0  # seconds
+    STOP_TIMEOUT: ClassVar[float] = 5.0  # seconds
+
+    _instance: ClassVar[Optional['DockerEventsMonitor']] = None
+    _instance_lock: ClassVar[Lock] = Lock()
+
+    def __init__(
+            self,
+            client_factory: Callable[[], Any] = local_client,
+    ) -> None:
+        self._client_factory = client_factory
+        self._containers: Dict[str, Tuple[ContainerEventCallback,
+                                          PollCallback]] = {}
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._stream: Optional[Any] = None
+        self._connected = False
+        self._stopping = Event()
+
+    @classmethod
+    def instance(cls) -> 'DockerEventsMonitor':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def register(
+            self,
+            container_id: str,
+            on_event: ContainerEventCallback,
+            poll: PollCallback,
+    ) -> None:
+        """ Start dispatching events of a container. Should be called before
+            the container is started not to miss any of its events. """
+        with self._lock:
+            self._containers[container_id] = (on_event, poll)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = Thread(
+                    target=self._run,
+                    name='DockerEventsMonitor',
+                    daemon=True)
+                self._thread.start()
+
+    def unregister(self, container_id: str) -> None:
+        with self._lock:
+            self._containers.pop(container_id, None)
+
+    def stop(self) -> None:
+        """ Stop consuming events. The monitor is restarted on the next
+            registration. """
+        self._stopping.set()
+        self._close_stream()
+        thread = self._thread
+        if thread is not None:
+            thread.join(self.STOP_TIMEOUT)
+
+    def _run(self) -> None:
+        last_attempt: Optional[float] = None
+        while not self._stopping.is_set():
+            if last_attempt is None \
+                    or monotonic() - last_attempt >= self.RECONNECT_INTERVAL:
+                last_attempt = monotonic()
+                self._consume()
+            if self._stopping.is_set():
+                break
+            # Events are unavailable, fall back to polling
+            self._poll_all()
+            self._stopping.wait(self.POLL_INTERVAL)
+        logger.debug("Docker events monitor stopped.")
+
+    def _consume(self) -> None:
+        """ Dispatch events until the stream breaks or the monitor stops """
+        try:
+            client = self._client_factory()
+            stream = client.events(
+                decode=True,
+                filters={'type': 'container', 'event': self.EVENTS})
+            self._stream = stream
+            if self._stopping.is_set():
+                return
+            self._connected = True
+            logger.debug("Connected to Docker events stream.")
+            self._poll_all()
+            for event in stream:
+                self._dispatch(event)
+                if self._stopping.is_set():
+                    break
+            if not self._stopping.is_set():
+                logger.warning("Docker events stream ended.")
+        except Exception as e:  # pylint: disable=broad-except
+            if not self._stopping.is_set():
+                logger.warning("Docker events stream failed: %r", e)
+        finally:
+            self._connected = False
+            self._close_stream()
+
+    def _close_stream(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None and hasattr(stream, 'close'):
+            try:
+                stream.close()
+            except Exception:  # pylint: disable=broad-except
+                logger.debug("Error closing events stream", exc_info=True)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        actor = event.get('Actor') or {}
+        container_id = actor.get('ID') or event.get('id')
+        action = event.get('Action') or event.get('status')
+        with self._lock:
+            callbacks = self._containers.get(container_id)
+        if callbacks is None:
+            return
+        try:
+            callbacks[0](action, actor.get('Attributes') or {})
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(
+                "Error handling '%s' event of container '%s'",
+                action, container_id)
+
+    def _poll_all(self) -> None:
+        with self._lock:
+            containers = list(self._containers.items())
+        for container_id, (_, poll) in containers:
+            try:
+                poll()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(
+                    "Error polling status of container '%s'", container_id)
@@ -144,4 +144,5 @@ class DockerGPUEnvironment(DockerCPUEnvironment):
         return DockerGPURuntime(
             container_config,
             self._port_mapper,
-            runtime_logger=self._logger)
+            runtime_logger=self._logger,
+            container_pool=self._container_pool)
@@ -0,0 +1,166 @@
+import json
+import logging
+from collections import OrderedDict, deque
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from docker.errors import APIError
+
+from golem.docker.client import local_client
+
+logger = logging.getLogger(__name__)
+
+
+class PooledContainer(NamedTuple):
+    container_id: str
+    # When the container was created and how long did it take (seconds)
+    created_at: float
+    creation_time: float
+
+
+class ContainerPool:
+    """ Containers created in advance, ready to be claimed by runtimes.
+
+        Containers are pooled per their whole configuration: the image and
+        the resource limits, but also the command, environment and binds,
+        because Docker doesn't allow to change them once a container is
+        created. Runtimes with identical configurations, e.g. computing
+        subtasks of the same task, claim a container prepared while the
+        previous one was running. Pooled containers are created but never
+        started, so a claimed container doesn't need any reset; it's removed
+        by the runtime after use as any other container.
+
+        Containers idle for longer than `max_idle` are removed. Once there
+        are more than `max_size` of them, the least recently used
+        configurations are evicted first. """
+
+    MAX_IDLE: float = 300.0  # seconds
+
+    def __init__(
+            self,
+            max_size: int,
+            max_idle: float = MAX_IDLE,
+            client_factory: Callable[[], Any] = local_client,
+    ) -> None:
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._client_factory = client_factory
+        self._lock = Lock()
+        # Least recently used configurations first
+        self._containers: 'OrderedDict[str, Deque[PooledContainer]]' = \
+            OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._time_saved = 0.0
+
+    @staticmethod
+    def _key(container_config: Dict[str, Any]) -> str:
+        return json.dumps(container_config, sort_keys=True, default=str)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(map(len, self._containers.values()))
+
+    def claim(self, container_config: Dict[str, Any]) -> Optional[str]:
+        """ Take a container created with the given config out of the pool.
+            Returns None on a miss. """
+        # Stale containers are evicted first not to be handed out
+        self._evict()
+        key = self._key(container_config)
+        with self._lock:
+            containers = self._containers.get(key)
+            if containers:
+                container = containers.popleft()
+                self._containers.move_to_end(key)
+                self._hits += 1
+                self._time_saved += container.creation_time
+            else:
+                container = None
+                self._misses += 1
+        if container is None:
+            return None
+        logger.debug("Claimed pooled container '%s', %.2fs saved",
+                     container.container_id, container.creation_time)
+        return container.container_id
+
+    def fill(self, container_config: Dict[str, Any]) -> None:
+        """ Create a container for the next runtime using the given config,
+            unless one is already waiting. Blocking, to be called off the
+            reactor thread. """
+        key = self._key(container_config)
+        with self._lock:
+            if self.max_size <= 0 or self._containers.get(key):
+                return
+
+        client = self._client_factory()
+        started = monotonic()
+        result = client.create_container_from_config(container_config)
+        container = PooledContainer(
+            container_id=result['Id'],
+            created_at=monotonic(),
+            creation_time=monotonic() - started,
+        )
+        logger.debug("Container '%s' added to the pool",
+                     container.container_id)
+
+        with self._lock:
+            self._containers.setdefault(key, deque()).append(container)
+            self._containers.move_to_end(key)
+        self._evict()
+
+    def clear(self) -> None:
+        """ Remove all the pooled containers """
+        with self._lock:
+            containers = [
+                container.container_id
+                for key_containers in self._containers.values()
+                for container in key_containers
+            ]
+            self._containers.clear()
+        self._remove(containers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            claims = self._hits + self._misses
+            return {
+                'size': sum(map(len, self._containers.values())),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / claims if claims else 0.0,
+                'startup_time_saved': self._time_saved,
+            }
+
+    def _evict(self) -> None:
+        now = monotonic()
+        evicted: List[str] = []
+        with self._lock:
+            for key in list(self._containers):
+                containers = self._containers[key]
+                while containers \
+                        and now - containers[0].created_at > self.max_idle:
+                    evicted.append(containers.popleft().container_id)
+                if not containers:
+                    del self._containers[key]
+
+            size = sum(map(len, self._containers.values()))
+            while size > max(self.max_size, 0):
+                key, containers = next(iter(self._containers.items()))
+                evicted.append(containers.popleft().container_id)
+                size -= 1
+                if not containers:
+                    del self._containers[key]
+        self._remove(evicted)
+
+    def _remove(self, container_ids: List[str]) -> None:
+        if not container_ids:
+            return
+        client = self._client_factory()
+        for container_id in container_ids:
+            logger.debug("Removing pooled container '%s'", container_id)
+            try:
+                client.remove_container(container_id)
+            except APIError as e:
+                logger.warning(
+                    "Failed to remove pooled container '%s': %r",
+                    container_id, e)
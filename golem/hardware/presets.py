@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import humanize
 
@@ -13,6 +13,12 @@ from golem.rpc import utils as rpc_utils
 logger = logging.getLogger(__name__)
 
 
+class SlotResources(NamedTuple):
+    """ Share of the configured hardware available to a single subtask """
+    cpus: List[int]
+    memory: int  # KiB
+
+
 class HardwarePresets:
 
     default_values: Optional[Dict[str, int]] = None
@@ -72,6 +78,30 @@ class HardwarePresets:
             disk=hardware.cap_disk(config.max_resource_size),
         )
 
+    @classmethod
+    def slots(cls, config: ClientConfigDescriptor) -> List[SlotResources]:
+        """
+        Splits CPU cores and memory set in the config between subtasks
+        computed at the same time. The number of slots is limited so that
+        each slot gets at least one core and the minimal amount of memory.
+        :param config: config with values of the active preset applied
+        :return: resources of each slot
+        """
+        cpus = hardware.cpus()[:hardware.cap_cpus(config.num_cores)]
+        count = max(min(
+            int(config.subtask_slots or 1),
+            len(cpus),
+            config.max_memory_size // appconfig.MIN_MEMORY_SIZE,
+        ), 1)
+        cores = len(cpus) // count
+        return [
+            SlotResources(
+                cpus=cpus[i * cores:(i + 1) * cores],
+                memory=config.max_memory_size // count,
+            )
+            for i in range(count)
+        ]
+
     @classmethod
     def caps(cls) -> Dict[str, int]:
         return hardware.caps()
@@ -41,12 +41,14 @@ class RequestorBrassMarketStrategy(RequestorPoolingMarketStrategy):
             return None
 
         offers = cls._pools.pop(task_id)
+        scores = dbm.get_provider_scores(
+            offer.provider_id for offer in offers)
 
         permutation = order_providers([
             BrassMarketOffer(  # type: ignore
                 scale_price(offer.max_price, offer.price),
-                dbm.get_provider_efficiency(offer.provider_id),
-                dbm.get_provider_efficacy(offer.provider_id).vector)
+                scores[offer.provider_id][0],
+                scores[offer.provider_id][1].vector)
             for offer in offers
         ])
 
@@ -12,6 +12,8 @@ from twisted.web.http_headers import Headers
 from golem_messages import helpers as msg_helpers
 import requests
 from requests import HTTPError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import golem.tools.talkback
 
 
@@ -44,16 +46,53 @@ class HyperdriveClient(IClient):
     DEFAULT_ENDPOINT = 'api'
     HEADERS = {'content-type': 'application/json'}
 
-    def __init__(self, port, host, timeout=None):
+    # Maximum number of keep-alive connections to the daemon
+    POOL_SIZE = 8
+    # Requests failing to connect are retried after BACKOFF_FACTOR * 2^n s
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            port,
+            host,
+            timeout=None,
+            pool_size=POOL_SIZE,
+            retries=RETRIES,
+    ):
         super().__init__()
         # connection / read timeout
         self.timeout = timeout
         # API destination address
         self._url = f'http://{host}:{port}'
+        self._session = self._create_session(pool_size, retries)
 
     def __repr__(self):
         return f'<{self.__class__.__name__} {self.CLIENT_ID} at {self._url}>'
 
+    @classmethod
+    def _create_session(cls, pool_size: int, retries: int) \
+            -> requests.Session:
+        # Only connection errors are retried, the request has not reached
+        # the daemon then
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                read=0,
+                redirect=0,
+                status=0,
+                backoff_factor=cls.BACKOFF_FACTOR,
+                raise_on_status=False,
+            ))
+        session = requests.Session()
+        session.mount('http://', adapter)
+        return session
+
+    def close(self) -> None:
+        self._session.close()
+
     @classmethod
     def build_options(cls, **kwargs):
         return HyperdriveClientOptions(
@@ -135,10 +174,12 @@ class HyperdriveClient(IClient):
         if 'user' not in data:
             data['user'] = golem.tools.talkback.user()
 
-        response = requests.post(url=f'{self._url}/{endpoint}',
-                                 headers=self.HEADERS,
-                                 data=json.dumps(data),
-                                 timeout=self.timeout)
+        # Encoded, so that headers and body are sent at once; otherwise
+        # Nagle's algorithm delays requests on kept-alive connections
+        response = self._session.post(url=f'{self._url}/{endpoint}',
+                                      headers=self.HEADERS,
+                                      data=json.dumps(data).encode('utf-8'),
+                                      timeout=self.timeout)
 
         try:
             response.raise_for_status()
@@ -527,21 +527,27 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
             difficulty)
 
     def solve_challenge(self, key_id, challenge, difficulty):
-        """ Solve challenge with given difficulty for a node with key_id
+        """ Solve challenge with given difficulty for a node with key_id,
+        off the reactor
         :param str key_id: key id of a node that has send this challenge
         :param str challenge: puzzle to solve
         :param int difficulty: difficulty of challenge
-        :return str: solution of a challenge
+        :return Deferred: fired with the solution of a challenge,
+                          cancel it to stop solving
         """
         self.challenge_history.append([key_id, challenge])
-        solution, time_ = simplechallenge.solve_challenge(
-            challenge, difficulty)
-        logger.debug(
-            "Solved challenge with difficulty %r in %r sec",
-            difficulty,
-            time_
-        )
-        return solution
+        solver = simplechallenge.ChallengeSolver(challenge, difficulty)
+
+        def solved(result):
+            solution, time_ = result
+            logger.debug(
+                "Solved challenge with difficulty %r in %r sec",
+                difficulty,
+                time_
+            )
+            return solution
+
+        return solver.start().addCallback(solved)
 
     def get_peers_degree(self):
         """ Return peers degree level
@@ -693,6 +699,13 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         """
         return self.task_server.add_task_header(task_header)
 
+    def add_task_headers(self, task_headers: List[dt_tasks.TaskHeader]):
+        """ Add a batch of task headers received from a peer
+        :param list task_headers: new task headers
+        :return Deferred: fired with a list of add_task_header results
+        """
+        return self.task_server.add_task_headers(task_headers)
+
     def remove_task_header(self, task_id) -> bool:
         """ Remove header of a task with given id from a list of a known tasks
         :param str task_id: id of a task that should be removed
@@ -7,6 +7,7 @@ import semantic_version
 from golem_messages import message
 from golem_messages.datastructures import p2p as dt_p2p
 from pydispatch import dispatcher
+from twisted.internet.defer import CancelledError
 
 import golem
 from golem import constants as gconst
@@ -84,6 +85,8 @@ class PeerSession(BasicSafeSession):
         # Verification by challenge not a random value
         self.solve_challenge = False
         self.challenge = None
+        # Solution of the challenge sent by the peer, while being solved
+        self._challenge_solution = None
         self.difficulty = 0
 
         self.can_be_unverified.extend(
@@ -103,6 +106,8 @@ class PeerSession(BasicSafeSession):
         """
         BasicSafeSession.dropped(self)
         self.p2p_service.remove_peer(self)
+        if self._challenge_solution:
+            self._challenge_solution.cancel()
 
     def interpret(self, msg):
         """React to specific message. Disconnect, if message type is unknown
@@ -317,12 +322,30 @@ class PeerSession(BasicSafeSession):
             self.send(message.base.RandVal(rand_val=msg.rand_val))
 
     def _solve_challenge(self, challenge, difficulty):
-        solution = self.p2p_service.solve_challenge(
+        deferred = self.p2p_service.solve_challenge(
             self.key_id,
             challenge,
             difficulty
         )
-        self.send(message.base.ChallengeSolution(solution=solution))
+
+        def solved(solution):
+            self._challenge_solution = None
+            self.send(message.base.ChallengeSolution(solution=solution))
+
+        def failed(failure):
+            self._challenge_solution = None
+            if failure.check(CancelledError):
+                return
+            logger.warning(
+                "Failed to solve challenge. difficulty=%r, error=%s",
+                difficulty,
+                failure.getErrorMessage(),
+            )
+            self.disconnect(message.base.Disconnect.REASON.Unverified)
+
+        if not deferred.called:
+            self._challenge_solution = deferred
+        deferred.addCallbacks(solved, failed)
 
     def _react_to_get_peers(self, msg):
         self._send_peers()
@@ -363,11 +386,15 @@ class PeerSession(BasicSafeSession):
         logger.debug("Running handler for `Tasks`. msg=%r", msg)
         for t in msg.tasks:
             logger.debug("Task information received. task header: %r", t)
-            if not self.p2p_service.add_task_header(t):
+
+        def added(results):
+            if not all(results):
                 self.disconnect(
                     message.base.Disconnect.REASON.BadProtocol
                 )
 
+        self.p2p_service.add_task_headers(msg.tasks).addCallback(added)
+
     def _react_to_remove_task(self, msg):
         if not self._verify_remove_task(msg):
             return
@@ -0,0 +1,158 @@
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
+
+from golem.core.variables import (
+    CRYPTO_POOL_INLINE_THRESHOLD,
+    CRYPTO_POOL_MAX_PENDING,
+    CRYPTO_POOL_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CryptoPool:
+    """ Bounded pool of threads running message serialization, signing and
+        encryption (and the reverse) off the reactor thread.
+
+        Only messages of at least `inline_threshold` bytes are worth the
+        thread hand-off; smaller ones should be processed inline. When more
+        than `max_pending` jobs are waiting, callers are advised to fall back
+        to inline processing as well, which keeps the queue bounded.
+    """
+
+    def __init__(self,
+                 size: int = CRYPTO_POOL_SIZE,
+                 inline_threshold: int = CRYPTO_POOL_INLINE_THRESHOLD,
+                 max_pending: int = CRYPTO_POOL_MAX_PENDING,
+                 reactor=None) -> None:
+        if reactor is None:
+            from twisted.internet import reactor
+        self.size = size
+        self.inline_threshold = inline_threshold
+        self.max_pending = max_pending
+        self.pending = 0
+        self._reactor = reactor
+        self._pool = ThreadPool(minthreads=0, maxthreads=size,
+                                name='CryptoPool')
+        # Last seen serialized size per message class. Written from worker
+        # threads, single dict assignments are atomic.
+        self._size_hints: Dict[type, int] = {}
+
+    @property
+    def started(self) -> bool:
+        return self._pool.started
+
+    def start(self) -> None:
+        if self._pool.started:
+            return
+        self._pool.start()
+        self._reactor.addSystemEventTrigger('during', 'shutdown', self.stop)
+
+    def stop(self) -> None:
+        if self._pool.started:
+            self._pool.stop()
+
+    def should_offload(self, size: Optional[int]) -> bool:
+        """ Decide whether processing data of a given size should be done in
+            the pool
+        :param size: size of the data in bytes, None if not known
+        """
+        return size is not None \
+            and size >= self.inline_threshold \
+            and self.pending < self.max_pending
+
+    def should_offload_msg(self, msg) -> bool:
+        """ Decide whether serializing a message should be done in the pool,
+            judging by the size of previously serialized messages of its type
+        """
+        return self.should_offload(self._size_hints.get(type(msg)))
+
+    def record_msg_size(self, msg, size: int) -> None:
+        self._size_hints[type(msg)] = size
+
+    def run(self, fn: Callable, *args) -> Deferred:
+        """ Run fn(*args) in the pool, the result is delivered to the reactor
+            thread through the returned Deferred
+        """
+        self.start()
+        self.pending += 1
+
+        def _done(result):
+            self.pending -= 1
+            return result
+
+        deferred = deferToThreadPool(self._reactor, self._pool, fn, *args)
+        deferred.addBoth(_done)
+        return deferred
+
+
+class OrderedJobQueue:
+    """ Runs jobs one by one in submission order. A job is executed either
+        inline or in a CryptoPool, its result (or Failure) is passed to the
+        job's callback on the reactor thread. Meant to be used per session
+        and direction, so that messages are never reordered.
+    """
+
+    def __init__(self, pool: CryptoPool) -> None:
+        self._pool = pool
+        self._queue: Deque[Tuple[Callable, Tuple, bool, Callable]] = deque()
+        self._running = False
+
+    @property
+    def busy(self) -> bool:
+        return self._running or bool(self._queue)
+
+    def submit(self, fn: Callable, args: Tuple, offload: bool,
+               callback: Callable[[Any], None]) -> None:
+        self._queue.append((fn, args, offload, callback))
+        if not self._running:
+            self._run_queue()
+
+    def clear(self) -> None:
+        """ Drop jobs that have not been started yet """
+        self._queue.clear()
+
+    def _run_queue(self) -> None:
+        while self._queue:
+            fn, args, offload, callback = self._queue.popleft()
+            if offload:
+                self._running = True
+                deferred = self._pool.run(fn, *args)
+                deferred.addBoth(self._offloaded_done, callback)
+                return
+            try:
+                result = fn(*args)
+            except Exception:  # pylint: disable=broad-except
+                result = Failure()
+            self._call(callback, result)
+
+    def _offloaded_done(self, result, callback) -> None:
+        self._running = False
+        self._call(callback, result)
+        self._run_queue()
+
+    @staticmethod
+    def _call(callback, result) -> None:
+        try:
+            callback(result)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Crypto job callback failed')
+
+
+_crypto_pool: Optional[CryptoPool] = None
+
+
+def get_crypto_pool() -> Optional[CryptoPool]:
+    """ Return the crypto pool shared by all protocols, None if disabled """
+    global _crypto_pool  # pylint: disable=global-statement
+    if CRYPTO_POOL_SIZE <= 0:
+        return None
+    if _crypto_pool is None:
+        _crypto_pool = CryptoPool()
+    return _crypto_pool
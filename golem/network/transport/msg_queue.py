@@ -23,24 +23,44 @@ FORBIDDEN_CLASSES = (
     message.base.RandVal,
 )
 
+# Ids of queued messages by node, mirroring the QueuedMessage table.
+# Guarded by READ_LOCK, loaded on first use
+_index: typing.Dict[str, typing.List[int]] = {}
+# Database file the index mirrors
+_index_database: typing.Optional[str] = None
+
 
 def put(node_id: str, msg: message.base.Message) -> None:
     assert not isinstance(msg, FORBIDDEN_CLASSES),\
         "Disconnect message shouldn't be in a queue"
     db_model = model.QueuedMessage.from_message(node_id, msg)
-    db_model.save()
+    with READ_LOCK:
+        db_model.save()
+        if _index_database == model.db.database:
+            _index.setdefault(node_id, []).append(db_model.id)
 
 
 def get(node_id: str) -> typing.Iterator['message.base.Base']:
-    while True:
-        with READ_LOCK:
-            try:
-                db_model = model.QueuedMessage.select()\
-                    .where(
-                        model.QueuedMessage.node == node_id,
-                    ).order_by(model.QueuedMessage.created_date).get()
-            except model.QueuedMessage.DoesNotExist:
-                return
+    """ Yield queued messages of the node, in order of queueing. The yielded
+        ones are deleted from the queue in one statement at the end """
+    with READ_LOCK:
+        if not _load_index():
+            return
+        # Taken off the index, so concurrent calls don't yield them again
+        msg_ids = _index.pop(node_id, None)
+        if not msg_ids:
+            return
+        db_models = list(
+            model.QueuedMessage.select().where(
+                model.QueuedMessage.node == node_id,
+                model.QueuedMessage.id <= msg_ids[-1],
+            ).order_by(model.QueuedMessage.id)
+        )
+
+    last_id = None
+    try:
+        for db_model in db_models:
+            last_id = db_model.id
             try:
                 msg = db_model.as_message()
             except msg_exceptions.VersionMismatchError:
@@ -60,18 +80,51 @@ def get(node_id: str) -> typing.Iterator['message.base.Base']:
                     exc_info=True,
                 )
                 continue
-            finally:
-                db_model.delete_instance()
-        yield msg
+            yield msg
+    finally:
+        _dequeued(node_id, msg_ids, last_id)
+
+
+def _dequeued(
+        node_id: str,
+        msg_ids: typing.List[int],
+        last_id: typing.Optional[int],
+) -> None:
+    """ Delete messages up to `last_id`, return the rest to the index """
+    with READ_LOCK:
+        if last_id is not None:
+            model.QueuedMessage.delete().where(
+                model.QueuedMessage.node == node_id,
+                model.QueuedMessage.id <= last_id,
+            ).execute()
+            msg_ids = [msg_id for msg_id in msg_ids if msg_id > last_id]
+        if msg_ids and _index_database == model.db.database:
+            _index[node_id] = msg_ids + _index.get(node_id, [])
 
 
 def waiting() -> typing.Iterator[str]:
+    with READ_LOCK:
+        if not _load_index():
+            return
+        node_ids = list(_index)
+    yield from node_ids
+
+
+def _load_index() -> bool:
+    """ Load the index, unless it mirrors the current database already.
+        Needs to be called with READ_LOCK. Return whether it is loaded """
+    global _index_database  # pylint: disable=global-statement
+    if _index_database == model.db.database:
+        return True
+
     query = model.QueuedMessage.select(
+        model.QueuedMessage.id,
         model.QueuedMessage.node,
-    ).group_by(model.QueuedMessage.node)
+    ).order_by(model.QueuedMessage.id).tuples()
+    index: typing.Dict[str, typing.List[int]] = {}
     try:
-        for db_row in query:
-            yield db_row.node
+        for msg_id, node_id in query:
+            index.setdefault(node_id, []).append(msg_id)
     except (
             sqlite3.ProgrammingError,
             peewee.OperationalError,
@@ -81,16 +134,26 @@ def waiting() -> typing.Iterator[str]:
         # Here we're using peewee.QueryResultWrapper.iterate()
         # and have to duplicate error handling.
         logger.debug("DB Error", exc_info=True)
+        return False
+
+    _index.clear()
+    _index.update(index)
+    _index_database = model.db.database
+    return True
 
 
 @decorators.run_with_db()
 def sweep() -> None:
     """Sweep ancient messages"""
+    global _index_database  # pylint: disable=global-statement
     with READ_LOCK:
         oldest_allowed = datetime.datetime.now() \
             - variables.MESSAGE_QUEUE_MAX_AGE
         count = model.QueuedMessage.delete().where(
             model.QueuedMessage.created_date < oldest_allowed,
         ).execute()
+        if count:
+            # Reloaded on next use
+            _index_database = None
     if count:
         logger.info('Sweeped ancient messages from queue. count=%d', count)
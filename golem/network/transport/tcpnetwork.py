@@ -9,9 +9,12 @@ from twisted.internet.endpoints import TCP4ServerEndpoint, \
     TCP4ClientEndpoint, TCP6ServerEndpoint, TCP6ClientEndpoint, \
     HostnameEndpoint
 from twisted.internet.protocol import connectionDone
+from twisted.python.failure import Failure
 
-from golem.core.databuffer import DataBuffer
+from golem.core.databuffer import DataBuffer, RingDataBuffer
 from golem.core.hostaddress import get_host_addresses
+from golem.network.transport.cryptopool import get_crypto_pool, \
+    OrderedJobQueue
 from golem.network.transport.limiter import CallRateLimiter
 from .network import Network, SessionProtocol, IncomingProtocolFactoryWrapper, \
     OutgoingProtocolFactoryWrapper
@@ -272,7 +275,7 @@ class BasicProtocol(SessionProtocol):
     def __init__(self):
         super().__init__()
         self.opened = False
-        self.db = DataBuffer()
+        self.db = RingDataBuffer()
         self.spam_protector = SpamProtector()
 
     def send_message(self, msg):
@@ -336,10 +339,7 @@ class BasicProtocol(SessionProtocol):
     # Protected functions
     def _prepare_msg_to_send(self, msg):
         ser_msg = golem_messages.dump(msg, None, None)
-
-        db = DataBuffer()
-        db.append_len_prefixed_bytes(ser_msg)
-        return db.read_all()
+        return struct.pack("!L", len(ser_msg)) + ser_msg
 
     def _can_receive(self) -> bool:
         return self.opened and isinstance(self.db, DataBuffer)
@@ -362,59 +362,78 @@ class BasicProtocol(SessionProtocol):
     def _data_to_messages(self):
         messages = []
 
-        for data in self.db.get_len_prefixed_bytes():
-            if len(data) > MAX_MESSAGE_SIZE:
-                logger.info(
-                    'Ignoring huge message %dB from %r',
-                    len(data),
-                    self.transport.getPeer(),
-                )
-                continue
-
+        for data in self._received_frames():
             try:
                 if not self.spam_protector.check_msg(data):
                     continue
                 msg = self._load_message(data)
-            except golem_messages.exceptions.HeaderError as e:
-                logger.debug(
-                    "Invalid message header: %s from %s. Ignoring.",
-                    e,
-                    self.transport.getPeer(),
-                )
-                continue
-            except golem_messages.exceptions.VersionMismatchError as e:
-                logger.debug(
-                    "Message version mismatch: %s from %s. Closing.",
-                    e,
-                    self.transport.getPeer(),
-                )
-                msg = message.base.Disconnect(
-                    reason=message.base.Disconnect.REASON.ProtocolVersion,
-                )
-                self.send_message(msg)
-                self.close()
-                return []
             except golem_messages.exceptions.MessageError as e:
-                logger.debug(
-                    "Failed to deserialize message: %(e)s from %(peer)s."
-                    " data=%(data)r",
-                    {
-                        'e': e,
-                        'peer': self.transport.getPeer(),
-                        'data': data,
-                    },
-                )
-                logger.debug(
-                    "BasicProtocol._data_to_messages() failed %r",
-                    data,
-                    exc_info=True,
-                )
+                if self._handle_load_error(e, data):
+                    return []
                 continue
 
             messages.append(msg)
 
         return messages
 
+    def _received_frames(self):
+        """ Extract complete frames from the data buffer """
+        for view in self.db.get_len_prefixed_views():
+            if len(view) > MAX_MESSAGE_SIZE:
+                logger.info(
+                    'Ignoring huge message %dB from %r',
+                    len(view),
+                    self.transport.getPeer(),
+                )
+                continue
+
+            # Views are only valid until the buffer is modified, while
+            # loaded messages may keep references to the data
+            yield bytes(view)
+
+    def _handle_load_error(self, e, data) -> bool:
+        """
+        Handle an error raised while loading a message
+        :return bool: True if the connection is being closed and no further
+                      messages should be processed
+        """
+        if isinstance(e, golem_messages.exceptions.HeaderError):
+            logger.debug(
+                "Invalid message header: %s from %s. Ignoring.",
+                e,
+                self.transport.getPeer(),
+            )
+            return False
+
+        if isinstance(e, golem_messages.exceptions.VersionMismatchError):
+            logger.debug(
+                "Message version mismatch: %s from %s. Closing.",
+                e,
+                self.transport.getPeer(),
+            )
+            msg = message.base.Disconnect(
+                reason=message.base.Disconnect.REASON.ProtocolVersion,
+            )
+            self.send_message(msg)
+            self.close()
+            return True
+
+        logger.debug(
+            "Failed to deserialize message: %(e)s from %(peer)s."
+            " data=%(data)r",
+            {
+                'e': e,
+                'peer': self.transport.getPeer(),
+                'data': data,
+            },
+        )
+        logger.debug(
+            "BasicProtocol._data_to_messages() failed %r",
+            data,
+            exc_info=e,
+        )
+        return False
+
 
 class ServerProtocol(BasicProtocol):
     """ Basic protocol connected to server instance
@@ -449,9 +468,101 @@ class ServerProtocol(BasicProtocol):
 
 class SafeProtocol(ServerProtocol):
     """More advanced version of server protocol, support for serialization,
-       encryption, decryption and signing messages
+       encryption, decryption and signing messages.
+
+       Large messages are serialized / deserialized in the shared CryptoPool,
+       off the reactor thread. Per-direction job queues make sure that
+       messages are still sent and interpreted in order.
     """
 
+    def __init__(self, server):
+        super().__init__(server)
+        self.crypto_pool = get_crypto_pool()
+        if self.crypto_pool:
+            self._outgoing = OrderedJobQueue(self.crypto_pool)
+            self._incoming = OrderedJobQueue(self.crypto_pool)
+
+    def send_message(self, msg):
+        if not self.crypto_pool:
+            return super().send_message(msg)
+
+        offload = self.crypto_pool.should_offload_msg(msg)
+        if not (offload or self._outgoing.busy):
+            return super().send_message(msg)
+
+        if not self.opened:
+            logger.warning("Send message %s failed - connection closed", msg)
+            return False
+
+        if self.session is None:
+            logger.error("Wrong session, not sending message")
+            return False
+
+        self._outgoing.submit(
+            self._prepare_msg_to_send, (msg,), offload,
+            lambda result: self._write_prepared(msg, result),
+        )
+        return True
+
+    def _write_prepared(self, msg, result):
+        if isinstance(result, Failure):
+            logger.error('Cannot serialize message: %s', msg,
+                         exc_info=(result.type, result.value,
+                                   result.getTracebackObject()))
+            return
+
+        if result is None:
+            return
+
+        if not self.opened:
+            logger.warning("Send message %s failed - connection closed", msg)
+            return
+
+        self.transport.write(result)
+
+    def _interpret(self, data):
+        if not self.crypto_pool:
+            super()._interpret(data)
+            return
+
+        self.session.last_message_time = time.time()
+        self.db.append_bytes(data)
+
+        for frame in self._received_frames():
+            try:
+                if not self.spam_protector.check_msg(frame):
+                    continue
+            except golem_messages.exceptions.MessageError as e:
+                if self._handle_load_error(e, frame):
+                    self._incoming.clear()
+                    return
+                continue
+
+            self._incoming.submit(
+                self._load_message, (frame,),
+                self.crypto_pool.should_offload(len(frame)),
+                lambda result, frame=frame: self._interpret_loaded(
+                    frame, result),
+            )
+
+    def _interpret_loaded(self, data, result):
+        # The connection might have been lost in the meantime
+        session = getattr(self, 'session', None)
+        if not (self.opened and session):
+            logger.debug('Dropping %r, connection closed', result)
+            return
+
+        if isinstance(result, Failure):
+            if not result.check(golem_messages.exceptions.MessageError):
+                logger.error('Cannot load message',
+                             exc_info=(result.type, result.value,
+                                       result.getTracebackObject()))
+            elif self._handle_load_error(result.value, data):
+                self._incoming.clear()
+            return
+
+        session.interpret(result)
+
     def _prepare_msg_to_send(self, msg):
         logger.debug('SafeProtocol._prepare_msg_to_send(%r)', msg)
         if self.session is None:
@@ -465,6 +576,8 @@ class SafeProtocol(ServerProtocol):
             self.session.my_private_key,
             self.session.theirs_public_key,
         )
+        if self.crypto_pool:
+            self.crypto_pool.record_msg_size(msg, len(serialized))
         length = struct.pack("!L", len(serialized))
         return length + serialized
 
@@ -1,9 +1,12 @@
 import datetime
 import logging
+import time
+from typing import Dict, Iterable, List, Tuple
 
 from peewee import IntegrityError
 
-from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db
+from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db, \
+    provider_efficacy_producer
 from golem.ranking import ProviderEfficacy
 from golem.task.taskstate import SubtaskOp
 
@@ -13,6 +16,15 @@ logger = logging.getLogger(__name__)
 REQUESTOR_FORGETTING_FACTOR = 0.9
 PROVIDER_FORGETTING_FACTOR = 0.9
 
+# How long provider efficiency and efficacy read by get_provider_scores
+# are reused (seconds). Updates of a provider's rank invalidate its entry.
+PROVIDER_SCORES_TTL = 60.0
+# Keeps the number of query parameters below SQLite's limit
+PROVIDER_SCORES_QUERY_SIZE = 500
+
+# node_id -> (expiration time, efficiency, efficacy)
+_provider_scores: Dict[str, Tuple[float, float, ProviderEfficacy]] = {}
+
 
 def increase_positive_computed(node_id, trust_mod):
     logger.debug('increase_positive_computed. node_id=%r, trust_mod=%r',
@@ -214,6 +226,7 @@ def update_provider_efficiency(node_id: str,
                                timeout: float,
                                computation_time: float) -> None:
 
+    _provider_scores.pop(node_id, None)
     with db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.provider_efficiency
@@ -231,12 +244,57 @@ def get_provider_efficacy(node_id: str) -> ProviderEfficacy:
 
 def update_provider_efficacy(node_id: str, op: SubtaskOp) -> None:
 
+    _provider_scores.pop(node_id, None)
     with db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.provider_efficacy.update(op)
         rank.save()
 
 
+def get_provider_scores(node_ids: Iterable[str]) \
+        -> Dict[str, Tuple[float, ProviderEfficacy]]:
+    """
+    Efficiency and efficacy of many providers at once. Ranks missing from the
+    cache are read in a single query; providers without a rank get the
+    default values, their rows are not created.
+    """
+    now = time.monotonic()
+    scores: Dict[str, Tuple[float, ProviderEfficacy]] = {}
+    missing: List[str] = []
+    for node_id in node_ids:
+        cached = _provider_scores.get(node_id)
+        if cached is not None and cached[0] > now:
+            scores[node_id] = cached[1:]
+        else:
+            missing.append(node_id)
+
+    missing = list(dict.fromkeys(missing))
+    for i in range(0, len(missing), PROVIDER_SCORES_QUERY_SIZE):
+        chunk = missing[i:i + PROVIDER_SCORES_QUERY_SIZE]
+        query = LocalRank.select(
+            LocalRank.node_id,
+            LocalRank.provider_efficiency,
+            LocalRank.provider_efficacy,
+        ).where(LocalRank.node_id.in_(chunk))
+        found = {
+            rank.node_id: (rank.provider_efficiency, rank.provider_efficacy)
+            for rank in query
+        }
+        for node_id in chunk:
+            score = found.get(node_id)
+            if score is None:
+                score = (LocalRank.provider_efficiency.default,
+                         provider_efficacy_producer()())
+            scores[node_id] = score
+            _provider_scores[node_id] = (now + PROVIDER_SCORES_TTL,) + score
+
+    return scores
+
+
+def clear_provider_scores_cache() -> None:
+    _provider_scores.clear()
+
+
 def get_global_rank(node_id):
     return GlobalRank.select().where(GlobalRank.node_id == node_id).first()
 
@@ -65,11 +65,19 @@ class BaseResourceServer:
         resource_dir = self.resource_manager.storage.get_dir(res_id)
         package_path = os.path.join(resource_dir, res_id)
         request = golem_async.AsyncRequest(
-            self.packager.create,
+            self._create_package,
             package_path, files,
         )
         return golem_async.async_run(request)
 
+    def _create_package(self, package_path, files):
+        pkg_path, pkg_sha1 = self.packager.create(package_path, files)
+        # Spare the resource manager hashing the package on the reactor thread
+        content_store = self.resource_manager.content_store
+        if content_store:
+            content_store.remember_digest(pkg_path, pkg_sha1)
+        return pkg_path, pkg_sha1
+
     @staticmethod
     def _add_res_error(error):
         logger.error("Resource server: add_resources error: %r", error)
@@ -0,0 +1,361 @@
+"""
+Content-addressed store of resource files, shared by all the tasks of a node.
+
+Files are stored once per SHA1 digest of their contents: with a hard link to
+the shared file where possible, a copy-on-write clone (reflink) otherwise,
+falling back to a plain copy. Files which may be modified in place, e.g. task
+resources mounted into containers, are never hard linked, so that writing
+one doesn't change the other tasks' files. Hyperdrive resource hashes are
+mapped to the digests of their files, so that content which is already known
+is neither shared nor downloaded again, whatever the names of the files.
+
+A stored file is in use while it is hard linked from a shared file or
+referenced by a task that shares it. Unused files are removed by `clean`.
+
+The index is kept in a snapshot and a journal of the changes made since. The
+journal is merged into the snapshot on start and by `clean`.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from threading import RLock
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Linux ioctl sharing the extents of a file with another (copy-on-write)
+FICLONE = 0x40049409
+
+READ_CHUNK_SIZE = 2 ** 20
+
+
+def file_digest(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith('linux'):
+        return False
+
+    import fcntl  # pylint: disable=import-error
+    try:
+        with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def clone_file(src: str, dst: str, copy: bool = True,
+               hardlink: bool = True) -> bool:
+    """ Make `dst` a hard link to, a reflink of, or a copy of `src`, in this
+        order of preference. Hard links are skipped if `hardlink` is False.
+        Returns False if that was not possible without copying the data and
+        `copy` is False. """
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return True
+        except OSError:
+            pass
+
+    if _reflink(src, dst):
+        return True
+    if not copy:
+        return False
+
+    shutil.copyfile(src, dst)
+    return True
+
+
+class ContentStore:
+
+    INDEX_FILE = 'index.json'
+    JOURNAL_FILE = 'index.log'
+    OBJECTS_DIR = 'objects'
+
+    def __init__(self, root_dir: str) -> None:
+        self.root_dir = root_dir
+        self._objects_dir = os.path.join(root_dir, self.OBJECTS_DIR)
+        self._index_path = os.path.join(root_dir, self.INDEX_FILE)
+        self._journal_path = os.path.join(root_dir, self.JOURNAL_FILE)
+        self._lock = RLock()
+
+        # digest -> size, mtime (ns) of the stored file and last use time
+        self._objects: Dict[str, Dict[str, int]] = dict()
+        # Hyperdrive resource hash -> {file name: digest}
+        self._resources: Dict[str, Dict[str, str]] = dict()
+        # digest -> ids of tasks sharing the file
+        self._refs: Dict[str, Set[str]] = dict()
+        # (path, inode, size, mtime) -> digest, to avoid re-hashing files
+        self._digests: Dict[Tuple[str, int, int, int], str] = dict()
+
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._load()
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    # Digests
+
+    @staticmethod
+    def _stat_key(path: str) -> Tuple[str, int, int, int]:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_ino, stat.st_size, \
+            stat.st_mtime_ns
+
+    def digest(self, path: str, compute: bool = True) -> Optional[str]:
+        """ Digest of the file's contents. Returns None if it has not been
+            computed before and `compute` is False. """
+        key = self._stat_key(path)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest or not compute:
+            return digest
+
+        digest = file_digest(path)
+        self.remember_digest(path, digest)
+        return digest
+
+    def remember_digest(self, path: str, digest: str) -> None:
+        """ Record a digest computed elsewhere, e.g. while packaging """
+        key = self._stat_key(path)
+        with self._lock:
+            self._digests[key] = digest
+
+    # Files
+
+    def add(self, path: str,  # pylint: disable=too-many-arguments
+            digest: Optional[str] = None, res_id: Optional[str] = None,
+            copy: bool = True, hardlink: bool = True) -> Optional[str]:
+        """ Put a file in the store. Returns the path of the stored file or
+            None if it could not be stored without copying and `copy` is
+            False. A file which may be modified in place is added with
+            `hardlink` set to False. """
+        digest = digest or self.digest(path)
+        object_path = self.object_path(digest)
+
+        with self._lock:
+            if not self._valid(digest):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                if os.path.exists(object_path):
+                    os.remove(object_path)
+                if not clone_file(path, object_path, copy=copy,
+                                  hardlink=hardlink):
+                    return None
+                stat = os.stat(object_path)
+                self._change('object', digest=digest, entry={
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                })
+            self._use(digest, res_id)
+        return object_path
+
+    def link(self, digest: str, dst: str,
+             res_id: Optional[str] = None) -> bool:
+        """ Create a file at `dst` with the stored contents. It is a reflink
+            or a copy, since task files may be modified in place. """
+        with self._lock:
+            if not self._valid(digest):
+                return False
+
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            clone_file(self.object_path(digest), dst, hardlink=False)
+            self._use(digest, res_id)
+        return True
+
+    def release(self, res_id: str) -> None:
+        """ Drop the references of a task which doesn't share files anymore """
+        with self._lock:
+            self._change('release', res_id=res_id)
+
+    def _use(self, digest: str, res_id: Optional[str]) -> None:
+        self._change('use', digest=digest, used=int(time.time()),
+                     res_id=res_id)
+
+    def _valid(self, digest: str) -> bool:
+        """ Check whether the stored file exists and hasn't been modified, e.g.
+            through a hard link. Otherwise the file is forgotten. """
+        entry = self._objects.get(digest)
+        if not entry:
+            return False
+        try:
+            stat = os.stat(self.object_path(digest))
+        except OSError:
+            stat = None
+
+        if stat and stat.st_size == entry['size'] \
+                and stat.st_mtime_ns == entry['mtime']:
+            return True
+
+        logger.debug("Content store: %s is missing or modified", digest)
+        self._change('forget', digest=digest)
+        return False
+
+    # Resources
+
+    def add_resource(self, resource_hash: str,
+                     files: Dict[str, str]) -> None:
+        """ Map a resource hash to the {file name: digest} of its files. The
+            files of a known resource keep the names they are shared with """
+        with self._lock:
+            if self.get_resource(resource_hash):
+                return
+            self._change('resource', hash=resource_hash, files=dict(files))
+
+    def get_resource(self, resource_hash: str) -> Optional[Dict[str, str]]:
+        """ {file name: digest} of a resource, if all of its files are
+            stored """
+        with self._lock:
+            files = self._resources.get(resource_hash)
+            if files and all(map(self._valid, files.values())):
+                return dict(files)
+        return None
+
+    def find_resource(self, digests: Iterable[str]) -> Optional[str]:
+        """ Hash of a stored resource made of files with the same contents,
+            whatever their names """
+        digests = sorted(digests)
+        with self._lock:
+            for resource_hash, known_files in list(self._resources.items()):
+                if sorted(known_files.values()) != digests:
+                    continue
+                if all(map(self._valid, known_files.values())):
+                    return resource_hash
+        return None
+
+    # Cleanup
+
+    def clean(self, older_than_seconds: int = 0) -> int:
+        """ Remove files which are not in use and weren't used for the given
+            amount of time. Returns the number of removed files. """
+        deadline = time.time() - older_than_seconds
+        removed = 0
+
+        with self._lock:
+            for digest in list(self._objects):
+                if not self._valid(digest) or self._in_use(digest):
+                    continue
+                if self._objects[digest].get('used', 0) > deadline:
+                    continue
+
+                try:
+                    os.remove(self.object_path(digest))
+                except OSError as exc:
+                    logger.warning("Content store: cannot remove %s: %r",
+                                   digest, exc)
+                    continue
+                self._change('forget', digest=digest)
+                removed += 1
+
+            self._remove_untracked()
+            self._digests.clear()
+            self._save()
+
+        if removed:
+            logger.info("Content store: removed %d unused files", removed)
+        return removed
+
+    def _in_use(self, digest: str) -> bool:
+        if self._refs.get(digest):
+            return True
+        return os.stat(self.object_path(digest)).st_nlink > 1
+
+    def _remove_untracked(self) -> None:
+        """ Remove files left behind, e.g. by an interrupted write of the
+            index """
+        for dir_path, _, file_names in os.walk(self._objects_dir):
+            for file_name in file_names:
+                if file_name not in self._objects:
+                    os.remove(os.path.join(dir_path, file_name))
+
+    # Index
+
+    def _change(self, op: str, **change) -> None:
+        """ Apply a change to the index and append it to the journal """
+        change['op'] = op
+        self._apply(change)
+        with open(self._journal_path, 'a') as f:
+            f.write(json.dumps(change) + '\n')
+
+    def _apply(self, change: dict) -> None:
+        op = change['op']
+        if op == 'object':
+            self._objects[change['digest']] = change['entry']
+        elif op == 'use':
+            digest, res_id = change['digest'], change['res_id']
+            if digest not in self._objects:
+                return
+            self._objects[digest]['used'] = change['used']
+            if res_id:
+                self._refs.setdefault(digest, set()).add(res_id)
+        elif op == 'release':
+            for refs in self._refs.values():
+                refs.discard(change['res_id'])
+        elif op == 'forget':
+            digest = change['digest']
+            self._objects.pop(digest, None)
+            self._refs.pop(digest, None)
+            for resource_hash, files in list(self._resources.items()):
+                if digest in files.values():
+                    del self._resources[resource_hash]
+        elif op == 'resource':
+            self._resources[change['hash']] = change['files']
+
+    def _load(self) -> None:
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+            self._objects = index['objects']
+            self._resources = index['resources']
+            self._refs = {digest: set(refs)
+                          for digest, refs in index['refs'].items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) \
+                as exc:
+            logger.warning("Content store: invalid index, starting over: %r",
+                           exc)
+            self._objects, self._resources, self._refs = dict(), dict(), \
+                dict()
+
+        if os.path.exists(self._journal_path):
+            self._replay()
+            self._save()
+
+    def _replay(self) -> None:
+        with open(self._journal_path, 'r') as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError) as exc:
+                    # The last change may not have been written completely
+                    logger.warning("Content store: invalid journal entry, "
+                                   "skipping the rest: %r", exc)
+                    return
+
+    def _save(self) -> None:
+        """ Write a snapshot of the index and start a new journal """
+        tmp_path = self._index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'objects': self._objects,
+                'resources': self._resources,
+                'refs': {digest: sorted(refs)
+                         for digest, refs in self._refs.items() if refs},
+            }, f)
+        os.replace(tmp_path, self._index_path)
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
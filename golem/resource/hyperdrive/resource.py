@@ -95,6 +95,13 @@ class ResourceCache(object):
     def get_by_path(self, resource_path, default=None):
         return self._path_to_res.get(resource_path, default)
 
+    def has_hash(self, resource_hash):
+        """ Whether any of the resource ids is shared under the hash """
+        with self._lock:
+            return any(resource.hash == resource_hash
+                       for resources in self._id_to_res.values()
+                       for resource in resources)
+
     def has_resource(self, resource):
         if resource.res_id and resource.res_id not in self._id_to_res:
             return False
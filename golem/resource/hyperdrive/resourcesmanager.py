@@ -5,10 +5,12 @@ import typing
 from collections import Iterable, Sized
 from functools import partial
 from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThread
 
 from golem.core.fileshelper import common_dir
 from golem.network.hyperdrive.client import HyperdriveAsyncClient
 from golem.resource.client import ClientHandler, DummyClient
+from golem.resource.hyperdrive.contentstore import ContentStore
 from golem.resource.hyperdrive.resource import Resource, ResourceStorage, \
     ResourceError
 
@@ -79,6 +81,7 @@ class HyperdriveResourceManager(ClientHandler):
             self, dir_manager, daemon_address=None, config=None,  # noqa pylint: disable=unused-argument
             resource_dir_method=None,
             client_kwargs: typing.Optional[dict] = None,
+            content_store: typing.Optional[ContentStore] = None,
     ) -> None:
         super().__init__(config)
 
@@ -89,6 +92,7 @@ class HyperdriveResourceManager(ClientHandler):
 
         self.storage = ResourceStorage(dir_manager, resource_dir_method or
                                        dir_manager.get_task_resource_dir)
+        self.content_store = content_store
 
     @staticmethod
     def build_client_options(peers=None, **kwargs):
@@ -119,9 +123,14 @@ class HyperdriveResourceManager(ClientHandler):
         if not resources:
             raise ResourceError("Resource manager: no resources to remove with "
                                 "id '{}'".format(res_id))
+        if self.content_store:
+            self.content_store.release(res_id)
 
         on_error = partial(log_error, "Error removing resources for id: %r")
         for resource in resources:
+            # Files of the same contents are shared once for all the tasks
+            if self.storage.cache.has_hash(resource.hash):
+                continue
             self.client.cancel_async(resource.hash) \
                 .addErrback(on_error)
 
@@ -211,21 +220,32 @@ class HyperdriveResourceManager(ClientHandler):
         :param res_id: Resources id
         :return: Deferred object
         """
-        resource_files = list(files.values())
         result = Deferred()
+        # Digests are only known here if computed off the reactor thread
+        stored_hash = None if resource_hash else \
+            self._find_stored_files(files, compute=False)
 
         def success(hyperdrive_hash):
+            resource_files = self._shared_files(hyperdrive_hash, files)
             self._cache_files(hyperdrive_hash, resource_files, res_id)
+            self._store_files(hyperdrive_hash, files, res_id,
+                              compute=False, copy=False)
             result.callback((hyperdrive_hash, resource_files))
 
-        if resource_hash:
-            client_result = self.client.restore_async(
-                resource_hash, client_options=client_options)
-        else:
+        def add(*_):
             client_result = self.client.add_async(
                 files, client_options=client_options)
+            client_result.addCallbacks(success, result.errback)
 
-        client_result.addCallbacks(success, result.errback)
+        if resource_hash or stored_hash:
+            client_result = self.client.restore_async(
+                resource_hash or stored_hash, client_options=client_options)
+            # Fall back to sharing files which are no longer known to
+            # hyperdrive
+            client_result.addCallbacks(
+                success, add if stored_hash else result.errback)
+        else:
+            add()
         return result
 
     def _add_files_sync(self, resource_hash: str, files: dict, res_id: str,
@@ -238,12 +258,16 @@ class HyperdriveResourceManager(ClientHandler):
         :param res_id: Resources id
         :return: hash, file list
         """
-        resource_files = list(files.values())
+        stored_hash = None if resource_hash else \
+            self._find_stored_files(files)
 
         try:
             if resource_hash:
                 self.client.restore(resource_hash,
                                     client_options=client_options)
+            elif stored_hash and self._restore_stored(
+                    stored_hash, client_options=client_options):
+                resource_hash = stored_hash
             else:
                 resource_hash = self.client.add(files,
                                                 client_options=client_options)
@@ -251,9 +275,109 @@ class HyperdriveResourceManager(ClientHandler):
             raise ResourceError("Resource manager: error adding files: {}"
                                 .format(exc))
 
+        resource_files = self._shared_files(resource_hash, files)
         self._cache_files(resource_hash, resource_files, res_id)
+        self._store_files(resource_hash, files, res_id, copy=False)
         return resource_hash, resource_files
 
+    def _restore_stored(self, resource_hash: str, client_options=None) -> bool:
+        """
+        Restore files known to the content store.
+        :return: False if hyperdrive doesn't share them anymore
+        """
+        try:
+            self.client.restore(resource_hash, client_options=client_options)
+            return True
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Resource manager: cannot restore stored resource "
+                         "%s: %r", resource_hash, exc)
+            return False
+
+    def _find_stored_files(self, files: dict,
+                           compute: bool = True) -> typing.Optional[str]:
+        """
+        Find files with the same contents in the content store.
+        :param files: Dictionary of {full_path: relative_path} of files
+        :param compute: Compute missing digests of the files
+        :return: hash of a resource made of these files or None
+        """
+        if not self.content_store:
+            return None
+
+        digests = []
+        for path in files:
+            digest = self.content_store.digest(path, compute=compute)
+            if not digest:
+                return None
+            digests.append(digest)
+
+        return self.content_store.find_resource(digests)
+
+    def _shared_files(self, resource_hash: str, files: dict) -> list:
+        """
+        Names of the files shared under the hash. Files found in the content
+        store keep the names that they were first shared with, e.g. the
+        package name of another task.
+        :param files: Dictionary of {full_path: relative_path} of files
+        """
+        if self.content_store:
+            stored = self.content_store.get_resource(resource_hash)
+            if stored:
+                return list(stored)
+        return list(files.values())
+
+    def _store_files(self,  # pylint: disable=too-many-arguments
+                     resource_hash: str, files: dict, res_id: str,
+                     compute: bool = True, copy: bool = True,
+                     hardlink: bool = True) -> None:
+        """
+        Put the files in the content store.
+        :param resource_hash: Hash that files are identified by
+        :param files: Dictionary of {full_path: relative_path} of files
+        :param res_id: Task id that files are shared for; None if not shared
+        :param compute: Compute missing digests of the files
+        :param copy: Copy files which cannot be linked
+        :param hardlink: Hard link files, unless they may be modified in place
+        """
+        if not self.content_store:
+            return
+
+        stored = dict()
+        for path, name in files.items():
+            digest = self.content_store.digest(path, compute=compute)
+            if not digest:
+                return
+            if not self.content_store.add(path, digest, res_id, copy=copy,
+                                          hardlink=hardlink):
+                return
+            stored[name] = digest
+
+        self.content_store.add_resource(resource_hash, stored)
+
+    def _link_stored_files(self, resource: Resource, res_id: str) -> bool:
+        """
+        Create the files of a resource from the content store. Files may be
+        copied, so this is not run on the reactor thread when pulling
+        asynchronously.
+        :return: True if all of the files were found in the store
+        """
+        if not self.content_store:
+            return False
+
+        stored = self.content_store.get_resource(resource.hash)
+        if not stored:
+            return False
+
+        resource_dir = self.storage.get_dir(res_id)
+        for name, digest in stored.items():
+            path = os.path.join(resource_dir, name)
+            if not self.content_store.link(digest, path):
+                return False
+
+        logger.debug("Resource manager: linked %d stored files of %s",
+                     len(stored), resource.hash)
+        return True
+
     def _cache_files(self, resource_hash: str, files: Iterable, res_id: str):
         """
         Put the files in storage cache.
@@ -294,12 +418,58 @@ class HyperdriveResourceManager(ClientHandler):
             success(entry, resource.files, res_id)
             return
 
+        download_kwargs = dict(client=client, client_options=client_options,
+                               async_=async_)
+        if not self.content_store \
+                or not self.content_store.get_resource(resource.hash):
+            self._download_resource(entry, resource, res_id, success, error,
+                                    **download_kwargs)
+            return
+
+        def linked(result):
+            if result:
+                self._cache_resource(resource)
+                success(entry, resource.files, res_id)
+            return result
+
+        def link_error(exception):
+            logger.warning("Error linking stored resource. hash=%s, "
+                           "error=%r", resource.hash, exception)
+            return False
+
+        def download(result):
+            if not result:
+                self._download_resource(entry, resource, res_id,
+                                        success, error, **download_kwargs)
+
+        if not async_:
+            try:
+                result = linked(self._link_stored_files(resource, res_id))
+            except Exception as exc:  # pylint: disable=broad-except
+                result = link_error(exc)
+            download(result)
+            return
+
+        deferred = deferToThread(self._link_stored_files, resource, res_id)
+        deferred.addCallback(linked)
+        deferred.addErrback(lambda failure: link_error(failure.value))
+        deferred.addCallback(download)
+        deferred.addErrback(partial(log_error,
+                                    "Error downloading resource: %r"))
+
+    # pylint: disable=too-many-arguments
+    def _download_resource(self, entry, resource: Resource, res_id: str,
+                           success, error,
+                           client=None, client_options=None, async_=True):
+
         def success_wrapper(response, **_):
             logger.debug("Downloaded resource. path=%s, hash=%s",
                          resource.path, resource.hash)
 
             self._cache_resource(resource)
             files = self._parse_pull_response(response, res_id)
+            self._store_pulled_files(resource.hash, response, res_id,
+                                     async_=async_)
             success(entry, files, res_id)
 
         def error_wrapper(exception, **_):
@@ -357,6 +527,27 @@ class HyperdriveResourceManager(ClientHandler):
             except Exception as e:
                 error(e)
 
+    def _store_pulled_files(self, resource_hash: str, response: list,
+                            res_id: str, async_: bool = True) -> None:
+        # response -> [(path, hash, [file_1, file_2, ...])]
+        if not self.content_store or not response or len(response[0]) < 3:
+            return
+
+        resource_dir = self.storage.get_dir(res_id)
+        paths = [os.path.join(resource_dir, f) for f in response[0][2]]
+        files = {path: os.path.relpath(path, resource_dir) for path in paths}
+        # Downloaded files are task resources, which containers may modify
+        store = partial(self._store_files, resource_hash, files, None,
+                        hardlink=False)
+
+        if not async_:
+            store()
+            return
+
+        deferred = deferToThread(store)
+        deferred.addErrback(partial(log_error,
+                                    "Error storing downloaded files: %r"))
+
     def _parse_pull_response(self, response: list, res_id: str) -> list:
         # response -> [(path, hash, [file_1, file_2, ...])]
         relative = self.storage.relative_path
@@ -15,8 +15,10 @@ from golem_task_api.client import RequestorAppClient
 from peewee import fn
 
 from golem.app_manager import AppManager, AppId
+from golem.database import DatabaseExecutor
 from golem.model import (
     ComputingNode,
+    db,
     default_now,
     RequestedTask,
     RequestedSubtask,
@@ -74,6 +76,8 @@ class RequestedTaskManager:
         self._app_manager = app_manager
         self._public_key: bytes = public_key
         self._app_clients: Dict[EnvId, RequestorAppClient] = {}
+        # Runs queries of the async methods off the event loop
+        self._db = DatabaseExecutor(db)
         # Created lazily due to cascading errors in tests
         self._verification_queue: Optional[VerificationQueue] = None
 
@@ -228,7 +232,8 @@ class RequestedTaskManager:
         again, e.g. in case of failed verification a subtask may be marked
         as pending again. """
         logger.debug('has_pending_subtasks(task_id=%r)', task_id)
-        task = RequestedTask.get(RequestedTask.task_id == task_id)
+        task = await self._db.read(
+            RequestedTask.get, RequestedTask.task_id == task_id)
         if not task.status.is_active():
             return False
         app_client = await self._get_app_client(task.app_id)
@@ -246,8 +251,10 @@ class RequestedTaskManager:
             computing_node
         )
         # Check is my requested task
-        task = RequestedTask.get(RequestedTask.task_id == task_id)
-        node, _ = ComputingNode.get_or_create(
+        task = await self._db.read(
+            RequestedTask.get, RequestedTask.task_id == task_id)
+        node, _ = await self._db.write(
+            ComputingNode.get_or_create,
             node_id=computing_node.node_id,
             defaults={'name': computing_node.name}
         )
@@ -257,7 +264,7 @@ class RequestedTaskManager:
             raise RuntimeError(f"No subtasks for self. task_id={task_id}")
 
         # Check should accept provider, raises when waiting on results or banned
-        if self._get_unfinished_subtasks_for_node(task_id, node) > 0:
+        if await self._get_unfinished_subtasks_for_node(task_id, node) > 0:
             raise RuntimeError(
                 "Provider has unfinished subtasks, no next subtask. "
                 f"task_id={task_id}")
@@ -278,7 +285,8 @@ class RequestedTaskManager:
                 "task_id=%r, node_id=%r", task_id, node.node_id)
             return None
 
-        subtask = RequestedSubtask.create(
+        subtask = await self._db.write(
+            RequestedSubtask.create,
             task=task,
             subtask_id=result.subtask_id,
             status=SubtaskStatus.starting,
@@ -319,16 +327,17 @@ class RequestedTaskManager:
     ) -> VerifyResult:
         """ Return whether a subtask has been computed correctly. """
         logger.debug('verify(task_id=%r, subtask_id=%r)', task_id, subtask_id)
-        task = RequestedTask.get(RequestedTask.task_id == task_id)
+        task = await self._db.read(
+            RequestedTask.get, RequestedTask.task_id == task_id)
         if not task.status.is_active():
             raise RuntimeError(
                 f"Task not active, can not verify. task_id={task_id}")
-        subtask = RequestedSubtask.get(
-            RequestedSubtask.subtask_id == subtask_id)
-        assert subtask.task == task
+        subtask = await self._db.read(
+            RequestedSubtask.get, RequestedSubtask.subtask_id == subtask_id)
+        assert subtask.task_id == task.task_id
         app_client = await self._get_app_client(task.app_id)
         subtask.status = SubtaskStatus.verifying
-        subtask.save()
+        await self._db.write(subtask.save)
         try:
             result, _ = await app_client.verify(task_id, subtask_id)
         except Exception as e:
@@ -349,14 +358,14 @@ class RequestedTaskManager:
             pass  # no update
         else:
             raise NotImplementedError(f"Unexpected verify result: {result}")
-        subtask.save()
+        await self._db.write(subtask.save)
 
         if result is VerifyResult.SUCCESS:
             # Check if task completed
             if not await self.has_pending_subtasks(task_id):
-                if not self._get_pending_subtasks(task_id):
+                if not await self._get_pending_subtasks(task_id):
                     task.status = TaskStatus.finished
-                    task.save()
+                    await self._db.write(task.save)
                     await self._shutdown_app_client(task.app_id)
 
         return result
@@ -368,7 +377,7 @@ class RequestedTaskManager:
                 f"Task not active, can not abort. task_id={task_id}")
         task.status = TaskStatus.aborted
         task.save()
-        subtasks = self._get_pending_subtasks(task_id)
+        subtasks = await self._get_pending_subtasks(task_id)
         for subtask in subtasks:
             ProviderComputeTimers.finish(subtask.subtask_id)
             subtask.status = SubtaskStatus.cancelled
@@ -439,6 +448,8 @@ class RequestedTaskManager:
                 logger.warning("Failed to shutdown app. app_id=%r", app_id)
 
         self._app_clients.clear()
+        # Worker threads hold their own database connections
+        self._db.shutdown()
 
         logger.debug('stop() - DONE')
 
@@ -495,24 +506,27 @@ class RequestedTaskManager:
             task.status = TaskStatus.timeout
             task.save()
 
-    @staticmethod
-    def _get_unfinished_subtasks_for_node(
+    async def _get_unfinished_subtasks_for_node(
+            self,
             task_id: TaskId,
             computing_node: ComputingNode
     ) -> int:
-        unfinished_subtask_count = RequestedSubtask.select(
+        query = RequestedSubtask.select(
             fn.Count(RequestedSubtask.subtask_id)
         ).where(
             RequestedSubtask.computing_node == computing_node,
             RequestedSubtask.task_id == task_id,
             RequestedSubtask.status != SubtaskStatus.finished,
-        ).scalar()
+        )
+        unfinished_subtask_count = await self._db.read(query.scalar)
         logger.debug('unfinished subtasks: %r', unfinished_subtask_count)
         return unfinished_subtask_count
 
-    @staticmethod
-    def _get_pending_subtasks(task_id: TaskId) -> List[RequestedSubtask]:
-        return RequestedSubtask.select().where(
+    async def _get_pending_subtasks(
+            self,
+            task_id: TaskId,
+    ) -> List[RequestedSubtask]:
+        query = RequestedSubtask.select().where(
             RequestedSubtask.task_id == task_id,
             # FIXME: duplicate list with SubtaskStatus.is_active()
             RequestedSubtask.status.in_([
@@ -521,6 +535,7 @@ class RequestedTaskManager:
                 SubtaskStatus.verifying,
             ])
         )
+        return await self._db.read(list, query)
 
     async def _shutdown_app_client(self, app_id) -> None:
         # Check if app completed all tasks
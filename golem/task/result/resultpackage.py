@@ -1,8 +1,10 @@
 import binascii
+import hashlib
 import logging
+import struct
 import uuid
 import zipfile
-from typing import Dict
+from typing import Dict, List
 
 import abc
 import os
@@ -34,6 +36,212 @@ def backup_rename(file_path, max_iterations=100):
     os.rename(file_path, name)
 
 
+class HashingWriter(object):
+    """ Write-only stream computing the SHA1 of data passed through to one or
+        more destinations. Keeps track of the position, so that it can be
+        written to by zipfile. """
+
+    def __init__(self, *destinations):
+        self._destinations = destinations
+        self._sha1 = hashlib.sha1()
+        self._position = 0
+
+    def write(self, data):
+        self._sha1.update(data)
+        for destination in self._destinations:
+            destination.write(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        for destination in self._destinations:
+            destination.flush()
+
+    def hexdigest(self):
+        return self._sha1.hexdigest()
+
+
+class ZipStreamWriter(object):
+    """ Writes a ZIP_STORED archive sequentially, to a stream which does not
+        support seeking. The output is identical to zipfile.ZipFile.write
+        called with a regular file: since local headers precede the data,
+        the CRC of every file is computed before the file is written. """
+
+    CHUNK_SIZE = 2 ** 20
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        # Used to write the central directory only
+        self._zipfile = zipfile.ZipFile(fileobj, mode='w',
+                                        compression=zipfile.ZIP_STORED)
+
+    def write(self, filename, arcname=None):
+        zinfo = zipfile.ZipInfo.from_file(filename, arcname)
+        zinfo.compress_type = zipfile.ZIP_STORED
+        zip64 = False
+
+        if zinfo.is_dir():
+            zinfo.CRC = 0
+            zinfo.compress_size = 0
+        else:
+            zinfo.CRC = self._crc32(filename)
+            zinfo.compress_size = zinfo.file_size
+            zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+
+        zinfo.header_offset = self._fileobj.tell()
+        self._fileobj.write(zinfo.FileHeader(zip64))
+        if not zinfo.is_dir():
+            self._write_data(filename, zinfo)
+
+        self._zipfile.filelist.append(zinfo)
+        self._zipfile.NameToInfo[zinfo.filename] = zinfo
+        self._zipfile.start_dir = self._fileobj.tell()
+
+    def close(self):
+        self._zipfile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+
+    @classmethod
+    def _crc32(cls, filename):
+        crc = 0
+        with open(filename, 'rb') as src:
+            for chunk in iter(lambda: src.read(cls.CHUNK_SIZE), b''):
+                crc = zipfile.crc32(chunk, crc)
+        return crc
+
+    def _write_data(self, filename, zinfo):
+        crc = size = 0
+        with open(filename, 'rb') as src:
+            for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b''):
+                crc = zipfile.crc32(chunk, crc)
+                size += len(chunk)
+                self._fileobj.write(chunk)
+
+        if crc != zinfo.CRC or size != zinfo.file_size:
+            raise RuntimeError(f"{filename} was modified while packaging")
+
+
+class ZipStreamReader(object):
+    """ Extracts a ZIP_STORED archive created by ZipStreamWriter or
+        zipfile.ZipFile from a stream which does not support seeking, by
+        reading the local headers in order. The CRC of every file is
+        verified. """
+
+    CHUNK_SIZE = 2 ** 20
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def extractall(self, output_dir) -> List[str]:
+        extracted = []
+
+        while True:
+            signature = self._read(4, allow_eof=True)
+            if signature != zipfile.stringFileHeader:
+                # Central directory (or the end record of an empty archive)
+                break
+
+            header = signature + self._read(zipfile.sizeFileHeader - 4)
+            zinfo = self._parse_header(header)
+            self._extract_member(zinfo, output_dir)
+            extracted.append(zinfo.filename)
+
+        # Read until the end for the stream to verify its integrity
+        while self._fileobj.read(self.CHUNK_SIZE):
+            pass
+        return extracted
+
+    def _read(self, size, allow_eof=False):
+        data = self._fileobj.read(size)
+        if len(data) != size and not (allow_eof and not data):
+            raise zipfile.BadZipFile("Truncated archive")
+        return data
+
+    def _parse_header(self, header):
+        fields = struct.unpack(zipfile.structFileHeader, header)
+        (_, _, _, flag_bits, compress_type, _, _,
+         crc, compress_size, file_size, name_len, extra_len) = fields
+
+        if flag_bits & 0x08 or compress_type != zipfile.ZIP_STORED:
+            raise zipfile.BadZipFile("Unsupported archive member")
+
+        name = self._read(name_len)
+        extra = self._read(extra_len)
+
+        if flag_bits & 0x800:
+            filename = name.decode('utf-8')
+        else:
+            filename = name.decode('cp437')
+
+        if file_size == 0xFFFFFFFF:
+            file_size = self._zip64_size(extra)
+        elif file_size != compress_size:
+            raise zipfile.BadZipFile("Unsupported archive member")
+
+        zinfo = zipfile.ZipInfo(filename)
+        zinfo.CRC = crc
+        zinfo.compress_size = zinfo.file_size = file_size
+        return zinfo
+
+    @staticmethod
+    def _zip64_size(extra):
+        while len(extra) >= 4:
+            tag, length = struct.unpack('<HH', extra[:4])
+            if tag == 1 and length >= 8:
+                return struct.unpack('<Q', extra[4:12])[0]
+            extra = extra[4 + length:]
+        raise zipfile.BadZipFile("Missing ZIP64 extra field")
+
+    def _extract_member(self, zinfo, output_dir):
+        target_path = os.path.join(output_dir, self._sanitize(zinfo.filename))
+
+        if zinfo.is_dir():
+            os.makedirs(target_path, exist_ok=True)
+            return
+
+        upper_dirs = os.path.dirname(target_path)
+        if upper_dirs:
+            os.makedirs(upper_dirs, exist_ok=True)
+
+        crc = 0
+        remaining = zinfo.file_size
+        with open(target_path, 'wb') as dst:
+            while remaining:
+                chunk = self._read(min(remaining, self.CHUNK_SIZE))
+                crc = zipfile.crc32(chunk, crc)
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+        if crc != zinfo.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {zinfo.filename}")
+
+    @staticmethod
+    def _sanitize(filename):
+        """ Build a relative path the same way as zipfile.ZipFile.extract """
+        arcname = filename.replace('/', os.path.sep)
+        if os.path.altsep:
+            arcname = arcname.replace(os.path.altsep, os.path.sep)
+        arcname = os.path.splitdrive(arcname)[1]
+        invalid_path_parts = ('', os.path.curdir, os.path.pardir)
+        arcname = os.path.sep.join(
+            x for x in arcname.split(os.path.sep)
+            if x not in invalid_path_parts)
+        if os.path.sep == '\\':
+            # pylint: disable=protected-access
+            arcname = zipfile.ZipFile._sanitize_windows_name(
+                arcname, os.path.sep)
+        return arcname
+
+
 class Packager(object):
 
     def create(self,
@@ -154,24 +362,44 @@ class EncryptingPackager(Packager):
                output_path: str,
                disk_files: Dict[str, str]):
 
+        """ Zip, hash and encrypt the files in a single pass. The plain
+            archive is written alongside the encrypted one, at the path
+            returned by `package_name`. """
         tmp_file_path = self.package_name(output_path)
         backup_rename(tmp_file_path)
 
-        pkg_file_path, pkg_sha1 = super().create(tmp_file_path, disk_files)
+        if not disk_files:
+            logger.warning('No files to pack')
+        else:
+            disk_files = self._prepare_file_dict(disk_files)
 
-        self.encryptor_class.encrypt(pkg_file_path, output_path,
-                                     secret=self._secret)
-        return output_path, pkg_sha1
+        with open(output_path, 'wb') as encrypted_file, \
+                open(tmp_file_path, 'wb') as package_file:
+
+            encryptor = self.encryptor_class.encrypting_writer(
+                encrypted_file, secret=self._secret)
+            hashing_writer = HashingWriter(package_file, encryptor)
+
+            with ZipStreamWriter(hashing_writer) as archive:
+                for file_path, file_name in (disk_files or {}).items():
+                    self.write_disk_file(archive, file_path, file_name)
+            encryptor.close()
+
+        return output_path, hashing_writer.hexdigest()
 
     def extract(self, input_path, output_dir=None):
-        tmp_file_path = self.package_name(input_path)
-        backup_rename(tmp_file_path)
+        """ Decrypt, verify and unpack the files in a single pass """
+        if not output_dir:
+            output_dir = os.path.dirname(input_path)
+        os.makedirs(output_dir, exist_ok=True)
 
-        self.encryptor_class.decrypt(input_path, tmp_file_path,
-                                     secret=self._secret)
+        with open(input_path, 'rb') as encrypted_file:
+            decryptor = self.encryptor_class.decrypting_reader(
+                encrypted_file, secret=self._secret)
+            extracted = ZipStreamReader(decryptor).extractall(output_dir)
         os.remove(input_path)
 
-        return self._packager.extract(tmp_file_path, output_dir=output_dir)
+        return extracted, output_dir
 
     def generator(self, output_path):
         return self._packager.generator(output_path)
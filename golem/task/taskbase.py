@@ -1,7 +1,8 @@
 import abc
 import logging
 from enum import Enum
-from typing import Callable, Dict, List, Optional, Type, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Tuple, Type, \
+    TYPE_CHECKING
 
 from dataclasses import dataclass, field
 from golem_messages.datastructures import stats as dt_stats
@@ -114,6 +115,11 @@ class Task(abc.ABC):
         = DEFAULT_REQUESTOR_MARKET_STRATEGY
     PROVIDER_MARKET_STRATEGY: Type[ProviderMarketStrategy]\
         = DEFAULT_PROVIDER_MARKET_STRATEGY
+    # Dictionaries keyed by subtask id, persisted entry by entry
+    PER_SUBTASK_ATTRS: Tuple[str, ...] = ()
+    # Attributes which are not modified in place once the task is created,
+    # compared by identity when persisted
+    STATIC_ATTRS: Tuple[str, ...] = ()
 
     class ExtraData(object):
         def __init__(self, ctd=None, **kwargs):
@@ -1,7 +1,9 @@
 import asyncio
+import copy
+import functools
 import logging
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING, Callable, Any
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
 
 import os
 import time
@@ -26,6 +28,7 @@ from golem.envs import EnvId
 from golem.envs.docker.cpu import DockerCPUConfig
 from golem.envs.docker.gpu import DockerGPUConfig
 from golem.hardware import scale_memory, MemSize
+from golem.hardware.presets import HardwarePresets, SlotResources
 from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
 from golem.resource.dirmanager import DirManager
 from golem.task.task_api import EnvironmentTaskApiService
@@ -50,8 +53,75 @@ class CompStats(object):
         self.tasks_requested = 0
 
 
+class SubtaskSlot:
+    """ Computers able to compute a single subtask at a time, along with the
+        slot's share of the hardware and accounting of its work """
+
+    def __init__(
+            self,
+            index: int,
+            old_computer: 'TaskComputer',
+            new_computer: 'NewTaskComputer'
+    ) -> None:
+        self.index = index
+        self.old_computer = old_computer
+        self.new_computer = new_computer
+        # None if the slot may use all the configured resources
+        self.resources: Optional[SlotResources] = None
+        self.subtasks_started = 0
+        self.subtasks_finished = 0
+        self.busy_time = 0.0
+        self.busy_since: Optional[float] = None
+
+    def has_assigned_task(self) -> bool:
+        return self.new_computer.has_assigned_task() \
+            or self.old_computer.has_assigned_task()
+
+    @property
+    def assigned_task_id(self) -> Optional[str]:
+        return self.new_computer.assigned_task_id \
+            or self.old_computer.assigned_task_id
+
+    @property
+    def assigned_subtask_id(self) -> Optional[str]:
+        return self.new_computer.assigned_subtask_id \
+            or self.old_computer.assigned_subtask_id
+
+    def subtask_started(self) -> None:
+        self.subtasks_started += 1
+        self.busy_since = time.time()
+
+    def subtask_finished(self) -> None:
+        self.subtasks_finished += 1
+        if self.busy_since is not None:
+            self.busy_time += time.time() - self.busy_since
+            self.busy_since = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        busy_time = self.busy_time
+        if self.busy_since is not None:
+            busy_time += time.time() - self.busy_since
+        return {
+            'index': self.index,
+            'cpus': self.resources.cpus if self.resources else None,
+            'memory': self.resources.memory if self.resources else None,
+            'task_id': self.assigned_task_id,
+            'subtask_id': self.assigned_subtask_id,
+            'subtasks_started': self.subtasks_started,
+            'subtasks_finished': self.subtasks_finished,
+            'busy_time': busy_time,
+        }
+
+
 class TaskComputerAdapter:
-    """ This class hides old and new task computer under a single interface. """
+    """ This class hides old and new task computer under a single interface.
+
+        Subtasks are computed in slots, each having its own pair of computers.
+        The number of slots comes from the `subtask_slots` config option and
+        the configured CPU cores and memory are split evenly between them.
+        A provider computes at most one subtask of a given task at a time,
+        so slots can be looked up by task id.
+    """
 
     def __init__(
             self,
@@ -62,18 +132,12 @@ class TaskComputerAdapter:
     ) -> None:
         self.stats = IntStatsKeeper(CompStats)
         self._task_server = task_server
+        self._env_manager = env_manager
+        self._use_docker_manager = use_docker_manager
         self._finished_cb = finished_cb
-        self._old_computer = TaskComputer(
-            task_server=task_server,
-            stats_keeper=self.stats,
-            use_docker_manager=use_docker_manager,
-            finished_cb=finished_cb
-        )
-        self._new_computer = NewTaskComputer(
-            env_manager=env_manager,
-            work_dir=task_server.get_task_computer_root(),
-            stats_keeper=self.stats
-        )
+        self._slots: List[SubtaskSlot] = [self._create_slot(0)]
+        self._slots_limit = 1
+        self._update_slots(task_server.config_desc)
 
         # Should this node behave as provider and compute tasks?
         self.compute_tasks = task_server.config_desc.accept_tasks \
@@ -81,64 +145,171 @@ class TaskComputerAdapter:
         self.runnable = True
         self._listeners = []  # type: ignore
 
+    def _create_slot(self, index: int) -> SubtaskSlot:
+        # The first slot's computer manages the docker configuration
+        primary = index == 0
+        old_computer = TaskComputer(
+            task_server=self._task_server,
+            stats_keeper=self.stats,
+            use_docker_manager=self._use_docker_manager and primary,
+            finished_cb=functools.partial(
+                self._old_computation_finished, index),
+            status_callback=self._is_computing,
+        )
+        new_computer = NewTaskComputer(
+            env_manager=self._env_manager,
+            work_dir=self._task_server.get_task_computer_root(),
+            stats_keeper=self.stats
+        )
+        return SubtaskSlot(index, old_computer, new_computer)
+
+    def _update_slots(self, config_desc: ClientConfigDescriptor) -> None:
+        slots_resources = HardwarePresets.slots(config_desc)
+        self._slots_limit = len(slots_resources)
+        while len(self._slots) < self._slots_limit:
+            self._slots.append(self._create_slot(len(self._slots)))
+        self._remove_idle_slots()
+
+        shared = self._slots_limit == 1
+        for slot, resources in zip(self._slots, slots_resources):
+            slot.resources = None if shared else resources
+            slot.old_computer.container_constraints = {} if shared else {
+                'cpuset_cpus': ','.join(map(str, resources.cpus)),
+                'mem_limit': str(resources.memory * 1024),
+            }
+
+    def _remove_idle_slots(self) -> None:
+        """ Drop slots exceeding the limit, busy ones are removed later """
+        while len(self._slots) > self._slots_limit \
+                and not self._slots[-1].has_assigned_task():
+            self._slots.pop()
+
+    def _slot_config(
+            self,
+            config_desc: ClientConfigDescriptor,
+            slot: SubtaskSlot
+    ) -> ClientConfigDescriptor:
+        if slot.resources is None:
+            return config_desc
+        slot_config = copy.copy(config_desc)
+        slot_config.num_cores = len(slot.resources.cpus)
+        slot_config.max_memory_size = slot.resources.memory
+        return slot_config
+
+    def _free_slot(self) -> Optional[SubtaskSlot]:
+        for slot in self._slots[:self._slots_limit]:
+            if not slot.has_assigned_task():
+                return slot
+        return None
+
+    def _find_slot(self, task_id: Optional[str] = None) \
+            -> Optional[SubtaskSlot]:
+        """ Find the slot computing a task, or the first busy slot if no
+            task id is given """
+        for slot in self._slots:
+            if task_id is None:
+                if slot.has_assigned_task():
+                    return slot
+            elif slot.assigned_task_id == task_id:
+                return slot
+        return None
+
+    def _is_computing(self) -> bool:
+        # pylint: disable=protected-access
+        return any(
+            slot.old_computer._is_computing() for slot in self._slots)
+
     @property
     def dir_manager(self) -> DirManager:
         # FIXME: This shouldn't be part of the public interface probably
-        return self._old_computer.dir_manager
+        return self._slots[0].old_computer.dir_manager
 
     def task_given(self, ctd: ComputeTaskDef) -> None:
-        assert not self._new_computer.has_assigned_task()
-        assert not self._old_computer.has_assigned_task()
+        slot = self._free_slot()
+        assert slot is not None
 
         task_id = ctd['task_id']
         task_header = self._task_server.task_keeper.task_headers[task_id]
         if task_header.environment_prerequisites is not None:
-            self._new_computer.task_given(task_header, ctd)
+            slot.new_computer.task_given(task_header, ctd)
         else:
-            self._old_computer.task_given(ctd)
+            slot.old_computer.task_given(ctd)
+        slot.subtask_started()
 
     def has_assigned_task(self) -> bool:
-        return self._new_computer.has_assigned_task() \
-            or self._old_computer.has_assigned_task()
+        return any(slot.has_assigned_task() for slot in self._slots)
+
+    def has_free_slot(self) -> bool:
+        return self._free_slot() is not None
 
     @property
     def assigned_task_id(self) -> Optional[str]:
-        return self._new_computer.assigned_task_id \
-            or self._old_computer.assigned_task_id
+        for task_id in self.assigned_task_ids:
+            return task_id
+        return None
 
     @property
     def assigned_subtask_id(self) -> Optional[str]:
-        return self._new_computer.assigned_subtask_id \
-            or self._old_computer.assigned_subtask_id
+        for slot in self._slots:
+            if slot.assigned_subtask_id:
+                return slot.assigned_subtask_id
+        return None
+
+    @property
+    def assigned_task_ids(self) -> List[str]:
+        return [
+            slot.assigned_task_id
+            for slot in self._slots
+            if slot.assigned_task_id
+        ]
+
+    def get_assigned_subtask_id(self, task_id: str) -> Optional[str]:
+        slot = self._find_slot(task_id)
+        return slot.assigned_subtask_id if slot else None
 
     @property
     def support_direct_computation(self) -> bool:
-        return self._old_computer.support_direct_computation
+        return self._slots[0].old_computer.support_direct_computation
 
     @support_direct_computation.setter
     def support_direct_computation(self, value: bool) -> None:
-        self._old_computer.support_direct_computation = value
+        for slot in self._slots:
+            slot.old_computer.support_direct_computation = value
 
-    def get_subtask_inputs_dir(self) -> Path:
-        if not self._new_computer.has_assigned_task():
+    def get_subtask_inputs_dir(self, task_id: Optional[str] = None) -> Path:
+        slot = self._find_slot(task_id)
+        if slot is None or not slot.new_computer.has_assigned_task():
             raise ValueError(
                 'Task resources directory only available when a task-api task '
                 'is assigned')
-        return self._new_computer.get_subtask_inputs_dir()
-
-    def start_computation(self) -> None:
-        if self._new_computer.has_assigned_task():
-            task_id = self.assigned_task_id
-            subtask_id = self.assigned_subtask_id
-            computation = self._new_computer.compute()
+        return slot.new_computer.get_subtask_inputs_dir()
+
+    def start_computation(self, task_id: Optional[str] = None) -> None:
+        slot = self._find_slot(task_id)
+        if slot is not None and slot.new_computer.has_assigned_task():
+            task_id = slot.new_computer.assigned_task_id
+            subtask_id = slot.new_computer.assigned_subtask_id
+            computation = slot.new_computer.compute()
+            computation.addBoth(self._new_computation_finished, slot)
             self._task_server.task_keeper.task_started(task_id)
             # Fire and forget because it resolves when computation ends
             self._handle_computation_results(task_id, subtask_id, computation)
-        elif self._old_computer.has_assigned_task():
-            self._old_computer.start_computation()
+        elif slot is not None and slot.old_computer.has_assigned_task():
+            slot.old_computer.start_computation()
         else:
             raise RuntimeError('start_computation: No task assigned.')
 
+    def _new_computation_finished(self, result, slot: SubtaskSlot):
+        slot.subtask_finished()
+        self._remove_idle_slots()
+        return result
+
+    def _old_computation_finished(self, index: int) -> None:
+        # Busy slots are never removed, the slot is still there
+        self._slots[index].subtask_finished()
+        self._remove_idle_slots()
+        self._finished_cb()
+
     # FIXME: Move this code to TaskServer when old TaskComputer is removed
     @defer.inlineCallbacks
     def _handle_computation_results(
@@ -166,31 +337,38 @@ class TaskComputerAdapter:
             self._task_server.task_keeper.task_ended(task_id)
             self._finished_cb()
 
-    def task_interrupted(self) -> None:
-        if self._new_computer.has_assigned_task():
-            self._new_computer.task_interrupted()
-        elif self._old_computer.has_assigned_task():
-            self._old_computer.task_interrupted()
+    def task_interrupted(self, task_id: Optional[str] = None) -> None:
+        slot = self._find_slot(task_id)
+        if slot is not None and slot.new_computer.has_assigned_task():
+            slot.new_computer.task_interrupted()
+        elif slot is not None and slot.old_computer.has_assigned_task():
+            slot.old_computer.task_interrupted()
         else:
             raise RuntimeError('task_interrupted: No task assigned.')
 
     def check_timeout(self) -> None:
         # No active timeout checking is needed for the new computer
-        if self._old_computer.has_assigned_task():
-            self._old_computer.check_timeout()
+        for slot in self._slots:
+            if slot.old_computer.has_assigned_task():
+                slot.old_computer.check_timeout()
 
     def get_progress(self) -> Optional[ComputingSubtaskStateSnapshot]:
-        if self._old_computer.has_assigned_task():
-            return self._old_computer.get_progress()
+        for slot in self._slots:
+            if slot.old_computer.has_assigned_task():
+                return slot.old_computer.get_progress()
         return None
 
     def get_environment(self) -> Optional[EnvId]:
-        if self._new_computer.has_assigned_task():
-            return self._new_computer.get_current_computing_env()
-        if self._old_computer.has_assigned_task():
-            return self._old_computer.get_environment()
+        for slot in self._slots:
+            if slot.new_computer.has_assigned_task():
+                return slot.new_computer.get_current_computing_env()
+            if slot.old_computer.has_assigned_task():
+                return slot.old_computer.get_environment()
         return None
 
+    def get_slots_stats(self) -> List[Dict[str, Any]]:
+        return [slot.get_stats() for slot in self._slots]
+
     def register_listener(self, listener):
         self._listeners.append(listener)
 
@@ -207,16 +385,24 @@ class TaskComputerAdapter:
     ) -> defer.Deferred:
         self.compute_tasks = config_desc.accept_tasks \
             and not config_desc.in_shutdown
+        self._update_slots(config_desc)
         work_dir = Path(self._task_server.get_task_computer_root())
-        yield self._new_computer.change_config(
-            config_desc=config_desc,
-            work_dir=work_dir)
-        return (yield self._old_computer.change_config(
+        for slot in self._slots:
+            yield slot.new_computer.change_config(
+                config_desc=self._slot_config(config_desc, slot),
+                work_dir=work_dir)
+
+        primary = self._slots[0].old_computer
+        result = yield primary.change_config(
             config_desc=config_desc,
-            in_background=in_background))
+            in_background=in_background)
+        for slot in self._slots[1:]:
+            slot.old_computer.dir_manager = primary.dir_manager
+        return result
 
     def quit(self) -> None:
-        self._old_computer.quit()
+        for slot in self._slots:
+            slot.old_computer.quit()
 
 
 class NewTaskComputer:
@@ -418,7 +604,8 @@ class NewTaskComputer:
                 config_desc.max_memory_size,
                 unit=MemSize.kibi,
                 to_unit=MemSize.mebi
-            )
+            ),
+            container_pool_size=config_desc.container_pool_size,
         )
 
         # FIXME: Decide how to properly configure environments
@@ -445,7 +632,8 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             task_server: 'TaskServer',
             stats_keeper: Optional[IntStatsKeeper] = None,
             use_docker_manager=True,
-            finished_cb=None
+            finished_cb=None,
+            status_callback: Optional[Callable[[], bool]] = None
     ) -> None:
         self.task_server = task_server
         # Currently computing TaskThread
@@ -469,6 +657,12 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         self.support_direct_computation = False
         self.finished_cb = finished_cb
+        # Tells whether docker may be reconfigured, when the hypervisor is
+        # shared with other computers
+        self.status_callback = status_callback or self._is_computing
+        # Docker host config overrides confining the computation to a part
+        # of the hardware
+        self.container_constraints: Dict[str, str] = {}
 
     def task_given(self, ctd: ComputeTaskDef) -> None:
         assert self.assigned_subtask is None
@@ -629,7 +823,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             # PyLint thinks dm is of type DockerConfigManager not DockerManager
             # pylint: disable=no-member
             dm.update_config(
-                status_callback=self._is_computing,
+                status_callback=self.status_callback,
                 done_callback=deferred.callback,
                 work_dirs=work_dirs,
                 in_background=in_background
@@ -679,7 +873,8 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             dir_mapping = DockerTaskThread.generate_dir_mapping(resource_dir,
                                                                 temp_dir)
             tt = DockerTaskThread(docker_images, extra_data,
-                                  dir_mapping, task_timeout)
+                                  dir_mapping, task_timeout,
+                                  constraints=self.container_constraints)
         elif self.support_direct_computation:
             tt = PyTaskThread(extra_data, resource_dir, temp_dir,
                               task_timeout)
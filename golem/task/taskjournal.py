@@ -0,0 +1,410 @@
+"""
+Append-only persistence of requested tasks.
+
+Every task is stored in its own journal file: a snapshot of the pickled
+(task, task state) pair followed by deltas. A delta holds only the
+attributes changed since the previous record. Dictionaries keyed by subtask
+id (listed in `PER_SUBTASK_ATTRS` of a task or a task state) are compared
+entry by entry, so persisting a subtask event writes about as much as the
+subtask itself takes. Once the deltas outgrow the snapshot, the journal is
+compacted into a new snapshot, which is written aside and atomically moved
+in place. Records are checksummed; a torn record left by a crash is cut off
+when the journal is read.
+
+Changes of a delta are pickled together. Attributes and entries which share
+objects with the changed ones are written along with them, so that they
+keep sharing these objects once restored. Attributes listed in
+`STATIC_ATTRS` are not modified in place after the task is created. They
+are compared by identity instead of being pickled on every write. Binding
+one of them to another object writes a new snapshot.
+"""
+import datetime
+import enum
+import hashlib
+import io
+import logging
+import os
+import pickle
+import struct
+import types
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from golem.core.variables import TASK_JOURNAL_MAX_RECORDS
+
+if TYPE_CHECKING:
+    # pylint:disable=unused-import
+    from golem.task.taskbase import Task
+    from golem.task.taskstate import TaskState
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_TMP_SUFFIX = JOURNAL_SUFFIX + '.tmp'
+PICKLE_PROTOCOL = 2
+# Payload length and its CRC32
+RECORD_HEADER = struct.Struct('!LL')
+
+SNAPSHOT = 0
+DELTA = 1
+
+# Objects which are restored the same whether they are shared or not:
+# immutable values and objects pickled by name
+VALUE_TYPES = (
+    str, bytes, int, float, complex, type(None), tuple, frozenset, range,
+    type, enum.Enum, types.FunctionType, types.BuiltinFunctionType,
+    datetime.date, datetime.time, datetime.timedelta,
+)
+
+# An attribute, (name,), or an entry of a per subtask dictionary, (name, key)
+Unit = Tuple[Any, ...]
+
+# Changes of a single object: values of changed attributes, values of
+# changed entries of the per subtask dictionaries, names of removed
+# attributes and keys of removed entries
+ObjectChanges = Tuple[
+    Dict[str, Any],
+    Dict[str, Dict[Any, Any]],
+    List[str],
+    Dict[str, List[Any]],
+]
+
+
+class Fingerprint:
+    """ Digests of the persisted attributes of a task or a task state and
+        ids of the objects they refer to """
+
+    __slots__ = ('attrs', 'entries', 'refs', 'static')
+
+    def __init__(self) -> None:
+        self.attrs: Dict[str, bytes] = {}
+        self.entries: Dict[str, Dict[Any, bytes]] = {}
+        self.refs: Dict[Unit, Set[int]] = {}
+        self.static: Dict[str, Any] = {}
+
+    def update(self, diff: 'Diff') -> None:
+        for unit, digest in diff.digests.items():
+            digests = self.attrs if len(unit) == 1 \
+                else self.entries[unit[0]]
+            if digest is None:
+                digests.pop(unit[-1], None)
+                self.refs.pop(unit, None)
+            else:
+                digests[unit[-1]] = digest
+        self.refs.update(diff.refs)
+
+
+class Diff:
+    """ Attributes and entries of an object compared with its fingerprint """
+
+    __slots__ = ('state', 'digests', 'refs')
+
+    def __init__(self, state: Dict[str, Any]) -> None:
+        self.state = state
+        # Digests of the changed units, None if removed
+        self.digests: Dict[Unit, Optional[bytes]] = {}
+        # Objects referred to by the written units
+        self.refs: Dict[Unit, Set[int]] = {}
+
+    def value(self, unit: Unit) -> Any:
+        value = self.state[unit[0]]
+        return value if len(unit) == 1 else value[unit[1]]
+
+    def write(self, unit: Unit) -> Set[int]:
+        """ Collect the objects a written unit refers to """
+        self.refs[unit] = _dump_refs(self.value(unit))[1]
+        return self.refs[unit]
+
+
+class JournalInfo:
+    """ What is known about a journal written in this session """
+
+    __slots__ = ('fingerprints', 'snapshot_size', 'deltas', 'deltas_size')
+
+    def __init__(self, fingerprints: Tuple[Fingerprint, Fingerprint],
+                 snapshot_size: int) -> None:
+        self.fingerprints = fingerprints
+        self.snapshot_size = snapshot_size
+        self.deltas = 0
+        self.deltas_size = 0
+
+
+class TaskJournal:
+
+    def __init__(self, tasks_dir: Path,
+                 max_records: int = TASK_JOURNAL_MAX_RECORDS) -> None:
+        self.tasks_dir = tasks_dir
+        self.max_records = max_records
+        self._journals: Dict[str, JournalInfo] = {}
+
+    def path(self, task_id: str) -> Path:
+        return self.tasks_dir / (task_id + JOURNAL_SUFFIX)
+
+    def write(self, task_id: str, task: 'Task', state: 'TaskState',
+              subtask_id: Optional[str] = None) -> None:
+        """ Persist the changes of a task made since the previous write
+        :param subtask_id: the subtask the changes are related to; if given,
+            only its entries of the per subtask dictionaries are compared
+        """
+        info = self._journals.get(task_id)
+        if info is None \
+                or info.deltas >= self.max_records \
+                or info.deltas_size > info.snapshot_size:
+            self.write_snapshot(task_id, task, state)
+            return
+
+        try:
+            diffs = []
+            for obj, fingerprint in zip((task, state), info.fingerprints):
+                diff = _diff(obj, fingerprint, subtask_id)
+                if diff is None:
+                    self.write_snapshot(task_id, task, state)
+                    return
+                diffs.append(diff)
+
+            if not any(diff.digests for diff in diffs):
+                return
+            changes = _changes(info.fingerprints, diffs)
+            payload = _dump((DELTA, changes))
+            with self.path(task_id).open('ab') as f:
+                f.write(_frame(payload))
+        except BaseException:
+            # The journal may be incomplete, start over with a snapshot
+            self._journals.pop(task_id, None)
+            raise
+
+        for fingerprint, diff in zip(info.fingerprints, diffs):
+            fingerprint.update(diff)
+        info.deltas += 1
+        info.deltas_size += len(payload)
+
+    def write_snapshot(self, task_id: str, task: 'Task',
+                       state: 'TaskState') -> None:
+        """ Replace the journal of a task with a snapshot of its state """
+        self._journals.pop(task_id, None)
+        payload = _dump((SNAPSHOT, task, state))
+        fingerprints = (_fingerprint(task), _fingerprint(state))
+
+        path = self.path(task_id)
+        tmp_path = path.with_name(task_id + JOURNAL_TMP_SUFFIX)
+        try:
+            with tmp_path.open('wb') as f:
+                f.write(_frame(payload))
+            os.replace(str(tmp_path), str(path))
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        self._journals[task_id] = JournalInfo(fingerprints, len(payload))
+
+    def remove(self, task_id: str) -> None:
+        self._journals.pop(task_id, None)
+        self.path(task_id).unlink()
+
+    @staticmethod
+    def read(path: Path) -> Tuple['Task', 'TaskState']:
+        """ Replay a journal. Records past the first torn or corrupted one
+            are truncated, they could have been written only by a crashed
+            process.
+        """
+        task = state = None
+        valid_size = 0
+        with path.open('rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                size, checksum = RECORD_HEADER.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != checksum:
+                    break
+
+                record = pickle.loads(payload)
+                if record[0] == SNAPSHOT:
+                    _, task, state = record
+                elif task is None:
+                    raise ValueError('Journal delta without a snapshot')
+                else:
+                    for obj, changes in zip((task, state), record[1]):
+                        _apply(obj, changes)
+                valid_size = f.tell()
+
+        if task is None:
+            raise ValueError('No snapshot in journal {}'.format(path))
+        if valid_size < path.stat().st_size:
+            logger.warning('Truncating torn journal: %s', path)
+            with path.open('r+b') as f:
+                f.truncate(valid_size)
+        return task, state
+
+
+def _dump(value) -> bytes:
+    return pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+
+
+def _dump_refs(value) -> Tuple[bytes, Set[int]]:
+    """ Pickle a value and collect ids of the objects it refers to, which
+        could be shared with other values """
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=PICKLE_PROTOCOL)
+    pickler.dump(value)
+    refs = {
+        obj_id for obj_id, (_, obj) in pickler.memo.copy().items()
+        if not isinstance(obj, VALUE_TYPES)
+    }
+    return buffer.getvalue(), refs
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.sha1(data).digest()
+
+
+def _frame(payload: bytes) -> bytes:
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _object_state(obj) -> Dict[str, Any]:
+    """ Attributes of an object as they would be pickled """
+    state = obj.__getstate__() if hasattr(obj, '__getstate__') else None
+    return state if isinstance(state, dict) else vars(obj)
+
+
+def _per_subtask_dicts(obj, state: Dict[str, Any]) -> Dict[str, dict]:
+    return {
+        name: state[name]
+        for name in getattr(obj, 'PER_SUBTASK_ATTRS', ())
+        if isinstance(state.get(name), dict)
+    }
+
+
+def _static_attrs(obj, state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: state[name]
+        for name in getattr(obj, 'STATIC_ATTRS', ())
+        if name in state
+    }
+
+
+def _fingerprint(obj) -> Fingerprint:
+    fingerprint = Fingerprint()
+    state = _object_state(obj)
+    dicts = _per_subtask_dicts(obj, state)
+    fingerprint.static = _static_attrs(obj, state)
+    for name, value in state.items():
+        if name in dicts:
+            fingerprint.entries[name] = {}
+            for key, entry in value.items():
+                data, refs = _dump_refs(entry)
+                fingerprint.entries[name][key] = _digest(data)
+                fingerprint.refs[(name, key)] = refs
+            continue
+        data, refs = _dump_refs(value)
+        if name not in fingerprint.static:
+            fingerprint.attrs[name] = _digest(data)
+        fingerprint.refs[(name,)] = refs
+    return fingerprint
+
+
+def _diff(obj, fingerprint: Fingerprint,
+          subtask_id: Optional[str]) -> Optional[Diff]:
+    """ Compare an object with its fingerprint
+    :return: the changes, or None if the object cannot be described by
+        a delta and needs a snapshot
+    """
+    state = _object_state(obj)
+    static = _static_attrs(obj, state)
+    if static.keys() != fingerprint.static.keys() \
+            or any(value is not fingerprint.static[name]
+                   for name, value in static.items()):
+        return None
+    if _per_subtask_dicts(obj, state).keys() != fingerprint.entries.keys():
+        return None
+
+    diff = Diff(state)
+
+    def compare(unit: Unit, value: Any, known: Optional[bytes]) -> None:
+        digest = _digest(_dump(value))
+        if known != digest:
+            diff.digests[unit] = digest
+
+    for name, value in state.items():
+        if name in static:
+            continue
+        known = fingerprint.entries.get(name)
+        if known is None:
+            compare((name,), value, fingerprint.attrs.get(name))
+            continue
+
+        keys = value.keys() | known.keys()
+        if subtask_id is not None:
+            expected = len(known) \
+                + (subtask_id in value) - (subtask_id in known)
+            # Unless other subtasks have been added or removed as well
+            if len(value) == expected:
+                keys = (subtask_id,)
+        for key in keys:
+            if key in value:
+                compare((name, key), value[key], known.get(key))
+            elif key in known:
+                diff.digests[(name, key)] = None
+
+    for name in fingerprint.attrs.keys() - state.keys():
+        diff.digests[(name,)] = None
+    return diff
+
+
+def _changes(fingerprints: Tuple[Fingerprint, Fingerprint],
+             diffs: List[Diff]) -> List[ObjectChanges]:
+    """ Values of the changed units of every object, together with the
+        units which share objects with them. Units which are not written are
+        assumed to refer to the objects they referred to when last written.
+    """
+    written = {(i, unit) for i, diff in enumerate(diffs)
+               for unit, digest in diff.digests.items() if digest is not None}
+    shared: Set[int] = set()
+    for i, unit in written:
+        shared |= diffs[i].write(unit)
+
+    grown = bool(shared)
+    while grown:
+        grown = False
+        for i, fingerprint in enumerate(fingerprints):
+            for unit, unit_refs in fingerprint.refs.items():
+                if (i, unit) in written or unit in diffs[i].digests \
+                        or shared.isdisjoint(unit_refs):
+                    continue
+                written.add((i, unit))
+                shared |= diffs[i].write(unit)
+                grown = True
+
+    changes: List[ObjectChanges] = [({}, {}, [], {}) for _ in diffs]
+    for i, unit in written:
+        attrs, entries, _, _ = changes[i]
+        value = diffs[i].value(unit)
+        if len(unit) == 1:
+            attrs[unit[0]] = value
+        else:
+            entries.setdefault(unit[0], {})[unit[1]] = value
+    for diff, (_, _, removed_attrs, removed_entries) in zip(diffs, changes):
+        for unit, digest in diff.digests.items():
+            if digest is not None:
+                continue
+            if len(unit) == 1:
+                removed_attrs.append(unit[0])
+            else:
+                removed_entries.setdefault(unit[0], []).append(unit[1])
+    return changes
+
+
+def _apply(obj, changes: ObjectChanges) -> None:
+    attrs, entries, removed_attrs, removed_entries = changes
+    obj.__dict__.update(attrs)
+    for name in removed_attrs:
+        obj.__dict__.pop(name, None)
+    for name, values in entries.items():
+        obj.__dict__[name].update(values)
+    for name, keys in removed_entries.items():
+        target = obj.__dict__[name]
+        for key in keys:
+            target.pop(key, None)
@@ -1,4 +1,7 @@
+import abc
 import datetime
+import heapq
+import json
 import logging
 import pathlib
 import pickle
@@ -8,7 +11,7 @@ import random
 from collections import Counter
 
 from eth_utils import decode_hex
-from twisted.internet.defer import inlineCallbacks, Deferred
+from twisted.internet.defer import inlineCallbacks, Deferred, DeferredList
 
 from golem_messages import (
     idgenerator,
@@ -306,6 +309,122 @@ class CompTaskKeeper:
         return self.task_package_paths.get(task_id, None)
 
 
+class TaskIdSet:
+    """ Set of task ids with O(1) add, discard, membership test and random
+        choice. Ids are kept in a list (and may be indexed), removal swaps
+        the last element into the freed position.
+    """
+
+    def __init__(self, task_ids: typing.Iterable[str] = ()) -> None:
+        self._ids: typing.List[str] = []
+        self._positions: typing.Dict[str, int] = {}
+        for task_id in task_ids:
+            self.add(task_id)
+
+    def add(self, task_id: str) -> None:
+        if task_id in self._positions:
+            return
+        self._positions[task_id] = len(self._ids)
+        self._ids.append(task_id)
+
+    def discard(self, task_id: str) -> None:
+        position = self._positions.pop(task_id, None)
+        if position is None:
+            return
+        last = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> str:
+        return random.choice(self._ids)
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._positions
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._ids)
+
+    def __getitem__(self, index: int) -> str:
+        return self._ids[index]
+
+    def __repr__(self):
+        return "<TaskIdSet %r>" % (self._ids,)
+
+
+class TaskSelector(abc.ABC):
+    """ Strategy of choosing a task to compute from the supported ones """
+
+    @abc.abstractmethod
+    def select(
+            self,
+            keeper: 'TaskHeaderKeeper',
+            task_ids: TaskIdSet,
+            exclude: typing.AbstractSet[str],
+    ) -> typing.Optional[str]:
+        """ Choose one of task_ids which is not excluded
+        :return: None if there are no candidates
+        """
+        raise NotImplementedError
+
+
+class RandomTaskSelector(TaskSelector):
+    """ Chooses uniformly at random. Excluded tasks are usually few, so
+        candidates are drawn directly from the set first and the list of
+        non-excluded tasks is only built when that keeps failing.
+    """
+
+    MAX_DRAWS = 8
+
+    def select(self, keeper, task_ids, exclude):
+        if not task_ids:
+            return None
+        for _ in range(self.MAX_DRAWS):
+            task_id = task_ids.choice()
+            if task_id not in exclude:
+                return task_id
+        candidates = [t for t in task_ids if t not in exclude]
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+
+class WeightedTaskSelector(TaskSelector):
+    """ Chooses at random with probability proportional to the weight
+        assigned to a task header. Falls back to uniform choice when all
+        weights are zero.
+    """
+
+    def __init__(
+            self,
+            weight: typing.Callable[
+                ['TaskHeaderKeeper', dt_tasks.TaskHeader], float],
+    ) -> None:
+        self.weight = weight
+
+    def select(self, keeper, task_ids, exclude):
+        candidates = [t for t in task_ids if t not in exclude]
+        if not candidates:
+            return None
+        weights = [max(self.weight(keeper, keeper.task_headers[t]), 0.)
+                   for t in candidates]
+        if not any(weights):
+            return random.choice(candidates)
+        return random.choices(candidates, weights=weights)[0]
+
+
+def price_fit_weight(keeper: 'TaskHeaderKeeper',
+                     header: dt_tasks.TaskHeader) -> float:
+    """ Prefer tasks paying more than the node's minimal price, per second
+        of expected computation """
+    max_price = getattr(header, 'max_price', None) or 0
+    margin = max_price - keeper.min_price + 1
+    return margin / max(header.subtask_timeout, 1)
+
+
 class TaskHeaderKeeper:
     """Keeps information about tasks living in Golem Network. Node may
        choose one of those task to compute or will pass information
@@ -323,11 +442,12 @@ class TaskHeaderKeeper:
             remove_task_timeout=180,
             verification_timeout=3600,
             max_tasks_per_requestor=10,
-            task_archiver=None):
+            task_archiver=None,
+            task_selector: typing.Optional[TaskSelector] = None):
         # all computing tasks that this node knows about
         self.task_headers: typing.Dict[str, dt_tasks.TaskHeader] = {}
         # ids of tasks that this node may try to compute
-        self.supported_tasks: typing.List[str] = []
+        self.supported_tasks = TaskIdSet()
         # ids of tasks that are computing on this node
         self.running_tasks: typing.Set[str] = set()
         # results of tasks' support checks
@@ -337,8 +457,18 @@ class TaskHeaderKeeper:
         self.removed_tasks: typing.Dict[str, float] = {}
         # task ids by owner
         self.tasks_by_owner: typing.Dict[str, typing.Set[str]] = {}
+        # task ids by environment
+        self.tasks_by_env: typing.Dict[str, typing.Set[str]] = {}
         # Keep track which tasks were checked when
         self.last_checking: typing.Dict[str, datetime.datetime] = {}
+        # (deadline, task id) heap, entries of removed or updated headers
+        # are skipped when popped
+        self._deadlines: typing.List[typing.Tuple[int, str]] = []
+        # headers accounted in the indices and aggregates below
+        self._indexed_headers: typing.Dict[str, dt_tasks.TaskHeader] = {}
+        self._unsupport_reasons: typing.Counter[UnsupportReason] = Counter()
+        self._min_versions: typing.Counter[str] = Counter()
+        self._max_price_sum = 0
 
         self.min_price = min_price
         self.verification_timeout = verification_timeout
@@ -349,6 +479,7 @@ class TaskHeaderKeeper:
         self.new_env_manager = new_env_manager
         self.max_tasks_per_requestor = max_tasks_per_requestor
         self.task_archiver = task_archiver
+        self.task_selector = task_selector or RandomTaskSelector()
         self.node = node
 
     @inlineCallbacks
@@ -361,12 +492,24 @@ class TaskHeaderKeeper:
            application version.
         :return SupportStatus: ok() if this node may compute a task
         """
+        supported = yield self.check_environment(header)
+        return self._join_support(header, supported)
+
+    @inlineCallbacks
+    def check_environment(self, header: dt_tasks.TaskHeader) \
+            -> typing.Generator[Deferred, SupportStatus, SupportStatus]:
+        """ Checks if this node supports the environment of a task """
         if header.environment_prerequisites:
             supported = yield self._check_new_environment(
                 header.environment, header.environment_prerequisites
             )
         else:
             supported = self._check_old_environment(header.environment)
+        return supported
+
+    def _join_support(self, header: dt_tasks.TaskHeader,
+                      supported: SupportStatus) -> SupportStatus:
+        """ Joins support of the task environment with the other checks """
         supported = supported.join(self.check_mask(header))
         supported = supported.join(self.check_price(header))
 
@@ -471,15 +614,29 @@ class TaskHeaderKeeper:
         if config_desc.min_price == self.min_price:
             return
         self.min_price = config_desc.min_price
-        self.supported_tasks = []
-        for id_, th in self.task_headers.items():
+        self.supported_tasks = TaskIdSet()
+        for id_, th in list(self.task_headers.items()):
             supported = yield self.check_support(th)
-            self.support_status[id_] = supported
+            self._set_support_status(id_, supported)
             if supported:
-                self.supported_tasks.append(id_)
+                self.supported_tasks.add(id_)
             if self.task_archiver:
                 self.task_archiver.add_support_status(id_, supported)
 
+    @inlineCallbacks
+    def recheck_environment(self, env_id: str) -> Deferred:
+        """ Check support again for the tasks using the given environment,
+            ie. after it was enabled or disabled
+        """
+        for task_id in list(self.tasks_by_env.get(env_id, ())):
+            header = self.task_headers.get(task_id)
+            if header is None:
+                continue
+            yield self.update_supported_set(header)
+            if self.task_archiver and task_id in self.support_status:
+                self.task_archiver.add_support_status(
+                    task_id, self.support_status[task_id])
+
     def add_task_header(self, header: dt_tasks.TaskHeader) -> bool:
         """This function will try to add to or update a task header
            in a list of known headers. The header will be added / updated
@@ -488,59 +645,184 @@ class TaskHeaderKeeper:
         :return bool: True if task header was well formatted and
                       no error occurs, False otherwise
         """
-        try:
-            task_id = header.task_id
-            self.check_owner(task_id, header.task_owner.key)
-
-            old_header = self.task_headers.get(task_id)
-            if old_header:
-                if header.signature == old_header.signature:
-                    return True  # Nothing changed
+        result, = sync_wait(self.add_task_headers([header]))
+        return result
 
-                if header.timestamp < old_header.timestamp:
-                    return True  # We already have a newer version
-
-            if task_id in self.removed_tasks:  # recent
-                logger.debug("Received a task which has been already "
-                             "cancelled/removed/timeout/banned/etc "
-                             "Task id %s .", task_id)
-                return True
+    @inlineCallbacks
+    def add_task_headers(
+            self, headers: typing.List[dt_tasks.TaskHeader]) -> Deferred:
+        """ Adds or updates a batch of task headers, as add_task_header
+            does. Support of the new headers is checked for the whole batch.
+        :return Deferred: fired with a list of add_task_header results,
+                          in the order of headers
+        """
+        results = [True] * len(headers)
+        # Index of the last stored header, by task id
+        stored: typing.Dict[str, int] = {}
+        for i, header in enumerate(headers):
+            try:
+                if self._store_header(header):
+                    stored[header.task_id] = i
+            except (KeyError, TypeError, WrongOwnerException) as err:
+                logger.warning("Wrong task header received: {}".format(err))
+                results[i] = False
+
+        indices = list(stored.values())
+        supports = yield self.update_supported_sets(
+            [headers[i] for i in indices])
+
+        for i, support in zip(indices, supports):
+            if support is None:
+                results[i] = False
+                continue
 
-            self.task_headers[task_id] = header
-            self.last_checking[task_id] = datetime.datetime.now()
+            header = headers[i]
+            task_id = header.task_id
+            try:
+                self.check_max_tasks_per_owner(header.task_owner.key)
+
+                if self.task_archiver and task_id in self.task_headers:
+                    self.task_archiver.add_task(header)
+                    self.task_archiver.add_support_status(
+                        task_id, self.support_status[task_id])
+            except (KeyError, TypeError) as err:
+                logger.warning("Wrong task header received: {}".format(err))
+                results[i] = False
+
+        return results
+
+    def _store_header(self, header: dt_tasks.TaskHeader) -> bool:
+        """ Stores a header, unless it's known or the task was removed
+        :return bool: True if the header was stored and its support needs
+                      to be checked, False otherwise
+        """
+        task_id = header.task_id
+        self.check_owner(task_id, header.task_owner.key)
 
-            self._get_tasks_by_owner_set(header.task_owner.key).add(task_id)
+        old_header = self.task_headers.get(task_id)
+        if old_header:
+            if header.signature == old_header.signature:
+                return False  # Nothing changed
 
-            sync_wait(self.update_supported_set(header))
+            if header.timestamp < old_header.timestamp:
+                return False  # We already have a newer version
 
-            self.check_max_tasks_per_owner(header.task_owner.key)
+        if task_id in self.removed_tasks:  # recent
+            logger.debug("Received a task which has been already "
+                         "cancelled/removed/timeout/banned/etc "
+                         "Task id %s .", task_id)
+            return False
 
-            if self.task_archiver and task_id in self.task_headers:
-                self.task_archiver.add_task(header)
-                self.task_archiver.add_support_status(
-                    task_id, self.support_status[task_id])
+        self.task_headers[task_id] = header
+        self.last_checking[task_id] = datetime.datetime.now()
 
-            return True
-        except (KeyError, TypeError, WrongOwnerException) as err:
-            logger.warning("Wrong task header received: {}".format(err))
-            return False
+        self._get_tasks_by_owner_set(header.task_owner.key).add(task_id)
+        self._index_header(header)
+        return True
 
     @inlineCallbacks
     def update_supported_set(self, header: dt_tasks.TaskHeader) -> Deferred:
 
         task_id = header.task_id
         support = yield self.check_support(header)
-        self.support_status[task_id] = support
+        self._update_support(task_id, support)
+
+    @inlineCallbacks
+    def update_supported_sets(
+            self, headers: typing.List[dt_tasks.TaskHeader]) -> Deferred:
+        """ Updates support of a batch of headers. Each environment is
+            checked once for all the headers, which require it with the
+            same prerequisites.
+        :return Deferred: fired with a list of support statuses of the
+                          headers, None where the check has failed
+        """
+        environments: typing.Dict[tuple, dt_tasks.TaskHeader] = {}
+        for header in headers:
+            environments.setdefault(self._environment_key(header), header)
+
+        checked = yield DeferredList(
+            [self.check_environment(header)
+             for header in environments.values()],
+            consumeErrors=True,
+        )
+        checked = dict(zip(environments, checked))
+
+        supports: typing.List[typing.Optional[SupportStatus]] = []
+        for header in headers:
+            success, result = checked[self._environment_key(header)]
+            try:
+                if not success:
+                    result.raiseException()
+                support = self._join_support(header, result)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(
+                    "Support check failed. task_id=%r", header.task_id)
+                supports.append(None)
+                continue
+            self._update_support(header.task_id, support)
+            supports.append(support)
+        return supports
 
-        if not support and task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
-        if support and task_id not in self.supported_tasks:
+    @staticmethod
+    def _environment_key(header: dt_tasks.TaskHeader) -> tuple:
+        return (
+            header.environment,
+            json.dumps(header.environment_prerequisites, sort_keys=True,
+                       default=repr),
+        )
+
+    def _update_support(self, task_id: str, support: SupportStatus) -> None:
+        self._set_support_status(task_id, support)
+
+        if not support:
+            self.supported_tasks.discard(task_id)
+        elif task_id not in self.supported_tasks:
             logger.info(
                 "Adding task %r support=%r",
                 task_id,
                 support
             )
-            self.supported_tasks.append(task_id)
+            self.supported_tasks.add(task_id)
+
+    def _set_support_status(self, task_id: str,
+                            status: typing.Optional[SupportStatus]) -> None:
+        old_status = self.support_status.pop(task_id, None)
+        if old_status is not None:
+            self._unsupport_reasons.subtract(old_status.desc.keys())
+        if status is not None:
+            self.support_status[task_id] = status
+            self._unsupport_reasons.update(status.desc.keys())
+
+    def _index_header(self, header: dt_tasks.TaskHeader) -> None:
+        task_id = header.task_id
+        self._unindex_header(task_id)
+        self._indexed_headers[task_id] = header
+
+        self.tasks_by_env.setdefault(header.environment, set()).add(task_id)
+        self._min_versions[header.min_version] += 1
+        self._max_price_sum += header.max_price or 0
+
+        heapq.heappush(self._deadlines, (header.deadline, task_id))
+        if len(self._deadlines) > 2 * len(self._indexed_headers) + 64:
+            # Drop entries of removed and updated headers
+            self._deadlines = [
+                (h.deadline, t) for t, h in self._indexed_headers.items()]
+            heapq.heapify(self._deadlines)
+
+    def _unindex_header(self, task_id: str) -> None:
+        header = self._indexed_headers.pop(task_id, None)
+        if header is None:
+            return
+
+        env_tasks = self.tasks_by_env.get(header.environment)
+        if env_tasks is not None:
+            env_tasks.discard(task_id)
+            if not env_tasks:
+                del self.tasks_by_env[header.environment]
+        self._min_versions[header.min_version] -= 1
+        if self._min_versions[header.min_version] <= 0:
+            del self._min_versions[header.min_version]
+        self._max_price_sum -= header.max_price or 0
 
     @staticmethod
     def check_owner(task_id: str, owner_id: str) -> None:
@@ -611,27 +893,11 @@ class TaskHeaderKeeper:
         except KeyError:
             pass
 
-        for container in (
-                self.task_headers,
-                self.supported_tasks,
-                self.support_status,
-                self.last_checking
-        ):
-            if isinstance(container, list):
-                try:
-                    container.remove(task_id)
-                except ValueError:
-                    pass
-                continue
-            if isinstance(container, dict):
-                try:
-                    del container[task_id]
-                except KeyError:
-                    pass
-                continue
-            raise RuntimeError(
-                "Unknown container type {}".format(type(container)),
-            )
+        self._unindex_header(task_id)
+        self._set_support_status(task_id, None)
+        self.supported_tasks.discard(task_id)
+        self.task_headers.pop(task_id, None)
+        self.last_checking.pop(task_id, None)
 
         self.removed_tasks[task_id] = time.time()
         return True
@@ -654,29 +920,41 @@ class TaskHeaderKeeper:
         :return: None if there are no tasks that this node may want to compute
         """
         logger.debug("`get_task` called. exclude=%r", exclude)
-        tasks = self.supported_tasks
-        if exclude:
-            tasks = [t for t in tasks if t not in exclude]
-        if not tasks:
+        task_id = self.task_selector.select(
+            self, self.supported_tasks, exclude or set())
+        if task_id is None:
             logger.debug("`get_task`: no potential task candidates found.")
             return None
-        task_id = random.choice(tasks)
         logger.debug("`get_task`: task candidate found. task_id=%r", task_id)
         return self.task_headers[task_id]
 
     def remove_old_tasks(self):
-        for t in list(self.task_headers.values()):
-            cur_time = common.get_timestamp_utc()
-            if cur_time > t.deadline:
-                logger.debug("Task owned by %s removed after deadline, "
-                             "task_id: %s",
-                             t.task_owner.key, t.task_id)
-                self.remove_task_header(t.task_id)
-
-        for task_id, remove_time in list(self.removed_tasks.items()):
-            cur_time = time.time()
-            if cur_time - remove_time > self.removed_task_timeout:
-                del self.removed_tasks[task_id]
+        cur_time = common.get_timestamp_utc()
+        not_removed = []
+        while self._deadlines and cur_time > self._deadlines[0][0]:
+            entry = heapq.heappop(self._deadlines)
+            deadline, task_id = entry
+            t = self._indexed_headers.get(task_id)
+            if t is None or t.deadline != deadline:
+                continue  # Removed or updated since
+            logger.debug("Task owned by %s removed after deadline, "
+                         "task_id: %s",
+                         t.task_owner.key, t.task_id)
+            if not self.remove_task_header(t.task_id):
+                not_removed.append(entry)
+        # Running tasks can not be removed, try again on the next call
+        for entry in not_removed:
+            heapq.heappush(self._deadlines, entry)
+
+        # removed_tasks is ordered by removal time
+        cur_time = time.time()
+        expired = []
+        for task_id, remove_time in self.removed_tasks.items():
+            if cur_time - remove_time <= self.removed_task_timeout:
+                break
+            expired.append(task_id)
+        for task_id in expired:
+            del self.removed_tasks[task_id]
 
     def get_unsupport_reasons(self):
         """
@@ -691,17 +969,12 @@ class TaskHeaderKeeper:
          network.
         """
         c_reasons = Counter({r: 0 for r in UnsupportReason})
-        for st in self.support_status.values():
-            c_reasons.update(st.desc.keys())
-        c_versions = Counter()
-        c_price = 0
-        for th in self.task_headers.values():
-            c_versions[th.min_version] += 1
-            c_price += th.max_price
+        c_reasons.update(+self._unsupport_reasons)
+        c_versions = self._min_versions
         ret = []
         for (reason, count) in c_reasons.most_common():
-            if reason == UnsupportReason.MAX_PRICE and self.task_headers:
-                avg = int(c_price / len(self.task_headers))
+            if reason == UnsupportReason.MAX_PRICE and self._indexed_headers:
+                avg = int(self._max_price_sum / len(self._indexed_headers))
             elif reason == UnsupportReason.APP_VERSION and c_versions:
                 avg = c_versions.most_common(1)[0][0]
             else:
@@ -1,5 +1,6 @@
 # pylint: disable=too-many-lines
 
+import heapq
 import logging
 import os
 import pickle
@@ -50,6 +51,8 @@ from golem.rpc import utils as rpc_utils
 from golem.task.result.resultmanager import EncryptedResultPackageManager
 from golem.task.taskbase import TaskEventListener, Task, \
     TaskPurpose, AcceptClientVerdict, TaskResult
+from golem.task.taskjournal import JOURNAL_SUFFIX, JOURNAL_TMP_SUFFIX, \
+    TaskJournal
 from golem.task.taskkeeper import CompTaskKeeper, compute_subtask_value
 from golem.task.taskrequestorstats import RequestorTaskStatsManager
 from golem.task.taskstate import TaskState, TaskStatus, SubtaskStatus, \
@@ -128,11 +131,19 @@ class TaskManager(TaskEventListener):
         self.tasks: Dict[str, Task] = {}
         self.tasks_states: Dict[str, TaskState] = {}
         self.subtask2task_mapping: Dict[str, str] = {}
+        # Heap of (deadline, kind, task_id, subtask_id) checked by
+        # check_timeouts. Kind orders subtasks (0) before their task (1).
+        # Entries of finished or removed (sub)tasks are dropped when popped.
+        self._deadlines: List[Tuple[float, int, str, str]] = []
+        # Deadline of the live heap entry by (task_id, subtask_id), the
+        # entries scheduled before it are skipped when popped
+        self._scheduled_deadlines: Dict[Tuple[str, str], float] = {}
 
         tasks_dir = Path(tasks_dir)
         self.tasks_dir = tasks_dir / "tmanager"
         if not self.tasks_dir.is_dir():
             self.tasks_dir.mkdir(parents=True)
+        self.journal = TaskJournal(self.tasks_dir)
         self.root_path = root_path
         self.dir_manager = DirManager(self.get_task_manager_root())
 
@@ -230,6 +241,7 @@ class TaskManager(TaskEventListener):
 
         logger.info("Task %s added", task_id)
 
+        self._schedule_deadline(task.header.deadline, task_id)
         self._create_task_output_dir(task.task_definition)
 
         self.notice_task_updated(task_id,
@@ -275,20 +287,25 @@ class TaskManager(TaskEventListener):
                                .format(task_id))
 
         task_state.status = TaskStatus.waiting
+        # Deadlines of tasks which are not active are not watched
+        self._schedule_deadline(self.tasks[task_id].header.deadline, task_id)
         self.notice_task_updated(task_id, op=TaskOp.STARTED)
         logger.info("Task %s started", task_id)
 
     def _dump_filepath(self, task_id):
-        return self.tasks_dir / ('%s.pickle' % (task_id,))
+        return self.journal.path(task_id)
 
-    def dump_task(self, task_id: str) -> None:
+    def dump_task(self, task_id: str,
+                  subtask_id: Optional[str] = None) -> None:
+        """ Append changes of the task to its journal
+        :param subtask_id: the subtask the changes are related to
+        """
         logger.debug('DUMP TASK %r', task_id)
         filepath = self._dump_filepath(task_id)
         try:
-            data = self.tasks[task_id], self.tasks_states[task_id]
             logger.debug('DUMPING TASK %r', filepath)
-            with filepath.open('wb') as f:
-                pickle.dump(data, f, protocol=2)
+            self.journal.write(task_id, self.tasks[task_id],
+                               self.tasks_states[task_id], subtask_id)
             logger.debug('TASK %s DUMPED in %r', task_id, filepath)
         except Exception:  # pylint: disable=broad-except
             logger.exception(
@@ -303,7 +320,7 @@ class TaskManager(TaskEventListener):
     def remove_dump(self, task_id: str):
         filepath = self._dump_filepath(task_id)
         try:
-            filepath.unlink()
+            self.journal.remove(task_id)
             logger.debug('TASK DUMP with id %s REMOVED from %r',
                          task_id, filepath)
         except (FileNotFoundError, OSError) as e:
@@ -344,48 +361,76 @@ class TaskManager(TaskEventListener):
 
         return Path(task_def.output_file).resolve().parent
 
+    def _load_dump(self, path: Path) -> 'Tuple[Task, TaskState]':
+        if path.suffix == JOURNAL_SUFFIX:
+            return self.journal.read(path)
+        # Written by an older version
+        with path.open('rb') as f:
+            return pickle.load(f)
+
     def restore_tasks(self) -> None:
         logger.debug('SEARCHING FOR TASKS TO RESTORE')
-        broken_paths = set()
+        paths_to_remove = set()
         for path in self.tasks_dir.iterdir():
-            if not path.suffix == '.pickle':
+            if path.name.endswith(JOURNAL_TMP_SUFFIX):
+                # Left by an interrupted compaction, the journal is intact
+                paths_to_remove.add(path)
+                continue
+            if path.suffix not in ('.pickle', JOURNAL_SUFFIX):
+                continue
+            if path.suffix == '.pickle' \
+                    and path.with_suffix(JOURNAL_SUFFIX).exists():
+                # Already converted to a journal
+                paths_to_remove.add(path)
                 continue
             logger.debug('RESTORE TASKS %r', path)
 
             task_id = None
-            with path.open('rb') as f:
-                try:
-                    task: Task
-                    state: TaskState
-                    task, state = pickle.load(f)
-                except Exception:  # pylint: disable=broad-except
-                    logger.exception('Problem restoring task from: %s', path)
-                    # On Windows, attempting to remove a file that is in use
-                    # causes an exception to be raised, therefore
-                    # we'll remove broken files later
-                    broken_paths.add(path)
-                else:
-                    task.register_listener(self)
-
-                    task_id = task.header.task_id
-                    self.tasks[task_id] = task
-                    self.tasks_states[task_id] = state
-
-                    for sub in state.subtask_states.values():
-                        self.subtask2task_mapping[sub.subtask_id] = task_id
-
-                    logger.debug('TASK %s RESTORED from %r', task_id, path)
+            try:
+                task: Task
+                state: TaskState
+                task, state = self._load_dump(path)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Problem restoring task from: %s', path)
+                # On Windows, attempting to remove a file that is in use
+                # causes an exception to be raised, therefore
+                # we'll remove broken files later
+                paths_to_remove.add(path)
+            else:
+                task.register_listener(self)
+
+                task_id = task.header.task_id
+                self.tasks[task_id] = task
+                self.tasks_states[task_id] = state
+
+                self._schedule_deadline(task.header.deadline, task_id)
+                for sub in state.subtask_states.values():
+                    self.subtask2task_mapping[sub.subtask_id] = task_id
+                    if sub.status.is_computed():
+                        self._schedule_deadline(
+                            sub.deadline, task_id, sub.subtask_id)
+
+                logger.debug('TASK %s RESTORED from %r', task_id, path)
+
+                if path.suffix == '.pickle':
+                    try:
+                        self.dump_task(task_id)
+                    except Exception:  # pylint: disable=broad-except
+                        pass  # Logged already, keep restoring from pickle
+                    else:
+                        paths_to_remove.add(path)
 
             if task_id is not None:
                 self.notice_task_updated(task_id, op=TaskOp.RESTORED,
                                          persist=False)
 
-        for path in broken_paths:
+        for path in paths_to_remove:
             path.unlink()
 
     @handle_task_key_error
     def resources_send(self, task_id):
         self.tasks_states[task_id].status = TaskStatus.waiting
+        self._schedule_deadline(self.tasks[task_id].header.deadline, task_id)
         self.notice_task_updated(task_id)
         logger.info("Resources for task sent. id=%s", task_id)
 
@@ -897,36 +942,74 @@ class TaskManager(TaskEventListener):
             subtask_id=subtask_id,
             op=SubtaskOp.RESULT_DOWNLOADING)
 
+    def _schedule_deadline(self, deadline: float, task_id: str,
+                           subtask_id: Optional[str] = None) -> None:
+        """ Make check_timeouts look at the task (or subtask) once its
+            deadline passes """
+        key = (task_id, subtask_id or '')
+        if self._scheduled_deadlines.get(key) == deadline:
+            return
+        self._scheduled_deadlines[key] = deadline
+        heapq.heappush(
+            self._deadlines,
+            (deadline, 0 if subtask_id else 1, task_id, subtask_id or ''),
+        )
+
     # CHANGE TO RETURN KEY_ID (check IF SUBTASK COMPUTER HAS KEY_ID
     def check_timeouts(self):
         nodes_with_timeouts = []
-        for t in list(self.tasks.values()):
-            th = t.header
-            if not self.tasks_states[th.task_id].status.is_active():
+        cur_time = int(get_timestamp_utc())
+
+        expired: Dict[str, List[Tuple[float, int, str, str]]] = {}
+        while self._deadlines and cur_time > self._deadlines[0][0]:
+            entry = heapq.heappop(self._deadlines)
+            deadline, _, task_id, subtask_id = entry
+            if self._scheduled_deadlines.get((task_id, subtask_id)) \
+                    != deadline:
+                continue  # Scheduled again since
+            del self._scheduled_deadlines[(task_id, subtask_id)]
+            expired.setdefault(task_id, []).append(entry)
+
+        for task_id, entries in expired.items():
+            t = self.tasks.get(task_id)
+            ts = self.tasks_states.get(task_id)
+            if t is None or ts is None:
                 continue
-            cur_time = int(get_timestamp_utc())
+            if not ts.status.is_active():
+                # The deadline is scheduled again if the task is started
+                continue
+            th = t.header
             # Check subtask timeout
-            ts = self.tasks_states[th.task_id]
-            for s in list(ts.subtask_states.values()):
-                if s.status.is_computed():
-                    if cur_time > s.deadline:
-                        logger.info("Subtask %r dies with status %r",
-                                    s.subtask_id,
-                                    s.status.value)
-                        s.status = SubtaskStatus.failure
-                        nodes_with_timeouts.append(s.node_id)
-                        t.computation_failed(s.subtask_id)
-                        s.stderr = "[GOLEM] Timeout"
-                        self.notice_task_updated(th.task_id,
-                                                 subtask_id=s.subtask_id,
-                                                 op=SubtaskOp.TIMEOUT)
+            for _, kind, _, subtask_id in entries:
+                if kind != 0:
+                    continue
+                s = ts.subtask_states.get(subtask_id)
+                if s is None or not s.status.is_computed():
+                    continue
+                if cur_time > s.deadline:
+                    logger.info("Subtask %r dies with status %r",
+                                s.subtask_id,
+                                s.status.value)
+                    s.status = SubtaskStatus.failure
+                    nodes_with_timeouts.append(s.node_id)
+                    t.computation_failed(s.subtask_id)
+                    s.stderr = "[GOLEM] Timeout"
+                    self.notice_task_updated(th.task_id,
+                                             subtask_id=s.subtask_id,
+                                             op=SubtaskOp.TIMEOUT)
             # Check task timeout
+            if not any(kind == 1 for _, kind, _, _ in entries):
+                continue
             if cur_time > th.deadline:
                 logger.info("Task %r dies", th.task_id)
                 self.tasks_states[th.task_id].status = TaskStatus.timeout
                 # TODO: t.tell_it_has_timeout()?
                 self.notice_task_updated(th.task_id, op=TaskOp.TIMEOUT)
                 self._try_remove_task_output_dir(t.task_definition)
+            else:
+                # The deadline has been moved
+                self._schedule_deadline(th.deadline, task_id)
+
         return nodes_with_timeouts
 
     def get_progresses(self):
@@ -989,6 +1072,8 @@ class TaskManager(TaskEventListener):
         subtask_state = task_state.subtask_states[subtask_id]
         subtask_state.status = new_status
         subtask_state.stderr = f"[GOLEM] {new_status.value}"
+        # The task could have been completed before, watch its deadline again
+        self._schedule_deadline(self.tasks[task_id].header.deadline, task_id)
 
         self.notice_task_updated(task_id,
                                  subtask_id=subtask_id,
@@ -1176,6 +1261,7 @@ class TaskManager(TaskEventListener):
 
         self.tasks_states[ctd['task_id']].\
             subtask_states[ctd['subtask_id']] = ss
+        self._schedule_deadline(ss.deadline, ctd['task_id'], ss.subtask_id)
 
     def notify_update_task(self, task_id):
         self.notice_task_updated(task_id)
@@ -1217,7 +1303,7 @@ class TaskManager(TaskEventListener):
         )
 
         if persist:
-            self.dump_task(task_id)
+            self.dump_task(task_id, subtask_id)
 
         task_state = self.tasks_states.get(task_id)
         dispatcher.send(
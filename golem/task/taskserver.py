@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import functools
+import hashlib
 import itertools
 import logging
 import os
@@ -28,6 +29,7 @@ from pydispatch import dispatcher
 from twisted.internet import defer
 from twisted.internet.defer import inlineCallbacks, Deferred, \
     TimeoutError as DeferredTimeoutError
+from twisted.internet.threads import deferToThread
 
 from apps.appsmanager import AppsManager
 from apps.core.task.coretask import CoreTask
@@ -36,6 +38,7 @@ from golem import app_manager
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.common import short_node_id
 from golem.core.deferred import sync_wait, deferred_from_future
+from golem.core.ordereddict import SizedOrderedDict
 from golem.core.variables import MAX_CONNECT_SOCKET_ADDRESSES
 from golem.environments.environment import (
     Environment as OldEnv,
@@ -101,6 +104,10 @@ logger = logging.getLogger(__name__)
 
 tmp_cycler = itertools.cycle(list(range(550)))
 
+# Number of received task headers with verified signatures to remember, so
+# that duplicates gossiped by other peers are not verified again
+VERIFIED_HEADERS_LIMIT = 1000
+
 
 class TaskServer(
         PendingConnectionsServer,
@@ -232,6 +239,14 @@ class TaskServer(
         self.resource_handshakes = {}
         self.requested_tasks: Set[str] = set()
         self._last_task_request_time: float = time.time()
+        # Signed headers of started requested tasks, by task id, along with
+        # the header fields they were signed with
+        self._signed_headers: \
+            Dict[str, Tuple[tuple, dt_tasks.TaskHeader]] = {}
+        # Fields of received headers with verified signatures, by task id and
+        # signature digest, least recently received first
+        self._verified_headers: SizedOrderedDict = \
+            SizedOrderedDict(VERIFIED_HEADERS_LIMIT)
 
         network = TCPNetwork(
             ProtocolFactory(SafeProtocol, self, SessionFactory(TaskSession)),
@@ -339,12 +354,14 @@ class TaskServer(
                 < self.config_desc.task_request_interval:
             return
 
-        if self.task_computer.has_assigned_task() \
+        if not self.task_computer.has_free_slot() \
                 or (not self.task_computer.compute_tasks) \
                 or (not self.task_computer.runnable):
             return
 
-        task_header = self.task_keeper.get_task(self.requested_tasks)
+        # A single subtask of a task is computed at a time
+        task_header = self.task_keeper.get_task(
+            self.requested_tasks.union(self.task_computer.assigned_task_ids))
         if task_header is None:
             return
 
@@ -483,7 +500,10 @@ class TaskServer(
             self,
             msg: message.tasks.TaskToCompute,
     ) -> bool:
-        if self.task_computer.has_assigned_task():
+        if not self.task_computer.has_free_slot():
+            logger.error("Trying to assign a task, when no slot is free")
+            return False
+        if msg.task_id in self.task_computer.assigned_task_ids:
             logger.error("Trying to assign a task, when it's already assigned")
             return False
 
@@ -493,7 +513,7 @@ class TaskServer(
             for resource_id in msg.compute_task_def['resources']:
                 deferreds.append(self.new_resource_manager.download(
                     resource_id,
-                    self.task_computer.get_subtask_inputs_dir(),
+                    self.task_computer.get_subtask_inputs_dir(msg.task_id),
                     msg.resources_options,
                 ))
             defer.gatherResults(deferreds, consumeErrors=True)\
@@ -518,20 +538,20 @@ class TaskServer(
         return True
 
     def resource_collected(self, task_id: str) -> bool:
-        if self.task_computer.assigned_task_id != task_id:
+        if task_id not in self.task_computer.assigned_task_ids:
             logger.error("Resource collected for a wrong task, %s", task_id)
             return False
 
-        self.task_computer.start_computation()
+        self.task_computer.start_computation(task_id)
         return True
 
     def resource_failure(self, task_id: str, reason: str) -> None:
-        if self.task_computer.assigned_task_id != task_id:
+        if task_id not in self.task_computer.assigned_task_ids:
             logger.error("Resource failure for a wrong task, %s", task_id)
             return
 
-        subtask_id = self.task_computer.assigned_subtask_id
-        self.task_computer.task_interrupted()
+        subtask_id = self.task_computer.get_assigned_subtask_id(task_id)
+        self.task_computer.task_interrupted(task_id)
         self.send_task_failed(
             subtask_id,
             task_id,
@@ -646,15 +666,17 @@ class TaskServer(
         return old_headers + new_headers
 
     def _get_and_sign_headers(self):
+        """ Headers are only signed again once their fields change, which
+            includes the address of this node. Others are served from cache.
+        """
         started_tasks = self.requested_task_manager.get_started_tasks()
-        signed_headers = []
+        signed_headers = {}
         for db_task in started_tasks:
-            task_header = dt_tasks.TaskHeader(
+            fields = dict(
                 min_version=str(gconst.GOLEM_MIN_VERSION),
                 task_id=db_task.task_id,
                 environment=db_task.env_id,
                 environment_prerequisites=db_task.prerequisites,
-                task_owner=self.node,
                 deadline=int(db_task.deadline.timestamp()),
                 subtask_timeout=db_task.subtask_timeout,
                 subtasks_count=db_task.max_subtasks,
@@ -663,23 +685,102 @@ class TaskServer(
                 concent_enabled=db_task.concent_enabled,
                 timestamp=int(db_task.start_time.timestamp()),
             )
+            # The node is updated in place, so its fields are compared
+            version = (fields, self.node.to_dict())
+            cached = self._signed_headers.get(db_task.task_id)
+            if cached is not None and cached[0] == version:
+                signed_headers[db_task.task_id] = cached
+                continue
+
+            task_header = dt_tasks.TaskHeader(task_owner=self.node, **fields)
             task_header.sign(private_key=self.keys_auth._private_key)
-            signed_headers.append(task_header)
+            signed_headers[db_task.task_id] = (version, task_header)
 
-        return signed_headers
+        # Headers of tasks which are no longer started are dropped
+        self._signed_headers = signed_headers
+        return [task_header for _, task_header in signed_headers.values()]
 
     def get_others_tasks_headers(self) -> List[dt_tasks.TaskHeader]:
         return self.task_keeper.get_all_tasks()
 
     def add_task_header(self, task_header: dt_tasks.TaskHeader) -> bool:
         if not self._verify_header_sig(task_header):
-            logger.info(
-                'Invalid signature. task_id=%r, signature=%r',
-                task_header.task_id,
-                task_header.signature,
-            )
-            logger.debug("task_header=%r", task_header)
+            self._log_invalid_header_sig(task_header)
             return False
+        if not self._check_task_header(task_header):
+            return False
+
+        try:
+            if self._is_own_task_header(task_header):
+                return True  # Own tasks are not added to task keeper
+
+            return self.task_keeper.add_task_header(task_header)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Task header validation failed")
+        return False
+
+    @inlineCallbacks
+    def add_task_headers(
+            self,
+            task_headers: List[dt_tasks.TaskHeader],
+    ) -> Deferred:
+        """ Adds a batch of received task headers, as add_task_header does.
+            Signatures verified before, of headers with the same fields, are
+            not verified again. The others are verified in threads.
+        :return Deferred: fired with a list of add_task_header results,
+                          in the order of task_headers
+        """
+        results = [False] * len(task_headers)
+        unverified = []
+        for i, task_header in enumerate(task_headers):
+            key = self._verified_header_key(task_header)
+            if key in self._verified_headers \
+                    and self._verified_headers[key] == task_header.to_dict():
+                self._verified_headers.move_to_end(key)
+                results[i] = True
+            else:
+                unverified.append(i)
+
+        verified = yield defer.DeferredList(
+            [deferToThread(self._verify_header_sig, task_headers[i])
+             for i in unverified],
+            consumeErrors=True,
+        )
+        for i, (success, valid) in zip(unverified, verified):
+            task_header = task_headers[i]
+            if not (success and valid):
+                self._log_invalid_header_sig(task_header)
+                continue
+            key = self._verified_header_key(task_header)
+            self._verified_headers.pop(key, None)
+            self._verified_headers[key] = task_header.to_dict()
+            results[i] = True
+
+        to_add = []
+        for i, task_header in enumerate(task_headers):
+            if not results[i]:
+                continue
+            try:
+                if not self._check_task_header(task_header):
+                    results[i] = False
+                elif not self._is_own_task_header(task_header):
+                    to_add.append(i)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Task header validation failed")
+                results[i] = False
+
+        try:
+            added = yield self.task_keeper.add_task_headers(
+                [task_headers[i] for i in to_add])
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Task header validation failed")
+            added = [False] * len(to_add)
+        for i, result in zip(to_add, added):
+            results[i] = result
+        return results
+
+    def _check_task_header(self, task_header: dt_tasks.TaskHeader) -> bool:
+        """ Checks the deadline of a header with a valid signature """
         if task_header.deadline < time.time():
             logger.info(
                 "Task's deadline already in the past. task_id=%r",
@@ -691,16 +792,27 @@ class TaskServer(
         if task_header.environment_prerequisites:
             image_name = task_header.environment_prerequisites['image']
             self._docker_image_discovered(image_name)
+        return True
 
-        try:
-            if self.task_manager.is_my_task(task_header.task_id) or \
-                    task_header.task_owner.key == self.node.key:
-                return True  # Own tasks are not added to task keeper
+    def _is_own_task_header(self, task_header: dt_tasks.TaskHeader) -> bool:
+        return self.task_manager.is_my_task(task_header.task_id) or \
+            task_header.task_owner.key == self.node.key
 
-            return self.task_keeper.add_task_header(task_header)
-        except Exception:  # pylint: disable=broad-except
-            logger.exception("Task header validation failed")
-        return False
+    @staticmethod
+    def _verified_header_key(task_header: dt_tasks.TaskHeader) -> tuple:
+        return (
+            task_header.task_id,
+            hashlib.sha256(task_header.signature or b'').digest(),
+        )
+
+    @staticmethod
+    def _log_invalid_header_sig(task_header: dt_tasks.TaskHeader) -> None:
+        logger.info(
+            'Invalid signature. task_id=%r, signature=%r',
+            task_header.task_id,
+            task_header.signature,
+        )
+        logger.debug("task_header=%r", task_header)
 
     @classmethod
     def _verify_header_sig(cls, header: dt_tasks.TaskHeader):
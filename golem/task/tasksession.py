@@ -566,7 +566,8 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
 
         reasons = message.tasks.CannotComputeTask.REASON
 
-        if self.task_computer.has_assigned_task():
+        if not self.task_computer.has_free_slot() \
+                or msg.task_id in self.task_computer.assigned_task_ids:
             _cannot_compute(reasons.OfferCancelled)
             return
 
@@ -10,6 +10,9 @@ from golem_messages import validators
 class TaskState:
     # pylint: disable=too-many-instance-attributes
 
+    # Dictionaries keyed by subtask id, persisted entry by entry
+    PER_SUBTASK_ATTRS = ('subtask_states',)
+
     def __init__(self, task=None) -> None:
         self.status = TaskStatus.creating
         self.status_message: Optional[str] = None
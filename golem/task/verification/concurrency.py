@@ -0,0 +1,70 @@
+import time
+from typing import Optional
+
+import psutil
+
+# Verifications queued this many seconds later are preferred over the ones of
+# a task which has another verification running. Waiting items age, so they
+# are processed eventually regardless of the number of tasks.
+TASK_FAIRNESS_PENALTY: float = 60.
+
+
+class AdaptiveConcurrency:
+    """ Decides whether another verification may start, given the number of
+        running ones. Up to `max_workers` verifications run at once, as long
+        as there is enough free CPU and memory for another one. At least
+        `min_workers` run regardless of the load.
+
+        CPU and memory usage is sampled at most every `SAMPLE_INTERVAL`
+        seconds. Verifications started since the last sample are assumed to
+        use `cpu_per_worker` cores and `memory_per_worker` bytes each.
+    """
+
+    CPU_PER_WORKER: float = 1.
+    MEMORY_PER_WORKER: int = 512 * 2 ** 20  # B
+    SAMPLE_INTERVAL: float = 1.  # s
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            min_workers: int = 1,
+            cpu_per_worker: Optional[float] = None,
+            memory_per_worker: Optional[int] = None,
+    ) -> None:
+        self.max_workers = max_workers or psutil.cpu_count() or 1
+        self.min_workers = min(min_workers, self.max_workers)
+        self.cpu_per_worker = cpu_per_worker or self.CPU_PER_WORKER
+        self.memory_per_worker = memory_per_worker or self.MEMORY_PER_WORKER
+
+        self._sampled_at: Optional[float] = None
+        self._idle_cpus = 0.
+        self._available_memory = 0
+        self._running_at_sample = 0
+        # Starts measuring CPU usage, which is sampled since the previous call
+        psutil.cpu_percent(interval=None)
+
+    def can_start(self, running: int) -> bool:
+        if running < self.min_workers:
+            return True
+        if running >= self.max_workers:
+            return False
+
+        self._sample(running)
+        started = max(0, running - self._running_at_sample)
+        idle_cpus = self._idle_cpus - started * self.cpu_per_worker
+        available_memory = \
+            self._available_memory - started * self.memory_per_worker
+        return idle_cpus >= self.cpu_per_worker \
+            and available_memory >= self.memory_per_worker
+
+    def _sample(self, running: int) -> None:
+        now = time.monotonic()
+        if self._sampled_at is not None \
+                and now - self._sampled_at < self.SAMPLE_INTERVAL:
+            return
+
+        cpu_load = psutil.cpu_percent(interval=None) / 100.
+        self._idle_cpus = (1. - cpu_load) * (psutil.cpu_count() or 1)
+        self._available_memory = psutil.virtual_memory().available
+        self._running_at_sample = running
+        self._sampled_at = now
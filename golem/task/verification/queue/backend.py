@@ -1,12 +1,15 @@
+import heapq
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from peewee import IntegrityError
+from peewee import IntegrityError, fn
+from playhouse.shortcuts import case
 
 from golem.model import QueuedVerification, db
 from golem.task import SubtaskId, TaskId
 
 PriorityFn = Callable[[], int]
+QueueKey = Tuple[TaskId, SubtaskId]
 
 
 class QueueBackend(ABC):
@@ -23,7 +26,10 @@ class QueueBackend(ABC):
     @abstractmethod
     def get(
             self,
+            task_penalties: Optional[Dict[TaskId, int]] = None,
     ) -> Optional[Tuple[TaskId, SubtaskId]]:
+        """ Pop the item with the lowest priority, after increasing the
+            priorities of task's items by its penalty """
         raise NotImplementedError
 
     @abstractmethod
@@ -33,6 +39,9 @@ class QueueBackend(ABC):
     ) -> None:
         raise NotImplementedError
 
+    def flush(self) -> None:
+        """ Persist the changes which are not stored yet """
+
 
 class DatabaseQueueBackend(QueueBackend):
 
@@ -55,11 +64,20 @@ class DatabaseQueueBackend(QueueBackend):
 
     def get(
             self,
+            task_penalties: Optional[Dict[TaskId, int]] = None,
     ) -> Optional[Tuple[TaskId, SubtaskId]]:
         with db.transaction():
+            query = QueuedVerification.select() \
+                .where(QueuedVerification.priority.is_null(False))
+
+            if task_penalties:
+                task_id = self._get_task_id(task_penalties)
+                if task_id is None:
+                    return None
+                query = query.where(QueuedVerification.task_id == task_id)
+
             try:
-                queued = QueuedVerification.select() \
-                    .where(QueuedVerification.priority.is_null(False)) \
+                queued = query \
                     .order_by(+QueuedVerification.priority) \
                     .limit(1) \
                     .execute()
@@ -70,6 +88,25 @@ class DatabaseQueueBackend(QueueBackend):
 
         return queued.task_id, queued.subtask_id
 
+    @staticmethod
+    def _get_task_id(
+            task_penalties: Dict[TaskId, int],
+    ) -> Optional[TaskId]:
+        """ Task of the item to get next, after applying penalties """
+        heads = QueuedVerification \
+            .select(QueuedVerification.task_id,
+                    fn.MIN(QueuedVerification.priority).alias('head')) \
+            .where(QueuedVerification.priority.is_null(False)) \
+            .group_by(QueuedVerification.task_id) \
+            .tuples() \
+            .execute()
+
+        best = min(
+            heads,
+            key=lambda head: head[1] + task_penalties.get(head[0], 0),
+            default=None)
+        return best[0] if best else None
+
     def update_not_prioritized(
             self,
             priority_fn: PriorityFn,
@@ -82,4 +119,174 @@ class DatabaseQueueBackend(QueueBackend):
 
             for result in results:
                 result.priority = priority_fn()
-                result.save()
\ No newline at end of file
+                result.save()
+
+
+class BatchedDatabaseQueueBackend(QueueBackend):
+    """ Keeps the queue in memory and stores it in the database in batches.
+
+        The queue is loaded from the database on first use. New items are
+        stored right away, together with the pending changes. Dequeued items
+        are deleted in bulk, once `batch_size` of them are collected or on
+        `flush`. Assigned priorities are stored in a single update per task.
+
+        After a crash the queue is recovered with every item which was not
+        dequeued and with its priority. Items dequeued since the last flush
+        are returned to the queue, so they have to be flushed before their
+        verification starts.
+    """
+
+    BATCH_SIZE: int = 100
+    # Items per query, below SQLite's limit of host parameters
+    QUERY_SIZE: int = 250
+
+    QueuedItem = QueuedVerification
+
+    def __init__(self, batch_size: Optional[int] = None) -> None:
+        self._batch_size = batch_size or self.BATCH_SIZE
+        self._loaded = False
+        # Every queued item
+        self._items: Set[QueueKey] = set()
+        # Items with a priority, in a heap of (priority, subtask_id) per task
+        self._heaps: Dict[TaskId, List[Tuple[int, SubtaskId]]] = dict()
+        # Items without a priority, in order of creation
+        self._not_prioritized: Dict[QueueKey, None] = dict()
+        # Dequeued items which are still stored
+        self._dequeued: List[QueueKey] = []
+        # Assigned priorities which are not stored yet
+        self._prioritized: Dict[QueueKey, int] = dict()
+
+    def put(
+            self,
+            task_id: TaskId,
+            subtask_id: SubtaskId,
+            priority: Optional[int],
+    ) -> bool:
+        self._load()
+        key = (task_id, subtask_id)
+        if key in self._items:
+            return False
+
+        try:
+            with db.transaction():
+                self._store()
+                QueuedVerification.create(
+                    task_id=task_id,
+                    subtask_id=subtask_id,
+                    priority=priority)
+        except IntegrityError:
+            return False
+
+        self._stored()
+        self._add(task_id, subtask_id, priority)
+        return True
+
+    def get(
+            self,
+            task_penalties: Optional[Dict[TaskId, int]] = None,
+    ) -> Optional[Tuple[TaskId, SubtaskId]]:
+        self._load()
+        if not self._heaps:
+            return None
+
+        penalties = task_penalties or dict()
+        task_id = min(
+            self._heaps,
+            key=lambda task: self._heaps[task][0][0] + penalties.get(task, 0))
+
+        heap = self._heaps[task_id]
+        _, subtask_id = heapq.heappop(heap)
+        if not heap:
+            del self._heaps[task_id]
+
+        key = (task_id, subtask_id)
+        self._items.discard(key)
+        self._dequeued.append(key)
+        if len(self._dequeued) >= self._batch_size:
+            self.flush()
+        return key
+
+    def update_not_prioritized(
+            self,
+            priority_fn: PriorityFn,
+    ) -> None:
+        self._load()
+        if not self._not_prioritized:
+            return
+
+        for task_id, subtask_id in self._not_prioritized:
+            priority = priority_fn()
+            self._prioritized[(task_id, subtask_id)] = priority
+            self._add(task_id, subtask_id, priority)
+        self._not_prioritized = dict()
+        self.flush()
+
+    def flush(self) -> None:
+        if not (self._dequeued or self._prioritized):
+            return
+        with db.transaction():
+            self._store()
+        self._stored()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        queued = QueuedVerification \
+            .select(QueuedVerification.task_id,
+                    QueuedVerification.subtask_id,
+                    QueuedVerification.priority) \
+            .order_by(+QueuedVerification.created_date) \
+            .tuples() \
+            .execute()
+
+        for task_id, subtask_id, priority in queued:
+            self._add(task_id, subtask_id, priority)
+        self._loaded = True
+
+    def _add(
+            self,
+            task_id: TaskId,
+            subtask_id: SubtaskId,
+            priority: Optional[int],
+    ) -> None:
+        self._items.add((task_id, subtask_id))
+        if priority is None:
+            self._not_prioritized[(task_id, subtask_id)] = None
+        else:
+            heapq.heappush(self._heaps.setdefault(task_id, []),
+                           (priority, subtask_id))
+
+    def _store(self) -> None:
+        """ Store pending changes. Needs to be called in a transaction """
+        deleted: Dict[TaskId, List[SubtaskId]] = dict()
+        for task_id, subtask_id in self._dequeued:
+            deleted.setdefault(task_id, []).append(subtask_id)
+
+        for task_id, subtask_ids in deleted.items():
+            for i in range(0, len(subtask_ids), self.QUERY_SIZE):
+                chunk = subtask_ids[i:i + self.QUERY_SIZE]
+                QueuedVerification.delete() \
+                    .where(QueuedVerification.task_id == task_id,
+                           QueuedVerification.subtask_id.in_(chunk)) \
+                    .execute()
+
+        prioritized: Dict[TaskId, List[Tuple[SubtaskId, int]]] = dict()
+        for (task_id, subtask_id), priority in self._prioritized.items():
+            prioritized.setdefault(task_id, []).append((subtask_id, priority))
+
+        for task_id, priorities in prioritized.items():
+            for i in range(0, len(priorities), self.QUERY_SIZE):
+                chunk = priorities[i:i + self.QUERY_SIZE]
+                priority = case(QueuedVerification.subtask_id, chunk)
+                QueuedVerification \
+                    .update(priority=priority) \
+                    .where(QueuedVerification.task_id == task_id,
+                           QueuedVerification.subtask_id.in_(
+                               [subtask_id for subtask_id, _ in chunk])) \
+                    .execute()
+
+    def _stored(self) -> None:
+        """ Forget pending changes, once their transaction is committed """
+        self._dequeued = []
+        self._prioritized = dict()
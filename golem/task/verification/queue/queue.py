@@ -7,8 +7,10 @@ from golem_task_api.enums import VerifyResult
 
 from golem.core.common import get_timestamp_utc
 from golem.task import SubtaskId, TaskId
+from golem.task.verification.concurrency import AdaptiveConcurrency, \
+    TASK_FAIRNESS_PENALTY
 from golem.task.verification.queue.backend import QueueBackend, \
-    DatabaseQueueBackend
+    BatchedDatabaseQueueBackend
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,10 @@ def _next_priority() -> int:
     return int(get_timestamp_utc() * 10 ** 6)
 
 
+# Priorities are timestamps in microseconds
+_TASK_PENALTY = int(TASK_FAIRNESS_PENALTY * 10 ** 6)
+
+
 class VerificationQueue:
     """ Asynchronous verification queue for subtask results.
 
@@ -30,6 +36,11 @@ class VerificationQueue:
         are assigned a valid priority to re-schedule their processing.
 
         These prevent never ending loops caused by re-enqueuing.
+
+        Items are verified concurrently, as many at once as `concurrency`
+        allows. Each running verification of a task delays its other items
+        by TASK_FAIRNESS_PENALTY, so that tasks with many results don't
+        starve the others.
     """
 
     DEFAULT_TIMEOUT: float = 1800.
@@ -39,17 +50,21 @@ class VerificationQueue:
             verify_fn: VerifyFn,
             verify_timeout: float = DEFAULT_TIMEOUT,
             backend: Optional[QueueBackend] = None,
+            concurrency: Optional[AdaptiveConcurrency] = None,
     ) -> None:
         # Provided verification function
         self._verify_fn = verify_fn
         # Verification call timeout
         self._verify_timeout = verify_timeout
-        # Pending verification lock
-        self._verify_lock = asyncio.Lock()
         # Queue to store requested verifications in
-        self._queue = backend or DatabaseQueueBackend()
+        self._queue = backend or BatchedDatabaseQueueBackend()
+        # Decides whether another verification may run
+        self._concurrency = concurrency or AdaptiveConcurrency()
         # In-memory store for pending calls
         self._pending: Dict[Tuple[TaskId, SubtaskId], asyncio.Future] = dict()
+        # Running verifications
+        self._running: Dict[Tuple[TaskId, SubtaskId], asyncio.Future] = \
+            dict()
         # Tells whether the queue processing is running
         self._processing = False
         # Tells whether queue processing was paused by the user
@@ -57,9 +72,10 @@ class VerificationQueue:
 
     async def pause(self):
         """ Pause processing the queue.
-            Wait for the pending verification to finish """
-        async with self._verify_lock:
-            self._paused = True
+            Wait for the pending verifications to finish """
+        self._paused = True
+        if self._running:
+            await asyncio.wait(list(self._running.values()))
 
     async def resume(self):
         """ Resume processing the queue """
@@ -85,7 +101,7 @@ class VerificationQueue:
         return self._pending[(task_id, subtask_id)]
 
     async def process(self):
-        """ Process queued items one-by-one, ordered by their priority.
+        """ Process queued items, ordered by their priority.
             Skip items with priority equal to None """
         if self._processing:
             return
@@ -96,19 +112,42 @@ class VerificationQueue:
             self._processing = False
 
     async def _process(self):
-        if self._paused:
-            return
-
-        async with self._verify_lock:
-            queued = self._queue.get()
-            if not queued:
+        while True:
+            while not self._paused \
+                    and self._concurrency.can_start(len(self._running)):
+                queued = self._queue.get(self._task_penalties())
+                if not queued:
+                    break
+                self._running[queued] = asyncio.ensure_future(
+                    self._verify_and_reschedule(*queued))
+
+            # Started items are removed from the database before their
+            # verification runs, so that none is verified again after a crash
+            self._queue.flush()
+            if not self._running:
                 return
+            await asyncio.wait(list(self._running.values()),
+                               return_when=asyncio.FIRST_COMPLETED)
+
+    def _task_penalties(self) -> Dict[TaskId, int]:
+        penalties: Dict[TaskId, int] = dict()
+        for task_id, _ in self._running:
+            penalties[task_id] = penalties.get(task_id, 0) + _TASK_PENALTY
+        return penalties
 
-            task_id, subtask_id = queued
+    async def _verify_and_reschedule(
+            self,
+            task_id: TaskId,
+            subtask_id: SubtaskId,
+    ) -> None:
+        try:
             await self._verify(task_id, subtask_id)
             self._queue.update_not_prioritized(_next_priority)
-
-        await self._process()
+        except Exception:  # pylint: disable=broad-except
+            # Nothing awaits this call, the other verifications go on
+            logger.exception("Verification error: subtask_id=%s", subtask_id)
+        finally:
+            self._running.pop((task_id, subtask_id), None)
 
     async def _verify(
             self,
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Measures TaskManager.check_timeouts on a requestor holding many active tasks
+with many computed subtasks each, most of them far from their deadlines.
+The deadline heap is compared against the former scan over every task and
+subtask.
+
+    python scripts/benchmarks/check_timeouts.py --tasks 10000 --subtasks 100
+"""
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from golem.core.common import get_timestamp_utc
+from golem.task.taskmanager import TaskManager
+from golem.task.taskstate import SubtaskStatus, TaskStatus
+
+
+def full_scan(tm):
+    """ check_timeouts as it was implemented before the deadline heap """
+    nodes_with_timeouts = []
+    for t in list(tm.tasks.values()):
+        th = t.header
+        if not tm.tasks_states[th.task_id].status.is_active():
+            continue
+        cur_time = int(get_timestamp_utc())
+        for s in list(tm.tasks_states[th.task_id].subtask_states.values()):
+            if not s.status.is_computed():
+                continue
+            if cur_time > s.deadline:
+                s.status = SubtaskStatus.failure
+                nodes_with_timeouts.append(s.node_id)
+        if cur_time > th.deadline:
+            tm.tasks_states[th.task_id].status = TaskStatus.timeout
+    return nodes_with_timeouts
+
+
+def build(tasks, subtasks, expiring):
+    """ Create a TaskManager stub with `expiring` subtasks past their
+        deadlines, every other (sub)task expires in an hour """
+    # pylint: disable=protected-access
+    tm = TaskManager.__new__(TaskManager)
+    tm.tasks = {}
+    tm.tasks_states = {}
+    tm._deadlines = []
+    tm._scheduled_deadlines = {}
+    tm.notice_task_updated = mock.Mock()
+    now = int(get_timestamp_utc())
+    for i in range(tasks):
+        task_id = 'task-%d' % i
+        deadline = now + 3600
+        task = SimpleNamespace(
+            header=SimpleNamespace(task_id=task_id, deadline=deadline),
+            computation_failed=lambda _subtask_id: None,
+        )
+        states = {}
+        for j in range(subtasks):
+            subtask_id = '%s-%d' % (task_id, j)
+            sub_deadline = now - 1 if i * subtasks + j < expiring \
+                else deadline
+            states[subtask_id] = SimpleNamespace(
+                subtask_id=subtask_id,
+                node_id='node-%d' % j,
+                deadline=sub_deadline,
+                status=SubtaskStatus.starting,
+                stderr='',
+            )
+            tm._schedule_deadline(sub_deadline, task_id, subtask_id)
+        tm.tasks[task_id] = task
+        tm.tasks_states[task_id] = SimpleNamespace(
+            status=TaskStatus.computing,
+            subtask_states=states,
+        )
+        tm._schedule_deadline(deadline, task_id)
+    return tm
+
+
+def measure(fn, tm, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(tm)
+    return (time.perf_counter() - started) / rounds
+
+
+def main(tasks, subtasks, expiring, rounds):
+    print(f"tasks: {tasks}, subtasks per task: {subtasks}, "
+          f"expiring subtasks: {expiring}")
+    for name, fn in (('full scan', full_scan),
+                     ('deadline heap', TaskManager.check_timeouts)):
+        tm = build(tasks, subtasks, expiring)
+        first = measure(fn, tm, 1)
+        idle = measure(fn, tm, rounds)
+        print(f"{name:>14}: first call {first * 1000:9.2f}ms, "
+              f"idle call {idle * 1000:9.3f}ms")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Measure TaskManager.check_timeouts",
+    )
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--subtasks', type=int, default=100)
+    parser.add_argument('--expiring', type=int, default=100,
+                        help="subtasks already past their deadline")
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+    main(args.tasks, args.subtasks, args.expiring, args.rounds)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Loopback harness for SafeProtocol. Opens many TCP sessions to a local
+listener, pushes signed and encrypted messages through them and reports
+message throughput together with the reactor latency (how late a periodic
+reactor call fires), with and without the crypto pool.
+
+    python scripts/benchmarks/cryptopool.py --sessions 200 --pool-size 4
+    python scripts/benchmarks/cryptopool.py --sessions 200 --pool-size 0
+"""
+import statistics
+import time
+
+from golem_messages import message
+from golem_messages.cryptography import ECCx
+from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
+
+from golem.network.transport import cryptopool
+from golem.network.transport.network import ProtocolFactory, Session, \
+    SessionFactory
+from golem.network.transport.tcpnetwork import SafeProtocol
+
+PROBE_INTERVAL = 0.01
+
+
+class Stats:
+    def __init__(self, expected):
+        self.expected = expected
+        self.received = 0
+        self.delays = []
+        self.started = None
+        self.finished = None
+
+
+class BenchSession(Session):
+    keys = None
+    stats = None
+
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+        self.my_private_key = self.keys[0].raw_privkey
+        self.theirs_public_key = self.keys[1].raw_pubkey
+        self.last_message_time = 0.
+
+    def interpret(self, msg):
+        self.stats.received += 1
+        if self.stats.received == self.stats.expected:
+            self.stats.finished = time.perf_counter()
+            reactor.stop()
+
+    def dropped(self):
+        pass
+
+    def disconnect(self, reason):
+        self.conn.close()
+
+
+class Server:
+    def __init__(self):
+        self.sessions = []
+
+    def new_connection(self, session):
+        self.sessions.append(session)
+
+
+def make_message(payload_size):
+    return message.p2p.Peers(peers=[{
+        'address': '127.0.0.1',
+        'port': 40102,
+        'node': 'x' * payload_size,
+    }])
+
+
+def main(sessions, messages, payload_size, pool_size, threshold):
+    cryptopool.CRYPTO_POOL_SIZE = pool_size
+    if pool_size:
+        cryptopool._crypto_pool = cryptopool.CryptoPool(  # noqa pylint: disable=protected-access
+            size=pool_size, inline_threshold=threshold)
+
+    ecc_a, ecc_b = ECCx(None), ECCx(None)
+    stats = Stats(expected=sessions * messages)
+
+    class ListenerSession(BenchSession):
+        keys = (ecc_b, ecc_a)
+
+    class ClientSession(BenchSession):
+        keys = (ecc_a, ecc_b)
+
+    BenchSession.stats = stats
+    listener_server = Server()
+    client_server = Server()
+    port = reactor.listenTCP(0, ProtocolFactory(
+        SafeProtocol, listener_server, SessionFactory(ListenerSession)),
+                             interface='127.0.0.1')
+    client_factory = ProtocolFactory(
+        SafeProtocol, client_server, SessionFactory(ClientSession))
+    for _ in range(sessions):
+        reactor.connectTCP('127.0.0.1', port.getHost().port, client_factory)
+
+    msg = make_message(payload_size)
+
+    def _send():
+        if len(client_server.sessions) < sessions:
+            reactor.callLater(0.1, _send)
+            return
+        stats.started = time.perf_counter()
+        for _ in range(messages):
+            for session in client_server.sessions:
+                session.conn.send_message(msg)
+
+    last_probe = [time.perf_counter()]
+
+    def _probe():
+        now = time.perf_counter()
+        if stats.started:
+            stats.delays.append(now - last_probe[0] - PROBE_INTERVAL)
+        last_probe[0] = now
+
+    LoopingCall(_probe).start(PROBE_INTERVAL)
+    reactor.callLater(0, _send)
+    reactor.run()
+
+    elapsed = stats.finished - stats.started
+    delays = sorted(stats.delays) or [0.]
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+    print(f"pool size: {pool_size}, sessions: {sessions}, "
+          f"messages: {stats.expected}, payload: {payload_size}B")
+    print(f"throughput: {stats.expected / elapsed:10.1f} msg/s")
+    print(f"reactor latency: mean {statistics.mean(delays) * 1000:.2f}ms, "
+          f"p99 {p99 * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Measure SafeProtocol throughput and reactor latency",
+    )
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=20,
+                        help="messages sent per session")
+    parser.add_argument('--payload-size', type=int, default=128 * 1024)
+    parser.add_argument('--pool-size', type=int,
+                        default=cryptopool.CRYPTO_POOL_SIZE)
+    parser.add_argument('--threshold', type=int,
+                        default=cryptopool.CRYPTO_POOL_INLINE_THRESHOLD)
+    args = parser.parse_args()
+    main(args.sessions, args.messages, args.payload_size, args.pool_size,
+         args.threshold)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of DataBuffer implementations fed with fragmented streams of
+length-prefixed frames, the way BasicProtocol._data_to_messages consumes them.
+"""
+import random
+import struct
+import time
+
+from golem.core.databuffer import DataBuffer, RingDataBuffer
+
+
+def make_stream(frame_size, frames):
+    frame = bytes(random.getrandbits(8) for _ in range(256)) \
+        * (frame_size // 256 + 1)
+    frame = frame[:frame_size]
+    return (struct.pack("!L", frame_size) + frame) * frames
+
+
+def feed(buffer_cls, stream, chunk_size, use_views):
+    db = buffer_cls()
+    received = 0
+    start = time.perf_counter()
+    for pos in range(0, len(stream), chunk_size):
+        db.append_bytes(stream[pos:pos + chunk_size])
+        frames = db.get_len_prefixed_views() if use_views \
+            else db.get_len_prefixed_bytes()
+        for data in frames:
+            received += len(data)
+    return time.perf_counter() - start, received
+
+
+def main(frame_size, frames, chunk_size):
+    stream = make_stream(frame_size, frames)
+    print(f"{frames} frames x {frame_size}B, {chunk_size}B chunks")
+    for name, buffer_cls, use_views in (
+            ('DataBuffer', DataBuffer, False),
+            ('RingDataBuffer (bytes)', RingDataBuffer, False),
+            ('RingDataBuffer (views)', RingDataBuffer, True),
+    ):
+        elapsed, received = feed(buffer_cls, stream, chunk_size, use_views)
+        print(f"{name:>24}: {elapsed:8.3f}s "
+              f"{received / elapsed / 2 ** 20:10.1f} MiB/s")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark DataBuffer on fragmented streams",
+    )
+    parser.add_argument('--frame-size', type=int, default=2 * 1024 * 1024)
+    parser.add_argument('--frames', type=int, default=8)
+    parser.add_argument('--chunk-size', type=int, default=16 * 1024)
+    args = parser.parse_args()
+    main(args.frame_size, args.frames, args.chunk_size)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Benchmark of EXRImgRepr loading synthetic float RGB EXR frames, converted to
+8-bit BGR either at once or in bands of scanlines. Optionally compares them
+with the former per-pixel conversion, which is slow, so it is run only for
+images of up to --legacy-max-pixels.
+"""
+import os
+import tempfile
+import time
+
+import Imath
+import numpy
+import OpenEXR
+
+from apps.rendering.resources.imgrepr import EXRImgRepr
+
+
+def make_exr(path, width, height):
+    rng = numpy.random.RandomState(0)
+    header = OpenEXR.Header(width, height)
+    header['channels'] = {
+        c: Imath.Channel(Imath.PixelType(Imath.PixelType.FLOAT))
+        for c in 'RGB'
+    }
+    exr = OpenEXR.OutputFile(path, header)
+    exr.writePixels({
+        c: rng.random_sample((height, width)).astype(numpy.float32).tobytes()
+        for c in 'RGB'
+    })
+    exr.close()
+
+
+def legacy_conversion(img):
+    width, height = img.get_size()
+    bgr = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+    for i, channel_bytes in enumerate(img.img.channels("BGR")):
+        channel = numpy.frombuffer(channel_bytes, dtype=numpy.float32).copy()
+        for pixel_value in numpy.nditer(channel, op_flags=['readwrite']):
+            pixel_value[...] = round(pixel_value * 255)
+        bgr[:, :, i] = channel.reshape(-1, width)
+    return bgr
+
+
+def measure(name, path, tile_rows=None):
+    img = EXRImgRepr(tile_rows=tile_rows)
+    start = time.perf_counter()
+    img.load_from_file(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>24}: {elapsed:8.3f}s")
+    return img
+
+
+def main(sizes, tile_rows, legacy_max_pixels):
+    for width, height in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'frame.exr')
+            make_exr(path, width, height)
+            print(f"{width}x{height}")
+
+            img = measure('vectorized', path)
+            tiled = measure(f'tiled ({tile_rows} rows)', path, tile_rows)
+            assert numpy.array_equal(img.bgr, tiled.bgr)
+
+            if width * height <= legacy_max_pixels:
+                start = time.perf_counter()
+                bgr = legacy_conversion(img)
+                elapsed = time.perf_counter() - start
+                print(f"{'per pixel':>24}: {elapsed:8.3f}s")
+                assert numpy.array_equal(img.bgr, bgr)
+
+            img.close()
+            tiled.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    def size(value):
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark EXR to OpenCV BGR conversion",
+    )
+    parser.add_argument('--sizes', type=size, nargs='+',
+                        default=[(640, 360), (1920, 1080), (3840, 2160)])
+    parser.add_argument('--tile-rows', type=int, default=256)
+    parser.add_argument('--legacy-max-pixels', type=int, default=640 * 360)
+    args = parser.parse_args()
+    main(args.sizes, args.tile_rows, args.legacy_max_pixels)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Benchmark of the hyperdrive HTTP clients against a local stub of the daemon's
+API, which answers every request with a random resource hash.
+
+Compares a new connection per request (plain requests.post) with the pooled
+keep-alive sessions of HyperdriveClient and HyperdriveAsyncClient, for
+sequential and concurrent adds.
+"""
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
+
+import requests
+
+from golem.core.golem_async import AsyncHTTPRequest
+from golem.network.hyperdrive.client import HyperdriveAsyncClient, \
+    HyperdriveClient, HyperdriveClientOptions
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # As the Node.js server of the daemon does
+    disable_nagle_algorithm = True
+    connections = set()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.connections.add(self.client_address)
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = json.dumps({'hash': str(uuid.uuid4())}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+
+def start_server():
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def client_options():
+    options = HyperdriveClientOptions(
+        HyperdriveClient.CLIENT_ID,
+        HyperdriveClient.VERSION)
+    options.set(timeout=60.)
+    return options
+
+
+def files_list(requests_count):
+    return [{f'/tmp/file{i}': f'file{i}'} for i in range(requests_count)]
+
+
+def measure(name, func, requests_count):
+    StubHandler.connections.clear()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>24}: {elapsed:8.3f}s "
+          f"{requests_count / elapsed:10.1f} req/s "
+          f"{len(StubHandler.connections):6} connections")
+
+
+def run_async(client, files, options, pool_size):
+    from twisted.internet import reactor
+    from twisted.internet.defer import DeferredSemaphore, gatherResults
+
+    def _main():
+        # At most `pool_size` requests in flight, one per pooled connection
+        semaphore = DeferredSemaphore(pool_size)
+        deferred = gatherResults([
+            semaphore.run(client.add_async, entry, client_options=options)
+            for entry in files
+        ], consumeErrors=True)
+        deferred.addErrback(print)
+        deferred.addBoth(lambda _: reactor.stop())
+
+    reactor.callWhenRunning(_main)
+    reactor.run()
+
+
+def main(requests_count, pool_size):
+    server = start_server()
+    host, port = server.server_address
+    url = f'http://{host}:{port}/api'
+    options = client_options()
+    files = files_list(requests_count)
+    client = HyperdriveClient(port, host, pool_size=pool_size)
+    AsyncHTTPRequest.pool_size = pool_size
+
+    print(f"{requests_count} adds, pool size {pool_size}")
+
+    def new_connections():
+        for entry in files:
+            requests.post(
+                url=url,
+                headers=HyperdriveClient.HEADERS,
+                data=json.dumps({'command': 'upload', 'files': entry}))
+
+    def pooled():
+        for entry in files:
+            client.add(entry, client_options=options)
+
+    measure('new connections', new_connections, requests_count)
+    measure('pooled', pooled, requests_count)
+    # Runs the reactor, so it has to be the last one
+    measure(
+        'pooled concurrent (async)',
+        lambda: run_async(
+            HyperdriveAsyncClient(port, host, pool_size=pool_size),
+            files,
+            options,
+            pool_size),
+        requests_count)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark hyperdrive HTTP clients",
+    )
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--pool-size', type=int,
+                        default=HyperdriveClient.POOL_SIZE)
+    args = parser.parse_args()
+    main(args.requests, args.pool_size)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Measures event loop latency while RequestedTaskManager assigns subtasks to
+many providers at once. Every provider asks for a subtask concurrently, while
+a ticker measures how late the event loop wakes it up. Queries run through
+the database executor are compared against running them on the event loop,
+as RequestedTaskManager did before.
+
+    python scripts/benchmarks/rtm_event_loop_latency.py --providers 500
+"""
+import asyncio
+import itertools
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from golem_task_api.structs import Subtask
+
+from golem.database import Database
+from golem.model import db, DB_FIELDS, DB_MODELS, RequestedSubtask
+from golem.task.requestedtaskmanager import (
+    ComputingNodeDefinition,
+    CreateTaskParams,
+    RequestedTaskManager,
+)
+from golem.task.taskstate import SubtaskStatus
+
+TICK = 0.001  # s
+# Rows per insert, below SQLite's limit of host parameters
+INSERT_SIZE = 100
+
+
+class InlineExecutor:
+    """ Runs queries on the event loop, as before the database executor """
+
+    @staticmethod
+    async def read(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    @staticmethod
+    async def write(fn, *args, **kwargs):
+        with db.transaction():
+            return fn(*args, **kwargs)
+
+
+class AppClient:
+    """ Application which always has a subtask to give away """
+
+    def __init__(self):
+        self._ids = itertools.count()
+
+    @staticmethod
+    async def create_task(*_args, **_kwargs):
+        return SimpleNamespace(env_id='env', prerequisites={})
+
+    @staticmethod
+    async def has_pending_subtasks(*_args, **_kwargs):
+        return True
+
+    async def next_subtask(self, *_args, **_kwargs):
+        await asyncio.sleep(0)
+        return Subtask(
+            subtask_id=f'subtask-{next(self._ids)}',
+            params={},
+            resources=[],
+        )
+
+
+async def create_task(rtm, root, providers, subtasks):
+    task_id = rtm.create_task(CreateTaskParams(
+        app_id='app',
+        name='benchmark',
+        task_timeout=3600 * 1000,
+        subtask_timeout=3600 * 1000,
+        output_directory=root / 'output',
+        resources=[],
+        max_subtasks=providers + subtasks,
+        max_price_per_hour=1,
+        concent_enabled=False,
+    ), {})
+    await rtm.init_task(task_id)
+    rtm.start_task(task_id)
+
+    # Past subtasks of other providers, for the queries to go through
+    rows = [
+        dict(
+            task=task_id,
+            subtask_id=f'past-{i}',
+            status=SubtaskStatus.finished,
+        ) for i in range(subtasks)
+    ]
+    with db.transaction():
+        for i in range(0, len(rows), INSERT_SIZE):
+            RequestedSubtask.insert_many(rows[i:i + INSERT_SIZE]).execute()
+    return task_id
+
+
+async def ticker(lags, stop):
+    loop = asyncio.get_event_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - started - TICK)
+
+
+async def run(executor, providers, subtasks):
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        database = Database(db, fields=DB_FIELDS, models=DB_MODELS,
+                            db_dir=str(root / 'db'))
+        rtm = RequestedTaskManager(
+            env_manager=mock.Mock(),
+            app_manager=mock.Mock(),
+            public_key=b'requestor',
+            root_path=root,
+        )
+        app_client = AppClient()
+
+        async def get_app_client(_app_id):
+            return app_client
+
+        rtm._get_app_client = get_app_client  # pylint: disable=protected-access
+        if executor == 'inline':
+            rtm._db = InlineExecutor()  # pylint: disable=protected-access
+
+        task_id = await create_task(rtm, root, providers, subtasks)
+
+        lags = []
+        stop = asyncio.Event()
+        ticking = asyncio.ensure_future(ticker(lags, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            rtm.get_next_subtask(task_id, ComputingNodeDefinition(
+                node_id=f'provider-{i}',
+                name=f'provider-{i}',
+            )) for i in range(providers)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticking
+
+        database.close()
+
+    lags.sort()
+    print(f"{executor:>8}: {elapsed:8.3f}s total, "
+          f"lag median {statistics.median(lags) * 1000:7.2f}ms, "
+          f"p99 {lags[int(len(lags) * 0.99)] * 1000:7.2f}ms, "
+          f"max {lags[-1] * 1000:7.2f}ms")
+
+
+def main(providers, subtasks):
+    logging.disable(logging.INFO)
+    loop = asyncio.get_event_loop()
+    for executor in ('inline', 'executor'):
+        loop.run_until_complete(run(executor, providers, subtasks))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark event loop latency of RequestedTaskManager",
+    )
+    parser.add_argument('--providers', type=int, default=500)
+    parser.add_argument('--subtasks', type=int, default=50000,
+                        help="Past subtasks of the task")
+    args = parser.parse_args()
+    main(args.providers, args.subtasks)
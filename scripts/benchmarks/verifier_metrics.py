@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Benchmark of the Blender verification metrics which used to do per element
+Python work: wavelet and mass center distance. Compares them with the former
+implementations, kept in the regression tests, on synthetic crops.
+"""
+import time
+
+import numpy
+from PIL import Image
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools import \
+    mass_center_distance, wavelet
+from tests.apps.blender.verification.test_metrics import \
+    legacy_mass_centers, legacy_wavelet_metrics
+
+
+def make_image(rng, width, height):
+    pixels = rng.randint(0, 256, (height, width, 3)).astype(numpy.uint8)
+    return Image.fromarray(pixels)
+
+
+def measure(name, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>24}: {elapsed:8.3f}s")
+    return result
+
+
+def main(sizes, legacy):
+    rng = numpy.random.RandomState(0)
+    for width, height in sizes:
+        image1 = make_image(rng, width, height)
+        image2 = make_image(rng, width, height)
+        print(f"{width}x{height}")
+
+        result = measure('wavelet', wavelet.MetricWavelet.compute_metrics,
+                         image1, image2)
+        centers = measure(
+            'mass center',
+            mass_center_distance.MetricMassCenterDistance.compute_mass_centers,
+            image1)
+
+        if legacy:
+            expected = measure('legacy wavelet', legacy_wavelet_metrics,
+                               image1, image2)
+            assert result == expected
+            expected = measure('legacy mass center', legacy_mass_centers,
+                               image1)
+            assert centers == expected
+
+
+if __name__ == '__main__':
+    import argparse
+
+    def size(value):
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark Blender verification metrics",
+    )
+    parser.add_argument('--sizes', type=size, nargs='+',
+                        default=[(64, 64), (400, 400), (1000, 1000)])
+    parser.add_argument('--no-legacy', dest='legacy', action='store_false')
+    args = parser.parse_args()
+    main(args.sizes, args.legacy)
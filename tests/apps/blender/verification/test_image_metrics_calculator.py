@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pytest
+
+OpenEXR = pytest.importorskip('OpenEXR')
+Imath = pytest.importorskip('Imath')
+pytest.importorskip('pywt')
+pytest.importorskip('sklearn')
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools import \
+    image_metrics_calculator, verifier  # noqa pylint: disable=wrong-import-position
+
+VERIFIER = 'apps.blender.resources.images.entrypoints.scripts.verifier_tools' \
+           '.verifier'
+
+
+def write_multilayer_exr(path, width=8, height=8):
+    channel = Imath.Channel(Imath.PixelType(Imath.PixelType.FLOAT))
+    names = ['RenderLayer.Combined.{}'.format(c) for c in 'RGBA']
+    header = OpenEXR.Header(width, height)
+    header['channels'] = {name: channel for name in names}
+    data = b'\0' * (4 * width * height)
+    exr = OpenEXR.OutputFile(path, header)
+    exr.writePixels({name: data for name in names})
+    exr.close()
+
+
+class TestMultilayerExr(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.exr_path = os.path.join(self.tempdir.name, 'result.exr')
+        write_multilayer_exr(self.exr_path)
+
+    def test_load_image(self):
+        with self.assertRaises(ValueError):
+            image_metrics_calculator.load_image(self.exr_path)
+
+    def test_calculate_metrics_in_parallel(self):
+        # The error is passed from the workers instead of killing them
+        crops = [
+            (self.exr_path, self.exr_path, 0, 0,
+             os.path.join(self.tempdir.name, 'metrics.txt'))
+        ] * 2
+        with self.assertRaises(ValueError):
+            image_metrics_calculator.calculate_metrics_in_parallel(crops, 2)
+
+    def test_make_verdict(self):
+        crop = mock.Mock(id=0, x_pixels=[0, 8], y_pixels=[0, 8])
+        reference_results = [{
+            'crop': {
+                'id': 0,
+                'outfilebasename': 'crop0_',
+                'borders_x': [0.0, 1.0],
+                'borders_y': [0.0, 1.0],
+            },
+            'results': ['crop0.exr'],
+        }]
+        write_multilayer_exr(os.path.join(self.tempdir.name, 'crop0.exr'))
+
+        with mock.patch(f'{VERIFIER}.OUTPUT_DIR', self.tempdir.name):
+            verifier.make_verdict([self.exr_path], [crop], reference_results)
+
+        with open(os.path.join(self.tempdir.name, 'verdict.json')) as f:
+            assert json.load(f) == {'verdict': False}
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('OpenEXR')
+pytest.importorskip('pywt')
+pytest.importorskip('sklearn')
+Image = pytest.importorskip('PIL.Image')
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools import \
+    image_metrics, image_metrics_calculator, metric_engine  # noqa pylint: disable=wrong-import-position
+
+TEST_DATA = Path(__file__).parent / 'test_data'
+REFERENCE = 'chessboard_400x400_1.png'
+RESULTS = [
+    'chessboard_400x400_1.png',
+    'chessboard_400x400_2.png',
+    'almost_good_image.png',
+    'very_bad_image.png',
+]
+CROPS = [(50, 60, 100, 80), (0, 0, 400, 400), (13, 7, 171, 93)]
+
+# Features of the shipped tree which it splits on
+USED_LABELS = [
+    'ssim',
+    'histograms_correlation',
+    'max_y_mass_center_distance',
+    'edge_difference',
+    'comp_edge_factor',
+    'wavelet_sym2_base',
+    'wavelet_sym2_high',
+    'wavelet_db4_base',
+    'wavelet_db4_low',
+    'wavelet_db4_mid',
+    'wavelet_db4_high',
+    'wavelet_haar_base',
+    'wavelet_haar_low',
+    'wavelet_haar_high',
+    'wavelet_haar_freq_x1',
+    'wavelet_haar_freq_x2',
+    'wavelet_haar_freq_x3',
+]
+
+
+def classify_with_all_metrics(engine, image_a, image_b):
+    """ Former path: every metric is computed and fed to the classifier """
+    metrics = dict()
+    for metric_class in image_metrics.ImgageMetrics.get_metric_classes():
+        metrics.update(metric_class.compute_metrics(image_a, image_b))
+    results = engine.classifier.classify_with_feature_vector(
+        metrics,
+        engine.feature_labels
+    )
+    return results[0].decode('utf-8')
+
+
+class TestMetricEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = metric_engine.get_engine(
+            image_metrics_calculator.TREE_PATH)
+
+    def test_used_labels(self):
+        assert self.engine.required_labels == USED_LABELS
+        assert set(USED_LABELS) < set(self.engine.feature_labels)
+
+    def test_metric_classes(self):
+        computed = set()
+        for metric_class in self.engine.metric_classes:
+            computed.update(metric_class.get_labels())
+        assert set(USED_LABELS) <= computed
+        assert 'psnr' not in computed
+        assert 'variance_difference' not in computed
+
+    def test_labels_match_all_metrics(self):
+        reference = Image.open(str(TEST_DATA / REFERENCE))
+        labels = set()
+        for name in RESULTS:
+            result = Image.open(str(TEST_DATA / name))
+            for x, y, width, height in CROPS:
+                box = (x, y, x + width, y + height)
+                image_a, image_b = reference.crop(box), result.crop(box)
+                label = self.engine.classify(
+                    self.engine.compare_images(image_a, image_b))
+                assert label == classify_with_all_metrics(
+                    self.engine, image_a, image_b)
+                labels.add(label)
+        # Both outcomes are covered
+        assert labels == {'TRUE', 'FALSE'}
+
+
+class TestCalculateMetrics(unittest.TestCase):
+
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        # Provider's result crops are saved in the working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tempdir.name)
+
+        reference = Image.open(str(TEST_DATA / REFERENCE))
+        self.crops = []
+        for i, (x, y, width, height) in enumerate(CROPS):
+            crop_path = os.path.join(tempdir.name, 'crop{}.png'.format(i))
+            reference.crop((x, y, x + width, y + height)).save(crop_path)
+            for name in RESULTS:
+                self.crops.append((
+                    crop_path,
+                    str(TEST_DATA / name),
+                    x, y,
+                    os.path.join(tempdir.name, 'crop{}_metrics.txt'.format(i))
+                ))
+
+    def _expected_labels(self):
+        engine = metric_engine.get_engine(image_metrics_calculator.TREE_PATH)
+        labels = []
+        for crop_path, result_path, x, y, _ in self.crops:
+            image_a = Image.open(crop_path)
+            image_b = image_metrics_calculator.get_providers_result_crop(
+                Image.open(result_path), x, y, *image_a.size)
+            labels.append(classify_with_all_metrics(engine, image_a, image_b))
+        return labels
+
+    def test_sequential(self):
+        labels = [
+            image_metrics_calculator.compute_crop_metrics(*crop[:4])[0]
+            ['Label'] for crop in self.crops
+        ]
+        assert labels == self._expected_labels()
+
+    def test_parallel(self):
+        results = image_metrics_calculator.calculate_metrics_in_parallel(
+            self.crops, 2)
+        assert [label for _, label in results] == self._expected_labels()
+        assert all(os.path.isfile(path) for path, _ in results)
@@ -0,0 +1,142 @@
+import unittest
+from pathlib import Path
+
+import numpy
+import pytest
+
+pywt = pytest.importorskip('pywt')
+Image = pytest.importorskip('PIL.Image')
+
+from apps.blender.resources.images.entrypoints.scripts.verifier_tools import \
+    mass_center_distance, wavelet  # noqa pylint: disable=wrong-import-position
+
+TEST_DATA = Path(__file__).parent / 'test_data'
+IMAGES = [
+    'almost_good_image.png',
+    'chessboard_400x400_1.png',
+    'chessboard_400x400_2.png',
+    'very_bad_image.png',
+]
+
+
+# Former implementations, with per element Python loops
+
+def _legacy_sum(coefficient):
+    return sum(sum(coefficient ** 2))
+
+
+def _legacy_mse(coefficient1, coefficient2, low, high):
+    if low == high:
+        if low == 0:
+            high = low + 1
+        else:
+            low = high - 1
+    sum_ = 0
+    count = 0
+    for i in range(low, high):
+        if type(coefficient1[i]) is tuple:
+            for j in range(3):
+                sum_ += _legacy_sum(coefficient1[i][j] - coefficient2[i][j])
+            count += 3 * coefficient1[i][0].size
+        else:
+            sum_ += _legacy_sum(coefficient1[i] - coefficient2[i])
+            count += coefficient1[i].size
+    return 0 if count == 0 else sum_ / count
+
+
+def _legacy_frequencies(coefficient1, coefficient2):
+    frequencies = list()
+    for i in range(len(coefficient1) - 3, len(coefficient1)):
+        sum_coeffs1 = sum(sum(sum(numpy.absolute(coefficient1[i]))))
+        sum_coeffs2 = sum(sum(sum(numpy.absolute(coefficient2[i]))))
+        diff = numpy.absolute(sum_coeffs2 - sum_coeffs1) / (
+            3 * coefficient1[i][0].size)
+        frequencies = [diff] + frequencies
+    return frequencies
+
+
+def legacy_wavelet_metrics(image1, image2):
+    np_image1 = numpy.array(image1.convert("RGB"))
+    np_image2 = numpy.array(image2.convert("RGB"))
+    result = dict()
+    for name in ["db4", "sym2", "haar"]:
+        for band in ["base", "low", "mid", "high"]:
+            result["wavelet_{}_{}".format(name, band)] = 0
+        for i in range(0, 3):
+            coefficient1 = pywt.wavedec2(np_image1[..., i], name)
+            coefficient2 = pywt.wavedec2(np_image2[..., i], name)
+            if name == "haar":
+                frequencies = _legacy_frequencies(coefficient1, coefficient2)
+                for j in range(3):
+                    key = "wavelet_haar_freq_x{}".format(j + 1)
+                    result[key] = result.get(key, 0) + frequencies[j]
+
+            total_length = len(coefficient1) - 1
+            third = int(total_length / 3)
+            two_thirds = int(total_length * 2 / 3)
+            bands = [(0, 1), (1, 1 + third), (1 + third, 1 + two_thirds),
+                     (1 + two_thirds, 1 + total_length)]
+            for band, (low, high) in zip(["base", "low", "mid", "high"],
+                                         bands):
+                result["wavelet_{}_{}".format(name, band)] += _legacy_mse(
+                    coefficient1, coefficient2, low, high)
+    return result
+
+
+def legacy_mass_centers(image):
+    image = image.convert('RGB')
+    pixels = image.load()
+    width, height = image.size
+    results = dict()
+    for channel_index in range(len(pixels[0, 0])):
+        mass_center_x = 0
+        mass_center_y = 0
+        total_mass = 0
+        for x in range(width):
+            for y in range(height):
+                mass = pixels[x, y][channel_index]
+                mass_center_x += mass * x
+                mass_center_y += mass * y
+                total_mass += mass
+        divisor_x = (float(total_mass) * width)
+        divisor_y = (float(total_mass) * height)
+        mass_center_x = 0.5 if divisor_x == 0 else mass_center_x / divisor_x
+        mass_center_y = 0.5 if divisor_y == 0 else mass_center_y / divisor_y
+        results[channel_index] = mass_center_x, mass_center_y
+    return results
+
+
+class TestMetricsRegression(unittest.TestCase):
+    """ Vectorized metrics are equal to the former implementations """
+
+    @staticmethod
+    def _image_pairs():
+        images = [Image.open(str(TEST_DATA / name)) for name in IMAGES]
+        # Odd sizes make decompositions levels differ in size
+        crops = [image.crop((13, 7, 13 + 171, 7 + 93)) for image in images]
+        for reference in (images, crops):
+            for image in reference[1:]:
+                yield reference[0], image
+
+    def test_wavelet(self):
+        for image1, image2 in self._image_pairs():
+            result = wavelet.MetricWavelet.compute_metrics(image1, image2)
+            assert result == legacy_wavelet_metrics(image1, image2)
+            assert sorted(result) == \
+                sorted(wavelet.MetricWavelet.get_labels())
+
+    def test_wavelet_same_image(self):
+        image = Image.open(str(TEST_DATA / IMAGES[0]))
+        result = wavelet.MetricWavelet.compute_metrics(image, image)
+        assert all(value == 0 for value in result.values())
+
+    def test_mass_centers(self):
+        metric = mass_center_distance.MetricMassCenterDistance
+        for _, image in self._image_pairs():
+            assert metric.compute_mass_centers(image) == \
+                legacy_mass_centers(image)
+
+    def test_mass_centers_black_image(self):
+        image = Image.new('RGB', (10, 5))
+        assert mass_center_distance.MetricMassCenterDistance\
+            .compute_mass_centers(image) == legacy_mass_centers(image)
@@ -1,4 +1,4 @@
-from unittest import mock
+from unittest import TestCase, mock
 import functools
 from twisted.internet.defer import Deferred
 
@@ -52,3 +52,37 @@ class TestVerificationQueue(TestWithReactor):
 
         sync_wait(d, 60)
         _verification_timed_out.assert_called_once()
+
+
+class TestVerificationQueueFairness(TestCase):
+
+    def setUp(self):
+        self.queue = VerificationQueue(concurrency=2)
+        self.queue._concurrency.min_workers = 2
+        self.started = []
+
+        def start(entry, _verifier_cls):
+            self.started.append(entry.subtask_id)
+            return Deferred()
+
+        patcher = mock.patch('apps.core.verification_queue.VerificationTask.'
+                             'start', autospec=True, side_effect=start)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _submit(self, task_id, subtask_id):
+        self.queue.submit(mock.Mock(), subtask_id, timeout_to_deadline(10),
+                          cb=mock.Mock(), task_id=task_id)
+
+    def test_concurrency(self):
+        for i in range(3):
+            self._submit(f'task{i}', f'subtask{i}')
+        assert self.started == ['subtask0', 'subtask1']
+
+    def test_task_fairness(self):
+        self._submit('task1', 'subtask1')
+        self.queue.pause()
+        self._submit('task1', 'subtask2')
+        self._submit('task2', 'subtask3')
+        self.queue.resume()
+        assert self.started == ['subtask1', 'subtask3']
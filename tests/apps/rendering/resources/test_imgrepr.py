@@ -104,6 +104,16 @@ class TestExrImgRepr(TempDirFixture, PEP8MixIn):
         assert e.get_pixel((0, 0)) == val1
         assert e.get_pixel((4, 4)) == val2
 
+    def test_tile_rows(self):
+        e = get_exr_img_repr()
+
+        for tile_rows in (1, 3, 10, 20):
+            tiled = EXRImgRepr(tile_rows=tile_rows)
+            tiled.load_from_file(get_test_exr())
+            assert tiled.bgr.dtype == np.uint8
+            assert np.array_equal(tiled.bgr, e.bgr)
+            assert tiled.copy().tile_rows == tile_rows
+
 
 class TestImgFunctions(TempDirFixture, LogTestCase):
     def test_load_img(self):
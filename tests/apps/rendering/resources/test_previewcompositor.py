@@ -0,0 +1,132 @@
+import os
+import pickle
+from unittest.mock import Mock, patch
+
+from twisted.internet.task import Clock
+
+from apps.rendering.resources.imgrepr import OpenCVImgRepr
+from apps.rendering.resources.previewcompositor import PreviewCompositor
+from golem.testutils import TempDirFixture
+
+
+class TestPreviewCompositor(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.preview_path = self.temp_file_name('preview.png')
+        self.compositor = PreviewCompositor('PNG', flush_delay=60)
+
+    @staticmethod
+    def _img(color=(0, 0, 255), width=10, height=20):
+        return OpenCVImgRepr.empty(width, height, color=color)
+
+    def test_get_missing(self):
+        assert self.compositor.get(self.preview_path) is None
+
+    def test_get_loads_once(self):
+        self._img().save(self.preview_path)
+
+        img = self.compositor.get(self.preview_path)
+        assert img.get_pixel((0, 0)) == (0, 0, 255)
+
+        with patch.object(OpenCVImgRepr, 'from_image_file') as load:
+            assert self.compositor.get(self.preview_path) is img
+            assert not load.called
+
+    def test_set_saves_on_flush(self):
+        self.compositor.set(self.preview_path, self._img())
+        assert not os.path.exists(self.preview_path)
+
+        self.compositor.flush()
+        img = OpenCVImgRepr.from_image_file(self.preview_path)
+        assert img.get_pixel((5, 5)) == (0, 0, 255)
+
+    def test_changed(self):
+        self.compositor.set(self.preview_path, self._img())
+        self.compositor.flush()
+
+        img = self.compositor.get(self.preview_path)
+        img.paste_image(self._img((255, 0, 0), height=5), 0, 0)
+        self.compositor.changed(self.preview_path)
+        self.compositor.flush()
+
+        img = OpenCVImgRepr.from_image_file(self.preview_path)
+        assert img.get_pixel((0, 0)) == (255, 0, 0)
+        assert img.get_pixel((0, 10)) == (0, 0, 255)
+
+    def test_set_saved(self):
+        img = self._img()
+        img.save(self.preview_path)
+        self.compositor.set(self.preview_path, img, saved=True)
+
+        with patch.object(OpenCVImgRepr, 'save_with_extension') as save:
+            self.compositor.flush()
+            assert not save.called
+
+    def test_flush_delay(self):
+        clock = Clock()
+        reactor = Mock(callFromThread=lambda fn, *args: fn(*args),
+                       callLater=clock.callLater)
+        self.compositor = PreviewCompositor('PNG', flush_delay=2)
+
+        with patch('twisted.internet.reactor', reactor):
+            self.compositor.set(self.preview_path, self._img())
+            self.compositor.changed(self.preview_path)
+        # Saved once, on the reactor thread
+        assert len(clock.getDelayedCalls()) == 1
+        assert not os.path.exists(self.preview_path)
+
+        clock.advance(2)
+        assert os.path.exists(self.preview_path)
+
+    def test_changed_dropped_from_memory(self):
+        img = self._img()
+        self.compositor.set(self.preview_path, img)
+        self.compositor.flush()
+        self.compositor._images.clear()
+
+        # Without the image there's nothing to save
+        self.compositor.changed(self.preview_path)
+        assert self.preview_path not in self.compositor._dirty
+
+        img.paste_image(self._img((255, 0, 0), height=5), 0, 0)
+        self.compositor.changed(self.preview_path, img)
+        self.compositor.flush()
+        img = OpenCVImgRepr.from_image_file(self.preview_path)
+        assert img.get_pixel((0, 0)) == (255, 0, 0)
+
+    def test_no_flush_delay(self):
+        self.compositor = PreviewCompositor('PNG', flush_delay=0)
+        self.compositor.set(self.preview_path, self._img())
+        assert os.path.exists(self.preview_path)
+
+    def test_memory_limit(self):
+        img_size = self._img().img.nbytes
+        self.compositor = PreviewCompositor('PNG', flush_delay=60,
+                                            memory_limit=2 * img_size)
+        paths = [self.temp_file_name('preview{}.png'.format(i))
+                 for i in range(3)]
+
+        for path in paths:
+            self.compositor.set(path, self._img())
+
+        # The least recently used one is saved and dropped from memory
+        assert os.path.exists(paths[0])
+        assert not os.path.exists(paths[1])
+        assert not os.path.exists(paths[2])
+
+        with patch.object(OpenCVImgRepr, 'from_image_file',
+                          wraps=OpenCVImgRepr.from_image_file) as load:
+            assert self.compositor.get(paths[0]).get_pixel((0, 0)) == \
+                (0, 0, 255)
+            assert load.called
+        # Which in turn drops the next one
+        assert os.path.exists(paths[1])
+
+    def test_pickle(self):
+        self.compositor.set(self.preview_path, self._img())
+
+        compositor = pickle.loads(pickle.dumps(self.compositor))
+        assert compositor.flush_delay == self.compositor.flush_delay
+        assert compositor.memory_limit == self.compositor.memory_limit
+        assert compositor.get(self.preview_path) is None
@@ -1,5 +1,6 @@
 import os
 import random
+from unittest import mock
 
 import numpy
 import cv2
@@ -7,7 +8,9 @@ import pytest
 
 from golem.tools.testdirfixture import TestDirFixture
 
-from apps.rendering.resources.renderingtaskcollector import RenderingTaskCollector
+from apps.rendering.resources.renderingtaskcollector import \
+    RenderingTaskCollector, StreamingRenderingTaskCollector, merge_frame, \
+    read_image_size
 from apps.rendering.resources.imgrepr import OpenCVImgRepr, OpenCVError
 
 
@@ -140,3 +143,80 @@ class TestRenderingTaskCollector(TestDirFixture):
         for img_path in images:
             os.remove(img_path)
             assert os.path.exists(img_path) is False
+
+
+class TestReadImageSize(TestDirFixture):
+    def test_png(self):
+        img_path = self.temp_file_name("img.png")
+        make_test_img_16bits(img_path, width=20, height=15)
+        assert read_image_size(img_path) == (20, 15)
+
+    def test_exr(self):
+        assert read_image_size(_get_test_exr()) == (10, 10)
+
+    def test_unsupported(self):
+        img_path = self.temp_file_name("img.bmp")
+        make_test_img(img_path)
+        assert read_image_size(img_path) is None
+        assert read_image_size(self.temp_file_name("missing.png")) is None
+
+
+class TestStreamingRenderingTaskCollector(TestDirFixture):
+    def _make_chunks(self, ext="png", heights=(10, 7, 12)):
+        chunks = []
+        for i, height in enumerate(heights):
+            img_path = self.temp_file_name("chunk{}.{}".format(i, ext))
+            make_test_img(img_path, size=(height, 10),
+                          color=(10 * (i + 1), 0, 255))
+            chunks.append(img_path)
+        return chunks
+
+    def _finalize(self, collector_class, chunks):
+        collector = collector_class()
+        for img_path in chunks:
+            collector.add_img_file(img_path)
+        return collector.finalize()
+
+    def test_finalize(self):
+        chunks = self._make_chunks()
+        final_img = self._finalize(StreamingRenderingTaskCollector, chunks)
+        expected = self._finalize(RenderingTaskCollector, chunks)
+        assert final_img.img.shape == (29, 10, 3)
+        assert numpy.array_equal(final_img.img, expected.img)
+
+    def test_finalize_other_format(self):
+        chunks = self._make_chunks(ext="bmp")
+        final_img = self._finalize(StreamingRenderingTaskCollector, chunks)
+        expected = self._finalize(RenderingTaskCollector, chunks)
+        assert numpy.array_equal(final_img.img, expected.img)
+
+    def test_reads_chunks_once(self):
+        chunks = self._make_chunks()
+        with mock.patch.object(OpenCVImgRepr, 'from_image_file',
+                               wraps=OpenCVImgRepr.from_image_file) as load:
+            self._finalize(StreamingRenderingTaskCollector, chunks)
+        assert load.call_count == len(chunks)
+
+    def test_finalize_16bits(self):
+        chunks = []
+        for i in range(3):
+            img_path = self.temp_file_name("chunk{}.png".format(i))
+            make_test_img_16bits(img_path, width=20, height=15)
+            chunks.append(img_path)
+        final_img = self._finalize(StreamingRenderingTaskCollector, chunks)
+        assert final_img.img.dtype == numpy.uint16
+        assert final_img.img.shape == (45, 20, 3)
+
+    def test_merge_frame(self):
+        chunks = self._make_chunks(heights=(5, 6))
+        output_path = self.temp_file_name("frame.png")
+        merge_frame(chunks, output_path, "png")
+
+        expected = self._finalize(RenderingTaskCollector, chunks)
+        assert TestRenderingTaskCollector._compare_opencv_images(
+            expected.img, output_path)
+
+    def test_merge_frame_missing_chunk(self):
+        with pytest.raises(OpenCVError):
+            merge_frame([self.temp_file_name("missing.png")],
+                        self.temp_file_name("frame.png"), "png")
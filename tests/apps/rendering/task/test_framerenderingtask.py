@@ -80,6 +80,7 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         task.accept_results("SUBTASK1", [img_file])
         assert task.num_tasks_received == 1
         assert task.collected_file_names[3] == img_file
+        task.flush_preview()
         preview_img = OpenCVImgRepr.from_image_file(task.preview_file_path)
         assert preview_img.get_pixel((100, 100)) == (0, 0, 255)
         preview_img = OpenCVImgRepr.from_image_file(task.preview_task_file_path)
@@ -165,8 +166,9 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
             new_img = task._paste_new_chunk(img, preview_path, 1, 10)
         assert isinstance(new_img, OpenCVImgRepr)
 
+        # Previews are kept in memory once read
         img = OpenCVImgRepr.empty(10, 20, color=(0, 122, 0))
-        img.save(preview_path)
+        task.preview_compositor.set(preview_path, img)
         with self.assertNoLogs(logger, level="ERROR"):
             new_img = task._paste_new_chunk(img, preview_path, 1, 10)
         assert isinstance(new_img, OpenCVImgRepr)
@@ -0,0 +1,104 @@
+import random
+import struct
+import unittest
+
+from golem.core.databuffer import DataBuffer, RingDataBuffer
+
+
+class TestRingDataBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.db = RingDataBuffer(capacity=16)
+
+    def test_is_data_buffer(self):
+        self.assertIsInstance(self.db, DataBuffer)
+
+    def test_ulong(self):
+        self.assertIsNone(self.db.peek_ulong())
+        with self.assertRaises(ValueError):
+            self.db.read_ulong()
+        with self.assertRaises(AttributeError):
+            self.db.append_ulong(-1)
+
+        self.assertEqual(self.db.append_ulong(1234), struct.pack("!L", 1234))
+        self.assertEqual(self.db.peek_ulong(), 1234)
+        self.assertEqual(self.db.data_size(), 4)
+        self.assertEqual(self.db.read_ulong(), 1234)
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_bytes(self):
+        self.db.append_bytes(b"abcdef")
+        with self.assertRaises(AttributeError):
+            self.db.peek_bytes(7)
+        self.assertEqual(self.db.peek_bytes(3), b"abc")
+        self.assertEqual(self.db.read_bytes(2), b"ab")
+        self.assertEqual(self.db.buffered_data, b"cdef")
+        self.assertEqual(self.db.read_all(), b"cdef")
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_clear_buffer(self):
+        self.db.append_bytes(b"abc")
+        self.db.clear_buffer()
+        self.assertEqual(self.db.data_size(), 0)
+        self.assertEqual(self.db.buffered_data, b"")
+
+    def test_len_prefixed_bytes(self):
+        self.assertIsNone(self.db.read_len_prefixed_bytes())
+        self.db.append_len_prefixed_bytes(b"first")
+        self.db.append_len_prefixed_bytes(b"second")
+        self.db.append_ulong(10)
+        self.db.append_bytes(b"inc")
+
+        self.assertEqual(self.db.read_len_prefixed_bytes(), b"first")
+        self.assertEqual(list(self.db.get_len_prefixed_bytes()), [b"second"])
+        self.assertEqual(self.db.data_size(), 7)
+
+        self.db.append_bytes(b"omplete")
+        self.assertEqual(list(self.db.get_len_prefixed_bytes()),
+                         [b"incomplete"])
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_len_prefixed_views(self):
+        self.db.append_len_prefixed_bytes(b"first")
+        self.db.append_len_prefixed_bytes(b"second")
+        views = self.db.get_len_prefixed_views()
+        view = next(views)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(view, b"first")
+        self.assertEqual(bytes(next(views)), b"second")
+        self.assertEqual(list(views), [])
+
+    def test_growth_with_outstanding_views(self):
+        self.db.append_len_prefixed_bytes(b"x" * 10)
+        view = self.db.read_len_prefixed_view()
+        self.db.append_bytes(b"y" * 100)
+        self.assertEqual(self.db.read_all(), b"y" * 100)
+        self.assertEqual(view, b"x" * 10)
+
+    def test_fragmented_stream(self):
+        rand = random.Random(0)
+        frames = [
+            bytes(rand.randrange(256) for _ in range(rand.randint(1, 200)))
+            for _ in range(50)
+        ]
+        stream = b"".join(struct.pack("!L", len(f)) + f for f in frames)
+
+        received = []
+        pos = 0
+        while pos < len(stream):
+            step = rand.randint(1, 37)
+            self.db.append_bytes(stream[pos:pos + step])
+            pos += step
+            received.extend(
+                bytes(v) for v in self.db.get_len_prefixed_views())
+
+        self.assertEqual(received, frames)
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_storage_shrinks_when_idle(self):
+        self.db.append_bytes(b"z" * (RingDataBuffer.MAX_IDLE_CAPACITY + 1))
+        self.db.read_all()
+        self.db.append_bytes(b"a")
+        self.db.read_bytes(1)
+        # pylint: disable=protected-access
+        self.assertEqual(len(self.db._buf), 16)
@@ -98,6 +98,32 @@ class TestAESFileEncryptor(TestDirFixture):
 
         self.assertFalse(decrypted)
 
+    def test_streams(self):
+        """ Test streams compatibility with file encryption """
+        secret = FileEncryptor.gen_secret(10, 20)
+        decrypted_path = self.test_file_path + ".dec"
+
+        with open(self.test_file_path, 'rb') as f:
+            data = f.read()
+
+        for size in [0, 1, 15, 16, 17, len(data)]:
+            with open(self.enc_file_path, 'wb') as f:
+                writer = AESFileEncryptor.encrypting_writer(f, secret)
+                for i in range(0, size, 7):
+                    writer.write(data[i:min(i + 7, size)])
+                writer.close()
+
+            AESFileEncryptor.decrypt(self.enc_file_path,
+                                     decrypted_path,
+                                     secret)
+            with open(decrypted_path, 'rb') as f:
+                self.assertEqual(f.read(), data[:size])
+
+            with open(self.enc_file_path, 'rb') as f:
+                reader = AESFileEncryptor.decrypting_reader(f, secret)
+                self.assertEqual(reader.read(5), data[:min(5, size)])
+                self.assertEqual(reader.read(), data[5:size])
+
     def test_get_key_and_iv(self):
         """ Test helper methods: gen_salt and get_key_and_iv """
         salt = AESFileEncryptor.gen_salt(AESFileEncryptor.block_size)
@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+from twisted.internet.defer import CancelledError
+
+from golem.core import simplechallenge
+from golem.core.deferred import sync_wait
+from golem.core.keysauth import sha2
+from golem.tools.testwithreactor import TestWithReactor
+
+CHALLENGES = [
+    '',
+    'challenge',
+    'zażółć gęślą jaźń',
+    'x' * 1000 + '1234567890',
+]
+
+
+def legacy_solve_challenge(challenge, difficulty):
+    """ Former search, hashing the whole challenge for every solution """
+    min_hash = pow(2, 256 - difficulty)
+    solution = 0
+    while sha2(challenge + str(solution)) > min_hash:
+        solution += 1
+    return solution
+
+
+class TestFindSolution(TestCase):
+
+    def test_equivalence(self):
+        for challenge in CHALLENGES:
+            for difficulty in range(0, 11):
+                solution = simplechallenge.find_solution(challenge, difficulty)
+                assert solution == \
+                    legacy_solve_challenge(challenge, difficulty)
+                assert simplechallenge.accept_challenge(
+                    challenge, solution, difficulty)
+
+    def test_created_challenge(self):
+        challenge = simplechallenge.create_challenge(
+            [['node_id', 'previous challenge']], 'last challenge')
+        solution, _ = simplechallenge.solve_challenge(challenge, 8)
+        assert solution == legacy_solve_challenge(challenge, 8)
+
+    def test_difficulty_not_positive(self):
+        for difficulty in (0, -3):
+            assert simplechallenge.find_solution('challenge', difficulty) == 0
+            assert legacy_solve_challenge('challenge', difficulty) == 0
+
+    def test_range(self):
+        solution = simplechallenge.find_solution('challenge', 6)
+        assert simplechallenge.find_solution(
+            'challenge', 6, start=0, count=solution) is None
+        assert simplechallenge.find_solution(
+            'challenge', 6, start=solution, count=1) == solution
+
+        following = simplechallenge.find_solution(
+            'challenge', 6, start=solution + 1)
+        assert following > solution
+        assert simplechallenge.accept_challenge('challenge', following, 6)
+
+
+class TestChallengeSolver(TestWithReactor):
+
+    def test_inline(self):
+        solver = simplechallenge.ChallengeSolver('challenge', 8)
+        deferred = solver.start()
+        assert deferred.called
+        solution, _ = sync_wait(deferred)
+        assert solution == legacy_solve_challenge('challenge', 8)
+
+    def test_process(self):
+        difficulty = simplechallenge.INLINE_DIFFICULTY + 2
+        progress = []
+        solver = simplechallenge.ChallengeSolver(
+            'challenge', difficulty, progress.append)
+
+        solution, _ = sync_wait(solver.start(), 60)
+        assert solution == \
+            simplechallenge.find_solution('challenge', difficulty)
+        assert simplechallenge.accept_challenge(
+            'challenge', solution, difficulty)
+        assert progress == [
+            simplechallenge.SOLVE_BATCH * (i + 1)
+            for i in range(solution // simplechallenge.SOLVE_BATCH)
+        ]
+
+    def test_cancel(self):
+        solver = simplechallenge.ChallengeSolver('challenge', 128)
+        deferred = solver.start()
+        deferred.cancel()
+        with self.assertRaises(CancelledError):
+            sync_wait(deferred, 60)
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from golem.database import DatabaseExecutor
+from golem.model import ComputingNode, db
+from golem.testutils import pytest_database_fixture  # noqa pylint: disable=unused-import
+
+
+@pytest.mark.usefixtures('pytest_database_fixture')
+class TestDatabaseExecutor:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, event_loop):  # fixture: use the same event loop
+        self.executor = DatabaseExecutor(db, read_workers=1)
+        yield
+        self.executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_read(self):
+        ComputingNode.create(node_id='node', name='name')
+
+        node = await self.executor.read(
+            ComputingNode.get, ComputingNode.node_id == 'node')
+        assert node.name == 'name'
+
+    @pytest.mark.asyncio
+    async def test_read_lazy_query(self):
+        ComputingNode.create(node_id='node', name='name')
+
+        nodes = await self.executor.read(list, ComputingNode.select())
+        assert [node.node_id for node in nodes] == ['node']
+
+    @pytest.mark.asyncio
+    async def test_write(self):
+        node = await self.executor.write(
+            ComputingNode.create, node_id='node', name='name')
+        assert node.node_id == 'node'
+        assert ComputingNode.get(ComputingNode.node_id == 'node').name == 'name'
+
+    @pytest.mark.asyncio
+    async def test_write_rolled_back(self):
+        def create_and_fail():
+            ComputingNode.create(node_id='node', name='name')
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            await self.executor.write(create_and_fail)
+        assert not ComputingNode.select().exists()
+
+    @pytest.mark.asyncio
+    async def test_threads(self):
+        def thread_name():
+            return threading.current_thread().name
+
+        reader = await self.executor.read(thread_name)
+        writers = {await self.executor.write(thread_name) for _ in range(3)}
+        assert reader.startswith('db-read')
+        assert len(writers) == 1
+        assert writers.pop().startswith('db-write')
+
+    @pytest.mark.asyncio
+    async def test_reinitialized_database(self, tmpdir):
+        await self.executor.write(
+            ComputingNode.create, node_id='node', name='name')
+        assert await self.executor.read(ComputingNode.select().exists)
+
+        # Worker threads do not keep connections to the former file
+        db.init(str(tmpdir / 'other.db'))
+        db.create_tables([ComputingNode])
+        assert not await self.executor.read(ComputingNode.select().exists)
@@ -54,5 +54,6 @@ class TestToDict(TestCase):
         self.assertEqual(Path(_work_dirs[0]), Path('/tmp/golem'))
         self.assertEqual(config_dict, {
             'memory_mb': 2137,
-            'cpu_count': 12
+            'cpu_count': 12,
+            'container_pool_size': 0,
         })
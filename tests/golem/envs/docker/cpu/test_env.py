@@ -664,4 +664,5 @@ class TestCreateContainerConfig(TestDockerCPUEnv):
         runtime.assert_called_once_with(
             container_config,
             ANY,
-            runtime_logger=ANY)
+            runtime_logger=ANY,
+            container_pool=None)
@@ -1,7 +1,6 @@
-from threading import Thread
+import threading
 from unittest.mock import Mock, patch as _patch, call, ANY
 
-import pytest
 from docker.errors import APIError
 from twisted.trial.unittest import TestCase
 
@@ -9,6 +8,7 @@ from golem.envs import RuntimeStatus
 from golem.envs.docker import DockerRuntimePayload
 from golem.envs.docker.cpu import DockerCPURuntime, DockerOutput, DockerInput, \
     InputSocket
+from golem.envs.docker.pool import ContainerPool
 
 
 def patch(name: str, *args, **kwargs):
@@ -54,6 +54,9 @@ class TestDockerCPURuntime(TestCase):
 
         self.logger = self._patch_async('logger')
         self.client = self._patch_async('local_client').return_value
+        self.events_monitor = \
+            self._patch_async('DockerEventsMonitor').instance.return_value
+        self.looping_call = self._patch_async('LoopingCall')
         self.container_config = self.client.create_container_config()
         self.runtime = DockerCPURuntime(self.container_config, Mock())
 
@@ -175,29 +178,72 @@ class TestUpdateStatus(TestDockerCPURuntime):
             None, "Unexpected container status: '(╯°□°)╯︵ ┻━┻'.")
 
 
-class TestUpdateStatusLoop(TestDockerCPURuntime):
+@patch_runtime('_update_status')
+@patch_runtime('_error_occurred')
+@patch_runtime('_stopped')
+class TestOnContainerEvent(TestDockerCPURuntime):
 
-    # Timeout not to enter an infinite loop if there's a bug in the method
-    @pytest.mark.timeout(5.0)
-    @patch('sleep')
-    @patch_runtime('_update_status')
-    def test_not_running(self, update_status, sleep):
-        self.runtime._update_status_loop()
+    def setUp(self):
+        super().setUp()
+        self.runtime._container_id = "Id"
+        self.cgroup_reader = self._patch_async('cgroup_reader')
+
+    def test_not_running(self, stopped, error_occurred, update_status):
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._on_container_event('die', {'exitCode': '0'})
+        stopped.assert_not_called()
+        error_occurred.assert_not_called()
         update_status.assert_not_called()
-        sleep.assert_not_called()
 
-    # Timeout not to enter an infinite loop if there's a bug in the method
-    @pytest.mark.timeout(5.0)
-    @patch('sleep')
-    @patch_runtime('_update_status')
-    def test_updated(self, update_status, sleep):
+    def test_start(self, stopped, error_occurred, update_status):
         self.runtime._set_status(RuntimeStatus.RUNNING)
-        update_status.side_effect = \
-            lambda: self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._on_container_event('start', {})
+        stopped.assert_not_called()
+        error_occurred.assert_not_called()
+        update_status.assert_not_called()
 
-        self.runtime._update_status_loop()
-        update_status.assert_called_once()
-        sleep.assert_called_once_with(DockerCPURuntime.STATUS_UPDATE_INTERVAL)
+    def test_exited_ok(self, stopped, error_occurred, update_status):
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._on_container_event('die', {'exitCode': '0'})
+        stopped.assert_called_once()
+        error_occurred.assert_not_called()
+        update_status.assert_not_called()
+        self.events_monitor.unregister.assert_called_once_with("Id")
+
+    def test_exited_usage(self, stopped, *_):
+        reader = self.cgroup_reader.return_value
+        reader.usage.return_value = {'cpu_time': 1.5}
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._on_container_event('die', {'exitCode': '0'})
+        stopped.assert_called_once()
+        self.cgroup_reader.assert_called_once_with("Id")
+
+        # The cgroup is removed once the container has stopped
+        reader.usage.side_effect = FileNotFoundError
+        self.assertEqual(self.runtime.usage_counters(), {'cpu_time': 1.5})
+
+    def test_exited_error(self, stopped, error_occurred, _):
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._on_container_event('die', {'exitCode': '2'})
+        stopped.assert_not_called()
+        error_occurred.assert_called_once_with(
+            None, "Container stopped with exit code 2.")
+
+    def test_out_of_memory(self, stopped, error_occurred, _):
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._on_container_event('oom', {})
+        error_occurred.assert_not_called()
+        self.runtime._on_container_event('die', {'exitCode': '137'})
+        stopped.assert_not_called()
+        error_occurred.assert_called_once_with(
+            None, "Container ran out of memory (exit code 137).")
+
+    def test_no_exit_code(self, stopped, error_occurred, update_status):
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._on_container_event('die', {})
+        stopped.assert_not_called()
+        error_occurred.assert_not_called()
+        update_status.assert_called_once_with()
 
 
 class TestPrepare(TestDockerCPURuntime):
@@ -344,6 +390,49 @@ class TestPrepare(TestDockerCPURuntime):
         return deferred
 
 
+class TestPreparePooled(TestDockerCPURuntime):
+
+    def setUp(self):
+        super().setUp()
+        self.pool = Mock(spec=ContainerPool)
+        self.runtime._container_pool = self.pool
+        self.input_socket = self._patch_async('InputSocket')
+        self.prepared = self._patch_runtime_async('_prepared')
+
+    def test_hit(self):
+        self.pool.claim.return_value = "Pooled"
+        deferred = self.runtime.prepare()
+
+        def _check(_):
+            self.pool.claim.assert_called_once_with(self.container_config)
+            self.client.create_container_from_config.assert_not_called()
+            self.assertEqual(self.runtime._container_id, "Pooled")
+            self.client.attach_socket.assert_called_once_with(
+                "Pooled", params={"stdin": True, "stream": True})
+            self.prepared.assert_called_once()
+
+        deferred.addCallback(_check)
+        return deferred
+
+    def test_miss(self):
+        self.pool.claim.return_value = None
+        self.client.create_container_from_config.return_value = {
+            "Id": "Id",
+            "Warnings": None
+        }
+        deferred = self.runtime.prepare()
+
+        def _check(_):
+            self.pool.claim.assert_called_once_with(self.container_config)
+            self.client.create_container_from_config.assert_called_once_with(
+                self.container_config)
+            self.assertEqual(self.runtime._container_id, "Id")
+            self.prepared.assert_called_once()
+
+        deferred.addCallback(_check)
+        return deferred
+
+
 class TestCleanup(TestDockerCPURuntime):
 
     def test_invalid_status(self):
@@ -398,8 +487,7 @@ class TestStart(TestDockerCPURuntime):
 
     def setUp(self):
         super().setUp()
-        self.update_status_loop = \
-            self._patch_runtime_async('_update_status_loop')
+        self.update_status = self._patch_runtime_async('_update_status')
 
     def test_invalid_status(self):
         self._generic_test_invalid_status(
@@ -419,9 +507,13 @@ class TestStart(TestDockerCPURuntime):
         deferred = self.assertFailure(deferred, APIError)
 
         def _check(_):
-            self.assertIsNone(self.runtime._status_update_thread)
             self.client.start.assert_called_once_with("Id")
-            self.update_status_loop.assert_not_called()
+            self.events_monitor.register.assert_called_once_with(
+                "Id",
+                on_event=self.runtime._on_container_event,
+                poll=self.runtime._update_status)
+            self.events_monitor.unregister.assert_called_once_with("Id")
+            self.update_status.assert_not_called()
             started.assert_not_called()
             error_occurred.assert_called_once_with(
                 error, "Starting container 'Id' failed.")
@@ -443,14 +535,40 @@ class TestStart(TestDockerCPURuntime):
             started.assert_called_once()
             error_occurred.assert_not_called()
 
-            self.assertIsInstance(self.runtime._status_update_thread, Thread)
-            self.runtime._status_update_thread.join(0.1)
-            self.update_status_loop.assert_called_once()
+            self.events_monitor.register.assert_called_once_with(
+                "Id",
+                on_event=self.runtime._on_container_event,
+                poll=self.runtime._update_status)
+            self.events_monitor.unregister.assert_not_called()
+            self.looping_call.assert_called_once_with(
+                self.runtime._sample_usage)
+            self.looping_call().start.assert_called_once_with(
+                DockerCPURuntime.USAGE_SAMPLE_INTERVAL)
+            # In case the container died before the runtime was running
+            self.update_status.assert_called_once_with()
 
         deferred.addCallback(_check)
 
         return deferred
 
+    def test_status_checked_off_reactor(self):
+        self.runtime._set_status(RuntimeStatus.PREPARED)
+        self.runtime._container_id = "Id"
+        self._patch_runtime_async('_started')
+        threads = []
+        self.update_status.side_effect = \
+            lambda: threads.append(threading.current_thread())
+
+        deferred = self.runtime.start()
+
+        def _check(_):
+            # Inspecting the container is a blocking Docker API call
+            self.assertEqual(len(threads), 1)
+            self.assertIsNot(threads[0], threading.main_thread())
+
+        deferred.addCallback(_check)
+        return deferred
+
 
 class TestStop(TestDockerCPURuntime):
 
@@ -463,8 +581,6 @@ class TestStop(TestDockerCPURuntime):
         self.runtime._set_status(RuntimeStatus.RUNNING)
         self.runtime._container_id = "Id"
         self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = False
         error = APIError("test")
         self.client.stop.side_effect = error
         stopped = self._patch_runtime_async('_stopped')
@@ -474,7 +590,6 @@ class TestStop(TestDockerCPURuntime):
 
         def _check(_):
             self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
             self.runtime._stdin_socket.close.assert_called_once()
             stopped.assert_not_called()
             error_occurred.assert_called_once_with(
@@ -483,42 +598,18 @@ class TestStop(TestDockerCPURuntime):
         deferred.addCallback(_check)
         return deferred
 
-    def test_failed_to_join_status_update_thread(self):
-        self.runtime._set_status(RuntimeStatus.RUNNING)
-        self.runtime._container_id = "Id"
-        self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = True
-        stopped = self._patch_runtime_async('_stopped')
-        error_occurred = self._patch_runtime_async('_error_occurred')
-
-        deferred = self.runtime.stop()
-
-        def _check(_):
-            self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
-            self.runtime._stdin_socket.close.assert_called_once()
-            self.logger.warning.assert_called_once()
-            stopped.assert_called_once()
-            error_occurred.assert_not_called()
-
-        deferred.addCallback(_check)
-        return deferred
-
     def test_ok(self):
         self.runtime._set_status(RuntimeStatus.RUNNING)
         self.runtime._container_id = "Id"
         self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = False
         stopped = self._patch_runtime_async('_stopped')
         error_occurred = self._patch_runtime_async('_error_occurred')
 
         deferred = self.runtime.stop()
 
         def _check(_):
+            self.events_monitor.unregister.assert_called_once_with("Id")
             self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
             self.runtime._stdin_socket.close.assert_called_once()
             self.logger.warning.assert_not_called()
             stopped.assert_called_once()
@@ -684,3 +775,57 @@ class TestGetRawOutput(TestDockerCPURuntime):
             logs=True,
             stream=False
         )
+
+
+class TestUsageCounters(TestDockerCPURuntime):
+
+    def test_no_container(self):
+        self.assertEqual(self.runtime.usage_counters(), {})
+
+    @patch('cgroup_reader', return_value=None)
+    def test_cgroup_not_found(self, cgroup_reader):
+        self.runtime._container_id = "Id"
+        self.assertEqual(self.runtime.usage_counters(), {})
+        self.assertEqual(self.runtime.usage_counters(), {})
+        self.assertEqual(cgroup_reader.call_count, 2)
+
+    @patch('cgroup_reader')
+    def test_ok(self, cgroup_reader):
+        self.runtime._container_id = "Id"
+        reader = cgroup_reader.return_value
+        reader.usage.return_value = {'cpu_time': 1.5}
+
+        self.assertEqual(self.runtime.usage_counters(), {'cpu_time': 1.5})
+        cgroup_reader.assert_called_once_with("Id")
+
+    @patch('cgroup_reader')
+    def test_container_gone(self, cgroup_reader):
+        self.runtime._container_id = "Id"
+        reader = cgroup_reader.return_value
+        reader.usage.return_value = {'cpu_time': 1.5}
+        self.runtime.usage_counters()
+
+        reader.usage.side_effect = FileNotFoundError
+        self.assertEqual(self.runtime.usage_counters(), {'cpu_time': 1.5})
+        cgroup_reader.assert_called_once_with("Id")
+
+
+class TestSampleUsage(TestDockerCPURuntime):
+
+    def setUp(self):
+        super().setUp()
+        self.runtime._container_id = "Id"
+        self.runtime._usage_sampler = self.looping_call()
+        self.usage_counters = self._patch_runtime_async('usage_counters')
+
+    def test_running(self):
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        self.runtime._sample_usage()
+        self.usage_counters.assert_called_once_with()
+        self.runtime._usage_sampler.stop.assert_not_called()
+
+    def test_not_running(self):
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._sample_usage()
+        self.usage_counters.assert_not_called()
+        self.runtime._usage_sampler.stop.assert_called_once_with()
@@ -80,6 +80,7 @@ class TestToDict(TestCase):
         self.assertEqual(config_dict, {
             'memory_mb': 2137,
             'cpu_count': 12,
+            'container_pool_size': 0,
             'gpu_vendor': 'TEST',
             'gpu_devices': ['device_1', 'device_2'],
             'gpu_caps': ['compute'],
@@ -0,0 +1,145 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from golem.envs.docker.cgroups import (
+    CgroupV1Reader,
+    CgroupV2Reader,
+    cgroup_reader,
+    CPU_TIME,
+    IO_READ_BYTES,
+    IO_WRITE_BYTES,
+    MEMORY_PEAK,
+)
+
+CONTAINER_ID = 'abc123'
+
+
+class CgroupFixture(TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+
+    def _write(self, path: str, content: str) -> Path:
+        file_path = self.root / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+        return file_path
+
+
+class TestCgroupV1(CgroupFixture):
+
+    def _create_tree(self, container_dir=f'docker/{CONTAINER_ID}',
+                     cpu_controller='cpu,cpuacct'):
+        self._write(
+            f'{cpu_controller}/{container_dir}/cpuacct.usage',
+            '2500000000\n')
+        self._write(
+            f'memory/{container_dir}/memory.max_usage_in_bytes',
+            '104857600\n')
+        self._write(
+            f'blkio/{container_dir}/blkio.throttle.io_service_bytes',
+            '8:0 Read 4096\n'
+            '8:0 Write 1024\n'
+            '8:0 Sync 5120\n'
+            '8:0 Async 0\n'
+            '8:0 Total 5120\n'
+            '8:16 Read 100\n'
+            '8:16 Write 0\n'
+            'Total 5220\n')
+
+    def test_cgroupfs_driver(self):
+        self._create_tree()
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        self.assertIsInstance(reader, CgroupV1Reader)
+        self.assertEqual(reader.usage(), {
+            CPU_TIME: 2.5,
+            MEMORY_PEAK: 104857600,
+            IO_READ_BYTES: 4196,
+            IO_WRITE_BYTES: 1024,
+        })
+
+    def test_systemd_driver(self):
+        self._create_tree(
+            container_dir=f'system.slice/docker-{CONTAINER_ID}.scope',
+            cpu_controller='cpuacct')
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        self.assertEqual(reader.usage()[CPU_TIME], 2.5)
+
+    def test_blkio_fallback(self):
+        self._create_tree()
+        self._write(
+            f'blkio/docker/{CONTAINER_ID}/blkio.throttle.io_service_bytes',
+            'Total 0\n')
+        self._write(
+            f'blkio/docker/{CONTAINER_ID}/blkio.io_service_bytes',
+            '8:0 Read 10\n8:0 Write 20\nTotal 30\n')
+        usage = cgroup_reader(CONTAINER_ID, root=self.root).usage()
+        self.assertEqual(usage[IO_READ_BYTES], 10)
+        self.assertEqual(usage[IO_WRITE_BYTES], 20)
+
+    def test_not_found(self):
+        self._create_tree(container_dir='docker/other')
+        self.assertIsNone(cgroup_reader(CONTAINER_ID, root=self.root))
+
+    def test_container_gone(self):
+        self._create_tree()
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        shutil.rmtree(str(self.root / 'memory'))
+        with self.assertRaises(OSError):
+            reader.usage()
+
+
+class TestCgroupV2(CgroupFixture):
+
+    def setUp(self):
+        super().setUp()
+        self._write('cgroup.controllers', 'cpu io memory pids\n')
+
+    def _create_tree(self, container_dir=f'docker/{CONTAINER_ID}'):
+        self._write(
+            f'{container_dir}/cpu.stat',
+            'usage_usec 1500000\n'
+            'user_usec 1000000\n'
+            'system_usec 500000\n')
+        self._write(f'{container_dir}/memory.current', '1048576\n')
+        self._write(
+            f'{container_dir}/io.stat',
+            '8:0 rbytes=4096 wbytes=1024 rios=1 wios=1 dbytes=0 dios=0\n'
+            '8:16 rbytes=100 wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n')
+        return self.root / container_dir
+
+    def test_cgroupfs_driver(self):
+        path = self._create_tree()
+        (path / 'memory.peak').write_text('2097152\n')
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        self.assertIsInstance(reader, CgroupV2Reader)
+        self.assertEqual(reader.usage(), {
+            CPU_TIME: 1.5,
+            MEMORY_PEAK: 2097152,
+            IO_READ_BYTES: 4196,
+            IO_WRITE_BYTES: 1024,
+        })
+
+    def test_systemd_driver(self):
+        self._create_tree(
+            container_dir=f'system.slice/docker-{CONTAINER_ID}.scope')
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        self.assertEqual(reader.usage()[CPU_TIME], 1.5)
+
+    def test_peak_not_available(self):
+        path = self._create_tree()
+        reader = cgroup_reader(CONTAINER_ID, root=self.root)
+        self.assertEqual(reader.usage()[MEMORY_PEAK], 1048576)
+
+        (path / 'memory.current').write_text('3145728\n')
+        self.assertEqual(reader.usage()[MEMORY_PEAK], 3145728)
+        # The highest sample is kept
+        (path / 'memory.current').write_text('1024\n')
+        self.assertEqual(reader.usage()[MEMORY_PEAK], 3145728)
+
+    def test_not_found(self):
+        self._create_tree(container_dir='docker/other')
+        self.assertIsNone(cgroup_reader(CONTAINER_ID, root=self.root))
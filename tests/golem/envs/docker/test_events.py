@@ -0,0 +1,156 @@
+from queue import Queue
+from threading import Event
+from unittest import TestCase
+from unittest.mock import Mock
+
+from golem.envs.docker.events import DockerEventsMonitor
+
+TIMEOUT = 5.0
+
+
+class FakeEventsStream:
+
+    _CLOSED = object()
+
+    def __init__(self):
+        self._queue = Queue()
+        self.closed = Event()
+
+    def push(self, event):
+        self._queue.put(event)
+
+    def close(self):
+        self.closed.set()
+        self._queue.put(self._CLOSED)
+
+    def __iter__(self):
+        while True:
+            event = self._queue.get()
+            if event is self._CLOSED:
+                return
+            yield event
+
+
+class FakeDockerClient:
+
+    def __init__(self):
+        self.streams = Queue()
+        self.filters = None
+
+    def events(self, decode, filters):
+        assert decode
+        self.filters = filters
+        stream = self.streams.get(timeout=TIMEOUT)
+        if isinstance(stream, Exception):
+            raise stream
+        return stream
+
+
+def die_event(container_id, exit_code=0):
+    return {
+        'Type': 'container',
+        'Action': 'die',
+        'Actor': {
+            'ID': container_id,
+            'Attributes': {'exitCode': str(exit_code), 'image': 'test'},
+        },
+    }
+
+
+class TestDockerEventsMonitor(TestCase):
+
+    def setUp(self):
+        self.client = FakeDockerClient()
+        self.monitor = DockerEventsMonitor(client_factory=lambda: self.client)
+        self.monitor.POLL_INTERVAL = 0.01
+        self.monitor.RECONNECT_INTERVAL = 0.01
+        self.addCleanup(self.monitor.stop)
+
+    def _register(self, container_id):
+        received = Queue()
+        polled = Event()
+        self.monitor.register(
+            container_id,
+            on_event=lambda action, attrs: received.put((action, attrs)),
+            poll=polled.set)
+        return received, polled
+
+    def test_dispatch(self):
+        stream = FakeEventsStream()
+        self.client.streams.put(stream)
+        received, polled = self._register('c1')
+        # Containers are polled once connected, events could have been missed
+        self.assertTrue(polled.wait(TIMEOUT))
+        self.assertTrue(self.monitor.connected)
+        self.assertEqual(self.client.filters, {
+            'type': 'container',
+            'event': ['start', 'die', 'oom'],
+        })
+
+        stream.push(die_event('other'))
+        stream.push(die_event('c1', exit_code=2))
+        self.assertEqual(
+            received.get(timeout=TIMEOUT),
+            ('die', {'exitCode': '2', 'image': 'test'}))
+        self.assertTrue(received.empty())
+
+    def test_unregister(self):
+        stream = FakeEventsStream()
+        self.client.streams.put(stream)
+        received, polled = self._register('c1')
+        other_received, _ = self._register('c2')
+        self.assertTrue(polled.wait(TIMEOUT))
+
+        self.monitor.unregister('c1')
+        stream.push(die_event('c1'))
+        stream.push(die_event('c2'))
+        self.assertEqual(other_received.get(timeout=TIMEOUT)[0], 'die')
+        self.assertTrue(received.empty())
+
+    def test_callback_error(self):
+        stream = FakeEventsStream()
+        self.client.streams.put(stream)
+        polled = Event()
+        self.monitor.register(
+            'c1', on_event=Mock(side_effect=ValueError), poll=polled.set)
+        received, _ = self._register('c2')
+        self.assertTrue(polled.wait(TIMEOUT))
+
+        stream.push(die_event('c1'))
+        stream.push(die_event('c2'))
+        self.assertEqual(received.get(timeout=TIMEOUT)[0], 'die')
+
+    def test_fallback_polling(self):
+        self.client.streams.put(ConnectionError('daemon unavailable'))
+        self.monitor.RECONNECT_INTERVAL = TIMEOUT * 10
+        polls = Queue()
+        self.monitor.register(
+            'c1', on_event=Mock(), poll=lambda: polls.put(None))
+
+        for _ in range(3):
+            polls.get(timeout=TIMEOUT)
+        self.assertFalse(self.monitor.connected)
+
+    def test_reconnect(self):
+        first_stream = FakeEventsStream()
+        second_stream = FakeEventsStream()
+        self.client.streams.put(first_stream)
+        self.client.streams.put(second_stream)
+        received, polled = self._register('c1')
+        self.assertTrue(polled.wait(TIMEOUT))
+
+        polled.clear()
+        first_stream.close()
+        self.assertTrue(polled.wait(TIMEOUT))
+        second_stream.push(die_event('c1'))
+        self.assertEqual(received.get(timeout=TIMEOUT)[0], 'die')
+
+    def test_stop(self):
+        stream = FakeEventsStream()
+        self.client.streams.put(stream)
+        _, polled = self._register('c1')
+        self.assertTrue(polled.wait(TIMEOUT))
+
+        self.monitor.stop()
+        self.assertTrue(stream.closed.is_set())
+        self.assertFalse(self.monitor.connected)
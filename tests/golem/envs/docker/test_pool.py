@@ -0,0 +1,123 @@
+from itertools import count
+from unittest import TestCase
+from unittest.mock import patch
+
+from docker.errors import APIError
+
+from golem.envs.docker.pool import ContainerPool
+
+
+class FakeDockerClient:
+
+    def __init__(self):
+        self._ids = count()
+        self.created = []
+        self.removed = []
+
+    def create_container_from_config(self, config):
+        container_id = f"container-{next(self._ids)}"
+        self.created.append((container_id, config))
+        return {"Id": container_id, "Warnings": None}
+
+    def remove_container(self, container_id):
+        self.removed.append(container_id)
+
+
+CONFIG_A = {'image': 'golemfactory/a:1.0', 'host_config': {'mem_limit': '1g'}}
+CONFIG_B = {'image': 'golemfactory/a:1.0', 'host_config': {'mem_limit': '2g'}}
+
+
+@patch('golem.envs.docker.pool.monotonic')
+class TestContainerPool(TestCase):
+
+    def setUp(self):
+        self.client = FakeDockerClient()
+        self.pool = ContainerPool(
+            max_size=2,
+            max_idle=10.0,
+            client_factory=lambda: self.client)
+
+    def test_claim_miss(self, monotonic):
+        monotonic.return_value = 0.0
+        self.assertIsNone(self.pool.claim(CONFIG_A))
+        self.assertEqual(self.pool.stats()['misses'], 1)
+
+    def test_claim_hit(self, monotonic):
+        monotonic.side_effect = [0.0, 1.5, 1.5, 1.5, 2.0, 2.0]
+        self.pool.fill(CONFIG_A)
+        self.assertEqual(len(self.pool), 1)
+
+        self.assertIsNone(self.pool.claim(CONFIG_B))
+        self.assertEqual(self.pool.claim(CONFIG_A), 'container-0')
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.pool.stats(), {
+            'size': 0,
+            'hits': 1,
+            'misses': 1,
+            'hit_rate': 0.5,
+            'startup_time_saved': 1.5,
+        })
+        # Claimed containers are removed by their runtimes
+        self.assertEqual(self.client.removed, [])
+
+    def test_config_key_order(self, monotonic):
+        monotonic.return_value = 0.0
+        self.pool.fill({'image': 'img', 'command': 'cmd'})
+        self.assertEqual(
+            self.pool.claim({'command': 'cmd', 'image': 'img'}),
+            'container-0')
+
+    def test_fill_once_per_config(self, monotonic):
+        monotonic.return_value = 0.0
+        self.pool.fill(CONFIG_A)
+        self.pool.fill(CONFIG_A)
+        self.assertEqual(len(self.client.created), 1)
+
+    def test_disabled(self, monotonic):
+        monotonic.return_value = 0.0
+        self.pool.max_size = 0
+        self.pool.fill(CONFIG_A)
+        self.assertEqual(self.client.created, [])
+
+    def test_evict_idle(self, monotonic):
+        monotonic.return_value = 0.0
+        self.pool.fill(CONFIG_A)
+        monotonic.return_value = 5.0
+        self.pool.fill(CONFIG_B)
+
+        monotonic.return_value = 11.0
+        self.assertIsNone(self.pool.claim(CONFIG_A))
+        self.assertEqual(self.client.removed, ['container-0'])
+        self.assertEqual(self.pool.claim(CONFIG_B), 'container-1')
+
+    def test_evict_least_recently_used(self, monotonic):
+        monotonic.return_value = 0.0
+        config_c = dict(CONFIG_A, command='cmd')
+        self.pool.fill(CONFIG_A)
+        self.pool.fill(CONFIG_B)
+        self.pool.fill(config_c)
+
+        self.assertEqual(self.client.removed, ['container-0'])
+        self.assertEqual(len(self.pool), 2)
+        self.assertIsNone(self.pool.claim(CONFIG_A))
+
+    def test_clear(self, monotonic):
+        monotonic.return_value = 0.0
+        self.pool.fill(CONFIG_A)
+        self.pool.fill(CONFIG_B)
+        self.client.remove_container = self._fail_once(
+            self.client.remove_container)
+
+        self.pool.clear()
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.client.removed, ['container-1'])
+
+    @staticmethod
+    def _fail_once(remove_container):
+        calls = count()
+
+        def _remove(container_id):
+            if next(calls) == 0:
+                raise APIError('test')
+            remove_container(container_id)
+        return _remove
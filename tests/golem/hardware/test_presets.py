@@ -141,3 +141,34 @@ class TestHardwarePresets(testutils.DatabaseFixture):
         self.assertEqual(preset.cpu_cores, 4)
         self.assertEqual(preset.memory, 4 * 1024 * 1024)
         self.assertEqual(preset.disk, 10 * 1024 * 1024)
+
+    def test_slots(self, *_):
+        config = ClientConfigDescriptor()
+        config.num_cores = 6
+        config.max_memory_size = 6 * MIN_MEMORY_SIZE
+        config.subtask_slots = 3
+
+        with patch('golem.hardware.presets.hardware.cpus',
+                   return_value=list(range(1, 8))):
+            slots = HardwarePresets.slots(config)
+
+        self.assertEqual(
+            [slot.cpus for slot in slots],
+            [[1, 2], [3, 4], [5, 6]])
+        self.assertEqual(
+            [slot.memory for slot in slots],
+            [2 * MIN_MEMORY_SIZE] * 3)
+
+    def test_slots_limited_by_resources(self, *_):
+        config = ClientConfigDescriptor()
+        config.num_cores = 4
+        config.max_memory_size = 2 * MIN_MEMORY_SIZE
+        config.subtask_slots = 8
+
+        self.assertEqual(len(HardwarePresets.slots(config)), 2)
+
+        config.max_memory_size = 16 * MIN_MEMORY_SIZE
+        self.assertEqual(len(HardwarePresets.slots(config)), 4)
+
+        config.subtask_slots = 0
+        self.assertEqual(len(HardwarePresets.slots(config)), 1)
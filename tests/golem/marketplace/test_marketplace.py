@@ -25,6 +25,10 @@ def _fake_get_efficacy():
     return A()
 
 
+def _fake_get_provider_scores(node_ids):
+    return {node_id: (0.0, _fake_get_efficacy()) for node_id in node_ids}
+
+
 class TestScalePrice(TestCase):
 
     def test_basic(self):
@@ -34,10 +38,8 @@ class TestScalePrice(TestCase):
         assert scale_price(5, 0) == sys.float_info.max
 
 
-@patch('golem.ranking.manager.database_manager.get_provider_efficiency',
-       Mock(return_value=0.0))
-@patch('golem.ranking.manager.database_manager.get_provider_efficacy',
-       Mock(return_value=_fake_get_efficacy()))
+@patch('golem.ranking.manager.database_manager.get_provider_scores',
+       _fake_get_provider_scores)
 class TestRequestorMarketStrategy(TestCase):
     TASK_A = 'aaa'
     PROVIDER_A = 'provider_a'
@@ -94,10 +96,8 @@ class TestRequestorMarketStrategy(TestCase):
         self.assertEqual(payment_computer(1000 * GWEI), 6000 * GWEI)
 
 
-@patch('golem.ranking.manager.database_manager.get_provider_efficiency',
-       Mock(return_value=0.0))
-@patch('golem.ranking.manager.database_manager.get_provider_efficacy',
-       Mock(return_value=_fake_get_efficacy()))
+@patch('golem.ranking.manager.database_manager.get_provider_scores',
+       _fake_get_provider_scores)
 class TestRequestorBrassMarketStrategy(TestCase):
     TASK_A = 'aaa'
 
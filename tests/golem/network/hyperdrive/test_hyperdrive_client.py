@@ -3,9 +3,12 @@ import uuid
 from unittest import mock, TestCase, skip
 
 from requests import HTTPError
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, fail, succeed
+from twisted.internet.error import ConnectionRefusedError
 from twisted.python import failure
+from twisted.web.client import ResponseNeverReceived
 
+from golem.core.golem_async import AsyncHTTPRequest
 from golem.network.hyperdrive.client import HyperdriveAsyncClient, \
     HyperdriveClient, HyperdriveClientOptions
 
@@ -24,7 +27,7 @@ response = {
 response_str = json.dumps(response)
 
 
-@mock.patch('golem.network.hyperdrive.client.requests.post',
+@mock.patch('golem.network.hyperdrive.client.requests.Session.post',
             return_value=mock.Mock(text=response_str,
                                    content=response_str.encode()))
 class TestHyperdriveClient(TestCase):
@@ -63,6 +66,17 @@ class TestHyperdriveClient(TestCase):
             client_options=self.client_options)
         assert result == response['hash']
 
+    def test_session(self, _):
+        client = HyperdriveClient(
+            **hyperdrive_client_kwargs(wrapped=False),
+            pool_size=4,
+            retries=2)
+        adapter = client._session.get_adapter(client._url)
+
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+        assert adapter.max_retries.read == 0
+
     def test_restore(self, _):
         client = self.get_client()
         result = client.restore(
@@ -91,7 +105,7 @@ class TestHyperdriveClient(TestCase):
         assert client.cancel(content_hash) == response_hash
 
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request(self, post, json_loads, _):
         client = self.get_client()
         resp = mock.Mock()
@@ -168,6 +182,64 @@ class TestHyperdriveClientAsync(TestCase):
         )
 
 
+class TestAsyncHTTPRequest(TestCase):
+
+    def setUp(self):
+        self.agent = mock.Mock()
+        patcher = mock.patch.object(AsyncHTTPRequest, 'agent', self.agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self):
+        with mock.patch('twisted.internet.task.deferLater',
+                        return_value=succeed(None)) as defer_later:
+            result = AsyncHTTPRequest.run(b'POST', b'uri', None, b'body')
+        return result, defer_later
+
+    def test_run(self):
+        response = mock.Mock()
+        self.agent.request.return_value = succeed(response)
+
+        result, _ = self._run()
+        assert result.result is response
+
+    def test_retry(self):
+        response = mock.Mock()
+        self.agent.request.side_effect = [
+            fail(ConnectionRefusedError()),
+            fail(ConnectionRefusedError()),
+            succeed(response),
+        ]
+
+        result, defer_later = self._run()
+        assert result.result is response
+        assert [c[0][1] for c in defer_later.call_args_list] == [
+            AsyncHTTPRequest.backoff_factor,
+            AsyncHTTPRequest.backoff_factor * 2,
+        ]
+
+    def test_retry_limit(self):
+        self.agent.request.side_effect = lambda *_: \
+            fail(ConnectionRefusedError())
+
+        result, _ = self._run()
+        errors = []
+        result.addErrback(errors.append)
+
+        assert isinstance(errors[0].value, ConnectionRefusedError)
+        assert self.agent.request.call_count == AsyncHTTPRequest.retries + 1
+
+    def test_no_retry_after_sent(self):
+        self.agent.request.return_value = fail(ResponseNeverReceived([]))
+
+        result, _ = self._run()
+        errors = []
+        result.addErrback(errors.append)
+
+        assert isinstance(errors[0].value, ResponseNeverReceived)
+        assert self.agent.request.call_count == 1
+
+
 class TestHyperdriveClientOptions(TestCase):
 
     def test_clone(self):
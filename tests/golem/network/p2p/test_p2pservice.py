@@ -14,6 +14,7 @@ from golem_messages.message import Disconnect
 from twisted.internet.tcp import EISCONN
 
 from golem.clientconfigdescriptor import ClientConfigDescriptor
+from golem.core import simplechallenge
 from golem.core.keysauth import KeysAuth
 from golem.diag.service import DiagnosticsOutputFormat
 from golem.model import KnownHosts
@@ -441,6 +442,17 @@ class TestP2PService(TestDatabaseWithReactor):
 
         assert len(self.service.challenge_history) == HISTORY_LEN
 
+    def test_solve_challenge(self):
+        difficulty = self.service._get_difficulty("KEY_ID")
+        challenge = self.service._get_challenge(self.keys_auth.key_id)
+        deferred = self.service.solve_challenge(
+            self.keys_auth.key_id, challenge, difficulty)
+        # The base difficulty is solved in place
+        assert deferred.called
+        solution = deferred.result
+        assert simplechallenge.accept_challenge(
+            challenge, solution, difficulty)
+
     def test_change_config_name(self):
         ccd = ClientConfigDescriptor()
         ccd.node_name = "test name change"
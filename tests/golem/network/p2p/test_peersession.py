@@ -13,6 +13,7 @@ from golem_messages import factories as msg_factories
 from golem_messages import message
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
 from pydispatch import dispatcher
+from twisted.internet.defer import succeed
 
 import golem
 from golem import clientconfigdescriptor
@@ -401,6 +402,26 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
         assert len(sent_tasks) == len(set(sent_tasks))
 
+    def test_react_to_tasks(self):
+        conn = MagicMock()
+        peer_session = PeerSession(conn)
+        peer_session.p2p_service.add_task_headers = Mock()
+        peer_session.disconnect = Mock()
+        msg = message.p2p.Tasks(tasks=[])
+
+        peer_session.p2p_service.add_task_headers.return_value = \
+            succeed([True, True])
+        peer_session._react_to_tasks(msg)
+        peer_session.p2p_service.add_task_headers.assert_called_once_with(
+            msg.tasks)
+        assert not peer_session.disconnect.called
+
+        peer_session.p2p_service.add_task_headers.return_value = \
+            succeed([True, False])
+        peer_session._react_to_tasks(msg)
+        peer_session.disconnect.assert_called_once_with(
+            message.base.Disconnect.REASON.BadProtocol)
+
     def test_react_to_get_tasks_none_list(self):
         conn = MagicMock()
         peer_session = PeerSession(conn)
@@ -0,0 +1,120 @@
+import threading
+from unittest import TestCase, mock
+
+from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
+
+from golem.network.transport.cryptopool import CryptoPool, OrderedJobQueue
+
+
+class FakePool:
+    def __init__(self):
+        self.deferreds = []
+
+    def run(self, fn, *args):
+        deferred = Deferred()
+        self.deferreds.append((deferred, fn, args))
+        return deferred
+
+    def finish(self, index):
+        deferred, fn, args = self.deferreds[index]
+        deferred.callback(fn(*args))
+
+
+class TestCryptoPool(TestCase):
+
+    def setUp(self):
+        self.reactor = mock.Mock()
+        self.reactor.callFromThread.side_effect = \
+            lambda fn, *args, **kwargs: fn(*args, **kwargs)
+        self.pool = CryptoPool(size=2, inline_threshold=100, max_pending=1,
+                               reactor=self.reactor)
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def test_should_offload(self):
+        self.assertFalse(self.pool.should_offload(None))
+        self.assertFalse(self.pool.should_offload(99))
+        self.assertTrue(self.pool.should_offload(100))
+        self.pool.pending = 1
+        self.assertFalse(self.pool.should_offload(100))
+
+    def test_should_offload_msg(self):
+        msg = object()
+        self.assertFalse(self.pool.should_offload_msg(msg))
+        self.pool.record_msg_size(msg, 100)
+        self.assertTrue(self.pool.should_offload_msg(object()))
+        self.pool.record_msg_size(msg, 10)
+        self.assertFalse(self.pool.should_offload_msg(msg))
+
+    def test_run(self):
+        done = threading.Event()
+        results = []
+
+        def _callback(result):
+            results.append((result, threading.current_thread()))
+            done.set()
+
+        deferred = self.pool.run(lambda x: threading.current_thread(), 1)
+        deferred.addCallback(_callback)
+        self.assertTrue(done.wait(5))
+        self.assertTrue(self.pool.started)
+        self.assertNotEqual(results[0][0], threading.current_thread())
+        self.assertEqual(self.pool.pending, 0)
+        self.reactor.addSystemEventTrigger.assert_called_once_with(
+            'during', 'shutdown', self.pool.stop)
+
+
+class TestOrderedJobQueue(TestCase):
+
+    def setUp(self):
+        self.pool = FakePool()
+        self.queue = OrderedJobQueue(self.pool)
+        self.results = []
+
+    def _submit(self, value, offload):
+        self.queue.submit(lambda x: x, (value,), offload, self.results.append)
+
+    def test_inline(self):
+        self._submit(1, False)
+        self.assertEqual(self.results, [1])
+        self.assertFalse(self.queue.busy)
+
+    def test_order_preserved(self):
+        self._submit(1, True)
+        self._submit(2, False)
+        self._submit(3, True)
+        self.assertEqual(self.results, [])
+        self.assertTrue(self.queue.busy)
+        self.assertEqual(len(self.pool.deferreds), 1)
+
+        self.pool.finish(0)
+        self.assertEqual(self.results, [1, 2])
+        self.assertEqual(len(self.pool.deferreds), 2)
+
+        self.pool.finish(1)
+        self.assertEqual(self.results, [1, 2, 3])
+        self.assertFalse(self.queue.busy)
+
+    def test_failure(self):
+        def _fail(_):
+            raise ValueError()
+
+        self.queue.submit(_fail, (1,), False, self.results.append)
+        self.assertIsInstance(self.results[0], Failure)
+        self.assertTrue(self.results[0].check(ValueError))
+
+    def test_callback_error_does_not_stop_queue(self):
+        self.queue.submit(lambda x: x, (1,), True, mock.Mock(
+            side_effect=ValueError))
+        self._submit(2, False)
+        self.pool.finish(0)
+        self.assertEqual(self.results, [2])
+
+    def test_clear(self):
+        self._submit(1, True)
+        self._submit(2, False)
+        self.queue.clear()
+        self.pool.finish(0)
+        self.assertEqual(self.results, [1])
@@ -10,6 +10,7 @@ from golem_messages.factories import tasks as tasks_factories
 
 from golem import model
 from golem import testutils
+from golem.database import Database
 from golem.network.transport import msg_queue
 
 
@@ -92,3 +93,69 @@ class TestMsqQueue(testutils.DatabaseFixture):
             model.QueuedMessage.select().count(),
             0,
         )
+
+    def test_get_deletes_backlog(self):
+        node_id2 = str(uuid.uuid4())
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.put(node_id2, self.msg)
+
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 2)
+        self.assertEqual(
+            [row.node for row in model.QueuedMessage.select()],
+            [node_id2],
+        )
+        self.assertEqual(frozenset(msg_queue.waiting()), {node_id2})
+
+    def test_get_in_order(self):
+        msgs = [
+            tasks_factories.WantToComputeTaskFactory(price=price)
+            for price in range(3)
+        ]
+        for msg in msgs:
+            msg_queue.put(self.node_id, msg)
+        self.assertEqual(
+            [msg.price for msg in msg_queue.get(self.node_id)],
+            [0, 1, 2],
+        )
+
+    def test_get_partially(self):
+        msg_queue.put(self.node_id, self.msg)
+        msg_queue.put(self.node_id, self.msg)
+
+        msgs = msg_queue.get(self.node_id)
+        next(msgs)
+        msgs.close()
+        self.assertEqual(model.QueuedMessage.select().count(), 1)
+        self.assertEqual(frozenset(msg_queue.waiting()), {self.node_id})
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 1)
+
+    def test_put_while_getting(self):
+        msg_queue.put(self.node_id, self.msg)
+        for _ in msg_queue.get(self.node_id):
+            msg_queue.put(self.node_id, self.msg)
+        self.assertEqual(model.QueuedMessage.select().count(), 1)
+        self.assertEqual(len(list(msg_queue.get(self.node_id))), 1)
+
+    def test_get_empty_without_db(self):
+        msg_queue.put(self.node_id, self.msg)
+        list(msg_queue.waiting())
+        with mock.patch('golem.model.QueuedMessage.select') as select:
+            self.assertEqual(list(msg_queue.get(str(uuid.uuid4()))), [])
+            self.assertEqual(
+                frozenset(msg_queue.waiting()),
+                {self.node_id},
+            )
+        select.assert_not_called()
+
+    def test_waiting_recovered(self):
+        msg_queue.put(self.node_id, self.msg)
+        list(msg_queue.waiting())
+
+        # Reopening the database reloads the index
+        self.database.close()
+        self.database = Database(model.db, fields=model.DB_FIELDS,
+                                 models=model.DB_MODELS, db_dir=self.path)
+        msg_queue._index.clear()  # pylint: disable=protected-access
+        msg_queue._index_database = None  # noqa pylint: disable=protected-access
+        self.assertEqual(frozenset(msg_queue.waiting()), {self.node_id})
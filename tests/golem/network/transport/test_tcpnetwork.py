@@ -10,6 +10,7 @@ from golem_messages import exceptions as msg_exceptions
 from golem_messages import message
 from golem_messages import factories as msg_factories
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+from twisted.internet.defer import Deferred, maybeDeferred
 
 from golem import testutils
 from golem.network.transport import tcpnetwork
@@ -129,6 +130,88 @@ class SafeProtocolTestCase(unittest.TestCase):
             self.protocol.session.interpret.assert_called_once_with(msg)
 
 
+class SafeProtocolCryptoPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.protocol = SafeProtocol(MagicMock())
+        self.protocol.opened = True
+        self.protocol.session = mock.MagicMock()
+        self.protocol.session.my_private_key = None
+        self.protocol.session.theirs_public_key = None
+        self.protocol.transport = mock.MagicMock()
+        self.deferreds = []
+        self.pool = mock.Mock(
+            should_offload_msg=mock.Mock(return_value=False),
+            run=self._run,
+        )
+        self.protocol.crypto_pool = self.pool
+        self.protocol._outgoing = tcpnetwork.OrderedJobQueue(self.pool)
+        self.protocol._incoming = tcpnetwork.OrderedJobQueue(self.pool)
+
+    def _run(self, fn, *args):
+        deferred = Deferred()
+        self.deferreds.append((deferred, fn, args))
+        return deferred
+
+    def _finish(self, index):
+        deferred, fn, args = self.deferreds[index]
+        maybeDeferred(fn, *args).chainDeferred(deferred)
+
+    @staticmethod
+    def _pack(msg):
+        data = msg.serialize()
+        return struct.pack("!L", len(data)) + data
+
+    @mock.patch('golem_messages.load')
+    def test_receive_in_order(self, load_mock):
+        msgs = [message.base.Disconnect(reason=None),
+                message.base.RandVal(rand_val=1)]
+        load_mock.side_effect = msgs
+        self.pool.should_offload.side_effect = [True, False]
+
+        self.protocol.dataReceived(b"".join(self._pack(m) for m in msgs))
+        self.protocol.session.interpret.assert_not_called()
+
+        self._finish(0)
+        self.assertEqual(
+            self.protocol.session.interpret.call_args_list,
+            [mock.call(msgs[0]), mock.call(msgs[1])],
+        )
+
+    @mock.patch('golem_messages.load')
+    def test_receive_after_connection_lost(self, load_mock):
+        msg = message.base.Disconnect(reason=None)
+        load_mock.return_value = msg
+        self.pool.should_offload.return_value = True
+        self.protocol.dataReceived(self._pack(msg))
+        interpret = self.protocol.session.interpret
+
+        self.protocol.connectionLost()
+        self._finish(0)
+        interpret.assert_not_called()
+
+    @mock.patch('golem_messages.dump', side_effect=[b'first', b'second'])
+    def test_send_in_order(self, _):
+        self.pool.should_offload_msg.side_effect = [True, False]
+        self.assertTrue(self.protocol.send_message(mock.Mock()))
+        self.assertTrue(self.protocol.send_message(mock.Mock()))
+        self.protocol.transport.write.assert_not_called()
+
+        self._finish(0)
+        self.assertEqual(
+            self.protocol.transport.write.call_args_list,
+            [mock.call(struct.pack("!L", 5) + b'first'),
+             mock.call(struct.pack("!L", 6) + b'second')],
+        )
+
+    @mock.patch('golem_messages.dump',
+                side_effect=msg_exceptions.SerializationError)
+    def test_send_serialization_error(self, _):
+        self.pool.should_offload_msg.return_value = True
+        self.assertTrue(self.protocol.send_message(mock.Mock()))
+        self._finish(0)
+        self.protocol.transport.write.assert_not_called()
+
+
 class TestSocketAddress(unittest.TestCase):
 
     def test_zone_index(self):
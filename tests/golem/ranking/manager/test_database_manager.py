@@ -1,5 +1,10 @@
+import time
+from unittest import mock
+
+from golem.model import LocalRank
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
+from golem.task.taskstate import SubtaskOp
 from golem.testutils import DatabaseFixture
 
 
@@ -251,3 +256,44 @@ class TestDatabaseManager(DatabaseFixture):
         """Should throw exception for WRONG_COMPUTED increase."""
         with self.assertRaises(KeyError):
             Trust.WRONG_COMPUTED.increase('alpha', 0.3)
+
+
+class TestProviderScores(DatabaseFixture):
+    def setUp(self):
+        super().setUp()
+        dm.clear_provider_scores_cache()
+
+    def test_scores(self):
+        dm.update_provider_efficiency('alpha', 2.0, 1.0)
+        dm.update_provider_efficacy('alpha', SubtaskOp.FINISHED)
+
+        scores = dm.get_provider_scores(['alpha', 'beta', 'alpha'])
+
+        self.assertEqual(set(scores), {'alpha', 'beta'})
+        self.assertAlmostEqual(scores['alpha'][0],
+                               dm.get_provider_efficiency('alpha'))
+        self.assertEqual(scores['alpha'][1].vector,
+                         dm.get_provider_efficacy('alpha').vector)
+        self.assertEqual(scores['beta'][0], 1.0)
+        self.assertEqual(scores['beta'][1].vector, (0., 0., 0., 0.))
+        self.assertIsNone(dm.get_local_rank('beta'))
+
+    def test_cache(self):
+        dm.get_provider_scores(['alpha'])
+        with mock.patch.object(LocalRank, 'select') as select:
+            dm.get_provider_scores(['alpha'])
+        select.assert_not_called()
+
+        dm.update_provider_efficiency('alpha', 2.0, 1.0)
+        efficiency = dm.get_provider_scores(['alpha'])['alpha'][0]
+        self.assertAlmostEqual(efficiency, dm.get_provider_efficiency('alpha'))
+
+    def test_cache_expired(self):
+        dm.get_provider_scores(['alpha'])
+        expired = time.monotonic() + dm.PROVIDER_SCORES_TTL + 1
+        with mock.patch('golem.ranking.manager.database_manager.time'
+                        '.monotonic', return_value=expired), \
+                mock.patch.object(LocalRank, 'select',
+                                  wraps=LocalRank.select) as select:
+            dm.get_provider_scores(['alpha'])
+        select.assert_called_once()
@@ -0,0 +1,220 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from golem.resource.hyperdrive.contentstore import ContentStore, clone_file, \
+    file_digest
+from golem.testutils import TempDirFixture
+
+
+class TestCloneFile(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tempdir, 'src')
+        self.dst = os.path.join(self.tempdir, 'dst')
+        Path(self.src).write_bytes(b'content')
+
+    def test_link(self):
+        assert clone_file(self.src, self.dst)
+        assert os.stat(self.dst).st_ino == os.stat(self.src).st_ino
+
+    @patch('golem.resource.hyperdrive.contentstore._reflink',
+           return_value=False)
+    @patch('os.link', side_effect=OSError)
+    def test_copy(self, *_):
+        assert clone_file(self.src, self.dst)
+        assert Path(self.dst).read_bytes() == b'content'
+        assert os.stat(self.dst).st_ino != os.stat(self.src).st_ino
+
+    @patch('golem.resource.hyperdrive.contentstore._reflink',
+           return_value=False)
+    def test_no_hardlink(self, _):
+        assert clone_file(self.src, self.dst, hardlink=False)
+        assert Path(self.dst).read_bytes() == b'content'
+        assert os.stat(self.dst).st_ino != os.stat(self.src).st_ino
+
+    @patch('golem.resource.hyperdrive.contentstore._reflink',
+           return_value=False)
+    @patch('os.link', side_effect=OSError)
+    def test_no_copy(self, *_):
+        assert not clone_file(self.src, self.dst, copy=False)
+        assert not os.path.exists(self.dst)
+
+
+class TestContentStore(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.root_dir = os.path.join(self.tempdir, 'store')
+        self.store = ContentStore(self.root_dir)
+
+    def _file(self, name, content=b'content'):
+        path = os.path.join(self.tempdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Path(path).write_bytes(content)
+        return path
+
+    def test_digest(self):
+        path = self._file('file')
+        assert self.store.digest(path, compute=False) is None
+        assert self.store.digest(path) == file_digest(path)
+        assert self.store.digest(path, compute=False) == file_digest(path)
+
+    def test_remember_digest(self):
+        path = self._file('file')
+        self.store.remember_digest(path, 'digest')
+        assert self.store.digest(path) == 'digest'
+
+        # Modified files are hashed again
+        Path(path).write_bytes(b'modified content')
+        assert self.store.digest(path) == file_digest(path)
+
+    def test_add_deduplicates(self):
+        first = self._file('first')
+        second = self._file('second')
+
+        first_path = self.store.add(first)
+        second_path = self.store.add(second)
+
+        assert first_path == second_path
+        assert Path(first_path).read_bytes() == b'content'
+        assert len(os.listdir(os.path.dirname(first_path))) == 1
+
+    def test_link(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        dst = os.path.join(self.tempdir, 'task', 'file')
+
+        assert not self.store.link(digest, dst)
+        object_path = self.store.add(path)
+        assert self.store.link(digest, dst)
+        assert Path(dst).read_bytes() == b'content'
+        # Task files may be modified in place, they are never hard linked
+        assert os.stat(dst).st_ino != os.stat(object_path).st_ino
+
+    def test_resources(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        self.store.add(path)
+        self.store.add_resource('hash', {'file': digest})
+
+        assert self.store.get_resource('hash') == {'file': digest}
+        assert self.store.get_resource('other') is None
+        assert self.store.find_resource([digest]) == 'hash'
+        assert self.store.find_resource([digest, digest]) is None
+
+    def test_resource_names_kept(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        self.store.add(path)
+        self.store.add_resource('hash', {'file': digest})
+        self.store.add_resource('hash', {'other': digest})
+
+        assert self.store.get_resource('hash') == {'file': digest}
+
+    def test_modified_object(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        object_path = self.store.add(path, copy=False)
+        self.store.add_resource('hash', {'file': digest})
+
+        # Written through a hard link
+        with open(path, 'ab') as f:
+            f.write(b' modified')
+        assert Path(object_path).read_bytes() == b'content modified'
+
+        assert self.store.get_resource('hash') is None
+        assert self.store.find_resource([digest]) is None
+        assert not self.store.link(digest, os.path.join(self.tempdir, 'dst'))
+
+    def test_persistence(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        self.store.add(path)
+        self.store.add_resource('hash', {'file': digest})
+
+        store = ContentStore(self.root_dir)
+        assert store.get_resource('hash') == {'file': digest}
+
+    def test_persistence_refs(self):
+        path = self._file('file')
+        self.store.add(path, res_id='task')
+        os.remove(path)
+
+        store = ContentStore(self.root_dir)
+        assert store.clean() == 0
+        store.release('task')
+        assert store.clean() == 1
+
+    def test_journal(self):
+        index_path = os.path.join(self.root_dir, ContentStore.INDEX_FILE)
+        journal_path = os.path.join(self.root_dir, ContentStore.JOURNAL_FILE)
+        path = self._file('file')
+        digest = self.store.digest(path)
+
+        # Changes are appended, the snapshot is not written again
+        self.store.add(path)
+        self.store.add_resource('hash', {'file': digest})
+        assert not os.path.exists(index_path)
+        with open(journal_path, 'a') as f:
+            f.write('{"op": "resou')
+
+        store = ContentStore(self.root_dir)
+        assert store.get_resource('hash') == {'file': digest}
+        assert os.path.exists(index_path)
+        assert not os.path.exists(journal_path)
+
+    def test_invalid_index(self):
+        Path(os.path.join(self.root_dir, ContentStore.INDEX_FILE)) \
+            .write_text('{')
+        store = ContentStore(self.root_dir)
+        assert store.get_resource('hash') is None
+
+    def test_clean_linked(self):
+        path = self._file('file')
+        object_path = self.store.add(path, copy=False)
+
+        assert self.store.clean() == 0
+        os.remove(path)
+        assert self.store.clean() == 1
+        assert not os.path.exists(object_path)
+
+    def test_clean_referenced(self):
+        path = self._file('file')
+        object_path = self.store.add(path, res_id='task')
+        os.remove(path)
+
+        assert self.store.clean() == 0
+        self.store.release('task')
+        assert self.store.clean() == 1
+        assert not os.path.exists(object_path)
+
+    def test_clean_recently_used(self):
+        path = self._file('file')
+        self.store.add(path)
+        os.remove(path)
+
+        assert self.store.clean(older_than_seconds=3600) == 0
+        with patch('time.time', return_value=os.path.getmtime(
+                self.root_dir) + 7200):
+            assert self.store.clean(older_than_seconds=3600) == 1
+
+    def test_clean_forgets_resources(self):
+        path = self._file('file')
+        digest = self.store.digest(path)
+        self.store.add(path)
+        self.store.add_resource('hash', {'file': digest})
+        os.remove(path)
+
+        self.store.clean()
+        assert self.store.get_resource('hash') is None
+
+    def test_clean_untracked(self):
+        untracked = os.path.join(self.root_dir, ContentStore.OBJECTS_DIR,
+                                 'ab', 'abcd')
+        os.makedirs(os.path.dirname(untracked))
+        Path(untracked).touch()
+
+        self.store.clean()
+        assert not os.path.exists(untracked)
@@ -6,11 +6,13 @@ from unittest import skipIf, TestCase
 from unittest.mock import patch, Mock
 
 from requests import ConnectionError
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, succeed
 from twisted.python.failure import Failure
 
 from golem.network.hyperdrive.client import HyperdriveClient
+from golem.resource.base.resourceserver import BaseResourceServer
 from golem.resource.dirmanager import DirManager
+from golem.resource.hyperdrive.contentstore import ContentStore
 from golem.resource.hyperdrive.resource import Resource, ResourceError
 from golem.resource.hyperdrive.resourcesmanager import \
     HyperdriveResourceManager, DummyResourceManager, handle_async, \
@@ -232,6 +234,183 @@ class TestHyperdriveResourceManager(TempDirFixture):
         assert isinstance(deferred.result, Failure)
 
 
+@patch('golem.network.hyperdrive.client.HyperdriveClient.restore')
+@patch('golem.network.hyperdrive.client.HyperdriveClient.add')
+class TestHyperdriveResourceManagerContentStore(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+
+        self.task_id = str(uuid.uuid4())
+        self.dir_manager = DirManager(self.tempdir)
+        self.content_store = ContentStore(
+            os.path.join(self.tempdir, 'ContentStore'))
+        self.resource_manager = HyperdriveResourceManager(  # noqa pylint: disable=unexpected-keyword-arg
+            self.dir_manager,
+            content_store=self.content_store,
+            **hyperdrive_client_kwargs()
+        )
+
+        file_name = 'test_file'
+        self.file_path = os.path.join(
+            self.dir_manager.get_task_resource_dir(self.task_id), file_name)
+        Path(self.file_path).write_text('test content')
+        self.files = {self.file_path: file_name}
+
+    def _add(self, add, res_id=None):
+        add.return_value = str(uuid.uuid4())
+        return self.resource_manager.add_files(
+            self.files, res_id or self.task_id)
+
+    def test_add_stores_files(self, add, _restore):
+        resource_hash, files = self._add(add)
+
+        stored = self.content_store.get_resource(resource_hash)
+        assert list(stored) == files
+        object_path = self.content_store.object_path(stored['test_file'])
+        # Linked, not copied
+        assert os.stat(object_path).st_ino == os.stat(self.file_path).st_ino
+
+    def test_add_known_files(self, add, restore):
+        resource_hash, _ = self._add(add)
+        add.reset_mock()
+
+        result = self._add(add, res_id=str(uuid.uuid4()))
+        assert result[0] == resource_hash
+        restore.assert_called_once()
+        assert restore.call_args[0][0] == resource_hash
+        assert not add.called
+
+    def test_add_known_files_restore_error(self, add, restore):
+        resource_hash, _ = self._add(add)
+        restore.side_effect = ConnectionError
+
+        result = self._add(add, res_id=str(uuid.uuid4()))
+        assert result[0] != resource_hash
+        assert restore.called
+        assert add.call_count == 2
+
+    def test_add_known_files_async(self, add, _restore):
+        resource_hash, _ = self._add(add)
+        self.resource_manager.client = Mock()
+        self.resource_manager.client.restore_async.return_value = \
+            succeed(resource_hash)
+
+        deferred = self.resource_manager.add_files(
+            self.files, str(uuid.uuid4()), async_=True)
+        assert deferred.called
+        assert deferred.result[0] == resource_hash
+        assert self.resource_manager.client.restore_async.called
+        assert not self.resource_manager.client.add_async.called
+
+    def test_add_known_package(self, add, restore):
+        resource_server = BaseResourceServer(self.resource_manager, Mock())
+        task_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        add.return_value = str(uuid.uuid4())
+
+        def async_run(request):
+            return succeed(request.method(*request.args, **request.kwargs))
+
+        results = []
+        for task_id in task_ids:
+            with patch('golem.core.golem_async.async_run', async_run):
+                deferred = resource_server.create_resource_package(
+                    [self.file_path], task_id)
+            package_path, _ = deferred.result
+            results.append(self.resource_manager.add_files(
+                [package_path], task_id))
+
+        # Packages are named after their tasks, but have the same contents
+        assert results[1] == results[0]
+        assert results[0][1] == [task_ids[0]]
+        assert add.call_count == 1
+        assert restore.call_args[0][0] == results[0][0]
+
+    def test_remove_shared_resources(self, add, _restore):
+        resource_hash, _ = self._add(add)
+        self._add(add, res_id=str(uuid.uuid4()))
+        self.resource_manager.client = Mock()
+
+        self.resource_manager.remove_resources(self.task_id)
+        # Still shared for the other task
+        assert not self.resource_manager.client.cancel_async.called
+
+    def test_pull_stored(self, add, _restore):
+        resource_hash, files = self._add(add)
+        task_id = str(uuid.uuid4())
+        success, error = Mock(), Mock()
+
+        with patch.object(self.resource_manager, '_pull') as pull:
+            self.resource_manager.pull_resource(
+                (resource_hash, files), task_id, success, error,
+                async_=False)
+            assert not pull.called
+
+        success.assert_called_once_with((resource_hash, files), files, task_id)
+        assert not error.called
+        path = os.path.join(self.resource_manager.storage.get_dir(task_id),
+                            'test_file')
+        assert Path(path).read_text() == 'test content'
+
+        # Written in place by a container, the other tasks' files are intact
+        with open(path, 'a') as f:
+            f.write(' modified')
+        assert Path(self.file_path).read_text() == 'test content'
+        stored = self.content_store.get_resource(resource_hash)
+        assert Path(self.content_store.object_path(stored['test_file'])) \
+            .read_text() == 'test content'
+
+    def test_pull_stored_async(self, add, _restore):
+        resource_hash, files = self._add(add)
+        task_id = str(uuid.uuid4())
+        success, error = Mock(), Mock()
+
+        def defer_to_thread(fn, *args, **kwargs):
+            return succeed(fn(*args, **kwargs))
+
+        with patch('golem.resource.hyperdrive.resourcesmanager.deferToThread',
+                   side_effect=defer_to_thread) as defer, \
+                patch.object(self.resource_manager, '_pull') as pull:
+            self.resource_manager.pull_resource(
+                (resource_hash, files), task_id, success, error)
+            assert not pull.called
+
+        # Files are linked off the reactor thread
+        assert defer.call_args[0][0] == \
+            self.resource_manager._link_stored_files
+        success.assert_called_once_with((resource_hash, files), files, task_id)
+        assert not error.called
+
+    def test_pull_stores_files(self, *_):
+        resource_hash = str(uuid.uuid4())
+        task_id = str(uuid.uuid4())
+        task_dir = self.resource_manager.storage.get_dir(task_id)
+
+        def pull(*_args, success, **_kwargs):
+            path = os.path.join(task_dir, 'test_file')
+            Path(path).write_text('downloaded content')
+            success([(task_dir, resource_hash, [path])])
+
+        with patch.object(self.resource_manager, '_pull', side_effect=pull):
+            self.resource_manager.pull_resource(
+                (resource_hash, ['test_file']), task_id, Mock(), Mock(),
+                async_=False)
+
+        stored = self.content_store.get_resource(resource_hash)
+        assert list(stored) == ['test_file']
+        # Downloaded files may be modified in place, they are not hard linked
+        assert os.stat(os.path.join(task_dir, 'test_file')).st_ino != \
+            os.stat(self.content_store.object_path(stored['test_file'])).st_ino
+
+    def test_remove_resources(self, add, _restore):
+        self._add(add)
+        os.remove(self.file_path)
+
+        assert self.content_store.clean() == 0
+        self.resource_manager.remove_resources(self.task_id)
+        assert self.content_store.clean() == 1
+
+
 class TestHandleAsync(TestCase):
 
     @staticmethod
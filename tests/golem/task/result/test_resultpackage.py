@@ -1,12 +1,16 @@
+import io
 import uuid
+import zipfile
 from os import makedirs, listdir
 from os.path import basename, exists, join, relpath
 from pathlib import Path
 
-from golem.core.fileencrypt import FileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
+from golem.core.simplehash import SimpleHash
 from golem.resource.dirmanager import DirManager
 from golem.task.result.resultpackage import EncryptingPackager, \
-    EncryptingTaskResultPackager, ExtractedPackage, ZipPackager, backup_rename
+    EncryptingTaskResultPackager, ExtractedPackage, HashingWriter, \
+    ZipPackager, ZipStreamReader, ZipStreamWriter, backup_rename
 from golem.testutils import TempDirFixture
 
 
@@ -133,6 +137,52 @@ class TestZipDirectoryPackager(TempDirFixture):
         self.assertTrue(all(exists(join(self.out_dir, f)) for f in files))
 
 
+class TestZipStream(TestZipDirectoryPackager):
+
+    def _stream_package(self):
+        zp = ZipPackager()
+        output = io.BytesIO()
+        writer = HashingWriter(output)
+        with ZipStreamWriter(writer) as archive:
+            for file_path, file_name in \
+                    zp._prepare_file_dict(self.disk_files).items():
+                zp.write_disk_file(archive, file_path, file_name)
+        return output.getvalue(), writer.hexdigest()
+
+    def testSameAsZipPackager(self):
+        path, sha1 = ZipPackager().create(self.out_path, self.disk_files)
+        data, stream_sha1 = self._stream_package()
+
+        with open(path, 'rb') as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual(stream_sha1, sha1)
+
+    def testExtract(self):
+        data, _ = self._stream_package()
+
+        files = ZipStreamReader(io.BytesIO(data)).extractall(self.out_dir)
+        files = [str(Path(f)) for f in files]
+
+        self.assertEqual(set(files), set(self.expected_results))
+        self.assertTrue(all(exists(join(self.out_dir, f)) for f in files))
+
+    def testExtractBadCrc(self):
+        data, _ = self._stream_package()
+        data = data.replace(b'content', b'CONTENT', 1)
+
+        with self.assertRaises(zipfile.BadZipFile):
+            ZipStreamReader(io.BytesIO(data)).extractall(self.out_dir)
+
+    def testExtractSanitizesPaths(self):
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as zf:
+            zf.writestr('../../outside', 'contents')
+        data.seek(0)
+
+        ZipStreamReader(data).extractall(self.out_dir)
+        self.assertTrue(exists(join(self.out_dir, 'outside')))
+
+
 class TestEncryptingPackager(PackageDirContentsFixture):
 
     def testCreate(self):
@@ -141,6 +191,30 @@ class TestEncryptingPackager(PackageDirContentsFixture):
 
         self.assertTrue(exists(path))
 
+    def testCreateCompatible(self):
+        ep = EncryptingPackager(self.secret)
+        path, sha1 = ep.create(self.out_path, self.disk_files)
+        package_path = ep.package_name(self.out_path)
+        decrypted_path = join(self.path, 'decrypted.zip')
+
+        AESFileEncryptor.decrypt(path, decrypted_path, self.secret)
+
+        with open(package_path, 'rb') as f1, open(decrypted_path, 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+        self.assertEqual(
+            SimpleHash.hash_file(package_path).hex(), sha1)
+
+    def testExtractCompatible(self):
+        package_path, _ = ZipPackager().create(
+            join(self.path, 'package.zip'), self.disk_files)
+        AESFileEncryptor.encrypt(package_path, self.out_path, self.secret)
+
+        ep = EncryptingPackager(self.secret)
+        files, _ = ep.extract(self.out_path, join(self.path, 'extracted'))
+
+        with zipfile.ZipFile(package_path) as zf:
+            self.assertEqual(files, zf.namelist())
+
     def testExtract(self):
         ep = EncryptingPackager(self.secret)
         ep.create(self.out_path, self.disk_files)
@@ -60,6 +60,9 @@ class TestRequestedTaskManager():
             public_key=self.public_key,
             root_path=self.rtm_path
         )
+        yield
+        # Not every test stops the manager
+        self.rtm._db.shutdown()
 
     def test_create_task(self):
         # given
@@ -347,6 +350,8 @@ class TestRequestedTaskManager():
         # then
         mock_client.shutdown.assert_called_once_with()
         assert not self.rtm._app_clients
+        with pytest.raises(RuntimeError):
+            await self.rtm._db.read(lambda: None)
 
     def _build_golem_params(
             self,
@@ -6,6 +6,7 @@ from twisted.internet import defer
 from twisted.trial.unittest import TestCase as TwistedTestCase
 
 from golem.core.statskeeper import IntStatsKeeper
+from golem.hardware.presets import SlotResources
 from golem.task.envmanager import EnvironmentManager
 from golem.task.taskcomputer import (
     NewTaskComputer,
@@ -389,3 +390,160 @@ class TestQuit(TaskComputerAdapterTestBase):
     def test_quit(self):
         self.adapter.quit()
         self.old_computer.quit.assert_called_once()
+
+
+def _computer():
+    computer = mock.MagicMock()
+    computer.has_assigned_task.return_value = False
+    computer.assigned_task_id = None
+    computer.assigned_subtask_id = None
+    return computer
+
+
+def _assign(computer, task_id):
+    computer.has_assigned_task.return_value = True
+    computer.assigned_task_id = task_id
+    computer.assigned_subtask_id = task_id + '_subtask'
+
+
+def _unassign(computer):
+    computer.has_assigned_task.return_value = False
+    computer.assigned_task_id = None
+    computer.assigned_subtask_id = None
+
+
+@mock.patch('golem.task.taskcomputer.HardwarePresets.slots')
+@mock.patch('golem.task.taskcomputer.NewTaskComputer')
+@mock.patch('golem.task.taskcomputer.TaskComputer')
+class TestSlots(TwistedTestCase):
+
+    SLOTS = [
+        SlotResources(cpus=[1, 2], memory=1024 * 1024),
+        SlotResources(cpus=[3, 4], memory=1024 * 1024),
+    ]
+
+    def setUp(self):
+        self.config_desc = ClientConfigDescriptor()
+        self.config_desc.accept_tasks = True
+        self.config_desc.in_shutdown = False
+        self.task_header = mock.Mock(environment_prerequisites=None)
+        self.task_server = mock.Mock(
+            spec=TaskServer,
+            config_desc=self.config_desc,
+            task_keeper=mock.Mock(task_headers=mock.MagicMock(
+                __getitem__=lambda *_: self.task_header)),
+        )
+        self.task_server.get_task_computer_root.return_value = '/test'
+        self.finished_callback = mock.Mock()
+
+    def _create_adapter(self, old_computer, new_computer, slots):
+        old_computer.side_effect = lambda **_: _computer()
+        new_computer.side_effect = lambda **_: _computer()
+        slots.return_value = self.SLOTS
+        adapter = TaskComputerAdapter(
+            task_server=self.task_server,
+            env_manager=mock.Mock(spec_set=EnvironmentManager),
+            finished_cb=self.finished_callback
+        )
+        # pylint: disable=protected-access
+        return adapter, adapter._slots
+
+    def test_constraints(self, *mocks):
+        _, slots = self._create_adapter(*mocks)
+        self.assertEqual(len(slots), 2)
+        self.assertEqual(
+            [slot.old_computer.container_constraints for slot in slots],
+            [
+                {'cpuset_cpus': '1,2', 'mem_limit': str(1024 ** 3)},
+                {'cpuset_cpus': '3,4', 'mem_limit': str(1024 ** 3)},
+            ])
+
+    def test_task_given(self, *mocks):
+        adapter, slots = self._create_adapter(*mocks)
+
+        adapter.task_given(ComputeTaskDef(task_id='task1'))
+        slots[0].old_computer.task_given.assert_called_once()
+        _assign(slots[0].old_computer, 'task1')
+        self.assertTrue(adapter.has_free_slot())
+
+        adapter.task_given(ComputeTaskDef(task_id='task2'))
+        slots[1].old_computer.task_given.assert_called_once()
+        _assign(slots[1].old_computer, 'task2')
+        self.assertFalse(adapter.has_free_slot())
+        self.assertEqual(adapter.assigned_task_ids, ['task1', 'task2'])
+        self.assertEqual(
+            adapter.get_assigned_subtask_id('task2'), 'task2_subtask')
+
+        with self.assertRaises(AssertionError):
+            adapter.task_given(ComputeTaskDef(task_id='task3'))
+
+    def test_start_computation(self, *mocks):
+        adapter, slots = self._create_adapter(*mocks)
+        _assign(slots[0].old_computer, 'task1')
+        _assign(slots[1].old_computer, 'task2')
+
+        adapter.start_computation('task2')
+        slots[0].old_computer.start_computation.assert_not_called()
+        slots[1].old_computer.start_computation.assert_called_once_with()
+
+        adapter.task_interrupted('task1')
+        slots[0].old_computer.task_interrupted.assert_called_once_with()
+        slots[1].old_computer.task_interrupted.assert_not_called()
+
+        with self.assertRaises(RuntimeError):
+            adapter.start_computation('task3')
+
+    def test_computation_finished(self, *mocks):
+        adapter, slots = self._create_adapter(*mocks)
+        old_computer = mocks[0]
+        adapter.task_given(ComputeTaskDef(task_id='task1'))
+        _assign(slots[0].old_computer, 'task1')
+
+        finished_cb = old_computer.call_args_list[0][1]['finished_cb']
+        _unassign(slots[0].old_computer)
+        finished_cb()
+
+        self.finished_callback.assert_called_once_with()
+        stats = adapter.get_slots_stats()
+        self.assertEqual(stats[0]['subtasks_started'], 1)
+        self.assertEqual(stats[0]['subtasks_finished'], 1)
+        self.assertEqual(stats[1]['subtasks_started'], 0)
+
+    @defer.inlineCallbacks
+    def test_busy_slot_removed_when_finished(self, *mocks):
+        adapter, slots = self._create_adapter(*mocks)
+        busy_slot = slots[1]
+        _assign(slots[0].old_computer, 'task0')
+        _assign(busy_slot.old_computer, 'task1')
+
+        mocks[2].return_value = self.SLOTS[:1]
+        yield adapter.change_config(self.config_desc)
+        self.assertEqual(len(slots), 2)
+
+        old_computer = mocks[0]
+        finished_cb = old_computer.call_args_list[1][1]['finished_cb']
+        _unassign(busy_slot.old_computer)
+        finished_cb()
+        self.assertEqual(len(slots), 1)
+        # The remaining slot is no longer confined to a part of the hardware
+        self.assertEqual(slots[0].old_computer.container_constraints, {})
+        self.assertFalse(adapter.has_free_slot())
+
+    @defer.inlineCallbacks
+    def test_change_config(self, *mocks):
+        adapter, slots = self._create_adapter(*mocks)
+        yield adapter.change_config(self.config_desc)
+
+        for slot in slots:
+            config_desc = slot.new_computer.change_config.call_args[1][
+                'config_desc']
+            self.assertEqual(config_desc.num_cores, 2)
+            self.assertEqual(config_desc.max_memory_size, 1024 * 1024)
+        slots[0].old_computer.change_config.assert_called_once_with(
+            config_desc=self.config_desc,
+            in_background=True
+        )
+        slots[1].old_computer.change_config.assert_not_called()
+        self.assertIs(
+            slots[1].old_computer.dir_manager,
+            slots[0].old_computer.dir_manager)
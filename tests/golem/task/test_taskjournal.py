@@ -0,0 +1,200 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from golem.task import taskjournal
+from golem.task.taskjournal import JOURNAL_TMP_SUFFIX, TaskJournal
+
+
+class FakeTask:
+    PER_SUBTASK_ATTRS = ('subtasks_given',)
+    STATIC_ATTRS = ('definition',)
+
+    def __init__(self):
+        self.counter = 0
+        self.definition = 'd' * 10000
+        self.subtasks_given = {}
+        self.listeners = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['listeners']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self.listeners = []
+
+
+class FakeTaskState:
+    PER_SUBTASK_ATTRS = ('subtask_states',)
+
+    def __init__(self):
+        self.status = 'waiting'
+        self.subtask_states = {}
+
+
+class TestTaskJournal(TestCase):
+
+    def setUp(self):
+        self.tasks_dir = Path(tempfile.mkdtemp())
+        self.journal = TaskJournal(self.tasks_dir, max_records=100)
+        self.task = FakeTask()
+        self.state = FakeTaskState()
+        self.path = self.journal.path('xyz')
+
+    def tearDown(self):
+        shutil.rmtree(str(self.tasks_dir))
+
+    def _write(self, subtask_id=None):
+        self.journal.write('xyz', self.task, self.state, subtask_id)
+
+    def _add_subtask(self, subtask_id):
+        self.task.counter += 1
+        self.task.subtasks_given[subtask_id] = {'status': 'starting'}
+        self.state.subtask_states[subtask_id] = 'starting'
+        self._write(subtask_id)
+
+    def _assert_restored(self):
+        task, state = TaskJournal.read(self.path)
+        self.assertEqual(task.__dict__, self.task.__dict__)
+        self.assertEqual(state.__dict__, self.state.__dict__)
+
+    def test_restore(self):
+        self._write()
+        for i in range(10):
+            self._add_subtask('sub%d' % i)
+        self.task.subtasks_given['sub3']['status'] = 'finished'
+        self.state.status = 'computing'
+        self._write('sub3')
+        del self.state.subtask_states['sub4']
+        self._write('sub4')
+        self._assert_restored()
+
+    def test_delta_size(self):
+        self._write()
+        self._add_subtask('sub0')
+        size = self.path.stat().st_size
+        self._add_subtask('sub1')
+        self.assertLess(self.path.stat().st_size - size, 1000)
+
+    def test_nothing_changed(self):
+        self._write()
+        self._add_subtask('sub0')
+        size = self.path.stat().st_size
+        self._write('sub0')
+        self._write()
+        self.assertEqual(self.path.stat().st_size, size)
+
+    def test_other_subtask_changed(self):
+        self._write()
+        self.task.subtasks_given['sub0'] = {}
+        self.task.subtasks_given['sub1'] = {}
+        self._write('sub0')
+        self.task.subtasks_given['sub1']['status'] = 'finished'
+        self._write()
+        self._assert_restored()
+
+    def test_shared_references(self):
+        self.task.compositor = {'images': []}
+        self.task.updaters = [{'compositor': self.task.compositor, 'n': 0}]
+        self.task.subtasks_given['sub0'] = {'updater': self.task.updaters[0]}
+        self._write()
+        self.task.updaters[0]['n'] = 1
+        self._write()
+        self.task.compositor['images'].append('img')
+        self._write('sub0')
+
+        task, _ = TaskJournal.read(self.path)
+        self.assertEqual(task.__dict__, self.task.__dict__)
+        self.assertIs(task.updaters[0]['compositor'], task.compositor)
+        self.assertIs(task.subtasks_given['sub0']['updater'],
+                      task.updaters[0])
+
+    def test_static_attributes(self):
+        self._write()
+        size = self.path.stat().st_size
+        with mock.patch.object(taskjournal, '_dump',
+                               wraps=taskjournal._dump) as dump:
+            self._add_subtask('sub0')
+        self.assertNotIn(mock.call(self.task.definition), dump.call_args_list)
+        self.assertGreater(self.path.stat().st_size, size)
+
+        # A new object is stored with a snapshot
+        self.task.definition = 'e' * 10000
+        self._write()
+        task, _ = TaskJournal.read(self.path)
+        self.assertEqual(task.definition, self.task.definition)
+        self.assertLess(self.path.stat().st_size, size + 1000)
+
+    def test_attribute_removed(self):
+        self._write()
+        del self.task.counter
+        self._write()
+        self._assert_restored()
+
+    def test_compaction(self):
+        self.journal.max_records = 2
+        self._write()
+        snapshot_size = self.path.stat().st_size
+        self._add_subtask('sub0')
+        self._add_subtask('sub1')
+        self.assertGreater(self.path.stat().st_size, snapshot_size)
+        self.task.subtasks_given.clear()
+        self.state.subtask_states.clear()
+        self._write()
+        self.assertEqual(self.path.stat().st_size, snapshot_size)
+        self.assertFalse(
+            (self.tasks_dir / ('xyz' + JOURNAL_TMP_SUFFIX)).exists())
+        self._assert_restored()
+
+    def test_torn_record(self):
+        self._write()
+        self._add_subtask('sub0')
+        size = self.path.stat().st_size
+        with self.path.open('ab') as f:
+            f.write(b'\x00\x00\x01\x00garbage')
+        self._assert_restored()
+        self.assertEqual(self.path.stat().st_size, size)
+
+    def test_corrupted_record(self):
+        self._write()
+        size = self.path.stat().st_size
+        self._add_subtask('sub0')
+        with self.path.open('r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\xff')
+        task, _ = TaskJournal.read(self.path)
+        self.assertEqual(task.subtasks_given, {})
+        self.assertEqual(self.path.stat().st_size, size)
+
+    def test_no_snapshot(self):
+        self.path.write_bytes(b'')
+        with self.assertRaises(ValueError):
+            TaskJournal.read(self.path)
+
+    def test_write_error(self):
+        self._write()
+        self.task.counter = lambda: None
+        with self.assertRaises(Exception):
+            self._write()
+        self.task.counter = 1
+        self._write()
+        self._assert_restored()
+
+    def test_restart(self):
+        self._write()
+        self._add_subtask('sub0')
+        journal = TaskJournal(self.tasks_dir)
+        self._add_subtask('sub1')
+        journal.write('xyz', self.task, self.state, 'sub1')
+        self._assert_restored()
+
+    def test_remove(self):
+        self._write()
+        self.journal.remove('xyz')
+        self.assertFalse(self.path.exists())
+        with self.assertRaises(FileNotFoundError):
+            self.journal.remove('xyz')
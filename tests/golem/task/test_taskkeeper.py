@@ -3,6 +3,7 @@ from datetime import timedelta
 from pathlib import Path
 import random
 import time
+import unittest
 import unittest.mock as mock
 
 from eth_utils import encode_hex
@@ -13,7 +14,7 @@ from golem_messages.datastructures import tasks as dt_tasks
 from golem_messages.datastructures.masking import Mask
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
 from golem_messages.message import ComputeTaskDef
-from twisted.internet.defer import inlineCallbacks, Deferred
+from twisted.internet.defer import inlineCallbacks, Deferred, fail, succeed
 from twisted.trial.unittest import TestCase as TwistedTestCase
 
 import golem
@@ -447,6 +448,161 @@ class TestTaskHeaderKeeper(TaskHeaderKeeperBase):
         assert self.thk.get_owner(key_id) == owner
         assert self.thk.get_owner("UNKNOWN") is None
 
+    def test_get_task_exclude(self):
+        e = Environment()
+        e.accept_tasks = True
+        self.thk.old_env_manager.add_environment(e)
+        headers = [get_task_header(str(i)) for i in range(3)]
+        for header in headers:
+            self.thk.add_task_header(header)
+
+        exclude = {headers[0].task_id, headers[1].task_id}
+        for _ in range(10):
+            th = self.thk.get_task(exclude)
+            self.assertEqual(th.task_id, headers[2].task_id)
+        exclude.add(headers[2].task_id)
+        self.assertIsNone(self.thk.get_task(exclude))
+
+    def test_task_selector(self):
+        e = Environment()
+        e.accept_tasks = True
+        self.thk.old_env_manager.add_environment(e)
+        header = get_task_header()
+        self.thk.add_task_header(header)
+        self.thk.task_selector = mock.Mock(spec=taskkeeper.TaskSelector)
+        self.thk.task_selector.select.return_value = header.task_id
+
+        self.assertEqual(self.thk.get_task({'abc'}), header)
+        self.thk.task_selector.select.assert_called_once_with(
+            self.thk, self.thk.supported_tasks, {'abc'})
+
+    def test_indices(self):
+        header = get_task_header(environment="env1")
+        task_id = header.task_id
+        self.thk.add_task_header(header)
+        self.assertEqual(self.thk.tasks_by_env, {"env1": {task_id}})
+
+        updated = get_task_header(environment="env2")
+        updated.task_id = task_id
+        updated.timestamp = header.timestamp + 1
+        updated.signature = b'updated'
+        self.thk.add_task_header(updated)
+        self.assertEqual(self.thk.tasks_by_env, {"env2": {task_id}})
+
+        self.thk.remove_task_header(task_id)
+        self.assertEqual(self.thk.tasks_by_env, {})
+        self.assertEqual(self.thk.tasks_by_owner[header.task_owner.key],
+                         set())
+        self.assertEqual(self.thk.get_unsupport_reasons()[0]['ntasks'], 0)
+
+    @freeze_time(as_arg=True)
+    # pylint: disable=no-self-argument
+    def test_old_running_task(frozen_time, self):
+        task_header = get_task_header()
+        task_header.deadline = timeout_to_deadline(1)
+        task_id = task_header.task_id
+        self.thk.add_task_header(task_header)
+        self.thk.task_started(task_id)
+
+        frozen_time.tick(timedelta(seconds=1.1))  # noqa pylint: disable=no-member
+        self.thk.remove_old_tasks()
+        self.assertIn(task_id, self.thk.task_headers)
+
+        self.thk.task_ended(task_id)
+        self.thk.remove_old_tasks()
+        self.assertNotIn(task_id, self.thk.task_headers)
+
+    @freeze_time(as_arg=True)
+    # pylint: disable=no-self-argument
+    def test_removed_tasks_timeout(frozen_time, self):
+        self.thk.removed_task_timeout = 10
+        self.thk.remove_task_header('first')
+        frozen_time.tick(timedelta(seconds=5))  # pylint: disable=no-member
+        self.thk.remove_task_header('second')
+        frozen_time.tick(timedelta(seconds=6))  # pylint: disable=no-member
+
+        self.thk.remove_old_tasks()
+        self.assertEqual(list(self.thk.removed_tasks), ['second'])
+
+    def test_recheck_environment(self):
+        e = Environment()
+        e.accept_tasks = True
+        self.thk.old_env_manager.add_environment(e)
+        header = get_task_header()
+        self.thk.add_task_header(header)
+        self.assertIn(header.task_id, self.thk.supported_tasks)
+
+        e.accept_tasks = False
+        self.thk.recheck_environment(e.get_id())
+        self.assertNotIn(header.task_id, self.thk.supported_tasks)
+
+        e.accept_tasks = True
+        self.thk.recheck_environment(e.get_id())
+        self.assertIn(header.task_id, self.thk.supported_tasks)
+
+
+class TestTaskIdSet(unittest.TestCase):
+    def test_operations(self):
+        ids = taskkeeper.TaskIdSet(['a', 'b', 'c'])
+        ids.add('a')
+        self.assertEqual(len(ids), 3)
+        self.assertIn('b', ids)
+
+        ids.discard('a')
+        ids.discard('x')
+        self.assertNotIn('a', ids)
+        self.assertEqual(sorted(ids), ['b', 'c'])
+        self.assertEqual(ids[0], 'c')
+
+        ids.discard('b')
+        ids.discard('c')
+        self.assertFalse(ids)
+        ids.add('d')
+        self.assertEqual(ids.choice(), 'd')
+
+
+class TestTaskSelectors(unittest.TestCase):
+    def setUp(self):
+        self.keeper = mock.Mock(min_price=10)
+        self.headers = [get_task_header(str(i)) for i in range(3)]
+        self.keeper.task_headers = {h.task_id: h for h in self.headers}
+        self.task_ids = taskkeeper.TaskIdSet(self.keeper.task_headers)
+
+    def test_random(self):
+        selector = taskkeeper.RandomTaskSelector()
+        self.assertIsNone(selector.select(
+            self.keeper, taskkeeper.TaskIdSet(), set()))
+        exclude = {h.task_id for h in self.headers[1:]}
+        for _ in range(10):
+            self.assertEqual(
+                selector.select(self.keeper, self.task_ids, exclude),
+                self.headers[0].task_id)
+
+    def test_weighted(self):
+        selector = taskkeeper.WeightedTaskSelector(
+            lambda _, h: 1. if h is self.headers[1] else 0.)
+        for _ in range(10):
+            self.assertEqual(
+                selector.select(self.keeper, self.task_ids, set()),
+                self.headers[1].task_id)
+        self.assertIn(
+            selector.select(self.keeper, self.task_ids,
+                            {self.headers[1].task_id}),
+            self.keeper.task_headers)
+        self.assertIsNone(selector.select(
+            self.keeper, self.task_ids, set(self.keeper.task_headers)))
+
+    def test_price_fit_weight(self):
+        header = self.headers[0]
+        header.max_price = 20
+        header.subtask_timeout = 10
+        cheap = get_task_header("cheap")
+        cheap.max_price = 10
+        cheap.subtask_timeout = 10
+        self.assertGreater(
+            taskkeeper.price_fit_weight(self.keeper, header),
+            taskkeeper.price_fit_weight(self.keeper, cheap))
+
 
 class TestTHKTaskEnded(TaskHeaderKeeperBase):
     def test_task_not_found(self):
@@ -910,6 +1066,91 @@ class TestCheckSupport(TestTaskHeaderKeeperBase):
         self.check_price.assert_called_once_with(header)
 
 
+class TestAddTaskHeaders(TestTaskHeaderKeeperBase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.check_new_env = self._patch_keeper('_check_new_environment')
+        self.check_new_env.side_effect = \
+            lambda *_: succeed(SupportStatus.ok())
+        self.check_mask = self._patch_keeper('check_mask')
+        self.check_mask.return_value = SupportStatus.ok()
+        self.check_price = self._patch_keeper('check_price')
+        self.check_price.return_value = SupportStatus.ok()
+
+    @staticmethod
+    def _get_headers(*prerequisites):
+        return [
+            get_task_header(
+                key_id_seed=f'owner{i}',
+                environment='test_env',
+                environment_prerequisites=prerequisites_dict,
+            ) for i, prerequisites_dict in enumerate(prerequisites)
+        ]
+
+    @inlineCallbacks
+    def test_environment_checked_once(self):
+        # Given
+        headers = self._get_headers(
+            {'image': 'a', 'tag': '1'},
+            {'tag': '1', 'image': 'a'},
+            {'image': 'b', 'tag': '1'},
+        )
+
+        # When
+        results = yield self.keeper.add_task_headers(headers)
+
+        # Then
+        assert results == [True, True, True]
+        assert self.check_new_env.call_count == 2
+        assert self.check_mask.call_count == 3
+        for header in headers:
+            assert header.task_id in self.keeper.supported_tasks
+            assert self.keeper.support_status[header.task_id].is_ok()
+
+    @inlineCallbacks
+    def test_wrong_owner(self):
+        # Given
+        headers = self._get_headers({'image': 'a'}, {'image': 'a'})
+        headers[0].task_id = idgenerator.generate_id(b'other owner')
+
+        # When
+        results = yield self.keeper.add_task_headers(headers)
+
+        # Then
+        assert results == [False, True]
+        assert headers[0].task_id not in self.keeper.task_headers
+
+    @inlineCallbacks
+    def test_environment_check_failed(self):
+        # Given
+        headers = self._get_headers({'image': 'a'}, {'image': 'b'})
+        self.check_new_env.side_effect = lambda _, prerequisites: \
+            fail(RuntimeError()) if prerequisites['image'] == 'a' \
+            else succeed(SupportStatus.ok())
+
+        # When
+        results = yield self.keeper.add_task_headers(headers)
+
+        # Then
+        assert results == [False, True]
+        assert headers[0].task_id not in self.keeper.supported_tasks
+        assert headers[1].task_id in self.keeper.supported_tasks
+
+    @inlineCallbacks
+    def test_known_header(self):
+        # Given
+        header, = self._get_headers({'image': 'a'})
+        yield self.keeper.add_task_headers([header])
+
+        # When
+        results = yield self.keeper.add_task_headers([header, header])
+
+        # Then
+        assert results == [True, True]
+        self.check_new_env.assert_called_once()
+
+
 class TestCheckOldEnvironment(TestTaskHeaderKeeperBase):
 
     def test_ok(self):
@@ -1,6 +1,7 @@
 # pylint: disable=too-many-lines, protected-access
 import datetime
 import os
+import pickle
 import random
 import shutil
 import time
@@ -265,6 +266,31 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
         self.tm.restore_tasks()
         assert not broken_pickle_file.is_file()
 
+    def test_restore_converts_pickle(self, *_):
+        task = self._get_test_dummy_task("xyz")
+        self.tm.add_new_task(task)
+        self.tm.start_task("xyz")
+        state = self.tm.tasks_states["xyz"]
+        journal_path = self.tm._dump_filepath("xyz")
+        pickle_path = self.tm.tasks_dir / "xyz.pickle"
+        with pickle_path.open('wb') as f:
+            pickle.dump((task, state), f, protocol=2)
+        journal_path.unlink()
+        leftover_path = self.tm.tasks_dir / "xyz.journal.tmp"
+        leftover_path.touch()
+
+        fresh_tm = TaskManager(
+            dt_p2p_factory.Node(),
+            keys_auth=Mock(),
+            root_path=self.path,
+            config_desc=ClientConfigDescriptor(),
+        )
+
+        assert fresh_tm.tasks_states["xyz"].__dict__ == state.__dict__
+        assert journal_path.is_file()
+        assert not pickle_path.exists()
+        assert not leftover_path.exists()
+
     def test_got_wants_to_compute(self, *_):
         task_mock = self._get_task_mock()
         self.tm.add_new_task(task_mock)
@@ -869,6 +895,78 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
                      ("qwe", None, TaskOp.TIMEOUT)])
             del handler
 
+    def test_check_timeouts_finished_subtask(self, *_):
+        with patch('golem.task.taskbase.Task.needs_computation',
+                   return_value=True):
+            start_time = datetime.datetime.now()
+            with freeze_time(start_time):
+                t = self._get_task_mock(timeout=10, subtask_timeout=1)
+                self.tm.add_new_task(t)
+                self.tm.start_task(t.header.task_id)
+                self.tm.get_next_subtask("ABC", "xyz", 1000, 10, 'oh')
+            subtask_state = self.tm.tasks_states["xyz"].subtask_states[
+                "xxyyzz"]
+            subtask_state.status = SubtaskStatus.finished
+            with freeze_time(start_time + datetime.timedelta(seconds=2)):
+                self.assertEqual(self.tm.check_timeouts(), [])
+            self.assertIs(subtask_state.status, SubtaskStatus.finished)
+            # Only the task deadline is left to be checked
+            self.assertEqual(len(self.tm._deadlines), 1)
+
+    def test_check_timeouts_deadline_moved(self, *_):
+        start_time = datetime.datetime.now()
+        with freeze_time(start_time):
+            t = self._get_task_mock(timeout=1)
+            self.tm.add_new_task(t)
+            self.tm.start_task(t.header.task_id)
+            t.header.deadline += 10
+        with freeze_time(start_time + datetime.timedelta(seconds=2)):
+            self.tm.check_timeouts()
+        self.assertIs(self.tm.tasks_states["xyz"].status, TaskStatus.waiting)
+        with freeze_time(start_time + datetime.timedelta(seconds=12)):
+            self.tm.check_timeouts()
+        self.assertIs(self.tm.tasks_states["xyz"].status, TaskStatus.timeout)
+        self.assertEqual(self.tm._deadlines, [])
+
+    def test_check_timeouts_task_started_late(self, *_):
+        start_time = datetime.datetime.now()
+        with freeze_time(start_time):
+            t = self._get_task_mock(timeout=1)
+            self.tm.add_new_task(t)
+        with freeze_time(start_time + datetime.timedelta(seconds=2)):
+            self.tm.check_timeouts()
+            self.assertIs(
+                self.tm.tasks_states["xyz"].status,
+                TaskStatus.notStarted,
+            )
+            self.tm.start_task(t.header.task_id)
+            self.tm.check_timeouts()
+        self.assertIs(self.tm.tasks_states["xyz"].status, TaskStatus.timeout)
+
+    def test_check_timeouts_inactive_task(self, *_):
+        start_time = datetime.datetime.now()
+        with freeze_time(start_time):
+            t = self._get_task_mock(timeout=1)
+            self.tm.add_new_task(t)
+        for seconds in (2, 3):
+            with freeze_time(start_time + datetime.timedelta(seconds=seconds)):
+                self.tm.check_timeouts()
+            # The deadline is not checked again until the task is started
+            self.assertEqual(self.tm._deadlines, [])
+
+    def test_restart_subtask_deadline_scheduled_once(self, *_):
+        with patch('golem.task.taskbase.Task.needs_computation',
+                   return_value=True):
+            t = self._get_task_mock(timeout=10, subtask_timeout=1)
+            t.restart_subtask = Mock()
+            self.tm.add_new_task(t)
+            self.tm.start_task(t.header.task_id)
+            self.tm.get_next_subtask("ABC", "xyz", 1000, 10, 'oh')
+            for _ in range(3):
+                self.tm.restart_subtask("xxyyzz")
+        # One entry of the task and one of its subtask
+        self.assertEqual(len(self.tm._deadlines), 2)
+
     def test_task_event_listener(self, *_):
         self.tm.notice_task_updated = Mock()
         assert isinstance(self.tm, TaskEventListener)
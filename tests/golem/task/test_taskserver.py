@@ -910,6 +910,37 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         assert len(result) == len(task_list)
         mock_th_instance.sign.assert_called_once()
 
+    @patch('golem.task.taskserver.RequestedTaskManager.get_started_tasks')
+    @patch('golem.task.taskserver.dt_tasks.TaskHeader')
+    def test_get_own_task_headers_cached(self, mock_task_header,
+                                         mock_get_tasks):
+        mock_task_header.side_effect = lambda **_: Mock()
+        mock_db_task = Mock()
+        mock_db_task.start_time.timestamp.return_value = 1
+        mock_db_task.deadline.timestamp.return_value = 1
+        mock_get_tasks.return_value = [mock_db_task]
+
+        header, = self.ts.get_own_tasks_headers()
+        assert self.ts.get_own_tasks_headers() == [header]
+        header.sign.assert_called_once()
+
+        # Changed header fields are signed again
+        mock_db_task.max_subtasks = 10
+        changed, = self.ts.get_own_tasks_headers()
+        assert changed is not header
+        changed.sign.assert_called_once()
+
+        # So is a header of a node which has changed its address
+        self.ts.node.pub_addr = '10.0.0.1'
+        readdressed, = self.ts.get_own_tasks_headers()
+        assert readdressed is not changed
+        readdressed.sign.assert_called_once()
+
+        # Headers of tasks which are no longer started are dropped
+        mock_get_tasks.return_value = []
+        assert self.ts.get_own_tasks_headers() == []
+        assert not self.ts._signed_headers
+
 
 class TaskServerTaskHeaderTest(TaskServerTestBase):
     def test_add_task_header(self, *_):
@@ -964,6 +995,40 @@ class TaskServerTaskHeaderTest(TaskServerTestBase):
         self.assertFalse(ts.add_task_header(task_header))
         self.assertFalse(ts._docker_image_discovered.called)
 
+    @defer.inlineCallbacks
+    def test_add_task_headers(self):
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+
+        ts = self.ts
+        ts._docker_image_discovered = Mock()
+
+        task_header = get_example_task_header(keys_auth_2.public_key)
+        task_header.sign(private_key=keys_auth_2._private_key)  # noqa pylint:disable=no-value-for-parameter
+        unsigned_header = get_example_task_header(keys_auth_2.public_key)
+
+        with patch.object(ts, '_verify_header_sig',
+                          wraps=ts._verify_header_sig) as verify:
+            results = yield ts.add_task_headers(
+                [task_header, unsigned_header])
+            self.assertEqual(results, [True, False])
+            self.assertEqual(verify.call_count, 2)
+            self.assertEqual(len(ts.get_others_tasks_headers()), 1)
+
+            # Headers verified before are not verified again
+            results = yield ts.add_task_headers([task_header])
+            self.assertEqual(results, [True])
+            self.assertEqual(verify.call_count, 2)
+
+            # Unless their fields have changed
+            task_header.max_price += 1
+            results = yield ts.add_task_headers([task_header])
+            self.assertEqual(results, [False])
+            self.assertEqual(verify.call_count, 3)
+
 
 class TaskServerBase(TestDatabaseWithReactor, testutils.TestWithClient):
     def setUp(self):
@@ -1313,7 +1378,8 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
+        self.ts.task_computer.assigned_task_ids = []
         ttc = msg_factories.tasks.TaskToComputeFactory()
 
         result = self.ts.task_given(ttc)
@@ -1344,7 +1410,7 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = True
+        self.ts.task_computer.has_free_slot.return_value = False
         result = self.ts.task_given(Mock())
         self.assertEqual(result, False)
 
@@ -1354,10 +1420,27 @@ class TestTaskGiven(TaskServerTestBase):
         dispatcher_mock.send.assert_not_called()
         logger_mock.error.assert_called()
 
+    def test_same_task_assigned(
+            self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
+            request_resource):
+
+        ttc = msg_factories.tasks.TaskToComputeFactory()
+        self.ts.task_computer.has_free_slot.return_value = True
+        self.ts.task_computer.assigned_task_ids = [ttc.task_id]
+        result = self.ts.task_given(ttc)
+        self.assertEqual(result, False)
+
+        self.ts.task_computer.task_given.assert_not_called()
+        request_resource.assert_not_called()
+        update_requestor_assigned_sum.assert_not_called()
+        dispatcher_mock.send.assert_not_called()
+        logger_mock.error.assert_called()
+
     def test_task_api(
             self, _logger_mock, _dispatcher_mock,
             _update_requestor_assigned_sum, _request_resource):
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
+        self.ts.task_computer.assigned_task_ids = []
         ttc = msg_factories.tasks.TaskToComputeFactory()
         ttc.want_to_compute_task.task_header.environment_prerequisites = Mock()
         self.assertTrue(ttc.compute_task_def['resources'])  # noqa pylint: disable=unsubscriptable-object
@@ -1383,18 +1466,19 @@ class TestTaskGiven(TaskServerTestBase):
 class TestResourceCollected(TaskServerTestBase):
 
     def test_wrong_task_id(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.assigned_task_ids = ['test']
         result = self.ts.resource_collected('wrong_id')
         self.assertFalse(result)
         logger_mock.error.assert_called_once()
         self.ts.task_computer.start_computation.assert_not_called()
 
     def test_ok(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.assigned_task_ids = ['other', 'test']
         result = self.ts.resource_collected('test')
         self.assertTrue(result)
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.start_computation.assert_called_once_with()
+        self.ts.task_computer.start_computation.assert_called_once_with(
+            'test')
 
 
 @patch('golem.task.taskserver.logger')
@@ -1402,18 +1486,22 @@ class TestResourceCollected(TaskServerTestBase):
 class TestResourceFailure(TaskServerTestBase):
 
     def test_wrong_task_id(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.assigned_task_ids = ['test']
         self.ts.resource_failure('wrong_id', 'reason')
         logger_mock.error.assert_called_once()
         self.ts.task_computer.task_interrupted.assert_not_called()
         send_task_failed.assert_not_called()
 
     def test_ok(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test_task'
-        self.ts.task_computer.assigned_subtask_id = 'test_subtask'
+        self.ts.task_computer.assigned_task_ids = ['test_task']
+        self.ts.task_computer.get_assigned_subtask_id.return_value = \
+            'test_subtask'
         self.ts.resource_failure('test_task', 'test_reason')
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.task_interrupted.assert_called_once_with()
+        self.ts.task_computer.get_assigned_subtask_id.assert_called_once_with(
+            'test_task')
+        self.ts.task_computer.task_interrupted.assert_called_once_with(
+            'test_task')
         send_task_failed.assert_called_once_with(
             'test_subtask',
             'test_task',
@@ -1439,7 +1527,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_already_assigned(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = True
+        self.ts.task_computer.has_free_slot.return_value = False
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
 
@@ -1451,7 +1539,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_accepting_tasks(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = False
         self.ts.task_computer.runnable = True
 
@@ -1463,7 +1551,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_runnable(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = False
 
@@ -1475,7 +1563,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_no_supported_tasks_in_task_keeper(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         self.ts.task_keeper.get_task.return_value = None
@@ -1489,7 +1577,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_ok(self, request_task):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.has_free_slot.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         task_header = Mock()
@@ -1501,6 +1589,21 @@ class TestRequestRandomTask(TaskServerTestBase):
             'tasks_requested')
         request_task.assert_called_once_with(task_header)
 
+    @freezegun.freeze_time()
+    @patch('golem.task.taskserver.TaskServer._request_task')
+    def test_assigned_tasks_excluded(self, _request_task):
+        self.ts.config_desc.task_request_interval = 1.0
+        self.ts._last_task_request_time = time.time() - 1.0
+        self.ts.task_computer.has_free_slot.return_value = True
+        self.ts.task_computer.compute_tasks = True
+        self.ts.task_computer.runnable = True
+        self.ts.task_computer.assigned_task_ids = ['assigned']
+        self.ts.requested_tasks = {'requested'}
+
+        self.ts._request_random_task()
+        self.ts.task_keeper.get_task.assert_called_once_with(
+            {'assigned', 'requested'})
+
 
 class TestChangeConfig(TaskServerTestBase):
 
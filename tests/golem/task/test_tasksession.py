@@ -401,7 +401,8 @@ class TaskSessionReactToTaskToComputeTest(TaskSessionTestBase):
 
     def setUp(self):
         super().setUp()
-        self.task_session.task_computer.has_assigned_task.return_value = False
+        self.task_session.task_computer.has_free_slot.return_value = True
+        self.task_session.task_computer.assigned_task_ids = []
         self.task_session.concent_service.enabled = False
         self.task_session.send = Mock(
             side_effect=lambda msg: print(f"send {msg}"))
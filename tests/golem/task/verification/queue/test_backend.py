@@ -2,7 +2,9 @@ import itertools
 
 from freezegun import freeze_time
 
-from golem.task.verification.queue.backend import DatabaseQueueBackend
+from golem.model import QueuedVerification
+from golem.task.verification.queue.backend import DatabaseQueueBackend, \
+    BatchedDatabaseQueueBackend
 from golem.testutils import DatabaseFixture
 
 
@@ -69,3 +71,108 @@ class TestDatabaseQueueBackend(DatabaseFixture):
         assert self.backend.get() == (f"{TASK_ID}2", f"{SUBTASK_ID}2")
         assert self.backend.get() == (f"{TASK_ID}1", f"{SUBTASK_ID}1")
         assert self.backend.get() is None
+
+    def test_get_task_penalties(self):
+        self.backend.put(f"{TASK_ID}0", f"{SUBTASK_ID}0", priority=0)
+        self.backend.put(f"{TASK_ID}0", f"{SUBTASK_ID}1", priority=1)
+        self.backend.put(f"{TASK_ID}1", f"{SUBTASK_ID}2", priority=5)
+        self.backend.put(f"{TASK_ID}1", f"{SUBTASK_ID}3", priority=None)
+
+        penalties = {f"{TASK_ID}0": 10}
+        assert self.backend.get(penalties) == (f"{TASK_ID}1", f"{SUBTASK_ID}2")
+        assert self.backend.get(penalties) == (f"{TASK_ID}0", f"{SUBTASK_ID}0")
+        assert self.backend.get(penalties) == (f"{TASK_ID}0", f"{SUBTASK_ID}1")
+        assert self.backend.get(penalties) is None
+
+
+class TestBatchedDatabaseQueueBackend(TestDatabaseQueueBackend):
+
+    def setUp(self):
+        super().setUp()
+        self.backend = BatchedDatabaseQueueBackend(batch_size=2)
+
+    @staticmethod
+    def _stored():
+        return sorted(
+            QueuedVerification
+            .select(QueuedVerification.subtask_id,
+                    QueuedVerification.priority)
+            .tuples())
+
+    def test_put_stored(self):
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=None)
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}1", priority=1)
+        assert self._stored() == [
+            (f"{SUBTASK_ID}0", None),
+            (f"{SUBTASK_ID}1", 1),
+        ]
+
+    def test_get_batched(self):
+        for i in range(3):
+            self.backend.put(TASK_ID, f"{SUBTASK_ID}{i}", priority=i)
+
+        self.backend.get()
+        assert len(self._stored()) == 3
+        self.backend.get()
+        assert self._stored() == [(f"{SUBTASK_ID}2", 2)]
+
+    def test_flush(self):
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=0)
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}1", priority=1)
+
+        self.backend.get()
+        self.backend.flush()
+        assert self._stored() == [(f"{SUBTASK_ID}1", 1)]
+
+    def test_put_dequeued(self):
+        self.backend.put(TASK_ID, SUBTASK_ID, priority=0)
+        assert self.backend.get() == (TASK_ID, SUBTASK_ID)
+
+        assert self.backend.put(TASK_ID, SUBTASK_ID, priority=None)
+        assert self._stored() == [(SUBTASK_ID, None)]
+
+    def test_update_priorities_stored(self):
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=None)
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}1", priority=None)
+        self.backend.put(f"{TASK_ID}1", f"{SUBTASK_ID}2", priority=None)
+
+        counter = itertools.count()
+        self.backend.update_not_prioritized(lambda: next(counter))
+        assert self._stored() == [
+            (f"{SUBTASK_ID}0", 0),
+            (f"{SUBTASK_ID}1", 1),
+            (f"{SUBTASK_ID}2", 2),
+        ]
+
+    def test_recover(self):
+        with freeze_time('1000'):
+            self.backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=None)
+        with freeze_time('1001'):
+            self.backend.put(TASK_ID, f"{SUBTASK_ID}1", priority=2)
+        with freeze_time('1002'):
+            self.backend.put(TASK_ID, f"{SUBTASK_ID}2", priority=1)
+        with freeze_time('1003'):
+            self.backend.put(TASK_ID, f"{SUBTASK_ID}3", priority=None)
+        self.backend.get()
+        self.backend.flush()
+
+        backend = BatchedDatabaseQueueBackend()
+        assert not backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=None)
+        assert backend.get() == (TASK_ID, f"{SUBTASK_ID}1")
+        assert backend.get() is None
+
+        backend.update_not_prioritized(itertools.count(10).__next__)
+        assert backend.get() == (TASK_ID, f"{SUBTASK_ID}0")
+        assert backend.get() == (TASK_ID, f"{SUBTASK_ID}3")
+        assert backend.get() is None
+
+    def test_recover_not_flushed(self):
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}0", priority=0)
+        self.backend.put(TASK_ID, f"{SUBTASK_ID}1", priority=1)
+        self.backend.get()
+
+        # Dequeued items are returned to the queue, never lost
+        backend = BatchedDatabaseQueueBackend()
+        assert backend.get() == (TASK_ID, f"{SUBTASK_ID}0")
+        assert backend.get() == (TASK_ID, f"{SUBTASK_ID}1")
+        assert backend.get() is None
@@ -8,7 +8,9 @@ from unittest import mock
 import pytest
 from golem_task_api.enums import VerifyResult
 
+from golem.model import QueuedVerification
 from golem.task import SubtaskId, TaskId
+from golem.task.verification.concurrency import AdaptiveConcurrency
 from golem.task.verification.queue import VerificationQueue
 from golem.testutils import pytest_database_fixture  # noqa pylint: disable=unused-import
 from tests.utils.asyncio import AsyncMock
@@ -110,6 +112,86 @@ class TestProcessProtectedMethod:
         assert self.queue._verify.call_count == 2
         assert self.queue._queue.update_not_prioritized.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_concurrent(self):
+        self.queue.process = AsyncMock()
+        self.queue._concurrency = AdaptiveConcurrency(
+            max_workers=2, min_workers=2)
+        running = []
+        max_running = 0
+
+        async def verify(_task_id, subtask_id):
+            nonlocal max_running
+            running.append(subtask_id)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0.1)
+            running.remove(subtask_id)
+
+        self.queue._verify = verify
+
+        # Auto-processing in put was disabled by mocking queue.process
+        for i in range(3):
+            _ = self.queue.put(f"{TASK_ID}{i}", f"{SUBTASK_ID}{i}")
+
+        await self.queue._process()
+        assert max_running == 2
+        assert not self.queue._running
+
+    @pytest.mark.asyncio
+    async def test_task_fairness(self):
+        self.queue.process = AsyncMock()
+        self.queue._concurrency = AdaptiveConcurrency(
+            max_workers=2, min_workers=2)
+        started = []
+
+        async def verify(_task_id, subtask_id):
+            started.append(subtask_id)
+            await asyncio.sleep(0.1)
+
+        self.queue._verify = verify
+
+        # Auto-processing in put was disabled by mocking queue.process
+        _ = self.queue.put(f"{TASK_ID}1", f"{SUBTASK_ID}1")
+        _ = self.queue.put(f"{TASK_ID}1", f"{SUBTASK_ID}2")
+        _ = self.queue.put(f"{TASK_ID}2", f"{SUBTASK_ID}3")
+
+        await self.queue._process()
+        assert started == [
+            f"{SUBTASK_ID}1", f"{SUBTASK_ID}3", f"{SUBTASK_ID}2"]
+
+    @pytest.mark.asyncio
+    async def test_flushed_before_verification(self):
+        self.queue.process = AsyncMock()
+        stored = []
+
+        async def verify(_task_id, subtask_id):
+            stored.append(QueuedVerification.select().where(
+                QueuedVerification.subtask_id == subtask_id).exists())
+
+        self.queue._verify = verify
+
+        # Auto-processing in put was disabled by mocking queue.process
+        _ = self.queue.put(f"{TASK_ID}1", f"{SUBTASK_ID}1")
+        _ = self.queue.put(f"{TASK_ID}2", f"{SUBTASK_ID}2")
+
+        await self.queue._process()
+        # Items are deleted before their verification runs
+        assert stored == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_verify_error(self):
+        self.queue.process = AsyncMock()
+        self.queue._verify = AsyncMock(side_effect=ValueError)
+        self.queue._queue.update_not_prioritized = mock.Mock()
+
+        # Auto-processing in put was disabled by mocking queue.process
+        _ = self.queue.put(f"{TASK_ID}1", f"{SUBTASK_ID}1")
+        _ = self.queue.put(f"{TASK_ID}2", f"{SUBTASK_ID}2")
+
+        await self.queue._process()
+        assert self.queue._verify.call_count == 2
+        assert not self.queue._running
+
 
 @pytest.mark.usefixtures('pytest_database_fixture')
 class TestVerify:
@@ -0,0 +1,66 @@
+from unittest import TestCase, mock
+
+from golem.task.verification.concurrency import AdaptiveConcurrency
+
+GiB = 2 ** 30
+
+
+@mock.patch('golem.task.verification.concurrency.psutil')
+class TestAdaptiveConcurrency(TestCase):
+
+    @staticmethod
+    def _mock_usage(psutil, cpu_percent=0., cpu_count=4, available=8 * GiB):
+        psutil.cpu_percent.return_value = cpu_percent
+        psutil.cpu_count.return_value = cpu_count
+        psutil.virtual_memory.return_value = mock.Mock(available=available)
+
+    def test_max_workers_default(self, psutil):
+        self._mock_usage(psutil, cpu_count=3)
+        concurrency = AdaptiveConcurrency()
+        assert concurrency.max_workers == 3
+        assert not concurrency.can_start(3)
+
+    def test_min_workers(self, psutil):
+        self._mock_usage(psutil, cpu_percent=100., available=0)
+        concurrency = AdaptiveConcurrency(max_workers=4, min_workers=2)
+        assert concurrency.can_start(0)
+        assert concurrency.can_start(1)
+        assert not concurrency.can_start(2)
+
+    def test_min_workers_above_max(self, psutil):
+        self._mock_usage(psutil)
+        concurrency = AdaptiveConcurrency(max_workers=1, min_workers=2)
+        assert not concurrency.can_start(1)
+
+    def test_cpu_headroom(self, psutil):
+        # 1.6 idle cores
+        self._mock_usage(psutil, cpu_percent=60.)
+        concurrency = AdaptiveConcurrency(max_workers=4)
+        assert concurrency.can_start(1)
+
+        concurrency = AdaptiveConcurrency(max_workers=4, cpu_per_worker=2)
+        assert not concurrency.can_start(1)
+
+    def test_memory_headroom(self, psutil):
+        self._mock_usage(psutil, available=GiB)
+        concurrency = AdaptiveConcurrency(max_workers=4,
+                                          memory_per_worker=2 * GiB)
+        assert not concurrency.can_start(1)
+
+    def test_started_since_sample(self, psutil):
+        # 2 idle cores, for 2 more workers
+        self._mock_usage(psutil, cpu_percent=50.)
+        concurrency = AdaptiveConcurrency(max_workers=4)
+        assert concurrency.can_start(1)
+        assert concurrency.can_start(2)
+        assert not concurrency.can_start(3)
+        assert psutil.virtual_memory.call_count == 1
+
+    def test_resample(self, psutil):
+        self._mock_usage(psutil, cpu_percent=100.)
+        concurrency = AdaptiveConcurrency(max_workers=4)
+        assert not concurrency.can_start(1)
+
+        psutil.cpu_percent.return_value = 0.
+        concurrency._sampled_at -= concurrency.SAMPLE_INTERVAL
+        assert concurrency.can_start(1)
@@ -939,7 +939,17 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
             'subtasks_accepted': (0, 0),
             'subtasks_rejected': (0, 0),
             'subtasks_with_errors': (0, 0),
-            'subtasks_with_timeout': (0, 0)
+            'subtasks_with_timeout': (0, 0),
+            'slots': [{
+                'index': 0,
+                'cpus': None,
+                'memory': None,
+                'task_id': None,
+                'subtask_id': None,
+                'subtasks_started': 0,
+                'subtasks_finished': 0,
+                'busy_time': 0.0,
+            }],
         }
 
         self.assertEqual(result, expected)